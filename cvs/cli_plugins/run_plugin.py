@@ -1,10 +1,177 @@
 import pytest
 import sys
 import os
+import json
+import html as html_escape
+import subprocess
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 
 from .list_plugin import ListPlugin
 
 
+def shard_nodes(node_dict, num_groups):
+    """
+    Split the nodes of a cluster into disjoint, contiguous groups of near equal size.
+
+    Node order is preserved (cluster files are usually written rack by rack), so each group
+    stays as local as the original listing. Returns a list of lists of node names, never
+    more groups than nodes.
+    """
+    nodes = list(node_dict.keys())
+    num_groups = max(1, min(num_groups, len(nodes)))
+    size, extra = divmod(len(nodes), num_groups)
+    groups = []
+    start = 0
+    for i in range(num_groups):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(nodes[start:end])
+        start = end
+    return groups
+
+
+def write_shard_cluster_files(cluster_file, node_groups, out_dir):
+    """
+    Write one cluster file per node group, identical to cluster_file except that
+    node_dict only holds the nodes of that group. Returns the list of file paths.
+    """
+    with open(cluster_file) as f:
+        cluster_dict = json.load(f)
+
+    paths = []
+    for i, group in enumerate(node_groups):
+        shard_dict = dict(cluster_dict)
+        shard_dict["node_dict"] = {node: cluster_dict["node_dict"][node] for node in group}
+        path = os.path.join(out_dir, f"cluster_group{i}.json")
+        with open(path, "w") as f:
+            json.dump(shard_dict, f, indent=4)
+        paths.append(path)
+    return paths
+
+
+def parse_junit_results(junit_file):
+    """
+    Read a pytest junit xml file into a list of {name, outcome, duration, message} dicts.
+    A missing or unreadable file (pytest crashed before writing it) gives an empty list.
+    """
+    try:
+        root = ET.parse(junit_file).getroot()
+    except (OSError, ET.ParseError):
+        return []
+
+    results = []
+    for case in root.iter("testcase"):
+        outcome, message = "passed", ""
+        for tag in ("failure", "error", "skipped"):
+            child = case.find(tag)
+            if child is not None:
+                outcome = {"failure": "failed", "error": "error", "skipped": "skipped"}[tag]
+                message = child.get("message", "")
+                break
+        results.append(
+            {
+                "name": case.get("name"),
+                "outcome": outcome,
+                "duration": float(case.get("time") or 0),
+                "message": message,
+            }
+        )
+    return results
+
+
+def merge_results(jobs):
+    """
+    Merge finished scheduler jobs into one summary dict.
+
+    Each job is a dict with suite, group, nodes, exit_code, duration, html, junit and log keys.
+    """
+    summary = {"exit_code": 0, "totals": {}, "jobs": []}
+    for job in jobs:
+        tests = parse_junit_results(job["junit"])
+        counts = {}
+        for test in tests:
+            counts[test["outcome"]] = counts.get(test["outcome"], 0) + 1
+            summary["totals"][test["outcome"]] = summary["totals"].get(test["outcome"], 0) + 1
+        summary["jobs"].append(dict(job, counts=counts, tests=tests))
+    summary["exit_code"] = merge_exit_codes([job["exit_code"] for job in jobs])
+    return summary
+
+
+def merge_exit_codes(exit_codes):
+    """
+    Combine the pytest exit codes of several runs into one.
+
+    1 (tests failed) if any run had failures, else the highest other error code (interrupted,
+    internal or usage error), else 5 (no tests collected) only if no run collected any test.
+    """
+    errors = [code for code in exit_codes if code not in (0, 5)]
+    if errors:
+        return 1 if 1 in errors else max(errors)
+    if exit_codes and all(code == 5 for code in exit_codes):
+        return 5
+    return 0
+
+
+def write_merged_html(summary, html_path):
+    """Write a single HTML page summarising every suite/node group with links to the per-job reports."""
+    base_dir = os.path.dirname(os.path.abspath(html_path))
+
+    def link(path, label):
+        if not path or not os.path.exists(path):
+            return ""
+        return f'<a href="{html_escape.escape(os.path.relpath(path, base_dir))}">{label}</a>'
+
+    rows = []
+    for job in summary["jobs"]:
+        counts = ", ".join(f"{k}: {v}" for k, v in sorted(job["counts"].items())) or "no results"
+        failed = [t for t in job["tests"] if t["outcome"] in ("failed", "error")]
+        failures = "<br>".join(html_escape.escape(f"{t['name']}: {t['message'][:200]}") for t in failed)
+        rows.append(
+            "<tr class='{cls}'><td>{suite}</td><td>{group}</td><td>{nodes}</td><td>{rc}</td>"
+            "<td>{duration:.1f}</td><td>{counts}</td><td>{failures}</td><td>{report} {log}</td></tr>".format(
+                cls="fail" if job["exit_code"] else "pass",
+                suite=html_escape.escape(job["suite"]),
+                group=job["group"],
+                nodes=html_escape.escape(", ".join(job["nodes"])),
+                rc=job["exit_code"],
+                duration=job["duration"],
+                counts=counts,
+                failures=failures,
+                report=link(job["html"], "report"),
+                log=link(job["log"], "log"),
+            )
+        )
+
+    totals = ", ".join(f"{k}: {v}" for k, v in sorted(summary["totals"].items())) or "no results"
+    page = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>CVS parallel run</title>
+<style>
+body {{ font-family: sans-serif; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: top; }}
+tr.fail {{ background: #fdd; }}
+tr.pass {{ background: #dfd; }}
+</style>
+</head>
+<body>
+<h1>CVS parallel run</h1>
+<p>Exit code: {summary["exit_code"]} &mdash; {totals}</p>
+<table>
+<tr><th>Suite</th><th>Group</th><th>Nodes</th><th>Exit code</th><th>Duration (s)</th><th>Results</th>
+<th>Failures</th><th>Files</th></tr>
+{chr(10).join(rows)}
+</table>
+</body>
+</html>
+"""
+    with open(html_path, "w") as f:
+        f.write(page)
+
+
 class RunPlugin(ListPlugin):
     def get_name(self):
         return "run"
@@ -15,7 +182,11 @@ class RunPlugin(ListPlugin):
         parser.add_argument("function", nargs="*", help="Optional: specific test functions to run")
         parser.add_argument("--cluster_file", required=True, help="Path to cluster configuration JSON file")
         parser.add_argument("--config_file", required=True, help="Path to test configuration JSON file")
-        parser.add_argument("--html", help="Pytest: Create HTML report file at given path")
+        parser.add_argument(
+            "--html",
+            help="Pytest: Create HTML report file at given path "
+            "(scheduler mode: an index page linking the per-group HTML reports)",
+        )
         parser.add_argument(
             "--self-contained-html",
             action="store_true",
@@ -36,6 +207,22 @@ class RunPlugin(ListPlugin):
             choices=["no", "tee-sys", "tee-merged", "fd", "sys"],
             help="Per-test capturing method for stdout/stderr",
         )
+        parser.add_argument(
+            "--suites",
+            nargs="+",
+            default=[],
+            help="Scheduler mode: additional test suites to run along with <test> on every node group",
+        )
+        parser.add_argument(
+            "--node-groups",
+            type=int,
+            help="Scheduler mode: split the cluster into N disjoint node groups and run the suites on all groups concurrently",
+        )
+        parser.add_argument(
+            "--results-dir",
+            default="/tmp/cvs/parallel_run",
+            help="Scheduler mode: directory for per-group cluster files, reports and logs (default: /tmp/cvs/parallel_run)",
+        )
         parser.set_defaults(_plugin=self)
         return parser
 
@@ -45,9 +232,32 @@ Run Commands:
   cvs run agfhc                      Run all tests in agfhc
   cvs run agfhc test1                Run specific test function
   cvs run agfhc test1 test2 test3    Run multiple specific test functions
-  cvs run agfhc --html report.html   Run test and generate HTML report"""
+  cvs run agfhc --html report.html   Run test and generate HTML report
+  cvs run rvs_cvs --suites agfhc_cvs --node-groups 8 --html report.html
+                                     Run node-local suites on 8 node groups concurrently,
+                                     with an HTML index linking the per-group reports
+                                     (plus summary.json)"""
 
     def run(self, args):
+        # Only switch to scheduler mode when the options were actually given on the command line
+        node_groups = getattr(args, "node_groups", None)
+        suites = getattr(args, "suites", None)
+        if isinstance(node_groups, int) or (isinstance(suites, list) and suites):
+            self.run_scheduled(
+                [args.test] + list(suites or []),
+                args.function,
+                args.cluster_file,
+                args.config_file,
+                node_groups if isinstance(node_groups, int) else 1,
+                args.results_dir,
+                args.html,
+                args.self_contained_html,
+                args.log_file,
+                args.log_level,
+                args.capture,
+                getattr(args, "extra_pytest_args", []),
+            )
+            return
         self.run_test(
             args.test,
             args.function,
@@ -122,3 +332,120 @@ Run Commands:
         # Run pytest normally
         exit_code = pytest.main(pytest_args)
         sys.exit(exit_code)
+
+    def run_scheduled(
+        self,
+        test_names,
+        test_functions,
+        cluster_file,
+        config_file,
+        node_groups,
+        results_dir,
+        html,
+        self_contained_html,
+        log_file,
+        log_level,
+        capture,
+        extra_pytest_args,
+    ):
+        """
+        Run node-local suites across disjoint node groups concurrently.
+
+        The cluster is split into node_groups groups, each written to its own cluster file so
+        every pytest run builds its Pssh handle over its own nodes only. Groups run in
+        parallel (one pytest process each); the suites of a group run one after another so no
+        node ever runs two suites at the same time. Per-run junit reports and logs are merged
+        into summary.json and an HTML index of links to the per-run reports (at html if given,
+        else index.html in the run directory), jobs listed in the order the suites were given.
+        Per-run pytest-html reports are only written when html is given.
+
+        Concurrent runs can't share one log file, so each run logs to log_file with
+        _<suite>_group<N> appended to its name (to the results directory without log_file).
+        """
+        test_files = []
+        for test_name in test_names:
+            module_path = self._find_test(test_name)
+            if not module_path:
+                print(f"Error: Unknown test '{test_name}'")
+                print("Use 'cvs list' to see available tests.")
+                sys.exit(1)
+            test_files.append((test_name, self.get_test_file(module_path)))
+
+        with open(cluster_file) as f:
+            node_dict = json.load(f).get("node_dict", {})
+        if not node_dict:
+            print(f"Error: No nodes in node_dict of {cluster_file}")
+            sys.exit(1)
+
+        run_dir = os.path.join(results_dir, time.strftime("%Y%m%d-%H%M%S"))
+        os.makedirs(run_dir, exist_ok=True)
+        groups = shard_nodes(node_dict, node_groups)
+        shard_files = write_shard_cluster_files(cluster_file, groups, run_dir)
+        print(f"Running {len(test_files)} suite(s) on {len(groups)} node group(s), results in {run_dir}")
+
+        def job_log_file(test_name, group_index):
+            if not log_file:
+                return os.path.join(run_dir, f"{test_name}_group{group_index}.log")
+            base, ext = os.path.splitext(log_file)
+            return f"{base}_{test_name}_group{group_index}{ext or '.log'}"
+
+        if log_file and os.path.dirname(log_file):
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+        def run_group(group_index):
+            jobs = []
+            for test_name, test_file in test_files:
+                prefix = os.path.join(run_dir, f"{test_name}_group{group_index}")
+                targets = [f"{test_file}::{func}" for func in test_functions] if test_functions else [test_file]
+                # Test functions are only meaningful for the first suite
+                if test_functions and test_name != test_names[0]:
+                    targets = [test_file]
+                cmd = [sys.executable, "-m", "pytest"] + targets
+                cmd += [
+                    f"--cluster_file={shard_files[group_index]}",
+                    f"--config_file={config_file}",
+                    f"--junitxml={prefix}.xml",
+                    f"--log-file={job_log_file(test_name, group_index)}",
+                ]
+                if html:
+                    cmd.append(f"--html={prefix}.html")
+                    if self_contained_html:
+                        cmd.append("--self-contained-html")
+                if log_level:
+                    cmd.append(f"--log-level={log_level}")
+                if capture:
+                    cmd.append(f"--capture={capture}")
+                cmd.extend(extra_pytest_args)
+
+                start = time.time()
+                with open(f"{prefix}.console.log", "w") as console:
+                    exit_code = subprocess.call(cmd, stdout=console, stderr=subprocess.STDOUT)
+                duration = time.time() - start
+                print(f"  {test_name} group {group_index} ({len(groups[group_index])} nodes): exit {exit_code}")
+                jobs.append(
+                    {
+                        "suite": test_name,
+                        "group": group_index,
+                        "nodes": groups[group_index],
+                        "exit_code": exit_code,
+                        "duration": duration,
+                        "html": f"{prefix}.html" if html else None,
+                        "junit": f"{prefix}.xml",
+                        "log": f"{prefix}.console.log",
+                    }
+                )
+            return jobs
+
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            group_jobs = list(pool.map(run_group, range(len(groups))))
+        suite_order = {test_name: i for i, (test_name, _) in enumerate(test_files)}
+        jobs = sorted((job for jobs in group_jobs for job in jobs), key=lambda j: (suite_order[j["suite"]], j["group"]))
+
+        summary = merge_results(jobs)
+        with open(os.path.join(run_dir, "summary.json"), "w") as f:
+            json.dump(summary, f, indent=4)
+        html_path = html or os.path.join(run_dir, "index.html")
+        write_merged_html(summary, html_path)
+        print(f"Merged report: {html_path}")
+        print(f"Summary: {os.path.join(run_dir, 'summary.json')}")
+        sys.exit(summary["exit_code"])
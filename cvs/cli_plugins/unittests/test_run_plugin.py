@@ -2,11 +2,13 @@ import unittest
 from unittest.mock import MagicMock, patch
 import sys
 import os
+import json
+import tempfile
 
 # Add the parent directory to sys.path to import cli_plugins
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from cvs.cli_plugins.run_plugin import RunPlugin
+from cvs.cli_plugins.run_plugin import RunPlugin, merge_exit_codes, shard_nodes
 
 
 class TestRunPlugin(unittest.TestCase):
@@ -80,5 +82,128 @@ class TestRunPlugin(unittest.TestCase):
         mock_exit.assert_called_once_with(0)
 
 
+class TestRunScheduled(unittest.TestCase):
+    def setUp(self):
+        self.plugin = RunPlugin()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cluster_file = os.path.join(self.tmpdir.name, "cluster.json")
+        with open(self.cluster_file, "w") as f:
+            json.dump(
+                {
+                    "username": "user",
+                    "head_node_dict": {"mgmt_ip": "head"},
+                    "node_dict": {f"node{i}": {"bmc_ip": "NA", "vpc_ip": f"node{i}"} for i in range(5)},
+                },
+                f,
+            )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_shard_nodes(self):
+        node_dict = {f"node{i}": {} for i in range(5)}
+        self.assertEqual(shard_nodes(node_dict, 2), [["node0", "node1", "node2"], ["node3", "node4"]])
+        self.assertEqual(len(shard_nodes(node_dict, 10)), 5)
+        self.assertEqual(shard_nodes(node_dict, 1), [list(node_dict)])
+
+    @patch("cvs.cli_plugins.run_plugin.sys.exit")
+    @patch("cvs.cli_plugins.run_plugin.subprocess.call")
+    def test_run_scheduled_merges_results(self, mock_call, mock_exit):
+        """Each suite runs once per node group with a sharded cluster file, results are merged"""
+        seen_nodes, commands, results_dir = self._run_scheduled(mock_call, html=None)
+
+        self.assertEqual(mock_call.call_count, 4)
+        self.assertEqual(sorted(seen_nodes)[0], ["node0", "node1", "node2"])
+        for cmd in commands:
+            # No per-run HTML report unless --html was given
+            self.assertFalse([arg for arg in cmd if "html" in arg])
+            self.assertIn("--capture=tee-sys", cmd)
+        self.assertIn(
+            f"--log-file={os.path.join(self.tmpdir.name, 'logs', 'test_suite_a_group1.log')}",
+            [arg for cmd in commands for arg in cmd],
+        )
+        mock_exit.assert_called_once_with(1)
+
+        run_dir = os.path.join(results_dir, os.listdir(results_dir)[0])
+        with open(os.path.join(run_dir, "summary.json")) as f:
+            summary = json.load(f)
+        self.assertEqual(summary["exit_code"], 1)
+        self.assertEqual(summary["totals"], {"passed": 4, "failed": 2})
+        self.assertEqual(
+            [(j["suite"], j["group"]) for j in summary["jobs"]],
+            [("suite_b", 0), ("suite_b", 1), ("suite_a", 0), ("suite_a", 1)],
+        )
+        self.assertTrue(os.path.exists(os.path.join(run_dir, "index.html")))
+
+    @patch("cvs.cli_plugins.run_plugin.sys.exit")
+    @patch("cvs.cli_plugins.run_plugin.subprocess.call")
+    def test_run_scheduled_passes_html_through(self, mock_call, mock_exit):
+        """With --html every run writes its own report and the index goes to the given path"""
+        index = os.path.join(self.tmpdir.name, "report.html")
+        _, commands, results_dir = self._run_scheduled(mock_call, html=index)
+
+        run_dir = os.path.join(results_dir, os.listdir(results_dir)[0])
+        for cmd in commands:
+            self.assertIn("--self-contained-html", cmd)
+        self.assertIn(
+            f"--html={os.path.join(run_dir, 'suite_a_group1.html')}", [arg for cmd in commands for arg in cmd]
+        )
+        self.assertTrue(os.path.exists(index))
+        self.assertFalse(os.path.exists(os.path.join(run_dir, "index.html")))
+
+    def _run_scheduled(self, mock_call, html):
+        """Run suite_b and suite_a on 2 node groups; returns (nodes of each run, commands, results_dir)"""
+        seen_nodes = []
+        commands = []
+
+        def fake_pytest(cmd, stdout=None, stderr=None):
+            commands.append(cmd)
+            cluster_arg = next(a for a in cmd if a.startswith("--cluster_file="))
+            with open(cluster_arg.split("=", 1)[1]) as f:
+                shard = json.load(f)
+            self.assertEqual(shard["head_node_dict"], {"mgmt_ip": "head"})
+            seen_nodes.append(sorted(shard["node_dict"]))
+            junit = next(a for a in cmd if a.startswith("--junitxml=")).split("=", 1)[1]
+            failed = "node4" in shard["node_dict"]
+            with open(junit, "w") as f:
+                f.write(
+                    '<testsuites><testsuite><testcase name="test_a" time="1.5"/>'
+                    + ('<testcase name="test_b"><failure message="boom"/></testcase>' if failed else "")
+                    + "</testsuite></testsuites>"
+                )
+            return 1 if failed else 0
+
+        mock_call.side_effect = fake_pytest
+        results_dir = os.path.join(self.tmpdir.name, "results")
+        with (
+            patch.object(self.plugin, "_find_test", side_effect=lambda name: f"cvs.tests.health.{name}"),
+            patch.object(self.plugin, "get_test_file", side_effect=lambda m: f"/mock/{m.split('.')[-1]}.py"),
+        ):
+            self.plugin.run_scheduled(
+                ["suite_b", "suite_a"],
+                [],
+                self.cluster_file,
+                "/path/config.json",
+                2,
+                results_dir,
+                html,
+                True,
+                os.path.join(self.tmpdir.name, "logs", "test.log"),
+                None,
+                "tee-sys",
+                [],
+            )
+        return seen_nodes, commands, results_dir
+
+    def test_merge_exit_codes(self):
+        """Failed tests outrank 'no tests collected', which is only reported when no run collected any"""
+        self.assertEqual(merge_exit_codes([5, 1, 0]), 1)
+        self.assertEqual(merge_exit_codes([5, 5]), 5)
+        self.assertEqual(merge_exit_codes([0, 5]), 0)
+        self.assertEqual(merge_exit_codes([2, 5, 0]), 2)
+        self.assertEqual(merge_exit_codes([3, 1]), 1)
+        self.assertEqual(merge_exit_codes([]), 0)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -5,6 +5,7 @@ The year included in the foregoing notice is the year of creation of the work.
 All code contained here is Property of Advanced Micro Devices, Inc.
 '''
 
+import base64
 import re
 import time
 import xlsxwriter
@@ -12,86 +13,226 @@ import xlsxwriter
 from cvs.lib.utils_lib import *
 
 
-def get_ib_bw_pps(phdl, msg_size, cmd):
-    res_dict = {}
+IB_ERR_PATTERN = (
+    "Couldn't initialize ROCm device|Failed to init|Unable to open file descriptor|ERROR|FAIL|Segmentation fault"
+)
+
+IB_LOG_FRAME_MARKER = '__CVS_IBPERF__'
+
+# perftest result rows, one per message size (or per reporting interval with --run_infinitely)
+#  #bytes  #iterations  BW peak[Gb/sec]  BW average[Gb/sec]  MsgRate[Mpps]
+IB_BW_ROW_RE = re.compile(r'^[ \t]*(\d+)[ \t]+\d+[ \t]+[0-9.]+[ \t]+([0-9.]+)[ \t]+([0-9.]+)', re.M)
+#  #bytes  #iterations  t_min  t_max  t_typical  t_avg  t_stdev  99%  99.9%  [usec]
+IB_LAT_ROW_RE = re.compile(r'^[ \t]*(\d+)[ \t]+\d+' + r'[ \t]+([0-9.]+)' * 7, re.M)
+IB_LAT_FIELDS = ['t_min', 't_max', 't_typical', 't_avg', 't_stdev', 't_99_pct', 't_99_9_pct']
+
+# grep -E form of the rows above, used on the nodes to wait for results
+IB_ROW_GREP = '^[[:space:]]*[0-9]+[[:space:]]+[0-9]+[[:space:]]+[0-9.]+[[:space:]]+[0-9.]+'
+
+
+def parse_ib_bw_output(output):
+    """
+    Parse every result row of an ib_*_bw log.
+
+    Returns:
+      dict: msg_size (int) -> list of {'bw': str, 'pps': str} samples in log order. A regular
+      run has one sample per size, a --run_infinitely run one per reporting interval.
+    """
+    rows = {}
+    for match in IB_BW_ROW_RE.finditer(output):
+        rows.setdefault(int(match.group(1)), []).append({'bw': match.group(2), 'pps': match.group(3)})
+    return rows
+
+
+def parse_ib_lat_output(output):
+    """
+    Parse every result row of an ib_*_lat log.
+
+    Returns:
+      dict: msg_size (int) -> list of {'t_min', 't_max', 't_typical', 't_avg', 't_stdev',
+      't_99_pct', 't_99_9_pct'} samples (values as str) in log order.
+    """
+    rows = {}
+    for match in IB_LAT_ROW_RE.finditer(output):
+        rows.setdefault(int(match.group(1)), []).append(dict(zip(IB_LAT_FIELDS, match.groups()[1:])))
+    return rows
+
+
+def summarize_ib_samples(samples):
+    """
+    Fold the samples of one message size into a single result dict.
 
-    # Run some of the standard verifications
-    out_dict = phdl.exec(cmd)
-    err_pattern = (
-        "Couldn't initialize ROCm device|Failed to init|Unable to open file descriptor|ERROR|FAIL|Segmentation fault"
+    A single sample is returned as is. With several samples every field holds the mean
+    (formatted like perftest output) and '<field>_samples' the individual values, so
+    callers reading 'bw' / 't_avg' keep working.
+    """
+    if len(samples) == 1:
+        return dict(samples[0])
+    res = {}
+    for field in samples[0]:
+        values = [sample[field] for sample in samples]
+        res[field] = f'{sum(float(v) for v in values) / len(values):.6f}'
+        res[f'{field}_samples'] = values
+    return res
+
+
+def _wait_for_rows_script(log_files, min_rows, max_wait, poll_interval):
+    """
+    Shell loop that returns once every log file holds min_rows perftest result rows, or
+    after max_wait seconds, checking every poll_interval seconds on the node itself.
+    """
+    tries = max(1, int(max_wait // poll_interval))
+    files = ' '.join(log_files)
+    return (
+        f'for try in $(seq {tries}); do done=1; '
+        f"for f in {files}; do n=$(grep -cE '{IB_ROW_GREP}' $f 2>/dev/null); "
+        f'[ "${{n:-0}}" -ge {min_rows} ] || done=0; done; '
+        f'[ $done = 1 ] && break; sleep {poll_interval}; done'
     )
+
+
+def check_ib_log_errors(out_dict, log_name=''):
+    """Flag perftest logs that never set up their GPU buffer or contain error patterns."""
     for node in out_dict.keys():
         if not re.search('bytes of GPU buffer', out_dict[node], re.I):
-            fail_test(f'GPU Buffer allocation failed or Connection not setup for IB Test on node {node}')
-
-        if re.search(err_pattern, out_dict[node], re.I):
-            fail_test(f'IB Test failed - Error patterns seen on node {node}')
-
-    # Collect the BW, PPS numbers
-    for i in range(1, 10):
-        print(f'starting iteration {i} to collect numbers')
-        out_dict = phdl.exec(cmd)
-        for node in out_dict.keys():
-            res_dict[node] = {}
-            pattern = r"{}\s+\d+\s+[0-9\.]+\s+([0-9\.]+)\s+([0-9\.]+)".format(msg_size)
-            if re.search(pattern, out_dict[node]):
-                match = re.search(pattern, out_dict[node])
-                res_dict[node]['bw'] = match.group(1)
-                res_dict[node]['pps'] = match.group(2)
-                print(f"Node {node} BW - {res_dict[node]['bw']}, MPPS - {res_dict[node]['pps']}")
-                continue
-            else:
-                print('Sleeping 10 secs for test to complete')
-                time.sleep(10)
-            fail_test(
-                f'ERROR !!! on node {node} Client did not complete even after max iterations for msg size {msg_size}'
-            )
-            fail_test(f'ERROR !!! pls check log file for errors on node {node}')
-    return res_dict
+            fail_test(f'GPU Buffer allocation failed or Connection not setup for IB Test on node {node} {log_name}')
+
+        if re.search(IB_ERR_PATTERN, out_dict[node], re.I):
+            fail_test(f'IB Test failed - Error patterns seen on node {node} {log_name}')
+
+
+def split_ib_log_frames(output):
+    """Split output framed with IB_LOG_FRAME_MARKER lines into {log name: contents}."""
+    frames = {}
+    current = None
+    lines = []
+    for line in output.splitlines():
+        if line.startswith(IB_LOG_FRAME_MARKER + ' '):
+            if current is not None:
+                frames[current] = '\n'.join(lines) + '\n'
+            current = line[len(IB_LOG_FRAME_MARKER) + 1 :].strip()
+            lines = []
+        elif current is not None:
+            lines.append(line)
+    if current is not None:
+        frames[current] = '\n'.join(lines) + '\n'
+    return frames
+
+
+def collect_ib_perf_logs(phdl, log_files, min_rows=1, max_wait=120, poll_interval=2):
+    """
+    Fetch several perftest logs from every node in a single exec.
 
+    The node waits until each log holds at least min_rows result rows (or max_wait seconds
+    have passed) and then prints all of them, each preceded by a marker line, so a slow
+    client costs one remote loop instead of repeated cat + sleep round trips.
 
-def get_ib_lat_numb(phdl, msg_size, cmd):
-    res_dict = {}
+    Parameters:
+      phdl: Parallel SSH handle.
+      log_files (list[str]): Log paths, identical on every node.
+      min_rows (int): Result rows to wait for in each log (1 per size, or the sample count).
+      max_wait (int): Upper bound in seconds for the wait.
+      poll_interval (int): Seconds between checks on the node.
+
+    Returns:
+      dict: node -> {log file: contents} ('' for a log that was not printed).
+    """
+    cmd = _wait_for_rows_script(log_files, min_rows, max_wait, poll_interval)
+    cmd += '; ' + '; '.join(f'echo "{IB_LOG_FRAME_MARKER} {f}"; cat {f} 2>/dev/null' for f in log_files)
+    out_dict = phdl.exec(cmd, timeout=max_wait + 60, print_console=False)
 
-    # Run some of the standard verifications
-    out_dict = phdl.exec(cmd)
-    err_pattern = (
-        "Couldn't initialize ROCm device|Failed to init|Unable to open file descriptor|ERROR|FAIL|Segmentation fault"
+    logs_dict = {}
+    for node, output in out_dict.items():
+        logs_dict[node] = {f: '' for f in log_files}
+        logs_dict[node].update(split_ib_log_frames(output))
+    return logs_dict
+
+
+def collect_ib_perf_results(phdl, inst_count, msg_size, parse_fn, min_rows=1, max_wait=120, poll_interval=2):
+    """
+    Collect the results of all perftest instances launched by run_ib_perf_bw_test /
+    run_ib_perf_lat_test (logs /tmp/ib_perf_<instance>_logs) in one exec.
+
+    Parameters:
+      inst_count (int): Number of instances per node.
+      msg_size: Message size to report.
+      parse_fn: parse_ib_bw_output or parse_ib_lat_output.
+      min_rows, max_wait, poll_interval: See collect_ib_perf_logs.
+
+    Returns:
+      dict: node -> {instance_no: result dict}, instances without a result row are failed and left out.
+    """
+    log_files = [f'/tmp/ib_perf_{instance_no}_logs' for instance_no in range(inst_count)]
+    logs_dict = collect_ib_perf_logs(phdl, log_files, min_rows, max_wait, poll_interval)
+
+    result_dict = {}
+    for node, logs in logs_dict.items():
+        result_dict[node] = {}
+        for instance_no, log_file in enumerate(log_files):
+            check_ib_log_errors({node: logs[log_file]}, log_file)
+            samples = parse_fn(logs[log_file]).get(int(msg_size))
+            if not samples:
+                fail_test(
+                    f'ERROR !!! on node {node} no results in {log_file} for msg size {msg_size} after {max_wait} secs'
+                )
+                continue
+            result_dict[node][instance_no] = summarize_ib_samples(samples[:min_rows])
+    return result_dict
+
+
+def _get_ib_results(phdl, msg_size, cmd, parse_fn, min_rows, max_wait, poll_interval):
+    # Run cmd on the node until its output holds the result rows, then print it once
+    wait_cmd = (
+        f'for try in $(seq {max(1, int(max_wait // poll_interval))}); do out=$({cmd}); '
+        f"[ \"$(echo \"$out\" | grep -cE '{IB_ROW_GREP}')\" -ge {min_rows} ] && break; "
+        f'sleep {poll_interval}; done; echo "$out"'
     )
+    out_dict = phdl.exec(wait_cmd, timeout=max_wait + 60)
+    check_ib_log_errors(out_dict)
+
+    res_dict = {}
     for node in out_dict.keys():
         res_dict[node] = {}
-        if not re.search('bytes of GPU buffer', out_dict[node], re.I):
-            fail_test(f'GPU Buffer allocation failed or Connection not setup for IB Test on node {node}')
-
-        if re.search(err_pattern, out_dict[node], re.I):
-            fail_test(f'IB Test failed - Error patterns seen on node {node}')
-
-    # Collect the BW, PPS numbers
-    for i in range(1, 4):
-        print(f'starting iteration {i} to collect numbers')
-        out_dict = phdl.exec(cmd)
-        for node in out_dict.keys():
-            pattern = "{}[\t\s]+[0-9]+[\t\s]+([0-9\.]+)[\t\s]+([0-9\.]+)[\t\s]+([0-9\.]+)[\t\s]+([0-9\.]+)[\t\s]+([0-9\.]+)[\t\s]+([0-9\.]+)[\t\s]+([0-9\.]+)".format(
-                msg_size
-            )
-            if re.search(pattern, out_dict[node]):
-                match = re.search(pattern, out_dict[node])
-                res_dict[node]['t_min'] = match.group(1)
-                res_dict[node]['t_max'] = match.group(2)
-                res_dict[node]['t_typical'] = match.group(3)
-                res_dict[node]['t_avg'] = match.group(4)
-                res_dict[node]['t_stdev'] = match.group(5)
-                res_dict[node]['t_99_pct'] = match.group(6)
-                res_dict[node]['t_99_9_pct'] = match.group(7)
-                print(f'Node {node} Avg Lat - {res_dict[node]["t_avg"]}')
-                continue
-            else:
-                print('Sleeping 10 secs for test to complete')
-                time.sleep(10)
+        samples = parse_fn(out_dict[node]).get(int(msg_size))
+        if not samples:
             fail_test(
-                f'ERROR !!! on node {node} Client did not complete even after max iterations for msg size {msg_size}'
+                f'ERROR !!! on node {node} Client did not complete even after {max_wait} secs for msg size {msg_size}'
             )
             fail_test(f'ERROR !!! pls check log file for errors on node {node}')
+            continue
+        res_dict[node] = summarize_ib_samples(samples[:min_rows])
+    return res_dict
+
+
+def get_ib_bw_pps(phdl, msg_size, cmd, min_rows=1, max_wait=100, poll_interval=2):
+    """
+    Collect BW and MPPS for msg_size from the output of cmd (typically a cat of the log).
+
+    cmd is executed once: the node itself re-runs it every poll_interval seconds until the
+    output holds min_rows result rows or max_wait seconds pass. With min_rows > 1 (a
+    --run_infinitely run) 'bw' / 'pps' are the mean of the samples.
+
+    Returns:
+      dict: node -> {'bw': str, 'pps': str, ...}
+    """
+    res_dict = _get_ib_results(phdl, msg_size, cmd, parse_ib_bw_output, min_rows, max_wait, poll_interval)
+    for node, res in res_dict.items():
+        if res:
+            print(f"Node {node} BW - {res['bw']}, MPPS - {res['pps']}")
+    return res_dict
+
+
+def get_ib_lat_numb(phdl, msg_size, cmd, min_rows=1, max_wait=30, poll_interval=2):
+    """
+    Collect the latency numbers for msg_size from the output of cmd, see get_ib_bw_pps.
+
+    Returns:
+      dict: node -> {'t_min', 't_max', 't_typical', 't_avg', 't_stdev', 't_99_pct', 't_99_9_pct'}
+    """
+    res_dict = _get_ib_results(phdl, msg_size, cmd, parse_ib_lat_output, min_rows, max_wait, poll_interval)
+    for node, res in res_dict.items():
+        if res:
+            print(f'Node {node} Avg Lat - {res["t_avg"]}')
     return res_dict
 
 
@@ -136,8 +277,21 @@ def run_ib_perf_bw_test(
     qp_count=8,
     port_no=1516,
     duration=60,
+    samples=1,
 ):
+    """
+    Run bw_test between node pairs on all 8 GPU/NIC pairs and return
+    {node: {instance_no: {'bw': .., 'pps': ..}}}.
+
+    With samples > 1 every instance runs once with --run_infinitely, reporting every
+    duration/samples seconds, and the reported numbers are the mean of the first samples
+    intervals (the individual values are kept in 'bw_samples' / 'pps_samples').
+    """
     app_port = port_no
+    if samples > 1:
+        run_opts = f'-D {max(1, int(duration) // samples)} --run_infinitely'
+    else:
+        run_opts = f'-D {duration}'
     result_dict = {}
     i = 0
     cmd_dict = {}
@@ -159,7 +313,7 @@ def run_ib_perf_bw_test(
             for gpu_no in range(0, 8):
                 card_no = 'card' + str(gpu_no)
                 rdma_dev = gpu_nic_dict[node][card_no]['rdma_dev']
-                cmd = f'numactl --physcpubind={gpu_numa_dict[node][card_no]["local_cpulist"]} --localalloc {app_path}/{bw_test} -d {rdma_dev} --use_rocm={gpu_no} -x {gid_index} --report_gbits -b -F -D {duration} -p {port_no} -s {msg_size} -q {qp_count} > /tmp/ib_perf_{inst_count}_logs &  2>&1'
+                cmd = f'numactl --physcpubind={gpu_numa_dict[node][card_no]["local_cpulist"]} --localalloc {app_path}/{bw_test} -d {rdma_dev} --use_rocm={gpu_no} -x {gid_index} --report_gbits -b -F {run_opts} -p {port_no} -s {msg_size} -q {qp_count} > /tmp/ib_perf_{inst_count}_logs &  2>&1'
                 cmd_dict[node].append(f'echo "{cmd}" >> /tmp/ib_cmds_file.txt')
                 inst_count = inst_count + 1
                 port_no = port_no + 1
@@ -172,7 +326,7 @@ def run_ib_perf_bw_test(
             for gpu_no in range(0, 8):
                 card_no = 'card' + str(gpu_no)
                 rdma_dev = gpu_nic_dict[node][card_no]['rdma_dev']
-                cmd = f'numactl --physcpubind={gpu_numa_dict[node][card_no]["local_cpulist"]} --localalloc {app_path}/{bw_test} -d {rdma_dev} --use_rocm={gpu_no} -x {gid_index} --report_gbits -b -F -D {duration} -p {port_no} -s {msg_size} -q {qp_count} {server_addr} > /tmp/ib_perf_{inst_count}_logs &  2>&1'
+                cmd = f'numactl --physcpubind={gpu_numa_dict[node][card_no]["local_cpulist"]} --localalloc {app_path}/{bw_test} -d {rdma_dev} --use_rocm={gpu_no} -x {gid_index} --report_gbits -b -F {run_opts} -p {port_no} -s {msg_size} -q {qp_count} {server_addr} > /tmp/ib_perf_{inst_count}_logs &  2>&1'
                 cmd_dict[node].append(f'echo "{cmd}" >> /tmp/ib_cmds_file.txt')
                 inst_count = inst_count + 1
                 port_no = port_no + 1
@@ -194,18 +348,18 @@ def run_ib_perf_bw_test(
     time.sleep(2)
     phdl.exec('source /tmp/ib_cmds_file.txt')
 
-    time.sleep(20)
-
-    for instance_no in range(0, inst_count):
-        print('instance_no - {}'.format(instance_no))
-        try:
-            bw_pps_dict = get_ib_bw_pps(phdl, msg_size, f'cat /tmp/ib_perf_{instance_no}_logs')
-            for node in bw_pps_dict.keys():
-                result_dict[node][instance_no] = {}
-                result_dict[node][instance_no]['pps'] = bw_pps_dict[node]['pps']
-                result_dict[node][instance_no]['bw'] = bw_pps_dict[node]['bw']
-        except Exception:
-            print('FAILED to get BW, PPS numbers for size - {} qp_count {}'.format(msg_size, qp_count))
+    # The nodes wait for the results themselves; one exec covers every instance
+    try:
+        results = collect_ib_perf_results(
+            phdl, inst_count, msg_size, parse_ib_bw_output, min_rows=samples, max_wait=int(duration) + 60
+        )
+        for node in results.keys():
+            result_dict.setdefault(node, {}).update(results[node])
+    except Exception as e:
+        print('FAILED to get BW, PPS numbers for size - {} qp_count {} - {}'.format(msg_size, qp_count, e))
+    if samples > 1:
+        # --run_infinitely instances only stop when killed
+        phdl.exec(f'killall {bw_test}')
 
     print('%%%%%%%%%% BW result_dict %%%%%%%%%%')
     print(result_dict)
@@ -272,36 +426,314 @@ def run_ib_perf_lat_test(
     time.sleep(2)
     phdl.exec('source /tmp/ib_cmds_file.txt')
 
-    # wait for the duration of test
-    time.sleep(20)
-
-    for instance_no in range(0, inst_count):
-        print('instance_no - {}'.format(instance_no))
-        try:
-            lat_dict = get_ib_lat_numb(phdl, msg_size, f'cat /tmp/ib_perf_{instance_no}_logs')
-            print(f'%%%%% lat_dict = {lat_dict}')
-            for node in bck_nic_dict.keys():
-                result_dict[node][instance_no] = {}
-                result_dict[node][instance_no]['t_min'] = lat_dict[node]['t_min']
-                result_dict[node][instance_no]['t_max'] = lat_dict[node]['t_max']
-                result_dict[node][instance_no]['t_typical'] = lat_dict[node]['t_typical']
-                result_dict[node][instance_no]['t_avg'] = lat_dict[node]['t_avg']
-                result_dict[node][instance_no]['t_stdev'] = lat_dict[node]['t_stdev']
-                result_dict[node][instance_no]['t_99_pct'] = lat_dict[node]['t_99_pct']
-                result_dict[node][instance_no]['t_99_9_pct'] = lat_dict[node]['t_99_9_pct']
-                print('***** result_dict for lat = {result_dict[node][instance_no]')
-        except Exception:
-            print(
-                'FAILED to get latency numbers for size - {}'.format(
-                    msg_size,
-                )
-            )
+    # The nodes wait for the results themselves; one exec covers every instance
+    try:
+        results = collect_ib_perf_results(phdl, inst_count, msg_size, parse_ib_lat_output, max_wait=60)
+        for node in results.keys():
+            result_dict.setdefault(node, {}).update(results[node])
+    except Exception as e:
+        print('FAILED to get latency numbers for size - {} - {}'.format(msg_size, e))
 
     print('%%%%%%%%%% LAT result_dict %%%%%%%%%%')
     print(result_dict)
     return result_dict
 
 
+IB_SWEEP_DIR = '/tmp/ib_sweep'
+IB_SWEEP_DONE = 'sweep.done'
+
+
+def pair_ib_nodes(node_list):
+    """Pair nodes as (server, client) in order, like run_ib_perf_bw_test; an odd last node is left out."""
+    return [(node_list[i], node_list[i + 1]) for i in range(0, len(node_list) - 1, 2)]
+
+
+def build_ib_lanes(gpu_nic_dict, server_node, client_node, gpu_list=range(0, 8)):
+    """
+    Group the GPUs of a node pair into lanes that never share a NIC.
+
+    GPU n on the server talks to GPU n on the client. Two GPUs whose traffic would cross
+    the same rdma device on either node (a NIC shared by several GPUs) land in the same
+    lane; lanes run concurrently, the GPUs of one lane one after another.
+
+    Returns:
+      list[list[int]]: GPU numbers per lane.
+    """
+    lanes = []
+    for gpu_no in gpu_list:
+        card_no = 'card' + str(gpu_no)
+        devs = {
+            ('server', gpu_nic_dict[server_node][card_no]['rdma_dev']),
+            ('client', gpu_nic_dict[client_node][card_no]['rdma_dev']),
+        }
+        merged = [lane for lane in lanes if lane['devs'] & devs]
+        lane = {'gpus': [gpu_no], 'devs': set(devs)}
+        for other in merged:
+            lane['gpus'] += other['gpus']
+            lane['devs'] |= other['devs']
+        lanes = [other for other in lanes if other not in merged] + [lane]
+    return [sorted(lane['gpus']) for lane in lanes]
+
+
+def build_ib_sweep_points(apps, msg_size_list, qp_count_list=None):
+    """
+    List the (app, msg_size, qp_count) points of a sweep, qp_count is None for latency apps.
+    """
+    points = []
+    for app in apps:
+        for msg_size in msg_size_list:
+            if app.endswith('_lat'):
+                points.append((app, msg_size, None))
+            else:
+                for qp_count in qp_count_list or [8]:
+                    points.append((app, msg_size, qp_count))
+    return points
+
+
+def ib_sweep_log_name(point, gpu_no, sweep_dir=IB_SWEEP_DIR):
+    app, msg_size, qp_count = point
+    qp = f'_q{qp_count}' if qp_count is not None else ''
+    return f'{sweep_dir}/{app}_s{msg_size}{qp}_g{gpu_no}.log'
+
+
+def build_ib_sweep_script(
+    role,
+    node,
+    peer,
+    lanes,
+    points,
+    gpu_numa_dict,
+    gpu_nic_dict,
+    app_path,
+    gid_index,
+    port_no=1516,
+    duration=60,
+    sweep_dir=IB_SWEEP_DIR,
+    samples=1,
+    connect_window=None,
+):
+    """
+    Build the shell script running a whole sweep on one side of a node pair.
+
+    Every lane is a background subshell that walks through all points for its GPUs; the
+    server side of a job listens on a port unique to (gpu, point) and the client retries
+    the connection until the server of that point is up, so both sides advance in lock
+    step without the controller. Each finished job touches <log>.done.
+
+    Parameters:
+      role (str): 'server' or 'client'.
+      node (str): Node the script runs on.
+      peer (str): Server address (only used for the client).
+      lanes (list[list[int]]): From build_ib_lanes.
+      points (list[tuple]): From build_ib_sweep_points.
+      samples (int): Bandwidth samples per bw job, as for run_ib_perf_bw_test: above 1 the
+            job runs with --run_infinitely, reporting every duration/samples seconds, and
+            is stopped once samples rows are logged.
+      connect_window (int): Seconds a client keeps retrying to reach its server. Defaults
+            to the job timeout, the longest the server can still be busy with its previous job.
+
+    Returns:
+      str: Script contents.
+    """
+    job_timeout = int(duration) + 60
+    if connect_window is None:
+        connect_window = job_timeout
+    lines = [f'mkdir -p {sweep_dir}']
+    for lane in lanes:
+        jobs = []
+        for point_no, point in enumerate(points):
+            app, msg_size, qp_count = point
+            for gpu_no in lane:
+                card_no = 'card' + str(gpu_no)
+                port = int(port_no) + gpu_no * len(points) + point_no
+                multi_sample = qp_count is not None and samples > 1
+                if qp_count is None:
+                    opts = f'--report_gbits -F -p {port} -s {msg_size}'
+                elif multi_sample:
+                    opts = (
+                        f'--report_gbits -b -F -D {max(1, int(duration) // samples)} --run_infinitely '
+                        f'-p {port} -s {msg_size} -q {qp_count}'
+                    )
+                else:
+                    opts = f'--report_gbits -b -F -D {duration} -p {port} -s {msg_size} -q {qp_count}'
+                log_file = ib_sweep_log_name(point, gpu_no, sweep_dir)
+                cmd = (
+                    f'timeout {job_timeout} numactl --physcpubind={gpu_numa_dict[node][card_no]["local_cpulist"]} '
+                    f'--localalloc {app_path}/{app} -d {gpu_nic_dict[node][card_no]["rdma_dev"]} '
+                    f'--use_rocm={gpu_no} -x {gid_index} {opts}'
+                )
+                if role == 'client':
+                    cmd = f'{cmd} {peer}'
+                if multi_sample:
+                    # Stop the instance once it has logged samples rows; succeeds only if it did
+                    rows = f'$(grep -cE "^ *{msg_size} +[0-9]" {log_file})'
+                    job = (
+                        f'{{ {cmd} > {log_file} 2>&1 & pid=$!; '
+                        f'while kill -0 $pid 2>/dev/null && [ {rows} -lt {samples} ]; do sleep 1; done; '
+                        f'kill $pid 2>/dev/null; wait $pid; [ {rows} -ge {samples} ]; }}'
+                    )
+                else:
+                    job = f'{cmd} > {log_file} 2>&1'
+                if role == 'server':
+                    jobs.append(f'{job}; touch {log_file}.done')
+                else:
+                    jobs.append(
+                        f'end=$((SECONDS + {connect_window})); '
+                        f'while sleep 1; do {job} && break; [ $SECONDS -lt $end ] || break; done; '
+                        f'touch {log_file}.done'
+                    )
+        lines.append('(\n' + '\n'.join(jobs) + '\n) &')
+    lines.append('wait')
+    lines.append(f'touch {sweep_dir}/{IB_SWEEP_DONE}')
+    return '\n'.join(lines) + '\n'
+
+
+def poll_ib_sweep(phdl, sweep_dir=IB_SWEEP_DIR):
+    """
+    Fetch the logs of every sweep job finished since the last poll, in one exec.
+
+    Collected jobs are marked so they are returned only once.
+
+    Returns:
+      dict: node -> {log file: contents}; the IB_SWEEP_DONE key is present once the
+      node's sweep script has finished.
+    """
+    cmd = (
+        f'cd {sweep_dir} 2>/dev/null && for f in *.log.done; do [ -e "$f" ] || continue; '
+        f'l=${{f%.done}}; echo "{IB_LOG_FRAME_MARKER} {sweep_dir}/$l"; cat $l; mv $f $l.collected; done; '
+        f'[ -e {IB_SWEEP_DONE} ] && echo "{IB_LOG_FRAME_MARKER} {IB_SWEEP_DONE}"; true'
+    )
+    out_dict = phdl.exec(cmd, print_console=False)
+    return {node: split_ib_log_frames(output) for node, output in out_dict.items()}
+
+
+def run_ib_perf_sweep(
+    phdl,
+    apps,
+    gpu_numa_dict,
+    gpu_nic_dict,
+    bck_nic_dict,
+    app_path,
+    msg_size_list,
+    gid_index,
+    qp_count_list=None,
+    port_no=1516,
+    duration=60,
+    poll_interval=10,
+    on_result=None,
+    sweep_dir=IB_SWEEP_DIR,
+    samples=1,
+):
+    """
+    Run a full ibperf sweep (apps x message sizes x QP counts) as one scheduled job per node.
+
+    Unlike calling run_ib_perf_bw_test / run_ib_perf_lat_test per combination, every
+    node pair is launched once: the GPU/NIC pairs of a node pair are split into lanes
+    that never share a NIC (build_ib_lanes) and each lane runs its points back to back,
+    pinned to the GPU's local CPUs from gpu_numa_dict. Lanes and node pairs progress
+    independently, so a lane never waits for a slower one to finish the same point and
+    no NIC or GPU ever runs two jobs at a time. Results are polled every poll_interval
+    seconds and filled into the result matrix as the jobs finish.
+
+    Parameters:
+      apps (list[str]): perftest apps, e.g. ['ib_write_bw', 'ib_write_lat'].
+      on_result: Optional callback(app, msg_size, qp_count, node, gpu_no, result) per result.
+      samples (int): Bandwidth samples per bw job, averaged as in run_ib_perf_bw_test.
+      Other parameters as for run_ib_perf_bw_test.
+
+    Returns:
+      dict: Matrix in the layout the chart generators take:
+            bw apps:  {app: {msg_size: {qp_count: {node: {gpu_no: {'bw', 'pps'}}}}}}
+            lat apps: {app: {msg_size: {node: {gpu_no: {'t_min', ..}}}}}
+    """
+    node_pairs = pair_ib_nodes(list(bck_nic_dict.keys()))
+    points = build_ib_sweep_points(apps, msg_size_list, qp_count_list)
+
+    res_dict = {}
+    for app, msg_size, qp_count in points:
+        entry = res_dict.setdefault(app, {}).setdefault(msg_size, {})
+        if qp_count is not None:
+            entry.setdefault(qp_count, {})
+
+    # Build the per node scripts and remember which log belongs to which point
+    scripts = {}
+    expected = {}
+    longest_lane = 1
+    for server_node, client_node in node_pairs:
+        lanes = build_ib_lanes(gpu_nic_dict, server_node, client_node)
+        longest_lane = max(longest_lane, max(len(lane) for lane in lanes))
+        print(f'Node pair {server_node} -> {client_node}: {len(lanes)} concurrent NIC lanes {lanes}')
+        for role, node, peer in (('server', server_node, None), ('client', client_node, server_node)):
+            scripts[node] = build_ib_sweep_script(
+                role,
+                node,
+                peer,
+                lanes,
+                points,
+                gpu_numa_dict,
+                gpu_nic_dict,
+                app_path,
+                gid_index,
+                port_no,
+                duration,
+                sweep_dir,
+                samples=samples,
+            )
+            for point in points:
+                for gpu_no in range(0, 8):
+                    expected[(node, ib_sweep_log_name(point, gpu_no, sweep_dir))] = (point, gpu_no)
+
+    for app in apps:
+        phdl.exec(f'killall {app}')
+    phdl.exec(f'sudo rm -rf {sweep_dir}')
+    cmd_list = []
+    for node in phdl.reachable_hosts:
+        if node not in scripts:
+            cmd_list.append('true')
+            continue
+        encoded = base64.b64encode(scripts[node].encode('utf-8')).decode('ascii')
+        cmd_list.append(
+            f'mkdir -p {sweep_dir} && echo {encoded} | base64 -d > {sweep_dir}/sweep.sh && '
+            f'nohup bash {sweep_dir}/sweep.sh > {sweep_dir}/sweep.out 2>&1 < /dev/null &'
+        )
+    phdl.exec_cmd_list(cmd_list)
+
+    # Every lane runs len(points) * gpus-per-lane jobs one after another; a client may wait up
+    # to a job timeout for its server before its own job (of up to a job timeout) starts
+    deadline = time.time() + len(points) * longest_lane * 2 * (int(duration) + 70) + 120
+    finished = set()
+    while expected and len(finished) < len(scripts) and time.time() < deadline:
+        time.sleep(poll_interval)
+        for node, logs in poll_ib_sweep(phdl, sweep_dir).items():
+            if IB_SWEEP_DONE in logs:
+                finished.add(node)
+            for log_file, output in logs.items():
+                if (node, log_file) not in expected:
+                    continue
+                (app, msg_size, qp_count), gpu_no = expected.pop((node, log_file))
+                check_ib_log_errors({node: output}, log_file)
+                parse_fn = parse_ib_lat_output if qp_count is None else parse_ib_bw_output
+                rows = parse_fn(output).get(int(msg_size))
+                if not rows:
+                    fail_test(f'ERROR !!! on node {node} no results in {log_file}')
+                    continue
+                result = summarize_ib_samples(rows[: samples if qp_count is not None else 1])
+                entry = res_dict[app][msg_size] if qp_count is None else res_dict[app][msg_size][qp_count]
+                entry.setdefault(node, {})[gpu_no] = result
+                if on_result is not None:
+                    on_result(app, msg_size, qp_count, node, gpu_no, result)
+        print(f'ibperf sweep: {len(expected)} jobs pending, {len(finished)}/{len(scripts)} nodes finished')
+
+    for node, log_file in expected:
+        fail_test(f'ERROR !!! on node {node} sweep job {log_file} did not complete')
+    for app in apps:
+        phdl.exec(f'killall {app}')
+
+    print('%%%%%%%%%% ibperf sweep result_dict %%%%%%%%%%')
+    print(res_dict)
+    return res_dict
+
+
 def split_list_into_n_chunks(original_list, n):
     """
     Splits a list into n approximately equal chunks.
@@ -12,6 +12,7 @@ import statistics
 from cvs.lib import globals
 from cvs.lib.utils_lib import *
 from cvs.lib.verify_lib import *
+from cvs.lib.log_scan_lib import get_log_scanner
 from cvs.lib import linux_utils
 from cvs.lib import docker_lib
 
@@ -597,9 +598,9 @@ class JaxTrainingJob:
         Behavior:
         - Constructs a list of commands to read each node's training.log.
         - Executes the commands across nodes using phdl.exec_cmd_list.
-        - Checks the last node's log output against regex patterns in training_err_dict.
-        - On first match:
-          * Calls fail_test with a descriptive message.
+        - Scans the last node's log output once against all regex patterns in training_err_dict.
+        - For each error pattern seen:
+          * Calls fail_test with a descriptive message, including the first offending line.
           * Logs an error to indicate polling should stop.
           * Sets training_pass to False.
         - Returns training_pass at the end.
@@ -631,12 +632,16 @@ class JaxTrainingJob:
 
         output = out_dict[last_node]
 
-        # Check the log content against all known training error patterns
-        for err_key in training_err_dict:
-            if re.search(f'{training_err_dict[err_key]}', output):
-                fail_test(f'ERROR {training_err_dict[err_key]} seen in training logs ..')
-                log.error('Aborting training log polling')
-                training_pass = False
+        # Check the log content against all known training error patterns in one pass
+        matches = get_log_scanner(training_err_dict).scan(output, node=last_node)
+        for err_key in dict.fromkeys(name for match in matches for name in match.patterns):
+            first = next(match for match in matches if err_key in match.patterns)
+            fail_test(
+                f'ERROR {training_err_dict[err_key]} seen in training logs .. '
+                f'(node {last_node} line {first.line_no}: {first.line.strip()})'
+            )
+            log.error('Aborting training log polling')
+            training_pass = False
         return training_pass
 
     def poll_for_training_completion(self, waittime_between_iters=60, total_timeout=3600, require_all_nodes=True):
@@ -5,18 +5,168 @@ The year included in the foregoing notice is the year of creation of the work.
 All code contained here is Property of Advanced Micro Devices, Inc.
 '''
 
+import copy
 import re
-from cvs.lib import rocm_plib
+import weakref
 from cvs.lib.utils_lib import *
 
+# "<name>: <number>" aggregate counter lines of ethtool -S
+ETHTOOL_STAT_RE = re.compile(r"([a-z\_\-]+)\:\s+([0-9]+)", re.I)
+
+# Frame header printed before each interface by the ethtool sweep command
+ETHTOOL_FRAME_MARKER = '__CVS_ETHTOOL__'
+
+
+# Frame header printed before each section of the topology discovery output
+TOPOLOGY_FRAME_MARKER = '__CVS_TOPO__'
+
+# Section name -> command run by the topology discovery pass (all in one exec per node)
+TOPOLOGY_DISCOVERY_CMDS = {
+    'rdma_link': 'sudo rdma link',
+    'lshw': 'sudo lshw -class network -businfo',
+    'ip_addr': 'sudo ip addr show | grep -A 5 mtu --color=never',
+    'rdma_netdevs': 'for net in /sys/class/infiniband/*/device/net/*; do [ -e "$net" ] || continue; '
+    'dev=${net#/sys/class/infiniband/}; echo "${dev%%/*} $(basename "$net")"; done',
+    'gpu_bus': 'sudo rocm-smi --loglevel error --showbus --json',
+    # <bdf> <numa_node> <local_cpulist> of every display / processing accelerator PCI function
+    'gpu_numa': 'for dev in /sys/bus/pci/devices/*; do case $(cat $dev/class) in 0x03*|0x12*) '
+    'echo "$(basename $dev) $(cat $dev/numa_node) $(cat $dev/local_cpulist)";; esac; done',
+}
+
+
+def build_topology_discovery_cmd():
+    """Build the single command that runs every TOPOLOGY_DISCOVERY_CMDS section, framed by section name."""
+    return '; '.join(
+        f'echo "{TOPOLOGY_FRAME_MARKER} {name}"; ( {cmd} ) 2>/dev/null' for name, cmd in TOPOLOGY_DISCOVERY_CMDS.items()
+    )
+
+
+def parse_topology_output(out_dict):
+    """
+    Split per-node topology discovery output into sections.
+
+    Returns:
+        dict: node -> {section name: section output}. A node whose exec failed has no sections.
+    """
+    section_dict = {}
+    for node, output in out_dict.items():
+        sections = {}
+        name = None
+        for line in output.split('\n'):
+            if line.startswith(TOPOLOGY_FRAME_MARKER + ' '):
+                name = line[len(TOPOLOGY_FRAME_MARKER) + 1 :].strip()
+                sections[name] = []
+            elif name is not None:
+                sections[name].append(line)
+        section_dict[node] = {name: '\n'.join(lines) for name, lines in sections.items()}
+    return section_dict
+
+
+class ClusterTopology:
+    """
+    NIC/GPU topology of the nodes of a phdl, built from one discovery pass.
+
+    The raw output of every TOPOLOGY_DISCOVERY_CMDS section is kept per node and each
+    view (lshw, ip addr, rdma link, GPU PCIe bus, NUMA ..) is parsed on first use.
+    Views are returned as deep copies so callers can modify them freely.
+
+    Use get_topology(phdl) to get the memoized instance of a phdl and
+    invalidate_topology(phdl) after changing the nodes (driver reload, reboot, NIC
+    reconfiguration).
+    """
+
+    def __init__(self, section_dict):
+        self.section_dict = section_dict
+        self._views = {}
+
+    @classmethod
+    def discover(cls, phdl):
+        out_dict = phdl.exec(build_topology_discovery_cmd(), print_console=False)
+        return cls(parse_topology_output(out_dict))
+
+    def section(self, name):
+        """node -> raw output of one discovery section ('' for nodes that did not report it)."""
+        return {node: sections.get(name, '') for node, sections in self.section_dict.items()}
+
+    def _view(self, name, build):
+        if name not in self._views:
+            self._views[name] = build()
+        return copy.deepcopy(self._views[name])
+
+    def lshw_network_dict(self):
+        return self._view('lshw', lambda: parse_lshw_network_output(self.section('lshw')))
+
+    def ip_addr_dict(self):
+        return self._view('ip_addr', lambda: parse_ip_addr_output(self.section('ip_addr')))
+
+    def rdma_nic_dict(self, active_only=False):
+        return self._view(
+            f'rdma_link/{active_only}', lambda: parse_rdma_link_output(self.section('rdma_link'), active_only)
+        )
+
+    def rdma_capable_devices_dict(self):
+        return self._view('rdma_netdevs', lambda: parse_rdma_netdevs_output(self.section('rdma_netdevs')))
+
+    def gpu_pcie_bus_dict(self):
+        """Same structure as rocm_plib.get_gpu_pcie_bus_dict."""
+        return self._view('gpu_bus', lambda: convert_phdl_json_to_dict(self.section('gpu_bus')))
+
+    def gpu_numa_dict(self):
+        return self._view('gpu_numa', self._build_gpu_numa_dict)
+
+    def _build_gpu_numa_dict(self):
+        gpu_pcie_dict = self.gpu_pcie_bus_dict()
+        first_node = list(gpu_pcie_dict.keys())[0]
+        card_list = list(gpu_pcie_dict[first_node].keys())
+
+        numa_out = self.section('gpu_numa')
+        gpu_numa_dict = {}
+        for node in gpu_pcie_dict.keys():
+            pci_numa = {}
+            for line in numa_out.get(node, '').split('\n'):
+                fields = line.split()
+                if len(fields) == 3:
+                    pci_numa[fields[0].lower()] = fields[1:]
+            gpu_numa_dict[node] = {}
+            for card in card_list:
+                gpu_bdf = str(gpu_pcie_dict[node].get(card, {}).get('PCI Bus', '')).lower()
+                numa_node, local_cpulist = pci_numa.get(gpu_bdf, ['', ''])
+                gpu_numa_dict[node][card] = {'local_cpulist': local_cpulist, 'numa_node': numa_node}
+        return gpu_numa_dict
+
+
+# phdl -> (reachable hosts the topology was discovered for, ClusterTopology)
+_topology_cache = weakref.WeakKeyDictionary()
+
+
+def get_topology(phdl, refresh=False):
+    """
+    Return the ClusterTopology of phdl, running the discovery pass only on first use,
+    when refresh is set or when the reachable hosts of phdl changed since discovery.
+    """
+    hosts = tuple(getattr(phdl, 'reachable_hosts', None) or ())
+    cached = _topology_cache.get(phdl)
+    if refresh or cached is None or cached[0] != hosts:
+        cached = (hosts, ClusterTopology.discover(phdl))
+        _topology_cache[phdl] = cached
+    return cached[1]
+
+
+def invalidate_topology(phdl=None):
+    """Drop the memoized topology of phdl (or of every phdl) so the next call rediscovers it."""
+    if phdl is None:
+        _topology_cache.clear()
+    else:
+        _topology_cache.pop(phdl, None)
+
 
 def get_lshw_network_dict(phdl):
     """
     Parse `lshw -class network -businfo` output (per node) into a nested dictionary.
 
-    This function executes `sudo lshw -class network -businfo` via the provided phdl
-    handle (which is expected to run the command on one or more nodes and return a
-    mapping of node -> command output). It then parses each line of output to extract:
+    The `sudo lshw -class network -businfo` output comes from the cached topology
+    discovery pass (see get_topology), so lshw runs once per session rather than on
+    every call. Each line of output is parsed to extract:
       - The PCI bus identifier (e.g., 0000:03:00.0)
       - The OS device name (e.g., enp3s0), when present
       - The device description (e.g., RTL8111/8168/8411 PCI Express Gigabit Ethernet Controller)
@@ -51,12 +201,14 @@ def get_lshw_network_dict(phdl):
         dict: Nested dictionary of parsed network devices per node.
     """
 
-    lshw_dict = {}
+    return get_topology(phdl).lshw_network_dict()
 
-    # Execute lshw on all nodes via the provided handle. The expectation is that
-    # out_dict is like: { node_name: "command stdout as string", ... }
 
-    out_dict = phdl.exec('sudo lshw -class network -businfo')
+def parse_lshw_network_output(out_dict):
+    """Parse per-node `lshw -class network -businfo` output, see get_lshw_network_dict."""
+
+    lshw_dict = {}
+
     for node in out_dict.keys():
         lshw_dict[node] = {}
         # Process the output line-by-line. split("\n") assumes LF newlines from lshw.
@@ -96,11 +248,10 @@ def get_ip_addr_dict(phdl):
     """
     Parse `ip addr show` output (per node) into a structured dictionary.
 
-    This function executes:
+    The output of:
         sudo ip addr show | grep -A 5 mtu --color=never
-    via the provided phdl handle (which should run the command on one or more nodes and
-    return a mapping of node -> command output). It then parses each node's output to
-    extract interface-level details:
+    comes from the cached topology discovery pass (see get_topology). Each node's output
+    is parsed to extract interface-level details:
       - Interface name
       - Flags
       - MTU
@@ -134,10 +285,14 @@ def get_ip_addr_dict(phdl):
       current code assumes the interface-identifying line appears before its details.
     """
 
+    return get_topology(phdl).ip_addr_dict()
+
+
+def parse_ip_addr_output(out_dict):
+    """Parse per-node `ip addr show` output, see get_ip_addr_dict."""
+
     ip_dict = {}
 
-    # Execute the command on one or more nodes; expect dict[node] -> output string
-    out_dict = phdl.exec('sudo ip addr show | grep -A 5 mtu --color=never')
     int_nam = None
     for node in out_dict.keys():
         ip_dict[node] = {}
@@ -189,12 +344,11 @@ def get_ip_addr_dict(phdl):
 
 def get_rdma_nic_dict(phdl):
     """
-    Execute `rdma link` on one or more nodes via the provided handle and parse the
-    output into a nested dictionary of RDMA NIC information.
+    Parse `rdma link` output of one or more nodes into a nested dictionary of RDMA NIC
+    information. The output comes from the cached topology discovery pass (see get_topology).
 
     Expected behavior:
-      - phdl.exec('sudo rdma link') should return a dict mapping each node identifier
-        to the command's stdout as a single multiline string.
+      - `sudo rdma link` output is a single multiline string per node.
       - For each node, the function parses lines starting with 'link' that look like:
           link <rdma_dev>/<port> state <STATE> physical_state <PHYS_STATE> netdev <NETDEV>
         Example:
@@ -223,35 +377,17 @@ def get_rdma_nic_dict(phdl):
         granularity is required, consider using a composite key (e.g., "<dev>/<port>").
     """
 
-    rdma_dict = {}
-
-    # Run 'rdma link' across node(s); expect a dict: { node_name: "<multiline stdout>", ... }
-    out_dict = phdl.exec('sudo rdma link')
-    # gid_dict_t = phdl.exec('sudo show_gids | grep -i v2 --color=never')
-    for node in out_dict.keys():
-        rdma_dict[node] = {}
-        for line in out_dict[node].split("\n"):
-            if re.search('^link', line):
-                pattern = r"link\s+([a-zA-Z0-9_.-]+)\/([0-9]+)\s+state\s+([A-Za-z]+)\s+physical_state\s+([A-Za-z_]+)\s+netdev\s+([a-zA-Z0-9.-]+)"
-                match = re.search(pattern, line)
-                dev = match.group(1)
-                rdma_dict[node][dev] = {}
-                rdma_dict[node][dev]['port'] = match.group(2)  # Port number (string)
-                rdma_dict[node][dev]['device_status'] = match.group(3)  # Device state (e.g., ACTIVE)
-                rdma_dict[node][dev]['link_status'] = match.group(4)  # Physical link state (e.g., LinkUp)
-                rdma_dict[node][dev]['eth_device'] = match.group(5)  # Associated netdev (e.g., eth0)
-    return rdma_dict
+    return get_topology(phdl).rdma_nic_dict()
 
 
 def get_active_rdma_nic_dict(phdl):
     """
-    Execute `rdma link` on one or more nodes via the provided handle and parse the
-    output into a nested dictionary of RDMA NIC information and build only for
-    ACTIVE Interfaces
+    Parse `rdma link` output of one or more nodes into a nested dictionary of RDMA NIC
+    information and build only for ACTIVE Interfaces. The output comes from the cached
+    topology discovery pass (see get_topology).
 
     Expected behavior:
-      - phdl.exec('sudo rdma link') should return a dict mapping each node identifier
-        to the command's stdout as a single multiline string.
+      - `sudo rdma link` output is a single multiline string per node.
       - For each node, the function parses lines starting with 'link' that look like:
           link <rdma_dev>/<port> state <STATE> physical_state <PHYS_STATE> netdev <NETDEV>
         Example:
@@ -280,23 +416,31 @@ def get_active_rdma_nic_dict(phdl):
         granularity is required, consider using a composite key (e.g., "<dev>/<port>").
     """
 
+    return get_topology(phdl).rdma_nic_dict(active_only=True)
+
+
+def parse_rdma_link_output(out_dict, active_only=False):
+    """
+    Parse per-node `rdma link` output, see get_rdma_nic_dict. With active_only set only
+    devices whose state matches ACTIVE are kept (get_active_rdma_nic_dict).
+    """
+
     rdma_dict = {}
-    out_dict = phdl.exec('sudo rdma link')
-    # gid_dict_t = phdl.exec('sudo show_gids | grep -i v2 --color=never')
+    pattern = r"link\s+([a-zA-Z0-9_.-]+)\/([0-9]+)\s+state\s+([A-Za-z]+)\s+physical_state\s+([A-Za-z_]+)\s+netdev\s+([a-zA-Z0-9.-]+)"
     for node in out_dict.keys():
         rdma_dict[node] = {}
         for line in out_dict[node].split("\n"):
             if re.search('^link', line):
-                pattern = r"link\s+([a-zA-Z0-9_.-]+)\/([0-9]+)\s+state\s+([A-Za-z]+)\s+physical_state\s+([A-Za-z_]+)\s+netdev\s+([a-zA-Z0-9.-]+)"
                 match = re.search(pattern, line)
                 dev = match.group(1)
                 status = match.group(3)
-                if re.search('ACTIVE', status, re.I):
-                    rdma_dict[node][dev] = {}
-                    rdma_dict[node][dev]['port'] = match.group(2)
-                    rdma_dict[node][dev]['device_status'] = status
-                    rdma_dict[node][dev]['link_status'] = match.group(4)
-                    rdma_dict[node][dev]['eth_device'] = match.group(5)
+                if active_only and not re.search('ACTIVE', status, re.I):
+                    continue
+                rdma_dict[node][dev] = {}
+                rdma_dict[node][dev]['port'] = match.group(2)  # Port number (string)
+                rdma_dict[node][dev]['device_status'] = status  # Device state (e.g., ACTIVE)
+                rdma_dict[node][dev]['link_status'] = match.group(4)  # Physical link state (e.g., LinkUp)
+                rdma_dict[node][dev]['eth_device'] = match.group(5)  # Associated netdev (e.g., eth0)
     return rdma_dict
 
 
@@ -304,28 +448,23 @@ def get_rdma_capable_devices_dict(phdl):
     """
     Get RDMA-capable Ethernet devices per node by checking /sys/class/infiniband/.
     Returns a dict of node -> list of NIC names (e.g., ['eth0', 'eth1']).
+    The listing comes from the cached topology discovery pass (see get_topology).
     """
-    rdma_cap_dict = {}
+    return get_topology(phdl).rdma_capable_devices_dict()
 
-    # Get list of RDMA devices per node
-    out_dict = phdl.exec('ls /sys/class/infiniband/')
+
+def parse_rdma_netdevs_output(out_dict):
+    """
+    Parse per-node "<rdma_dev> <netdev>" lines listed from /sys/class/infiniband/*/device/net/
+    into node -> list of unique NIC names, in listing order.
+    """
+    rdma_cap_dict = {}
     for node in out_dict.keys():
         rdma_cap_dict[node] = []
-        devices = out_dict[node].strip().split('\n')
-        if devices == ['']:  # Empty if no devices
-            continue
-        for dev in devices:
-            dev = dev.strip()
-            if not dev:
-                continue
-            # Get the associated netdev (NIC name) by listing /sys/class/infiniband/{dev}/device/net/
-            netdev_out = phdl.exec(f'ls /sys/class/infiniband/{dev}/device/net/')
-            if node in netdev_out and netdev_out[node].strip():
-                nic_names = netdev_out[node].strip().split('\n')
-                for nic_name in nic_names:
-                    nic_name = nic_name.strip()
-                    if nic_name and nic_name not in rdma_cap_dict[node]:
-                        rdma_cap_dict[node].append(nic_name)
+        for line in out_dict[node].split('\n'):
+            fields = line.split()
+            if len(fields) == 2 and fields[1] not in rdma_cap_dict[node]:
+                rdma_cap_dict[node].append(fields[1])
     return rdma_cap_dict
 
 
@@ -438,23 +577,89 @@ def convert_ethtool_out_to_dict(ethtool_out, vendor=None):
         - The regex matches only keys composed of [a-z_-] followed by ": <digits>".
           Mixed-case keys or keys with other characters will be ignored.
         - Values are kept as strings to preserve original behavior.
-        - The function prints the intermediate match list for debugging purposes.
-          Consider removing or replacing with logging in production.
+        - A single finditer pass extracts name and value together.
     """
 
-    out_dict = {}
     # For now, let us ignore the per queue stats and just collect total stats
-    pattern = r"([a-z\_\-]+\:\s+[0-9]+)"
-    match_list = re.findall(pattern, ethtool_out, re.I)
+    return {match.group(1): match.group(2) for match in ETHTOOL_STAT_RE.finditer(ethtool_out)}
+
 
-    # print(match_list)
+def build_ethtool_sweep_cmd():
+    """
+    Build the command that dumps ethtool -S counters of every RDMA capable interface of a
+    node in one exec.
 
-    # Convert each "<name>: <number>" into dict entries
-    for match_item in match_list:
-        pattern = r"([a-z\_\-]+)\:\s+([0-9]+)"
-        match = re.search(pattern, match_item, re.I)
-        out_dict[match.group(1)] = match.group(2)
-    return out_dict
+    For each netdev under /sys/class/infiniband/<rdma_dev>/device/net/ it prints a frame
+    header line followed by the aggregate (non per-queue) ethtool -S counters:
+
+        __CVS_ETHTOOL__ <ifname> <rdma_dev> <port 1 state> <pci vendor:device> <pci bdf>
+
+    Parse the output with parse_ethtool_sweep_output.
+    """
+    return (
+        'for net in /sys/class/infiniband/*/device/net/*; do '
+        '[ -e "$net" ] || continue; '
+        'ifname=$(basename "$net"); '
+        'ibdev=${net#/sys/class/infiniband/}; ibdev=${ibdev%%/*}; '
+        'state=$(awk \'{print $2}\' /sys/class/infiniband/$ibdev/ports/1/state 2>/dev/null); '
+        'pci=$(readlink -f /sys/class/net/$ifname/device); '
+        'pci_id=$(cat $pci/vendor 2>/dev/null):$(cat $pci/device 2>/dev/null); '
+        f'echo "{ETHTOOL_FRAME_MARKER} $ifname $ibdev ${{state:-UNKNOWN}} $pci_id $(basename $pci)"; '
+        'sudo ethtool -S $ifname 2>&1 | grep -v "\\[" --color=never; '
+        'done'
+    )
+
+
+def parse_ethtool_sweep_output(sweep_out, vendor=None):
+    """
+    Single pass parser for the output of build_ethtool_sweep_cmd on one node.
+
+    Args:
+        sweep_out (str): Output of the sweep command.
+        vendor (str, optional): Forwarded to the stat parser (currently unused).
+
+    Returns:
+        dict: Mapping of interface name -> {
+                'rdma_dev': ..., 'state': ..., 'pci_id': ..., 'pci_bus': ...,
+                'stats': { "<stat_key>": "<stat_value_str>", ... }
+              } in output order.
+    """
+    intf_dict = {}
+    stats = None
+    for line in sweep_out.split('\n'):
+        if line.startswith(ETHTOOL_FRAME_MARKER):
+            fields = line.split()[1:] + [''] * 5
+            stats = {}
+            intf_dict[fields[0]] = {
+                'rdma_dev': fields[1],
+                'state': fields[2],
+                'pci_id': fields[3],
+                'pci_bus': fields[4],
+                'stats': stats,
+            }
+        elif stats is not None:
+            match = ETHTOOL_STAT_RE.search(line)
+            if match:
+                stats[match.group(1)] = match.group(2)
+    return intf_dict
+
+
+def select_backend_interfaces(intf_dict):
+    """
+    Pick the backend interfaces out of a parsed ethtool sweep, using the same rule as
+    get_backend_rdma_nic_dict: among the RDMA capable interfaces (in PCI order) keep the
+    larger of the group sharing the first interface's NIC model and the rest, then keep
+    only those whose RDMA port is ACTIVE.
+
+    The NIC model is the PCI vendor:device id, which is what lshw derives its description from.
+    """
+    intf_list = sorted(intf_dict.keys(), key=lambda intf: intf_dict[intf]['pci_bus'])
+    if not intf_list:
+        return []
+    list_a = [intf for intf in intf_list if intf_dict[intf]['pci_id'] == intf_dict[intf_list[0]]['pci_id']]
+    list_b = [intf for intf in intf_list if intf not in list_a]
+    bck_list = list_a if len(list_a) > len(list_b) else list_b
+    return [intf for intf in bck_list if re.search('ACTIVE', intf_dict[intf]['state'], re.I)]
 
 
 # stats_dict will be indexed by node_ip, followed by interface name of backend NICs
@@ -465,20 +670,19 @@ def get_nic_ethtool_stats_dict(phdl, vendor=None):
     Collect per-interface ethtool statistics from backend RDMA NICs across nodes.
 
     This function:
-      1) Retrieves per-node backend RDMA NICs using get_backend_rdma_nic_dict(phdl).
-      2) Builds a set of ethtool -S commands per NIC index so that execution can be done
-         in parallel across nodes even if interface names differ by node.
-      3) Executes those commands in batches via phdl.exec_cmd_list.
-      4) Parses each ethtool output with convert_ethtool_out_to_dict, keyed by interface name.
-      5) Emits warnings to stdout if any error-like counters (err|discard|drop|crc|fcs|reset)
+      1) Runs one sweep command on every node (build_ethtool_sweep_cmd) which discovers the
+         RDMA capable interfaces on the node and dumps all their ethtool -S counters,
+         framed per interface - a single round trip regardless of the number of NICs.
+      2) Parses each node's output in a single pass (parse_ethtool_sweep_output).
+      3) Keeps the backend interfaces (select_backend_interfaces), keyed by interface name.
+      4) Emits warnings to stdout if any error-like counters (err|discard|drop|crc|fcs|reset)
          are greater than zero.
 
     Args:
         phdl: A handle that can execute commands on multiple nodes. Must support:
               - exec(...) returning dict[node] -> output string
-              - exec_cmd_list(list_of_cmds) returning dict[node] -> output string
         vendor (str, optional): Hint for vendor-specific parsing that is forwarded to
-              convert_ethtool_out_to_dict. Currently optional/unused depending on parser.
+              the stat parser. Currently optional/unused depending on parser.
 
     Returns:
         dict: Nested mapping of the form:
@@ -494,63 +698,21 @@ def get_nic_ethtool_stats_dict(phdl, vendor=None):
           }
 
     Important assumptions and behavior:
-        - Assumes each node in bck_nic_dict has the same number of backend RDMA NICs,
-          and that NICs are accessed by a consistent index across nodes when batching.
+        - Interfaces can have different names on every node; each node reports its own.
         - Uses grep -v "[" to skip per-queue stats (bracketed) and focus on aggregate totals.
         - Prints warnings (stdout) for non-zero error-like counters; does not raise.
         - Values parsed from ethtool output are kept as strings to preserve the parser behavior.
+        - A node whose command failed maps to an empty dict.
     """
 
     stats_dict = {}
 
-    # Gather backend RDMA NICs per node:
-    # bck_nic_dict structure example:
-    #   { node: { rdma_dev: { 'eth_device': '<iface>' , ... }, ... }, ... }
-
-    bck_nic_dict = get_backend_rdma_nic_dict(phdl)
-
-    # Derive node list and infer NIC count from the first node
-    node_list = list(bck_nic_dict.keys())
-    node_0 = node_list[0]
-    no_of_nics = len(bck_nic_dict[node_0])
-
-    # Initialize the final per-node stats dict
-    for node in node_list:
-        stats_dict[node] = {}
-
-    # Build a list of list of cmds with the assumptions that NICs can be with different
-    # interface names across nodes and we still want to do parallel execution ..
-    # cmd_dict is a dict with key as nodes and value as list of cmds
-
-    # Prepare parallel command batches:
-    # We build a list of interface names per node and then create batches by NIC index.
-    cmd_dict = {}
-    eth_dev_dict = {}
-    print(node_list)
-    print(bck_nic_dict)
-
-    # Build map of nodes to ordered lists of backend interface names
-    for node in node_list:
-        node_nic_dict = bck_nic_dict[node]
-        eth_dev_dict[node] = []
-        for dev_name in list(node_nic_dict.keys()):
-            intf_name = node_nic_dict[dev_name]['eth_device']
-            eth_dev_dict[node].append(intf_name)
-
-    # For each NIC index, generate one command per node so they can be executed in parallel
-    for i in range(0, no_of_nics):
-        cmd_dict[i] = []
-        for node in node_list:
-            intf_nam = eth_dev_dict[node][i]
-            cmd_dict[i].append(f'sudo ethtool -S {intf_nam} | grep -v "\[" --color=never')
-
-    # Execute each batch of commands and parse results into stats_dict
-    for i in range(0, no_of_nics):
-        cmd_list = cmd_dict[i]
-        stats_dict_out = phdl.exec_cmd_list(cmd_list)
-        for node in stats_dict_out:
-            intf_nam = eth_dev_dict[node][i]
-            stats_dict[node][intf_nam] = convert_ethtool_out_to_dict(stats_dict_out[node], vendor)
+    out_dict = phdl.exec(build_ethtool_sweep_cmd(), print_console=False)
+    for node in out_dict.keys():
+        intf_dict = parse_ethtool_sweep_output(out_dict[node], vendor)
+        bck_intf_list = select_backend_interfaces(intf_dict)
+        print(f'{node}: backend interfaces {bck_intf_list}')
+        stats_dict[node] = {intf: intf_dict[intf]['stats'] for intf in bck_intf_list}
 
     # Emit warnings for any non-zero error-like counters
     for node in stats_dict.keys():
@@ -777,7 +939,7 @@ def get_gpu_nic_mapping_dict(
     phdl,
 ):
     gpu_nic_dict = {}
-    gpu_pcie_dict = rocm_plib.get_gpu_pcie_bus_dict(phdl)
+    gpu_pcie_dict = get_topology(phdl).gpu_pcie_bus_dict()
     lshw_dict = get_lshw_backend_nic_dict(phdl)
 
     nic_bus_dict = {}
@@ -822,37 +984,13 @@ def get_gpu_nic_mapping_dict(
 
 
 def get_gpu_numa_dict(phdl):
-    gpu_numa_dict = {}
-    gpu_pcie_dict = rocm_plib.get_gpu_pcie_bus_dict(phdl)
-
-    first_node = list(gpu_pcie_dict.keys())[0]
-    card_list = list(gpu_pcie_dict[first_node].keys())
-    for node in gpu_pcie_dict.keys():
-        gpu_numa_dict[node] = {}
-        for card in card_list:
-            gpu_numa_dict[node][card] = {}
-
-    # Build cmd list
-    for card in card_list:
-        cmd_list = []
-        for node in gpu_pcie_dict.keys():
-            gpu_bdf = str(gpu_pcie_dict[node][card]['PCI Bus']).lower()
-            cmd_list.append(f'cat /sys/bus/pci/devices/{gpu_bdf}/local_cpulist')
-
-        out_dict = phdl.exec_cmd_list(cmd_list)
-        for node in out_dict.keys():
-            gpu_numa_dict[node][card]['local_cpulist'] = str(out_dict[node]).rstrip('\n').rstrip('\r')
-
-    # Build cmd list
-    for card in card_list:
-        cmd_list = []
-        for node in gpu_pcie_dict.keys():
-            gpu_bdf = str(gpu_pcie_dict[node][card]['PCI Bus']).lower()
-            cmd_list.append(f'cat /sys/bus/pci/devices/{gpu_bdf}/numa_node')
-
-        out_dict = phdl.exec_cmd_list(cmd_list)
-        for node in out_dict.keys():
-            gpu_numa_dict[node][card]['numa_node'] = str(out_dict[node]).rstrip('\n').rstrip('\r')
+    """
+    Per node, per GPU card NUMA node and local CPU list (from /sys/bus/pci/devices/<bdf>/),
+    taken from the cached topology discovery pass (see get_topology).
 
+    Returns:
+        dict: { node: { card: {'local_cpulist': '0-47,96-143', 'numa_node': '0'}, ... }, ... }
+    """
+    gpu_numa_dict = get_topology(phdl).gpu_numa_dict()
     print(gpu_numa_dict)
     return gpu_numa_dict
@@ -0,0 +1,107 @@
+'''
+Copyright 2025 Advanced Micro Devices, Inc.
+All rights reserved. This notice is intended as a precaution against inadvertent publication and does not imply publication or any waiver of confidentiality.
+The year included in the foregoing notice is the year of creation of the work.
+All code contained here is Property of Advanced Micro Devices, Inc.
+'''
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+
+class LogMatch(NamedTuple):
+    """A log line that matched one or more named error patterns."""
+
+    node: str
+    line_no: int
+    patterns: tuple
+    line: str
+
+
+class LogScanner:
+    """
+    Scan log text for a set of named regex patterns in a single pass.
+
+    All patterns are compiled once into one alternation of named groups which is used
+    to jump straight to candidate lines; only those lines are then checked against the
+    individual patterns, so a line matching several patterns reports all of them.
+
+    Parameters:
+      patterns (dict): Mapping of pattern name -> regex, e.g. err_patterns_dict.
+      flags (int): re flags applied to every pattern (e.g. re.I).
+
+    Example:
+      scanner = LogScanner({'nccl': 'NCCL ERROR|Test failure'})
+      scanner.scan(output, node='node1')
+        -> [LogMatch(node='node1', line_no=42, patterns=('nccl',), line='... NCCL ERROR ...')]
+    """
+
+    def __init__(self, patterns, flags=0):
+        self.names = list(patterns.keys())
+        self._patterns = [re.compile(patterns[name], flags) for name in self.names]
+        self._combined = re.compile('|'.join(f'(?P<p{i}>{patterns[name]})' for i, name in enumerate(self.names)), flags)
+
+    def scan(self, text, node=None):
+        """
+        Return every line of text that matches at least one pattern.
+
+        Parameters:
+          text (str): Log contents (newline separated).
+          node (str): Node name recorded in the returned matches.
+
+        Returns:
+          list[LogMatch]: Matches in line order; line_no is 1-based.
+        """
+        matches = []
+        if not text or not self.names:
+            return matches
+
+        line_no = 1
+        counted_to = 0
+        pos = 0
+        while True:
+            hit = self._combined.search(text, pos)
+            if hit is None:
+                break
+            line_start = text.rfind('\n', 0, hit.start()) + 1
+            line_end = text.find('\n', hit.start())
+            if line_end < 0:
+                line_end = len(text)
+            line = text[line_start:line_end]
+
+            # The alternation may match across a newline; confirm against the line itself
+            names = tuple(self.names[i] for i, pattern in enumerate(self._patterns) if pattern.search(line))
+            if names:
+                line_no += text.count('\n', counted_to, line_start)
+                counted_to = line_start
+                matches.append(LogMatch(node, line_no, names, line))
+            pos = line_end + 1
+            if pos > len(text):
+                break
+        return matches
+
+    def scan_dict(self, out_dict):
+        """
+        Scan per-node command output.
+
+        Parameters:
+          out_dict (dict): Mapping of node -> log text, as returned by phdl.exec.
+
+        Returns:
+          dict: node -> list[LogMatch] (empty list for clean nodes).
+        """
+        return {node: self.scan(text, node=node) for node, text in out_dict.items()}
+
+
+@lru_cache(maxsize=32)
+def _cached_scanner(pattern_items, flags):
+    return LogScanner(dict(pattern_items), flags)
+
+
+def get_log_scanner(patterns, flags=0):
+    """
+    Return a compiled LogScanner for patterns, reusing one built earlier for the same
+    patterns and flags so module-level pattern dicts are only compiled once.
+    """
+    return _cached_scanner(tuple(patterns.items()), flags)
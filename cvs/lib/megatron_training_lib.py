@@ -12,6 +12,7 @@ import time
 from cvs.lib import globals
 from cvs.lib.utils_lib import *
 from cvs.lib.verify_lib import *
+from cvs.lib.log_scan_lib import get_log_scanner
 from cvs.lib import linux_utils
 
 log = globals.log
@@ -479,9 +480,9 @@ class MegatronLlamaTrainingJob:
         Behavior:
         - Reads the training log file from self.home_dir/training_logs via sudo on all hosts.
         - Selects the output from the last host in self.host_list (assumes it has the final log).
-        - Iterates through regex patterns in training_err_dict and searches the log content.
-        - On first match:
-          * Calls fail_test with a descriptive message.
+        - Scans the log content once against all regex patterns in training_err_dict.
+        - For each error pattern seen:
+          * Calls fail_test with a descriptive message, including the first offending line.
           * Logs an error indicating polling should stop.
           * Marks training_pass as False.
         - Returns training_pass.
@@ -494,10 +495,9 @@ class MegatronLlamaTrainingJob:
         - sudo can read the training_logs file without interactive prompts.
 
         Notes:
-        - Regex search is case-sensitive as written; pass re.I to re.search for case-insensitive matching.
-        - If multiple error patterns are present, all matches will trigger fail_test, but the function
-          does not short-circuit; it continues scanning and ultimately returns False.
-        - Consider logging or returning which specific patterns matched for better diagnostics.
+        - Regex search is case-sensitive as written; pass re.I to get_log_scanner for case-insensitive matching.
+        - If multiple error patterns are present, each one triggers fail_test, and the function
+          ultimately returns False.
         """
 
         print('Scan for training errors')
@@ -512,13 +512,17 @@ class MegatronLlamaTrainingJob:
 
         output = out_dict[last_node]
 
-        # Check the log content against all known training error patterns
-        for err_key in training_err_dict:
-            if re.search(f'{training_err_dict[err_key]}', output):
-                # Record failure and log an error for visibility
-                fail_test(f'ERROR {training_err_dict[err_key]} seen in training logs ..')
-                log.error('Aborting training log polling')
-                training_pass = False
+        # Check the log content against all known training error patterns in one pass
+        matches = get_log_scanner(training_err_dict).scan(output, node=last_node)
+        for err_key in dict.fromkeys(name for match in matches for name in match.patterns):
+            # Record failure (with the first offending line) and log an error for visibility
+            first = next(match for match in matches if err_key in match.patterns)
+            fail_test(
+                f'ERROR {training_err_dict[err_key]} seen in training logs .. '
+                f'(node {last_node} line {first.line_no}: {first.line.strip()})'
+            )
+            log.error('Aborting training log polling')
+            training_pass = False
         return training_pass
 
     def poll_for_training_completion(self, time_between_iters=120):
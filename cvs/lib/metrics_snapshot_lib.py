@@ -0,0 +1,386 @@
+'''
+Copyright 2025 Advanced Micro Devices, Inc.
+All rights reserved. This notice is intended as a precaution against inadvertent publication and does not imply publication or any waiver of confidentiality.
+The year included in the foregoing notice is the year of creation of the work.
+All code contained here is Property of Advanced Micro Devices, Inc.
+'''
+
+import json
+import os
+import re
+import time
+from collections import deque
+
+import numpy as np
+
+
+# Stat name classes used when comparing snapshots (checked in this order, first match wins)
+STAT_CLASS_NONE = 0
+STAT_CLASS_WARN = 1
+STAT_CLASS_ERR = 2
+STAT_CLASS_THRESHOLD = 3
+
+# Strings containing any of these characters are textual, not counters
+_textual_value_re = re.compile(r"[a-z\.\_\-]+", re.I)
+
+
+def _counter_value(value):
+    """
+    Return the integer value of a counter, or None for values that are not diffed.
+
+    Integers (and bools) are counters, numeric strings are converted, textual strings
+    and anything else (lists, floats, None) are skipped.
+    """
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, str) and not _textual_value_re.search(value):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
+class MetricsSnapshot:
+    """
+    Flat, typed table form of a cluster metrics snapshot.
+
+    One row per counter: parallel arrays of category, node, device and stat name (object
+    arrays), the int64 counter value and the original raw value (kept for reporting).
+    Only counters (see _counter_value) are stored.
+
+    Build with MetricsSnapshot.from_dict(s_dict) where s_dict is structured as
+    { category: { node: { device: { stat_name: value, ... } } } }.
+    """
+
+    def __init__(self, category, node, device, stat, value, raw, layout):
+        self.category = category
+        self.node = node
+        self.device = device
+        self.stat = stat
+        self.value = value
+        self.raw = raw
+        # {category: {node: [device, ...]}} - kept so reports list clean nodes/devices too
+        self.layout = layout
+        self._index = None
+
+    def __len__(self):
+        return len(self.value)
+
+    @classmethod
+    def from_dict(cls, s_dict):
+        keys = []
+        raw = []
+        values = []
+        layout = {}
+        for key_nam, node_dict in s_dict.items():
+            layout[key_nam] = {}
+            for node, dev_dict in node_dict.items():
+                layout[key_nam][node] = list(dev_dict.keys())
+                for dev_nam, stat_dict in dev_dict.items():
+                    for stat_nam, stat_val in stat_dict.items():
+                        counter = _counter_value(stat_val)
+                        if counter is not None:
+                            keys.append((key_nam, node, dev_nam, stat_nam))
+                            raw.append(stat_val)
+                            values.append(counter)
+
+        columns = [np.empty(len(keys), dtype=object) for _ in range(4)]
+        for i, column in enumerate(columns):
+            column[:] = [key[i] for key in keys]
+        try:
+            value = np.array(values, dtype=np.int64)
+        except OverflowError:
+            # Unsigned 64-bit counters beyond int64 range - keep exact Python ints
+            value = np.array(values, dtype=object)
+        raw_array = np.empty(len(raw), dtype=object)
+        raw_array[:] = raw
+        return cls(*columns, value, raw_array, layout)
+
+    def keys(self):
+        return list(zip(self.category, self.node, self.device, self.stat))
+
+    def index(self):
+        """Mapping of (category, node, device, stat) -> row, built on first use."""
+        if self._index is None:
+            self._index = {key: i for i, key in enumerate(self.keys())}
+        return self._index
+
+
+def as_snapshot(snapshot):
+    """Accept either a nested snapshot dict or a MetricsSnapshot."""
+    if isinstance(snapshot, MetricsSnapshot):
+        return snapshot
+    return MetricsSnapshot.from_dict(snapshot)
+
+
+def align_snapshots(before, after):
+    """
+    Line up the rows of two snapshots.
+
+    Returns:
+      tuple: (before_rows, after_rows) integer index arrays selecting the counters present
+             in both snapshots, in the order of before.
+    """
+    n = len(before)
+    if n == len(after) and all(
+        np.array_equal(a, b)
+        for a, b in (
+            (before.category, after.category),
+            (before.node, after.node),
+            (before.device, after.device),
+            (before.stat, after.stat),
+        )
+    ):
+        rows = np.arange(n)
+        return rows, rows
+
+    after_index = after.index()
+    pairs = [(i, after_index.get(key, -1)) for i, key in enumerate(before.keys())]
+    pairs = [pair for pair in pairs if pair[1] >= 0]
+    before_rows = np.array([p[0] for p in pairs], dtype=np.int64)
+    after_rows = np.array([p[1] for p in pairs], dtype=np.int64)
+    return before_rows, after_rows
+
+
+def classify_stats(stat_names, warn_pattern, err_pattern, threshold_pattern):
+    """
+    Classify stat names into STAT_CLASS_* codes, evaluating the regexes once per
+    distinct name rather than once per node/device row.
+
+    Returns:
+      np.ndarray: int8 class code per entry of stat_names.
+    """
+    if len(stat_names) == 0:
+        return np.zeros(0, dtype=np.int8)
+    unique_names, inverse = np.unique(stat_names.astype(str), return_inverse=True)
+    warn_re = re.compile(warn_pattern, re.I)
+    err_re = re.compile(err_pattern, re.I)
+    threshold_re = re.compile(threshold_pattern, re.I)
+
+    unique_class = np.zeros(len(unique_names), dtype=np.int8)
+    for i, name in enumerate(unique_names):
+        if warn_re.search(name):
+            unique_class[i] = STAT_CLASS_WARN
+        elif err_re.search(name):
+            unique_class[i] = STAT_CLASS_ERR
+        elif threshold_re.search(name):
+            unique_class[i] = STAT_CLASS_THRESHOLD
+    return unique_class[inverse.reshape(-1)]
+
+
+def snapshot_diff(before, after):
+    """
+    Compute after - before for every counter present in both snapshots.
+
+    Returns:
+      tuple: (before_rows, after_rows, delta) where delta[i] is the increase of the counter
+             at before row before_rows[i] / after row after_rows[i].
+    """
+    before_rows, after_rows = align_snapshots(before, after)
+    delta = after.value[after_rows] - before.value[before_rows]
+    return before_rows, after_rows, delta
+
+
+class SnapshotRecorder:
+    """
+    Streams a series of cluster metrics snapshots to disk and tracks per-interval counter jumps.
+
+    Every recorded snapshot is appended to a compact log in log_dir: the row keys are written
+    once per distinct layout (layout-<id>.json) and each snapshot adds a small header and its
+    int64 counter column to snapshots.npys (consecutive .npy records, see read_snapshot_log).
+    Recording into a log_dir that already holds a log appends to it: layout ids continue
+    from the existing ones, so every run's records keep pointing at their own layout.
+    Only the previous snapshot is kept in memory; each new one is diffed against it and
+    classified counters that jumped in that interval are reported with their delta and rate.
+
+    Parameters:
+      log_dir (str): Directory for the snapshot log (created if needed).
+      warn_pattern, err_pattern, threshold_pattern (str): Stat name regexes, as used by
+            verify_lib.compare_cluster_metrics_snapshots.
+      threshold_val (int): Per-interval increase above which threshold counters are reported.
+      max_events (int): Number of most recent jump events kept for the report.
+    """
+
+    def __init__(self, log_dir, warn_pattern, err_pattern, threshold_pattern, threshold_val, max_events=10000):
+        self.log_dir = log_dir
+        self.patterns = (warn_pattern, err_pattern, threshold_pattern)
+        self.threshold_val = threshold_val
+        self.iterations = 0
+        self.events = deque(maxlen=max_events)
+        self.total_events = 0
+        # (category, node, device, stat) -> {'total', 'max', 'max_iteration', 'intervals'} for counters that jumped
+        self.jumped = {}
+        self._prev = None
+        self._prev_time = None
+        self._prev_classes = None
+        os.makedirs(log_dir, exist_ok=True)
+        self._layout_id = self._last_layout_id()
+        self._fp = open(os.path.join(log_dir, 'snapshots.npys'), 'ab')
+
+    def _last_layout_id(self):
+        """Highest layout id of a log already in log_dir (-1 if none); drops a truncated last record."""
+        layout_ids = [
+            int(match.group(1))
+            for match in (re.fullmatch(r'layout-(\d+)\.json', name) for name in os.listdir(self.log_dir))
+            if match
+        ]
+        path = os.path.join(self.log_dir, 'snapshots.npys')
+        if os.path.exists(path):
+            # A run killed mid-write leaves a partial record; appending after it would hide the new records
+            end = 0
+            with open(path, 'rb') as fp:
+                while True:
+                    try:
+                        header = np.load(fp)
+                        np.load(fp)
+                    except (EOFError, ValueError):
+                        break
+                    end = fp.tell()
+                    layout_ids.append(int(header[2]))
+            if end < os.path.getsize(path):
+                os.truncate(path, end)
+        return max(layout_ids, default=-1)
+
+    def _same_layout(self, snapshot):
+        prev = self._prev
+        return (
+            prev is not None
+            and len(prev) == len(snapshot)
+            and all(
+                np.array_equal(a, b)
+                for a, b in (
+                    (prev.category, snapshot.category),
+                    (prev.node, snapshot.node),
+                    (prev.device, snapshot.device),
+                    (prev.stat, snapshot.stat),
+                )
+            )
+        )
+
+    def _write(self, snapshot, timestamp, new_layout):
+        if new_layout:
+            self._layout_id += 1
+            with open(os.path.join(self.log_dir, f'layout-{self._layout_id}.json'), 'w') as f:
+                json.dump([list(key) for key in snapshot.keys()], f)
+        value = snapshot.value
+        if value.dtype == object:
+            try:
+                value = np.array(value.tolist(), dtype=np.uint64)
+            except (OverflowError, ValueError):
+                value = np.array(value.tolist(), dtype=np.float64)
+        np.save(self._fp, np.array([self.iterations, int(timestamp * 1000), self._layout_id], dtype=np.int64))
+        np.save(self._fp, value)
+        self._fp.flush()
+
+    def record(self, snapshot, timestamp=None):
+        """
+        Append a snapshot and diff it against the previous one.
+
+        Parameters:
+          snapshot (dict | MetricsSnapshot): Snapshot from create_cluster_metrics_snapshot.
+          timestamp (float): Collection time (epoch seconds), defaults to now.
+
+        Returns:
+          list[dict]: Jump events of the interval ending with this snapshot, each with iteration,
+                      start, end, level, category, node, device, stat, before, after, delta and
+                      rate (per second).
+        """
+        snapshot = as_snapshot(snapshot)
+        timestamp = time.time() if timestamp is None else timestamp
+        same_layout = self._same_layout(snapshot)
+        self._write(snapshot, timestamp, new_layout=not same_layout)
+        classes = self._prev_classes if same_layout else classify_stats(snapshot.stat, *self.patterns)
+
+        events = []
+        if self._prev is not None:
+            before_rows, after_rows, delta = snapshot_diff(self._prev, snapshot)
+            prev_classes = self._prev_classes[before_rows]
+            increased = np.asarray(delta > 0, dtype=bool)
+            alert = ((prev_classes == STAT_CLASS_WARN) | (prev_classes == STAT_CLASS_ERR)) & increased
+            alert |= (prev_classes == STAT_CLASS_THRESHOLD) & np.asarray(delta > self.threshold_val, dtype=bool)
+            interval = max(timestamp - self._prev_time, 1e-3)
+            for i in np.flatnonzero(alert).tolist():
+                b_row, a_row = before_rows[i], after_rows[i]
+                key = (
+                    self._prev.category[b_row],
+                    self._prev.node[b_row],
+                    self._prev.device[b_row],
+                    self._prev.stat[b_row],
+                )
+                diff_val = int(delta[i])
+                events.append(
+                    {
+                        'iteration': self.iterations,
+                        'start': self._prev_time,
+                        'end': timestamp,
+                        'level': 'ERROR' if prev_classes[i] == STAT_CLASS_ERR else 'WARN',
+                        'category': key[0],
+                        'node': key[1],
+                        'device': key[2],
+                        'stat': key[3],
+                        'before': self._prev.raw[b_row],
+                        'after': snapshot.raw[a_row],
+                        'delta': diff_val,
+                        'rate': diff_val / interval,
+                    }
+                )
+                jump = self.jumped.setdefault(key, {'total': 0, 'max': 0, 'max_iteration': None, 'intervals': 0})
+                jump['total'] += diff_val
+                jump['intervals'] += 1
+                if diff_val > jump['max']:
+                    jump['max'] = diff_val
+                    jump['max_iteration'] = self.iterations
+            self.events.extend(events)
+            self.total_events += len(events)
+
+        self._prev = snapshot
+        self._prev_time = timestamp
+        self._prev_classes = classes
+        self.iterations += 1
+        return events
+
+    @staticmethod
+    def format_event(event):
+        """One line description of a jump event."""
+        start = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event['start']))
+        end = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event['end']))
+        return (
+            f"{event['level']} !! {event['category']} {event['node']} {event['device']} {event['stat']} "
+            f"incremented by {event['delta']} ({event['rate']:.2f}/s) between {start} and {end} "
+            f"(snapshot {event['iteration'] - 1} -> {event['iteration']}) Before = {event['before']} After = {event['after']}"
+        )
+
+    def events_by_node(self):
+        """Kept jump events as {node: [message, ...]} (the err_log table format of html_lib)."""
+        node_dict = {}
+        for event in self.events:
+            node_dict.setdefault(event['node'], []).append(self.format_event(event))
+        return node_dict
+
+    def close(self):
+        if not self._fp.closed:
+            self._fp.close()
+
+
+def read_snapshot_log(log_dir):
+    """
+    Read back a SnapshotRecorder log.
+
+    Yields:
+      tuple: (iteration, timestamp, keys, value) per recorded snapshot, where keys is the
+             list of (category, node, device, stat) row keys and value the counter array.
+    """
+    layouts = {}
+    with open(os.path.join(log_dir, 'snapshots.npys'), 'rb') as fp:
+        while True:
+            try:
+                header = np.load(fp)
+            except (EOFError, ValueError):
+                return
+            value = np.load(fp)
+            iteration, time_ms, layout_id = (int(x) for x in header)
+            if layout_id not in layouts:
+                with open(os.path.join(log_dir, f'layout-{layout_id}.json')) as f:
+                    layouts[layout_id] = [tuple(key) for key in json.load(f)]
+            yield iteration, time_ms / 1000.0, layouts[layout_id], value
@@ -6,16 +6,184 @@ All code contained here is Property of Advanced Micro Devices, Inc.
 '''
 
 from __future__ import print_function
+from contextlib import contextmanager
 from pssh.clients import ParallelSSHClient
 from pssh.exceptions import Timeout, ConnectionError, SessionError
 
+import threading
 import time
 
+import gevent
+from gevent.queue import Queue
+
 # Following used only for scp of file
 import paramiko
 from paramiko import SSHClient
 from scp import SCPClient
 
+# Marker pushed by a host reader greenlet once its stdout/stderr are fully drained
+_STREAM_DONE = object()
+
+
+def _drain_host_output(item, queue):
+    """
+    Greenlet body: push every stdout/stderr line of one HostOutput onto the shared queue
+    as (host, line), followed by (host, _STREAM_DONE). An exception raised while reading
+    (e.g. read Timeout) is pushed in place of the marker so the consumer can attribute it
+    to this host only.
+    """
+    try:
+        for line in item.stdout or []:
+            queue.put((item.host, line))
+        for line in item.stderr or []:
+            queue.put((item.host, line))
+    except Exception as e:
+        queue.put((item.host, e))
+        return
+    queue.put((item.host, _STREAM_DONE))
+
+
+def set_client_hosts(client, hosts):
+    """
+    Change the host list of a ParallelSSHClient in place, keeping the established session
+    of every host that stays.
+
+    ParallelSSHClient keys its sessions by (index, host), so assigning client.hosts directly
+    drops the session of every host whose index shifts - removing host 0 of 600 would redial
+    the other 599. The surviving sessions are re-keyed to their new index instead, new hosts
+    are dialed lazily on the next command.
+
+    Returns:
+      list: Sessions of the hosts that were removed, for the caller to pool or close (see close_session).
+    """
+    hosts = list(hosts)
+    host_clients = getattr(client, '_host_clients', None)
+    if not isinstance(host_clients, dict):
+        client.hosts = hosts
+        return []
+
+    sessions = {}
+    for (_, host), session in host_clients.items():
+        sessions.setdefault(host, []).append(session)
+    host_clients.clear()
+    client.hosts = hosts
+    for i, host in enumerate(hosts):
+        if sessions.get(host):
+            host_clients[(i, host)] = sessions[host].pop(0)
+    return [session for remaining in sessions.values() for session in remaining]
+
+
+def close_session(session):
+    """
+    Tear down the transport of a pssh SSHClient session now.
+
+    SSHClient.disconnect() is a deprecated no-op in parallel-ssh 2.x; _disconnect() is what
+    the client runs when it is de-allocated.
+    """
+    disconnect = getattr(session, '_disconnect', None)
+    if disconnect is None:
+        return
+    try:
+        disconnect()
+    except Exception:
+        pass
+
+
+class SSHConnectionPool:
+    """
+    Process-wide pool of authenticated per-host pssh SSHClient sessions, keyed by
+    (host, user, pkey, password). Pssh handles seed their ParallelSSHClient from the pool
+    and hand back any session they had to dial, so a Pssh created later in the same process
+    with the same credentials (e.g. a test module's second handle, or the client rebuilt
+    after pruning hosts) skips the handshake and auth. Only hosts whose transport has died
+    are redialed. The pool lives as long as the process: cvs run starts one pytest process
+    per suite, so sessions are not shared between suites.
+
+    gevent sockets are bound to the hub of the thread that created them, so sessions are
+    only shared between Pssh handles running in the same thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    @staticmethod
+    def _key(host, user, pkey, password):
+        return (threading.get_ident(), host, user, pkey, password)
+
+    @staticmethod
+    def is_alive(session):
+        """
+        Returns True if the session's transport is still connected.
+        """
+        sock = getattr(session, 'sock', None)
+        return getattr(session, 'session', None) is not None and sock is not None and not sock.closed
+
+    def get(self, host, user, pkey=None, password=None):
+        """
+        Returns a live pooled session for host or None, dropping it if its transport died.
+        """
+        key = self._key(host, user, pkey, password)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None and not self.is_alive(session):
+                del self._sessions[key]
+                session = None
+        return session
+
+    def put(self, host, user, session, pkey=None, password=None):
+        if self.is_alive(session):
+            with self._lock:
+                self._sessions[self._key(host, user, pkey, password)] = session
+
+    def holds(self, session):
+        """
+        Returns True if session is pooled, i.e. possibly in use by other Pssh handles.
+        """
+        with self._lock:
+            return any(pooled is session for pooled in self._sessions.values())
+
+    def evict(self, hosts, user, pkey=None, password=None):
+        """
+        Drop pooled sessions for hosts so the next borrower redials them.
+        """
+        with self._lock:
+            for host in hosts:
+                self._sessions.pop(self._key(host, user, pkey, password), None)
+
+    def seed_client(self, client, user, pkey=None, password=None):
+        """
+        Pre-populate a ParallelSSHClient with live pooled sessions for its hosts that have
+        no session yet.
+        """
+        host_clients = getattr(client, '_host_clients', None)
+        if not isinstance(host_clients, dict):
+            return
+        for i, host in enumerate(client.hosts):
+            if (i, host) in host_clients:
+                continue
+            session = self.get(host, user, pkey=pkey, password=password)
+            if session is not None:
+                host_clients[(i, host)] = session
+
+    def collect_client(self, client, user, pkey=None, password=None):
+        """
+        Add every session a ParallelSSHClient has dialed so far to the pool.
+        """
+        host_clients = getattr(client, '_host_clients', None)
+        if not isinstance(host_clients, dict):
+            return
+        for (_, host), session in list(host_clients.items()):
+            self.put(host, user, session, pkey=pkey, password=password)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+# Shared by every Pssh instance created with use_connection_pool=True
+ssh_connection_pool = SSHConnectionPool()
+
 
 class Pssh:
     """
@@ -24,10 +192,21 @@ class Pssh:
 
     Input host_config should be in this format ..
     mandatory args =  user, password (or) 'private_key': load_private_key('my_key.pem')
+
+    With use_connection_pool=True (default) established sessions are borrowed from and
+    returned to the process-wide ssh_connection_pool.
     """
 
     def __init__(
-        self, log, host_list, user=None, password=None, pkey='id_rsa', host_key_check=False, stop_on_errors=True
+        self,
+        log,
+        host_list,
+        user=None,
+        password=None,
+        pkey='id_rsa',
+        host_key_check=False,
+        stop_on_errors=True,
+        use_connection_pool=True,
     ):
         self.log = log
         self.host_list = host_list
@@ -38,16 +217,45 @@ class Pssh:
         self.host_key_check = host_key_check
         self.stop_on_errors = stop_on_errors
         self.unreachable_hosts = []
+        self.connection_pool = ssh_connection_pool if use_connection_pool else None
+        # See deferred_pruning
+        self._defer_pruning = 0
+        self._pending_prune = []
 
         if self.password is None:
             print(self.reachable_hosts)
             print(self.user)
             print(self.pkey)
-            self.client = ParallelSSHClient(self.reachable_hosts, user=self.user, pkey=self.pkey, keepalive_seconds=30)
+        self.client = self._create_client()
+
+    def _pool_auth(self):
+        """
+        Returns the credential kwargs identifying this handle's sessions in the connection pool.
+        """
+        if self.password is None:
+            return {'pkey': self.pkey}
+        return {'password': self.password}
+
+    def _create_client(self):
+        """
+        Build a ParallelSSHClient for self.reachable_hosts, seeded with pooled sessions.
+        """
+        if self.password is None:
+            client = ParallelSSHClient(self.reachable_hosts, user=self.user, pkey=self.pkey, keepalive_seconds=30)
         else:
-            self.client = ParallelSSHClient(
+            client = ParallelSSHClient(
                 self.reachable_hosts, user=self.user, password=self.password, keepalive_seconds=30
             )
+        if self.connection_pool is not None:
+            self.connection_pool.seed_client(client, self.user, **self._pool_auth())
+        return client
+
+    def _release_sessions(self):
+        """
+        Hand sessions dialed by self.client back to the connection pool.
+        """
+        if self.connection_pool is not None:
+            self.connection_pool.collect_client(self.client, self.user, **self._pool_auth())
 
     def check_connectivity(self, hosts):
         """
@@ -83,21 +291,65 @@ class Pssh:
             for item in output
             if item.exception and isinstance(item.exception, (ConnectionError, Timeout, SessionError))
         ]
-        unreachable = self.check_connectivity(failed_hosts)
+        if self.connection_pool is not None:
+            # Transport to these hosts is suspect, make the next borrower redial them
+            self.connection_pool.evict(failed_hosts, self.user, **self._pool_auth())
+        unreachable = [host for host in self.check_connectivity(failed_hosts) if host not in self.unreachable_hosts]
         for host in unreachable:
             print(f"Host {host} is unreachable, pruning from reachable hosts list.")
             self.unreachable_hosts.append(host)
-            self.reachable_hosts.remove(host)
         if len(self.unreachable_hosts) > initial_unreachable_len:
-            # Recreate client with filtered reachable_hosts, only if hosts were actually pruned
-            if self.password is None:
-                self.client = ParallelSSHClient(
-                    self.reachable_hosts, user=self.user, pkey=self.pkey, keepalive_seconds=30
-                )
+            if self._defer_pruning:
+                self._pending_prune.extend(unreachable)
             else:
-                self.client = ParallelSSHClient(
-                    self.reachable_hosts, user=self.user, password=self.password, keepalive_seconds=30
-                )
+                # Drop only the pruned hosts from the client, sessions to the remaining hosts stay up
+                self.remove_hosts(unreachable)
+
+    @contextmanager
+    def deferred_pruning(self):
+        """
+        Keep reachable_hosts and the client's host list unchanged while the block runs.
+
+        Needed while several greenlets share this handle: one of them may be running
+        exec_cmd_list with host_args built from reachable_hosts, which must still line up
+        with the client's hosts when another one prunes. Unreachable hosts are still added
+        to unreachable_hosts (and reported) right away, and removed from reachable_hosts and
+        the client when the outermost block exits.
+        """
+        self._defer_pruning += 1
+        try:
+            yield
+        finally:
+            self._defer_pruning -= 1
+            if not self._defer_pruning and self._pending_prune:
+                hosts, self._pending_prune = self._pending_prune, []
+                self.remove_hosts(hosts)
+
+    def remove_hosts(self, hosts):
+        """
+        Remove hosts from reachable_hosts and from the running client in place, closing their
+        sessions. Sessions to every other host are kept, and so are removed sessions still in
+        the connection pool, which other Pssh handles may share.
+        """
+        hosts = set(hosts)
+        self.reachable_hosts = [host for host in self.reachable_hosts if host not in hosts]
+        for session in set_client_hosts(self.client, self.reachable_hosts):
+            if self.connection_pool is None or not self.connection_pool.holds(session):
+                close_session(session)
+
+    def add_hosts(self, hosts):
+        """
+        Add hosts (e.g. nodes that came back) to reachable_hosts and to the running client in
+        place. They are dialed on the next command, seeded from the connection pool if possible.
+        """
+        new_hosts = [host for host in hosts if host not in self.reachable_hosts]
+        if not new_hosts:
+            return
+        self.unreachable_hosts = [host for host in self.unreachable_hosts if host not in new_hosts]
+        self.reachable_hosts = self.reachable_hosts + new_hosts
+        set_client_hosts(self.client, self.reachable_hosts)
+        if self.connection_pool is not None:
+            self.connection_pool.seed_client(self.client, self.user, **self._pool_auth())
 
     def inform_unreachability(self, cmd_output):
         """
@@ -107,46 +359,65 @@ class Pssh:
         for host in self.unreachable_hosts:
             cmd_output[host] = cmd_output.get(host, "") + "\nABORT: Host Unreachable Error"
 
-    def _process_output(self, output, cmd=None, cmd_list=None, print_console=True):
+    def _stream_output(self, output):
+        """
+        Generator yielding (host, line) tuples from all hosts in output as lines arrive.
+        Every host is drained by its own greenlet, so a slow host does not hold back the
+        others and per-host read timeouts run concurrently instead of back to back.
+
+        A read Timeout on one host is recorded on that host's item.exception when
+        stop_on_errors is False, otherwise it is re-raised.
+        """
+        items = {item.host: item for item in output}
+        queue = Queue()
+        greenlets = [gevent.spawn(_drain_host_output, item, queue) for item in output]
+        pending = len(greenlets)
+        try:
+            while pending:
+                host, line = queue.get()
+                if line is _STREAM_DONE:
+                    pending -= 1
+                elif isinstance(line, Exception):
+                    pending -= 1
+                    if self.stop_on_errors or not isinstance(line, Timeout):
+                        raise line
+                    if items[host].exception is None:
+                        items[host].exception = line
+                else:
+                    yield host, line
+        finally:
+            gevent.killall(greenlets, block=False)
+
+    def _process_output(self, output, cmd=None, cmd_list=None, print_console=True, callback=None):
         """
         Helper method to process output from run_command, collect results, and handle pruning.
+        Lines are gathered from all hosts concurrently into per-host lists and joined once,
+        callback(host, line) is invoked for every line as it arrives.
         Returns cmd_output dictionary.
         """
+        host_lines = {item.host: [] for item in output}
+        for host, line in self._stream_output(output):
+            if callback is not None:
+                callback(host, line)
+            host_lines[host].append(line.replace('\t', '   '))
+
         cmd_output = {}
-        i = 0
-        for item in output:
+        for i, item in enumerate(output):
             print('#----------------------------------------------------------#')
             print(f'Host == {item.host} ==')
             print('#----------------------------------------------------------#')
-            cmd_out_str = ''
-            if cmd_list:
-                print(cmd_list[i])
-            else:
-                print(cmd)
-            try:
-                for line in item.stdout or []:
-                    if print_console:
-                        print(line)
-                    cmd_out_str += line.replace('\t', '   ') + '\n'
-                for line in item.stderr or []:
-                    if print_console:
-                        print(line)
-                    cmd_out_str += line.replace('\t', '   ') + '\n'
-            except Timeout as e:
-                if not self.stop_on_errors:
-                    self._handle_timeout_exception(output, e)
-                else:
-                    raise
+            print(cmd_list[i] if cmd_list else cmd)
+            lines = host_lines[item.host]
+            if print_console and lines:
+                print('\n'.join(lines))
             if item.exception:
                 exc_str = str(item.exception) if str(item.exception) else repr(item.exception)
                 exc_str = exc_str.replace('\t', '   ')
                 if isinstance(item.exception, Timeout):
                     exc_str += "\nABORT: Timeout Error in Host: " + item.host
                 print(exc_str)
-                cmd_out_str += exc_str + '\n'
-            if cmd_list:
-                i += 1
-            cmd_output[item.host] = cmd_out_str
+                lines.append(exc_str)
+            cmd_output[item.host] = '\n'.join(lines) + '\n' if lines else ''
 
         if not self.stop_on_errors:
             self.prune_unreachable_hosts(output)
@@ -154,19 +425,23 @@ class Pssh:
 
         return cmd_output
 
-    def _handle_timeout_exception(self, output, e):
+    def _run_command(self, cmd, timeout=None):
         """
-        Helper method to handle Timeout exceptions by setting exceptions for all hosts in output.
-        Since Timeout is raised once for the operation, assume all hosts are affected.
+        Launch cmd on all reachable hosts and return the pssh output list without reading it.
         """
-        if output is not None and isinstance(e, Timeout):
-            for item in output:
-                if item.exception is None:
-                    item.exception = e
+        if timeout is None:
+            output = self.client.run_command(cmd, stop_on_errors=self.stop_on_errors)
+        else:
+            output = self.client.run_command(cmd, read_timeout=timeout, stop_on_errors=self.stop_on_errors)
+        self._release_sessions()
+        return output
 
-    def exec(self, cmd, timeout=None, print_console=True):
+    def exec(self, cmd, timeout=None, print_console=True, callback=None):
         """
         Returns a dictionary of host as key and command output as values
+
+        callback, if given, is called as callback(host, line) for every output line as it
+        arrives from any host. Pass print_console=False to skip echoing output lines.
         """
         print(f'cmd = {cmd}')
 
@@ -177,11 +452,8 @@ class Pssh:
             else:
                 self.log.debug(f"Executing command on {len(self.reachable_hosts)} host(s): {cmd}")
 
-        if timeout is None:
-            output = self.client.run_command(cmd, stop_on_errors=self.stop_on_errors)
-        else:
-            output = self.client.run_command(cmd, read_timeout=timeout, stop_on_errors=self.stop_on_errors)
-        cmd_output = self._process_output(output, cmd=cmd, print_console=print_console)
+        output = self._run_command(cmd, timeout=timeout)
+        cmd_output = self._process_output(output, cmd=cmd, print_console=print_console, callback=callback)
 
         # Log per-host execution completion
         if self.log:
@@ -190,6 +462,22 @@ class Pssh:
 
         return cmd_output
 
+    def exec_stream(self, cmd, timeout=None):
+        """
+        Streaming variant of exec for large outputs (dmesg, ethtool -S, ..).
+        Returns a generator of (host, line) tuples yielded as soon as any host produces
+        output, without echoing to the console or building per-host strings.
+        Unreachable host pruning runs once the stream is exhausted, as with exec.
+        """
+        if self.log:
+            self.log.debug(f"Streaming command on {len(self.reachable_hosts)} host(s): {cmd}")
+
+        output = self._run_command(cmd, timeout=timeout)
+        yield from self._stream_output(output)
+
+        if not self.stop_on_errors:
+            self.prune_unreachable_hosts(output)
+
     def exec_cmd_list(self, cmd_list, timeout=None, print_console=True):
         """
         Run different commands on different hosts compared to to exec
@@ -211,6 +499,7 @@ class Pssh:
             output = self.client.run_command(
                 '%s', host_args=cmd_list, read_timeout=timeout, stop_on_errors=self.stop_on_errors
             )
+        self._release_sessions()
         cmd_output = self._process_output(output, cmd_list=cmd_list, print_console=print_console)
 
         # Log per-host command execution
@@ -234,6 +523,8 @@ class Pssh:
     def reboot_connections(self):
         print('Rebooting Connections')
         self.client.run_command('reboot -f', stop_on_errors=self.stop_on_errors)
+        if self.connection_pool is not None:
+            self.connection_pool.evict(self.reachable_hosts, self.user, **self._pool_auth())
 
     def destroy_clients(self):
         print('Destroying Current phdl connections ..')
@@ -8,10 +8,11 @@ All code contained here is Property of Advanced Micro Devices, Inc.
 # Standard libraries
 import re
 import json
-from typing import List
+from typing import List, NamedTuple, Optional
 from pathlib import Path
 
 # Third party libraries
+import numpy as np
 import pandas as pd
 from pydantic import ValidationError
 
@@ -19,6 +20,7 @@ from cvs.lib import globals
 from cvs.schema.rccl import RcclTests, RcclTestsAggregated, RcclTestsMultinodeRaw
 from cvs.lib.utils_lib import *
 from cvs.lib.verify_lib import *
+from cvs.lib.log_scan_lib import get_log_scanner
 
 log = globals.log
 
@@ -135,31 +137,30 @@ def scan_rccl_logs(output):
       output (str): Combined stdout/stderr text from an RCCL test run.
 
     Behavior:
-      - Iterates over each line to detect:
+      - Scans the output once with a compiled LogScanner to detect:
         * Errors matching patterns in rccl_err_dict (e.g., ORTE/NCCL/FS errors).
         * NCCL WARN lines, which are collected and printed (but not fatal).
-      - Fails the test immediately on the first matched error via fail_test(...).
+      - Calls fail_test for every line matching an error pattern.
       - After scanning, if no '# Avg bus bandwidth' marker exists in the entire output,
         fails the test because results are considered incomplete.
 
+    Returns:
+      list[LogMatch]: Lines that matched an error pattern (line number and pattern names included).
+
     Notes:
       - Expects rccl_err_dict (dict of error_name -> regex pattern) to be defined in scope.
-      - Expects fail_test(...) to be available, which should raise/exit the test on failure.
-      - Uses simple regex searches; patterns in rccl_err_dict can include alternations.
+      - Expects fail_test(...) to be available, which records the failure.
     """
-    error_list = []  # Accumulates lines that match known error patterns (for context/auditing)
-    warn_list = []  # Accumulates NCCL warning lines (non-fatal but useful for visibility)
-
-    # Process output line-by-line to catch and act on errors/warnings
-    for line in output.split("\n"):
-        for err_key in rccl_err_dict.keys():
-            # Check each line against all known error signatures
-            if re.search(f'{rccl_err_dict[err_key]}', line):
-                error_list.append(line)
-                fail_test(f'ERROR - {line}')
-        # Collect NCCL warnings (do not fail the test)
-        if re.search('NCCL WARN', line):
-            warn_list.append(line)
+    error_list = []  # Lines that match known error patterns (for context/auditing)
+    warn_list = []  # NCCL warning lines (non-fatal but useful for visibility)
+
+    scanner = get_log_scanner({**rccl_err_dict, 'nccl_warn': 'NCCL WARN'})
+    for match in scanner.scan(output):
+        if 'nccl_warn' in match.patterns:
+            warn_list.append(match.line)
+        if any(name != 'nccl_warn' for name in match.patterns):
+            error_list.append(match)
+            fail_test(f'ERROR - {match.line}')
     if len(warn_list) > 0:
         print('Following warnings were observed in the RCCL test')
         print('#============#')
@@ -167,6 +168,7 @@ def scan_rccl_logs(output):
         print('#============#')
     if not re.search('#\sAvg bus bandwidth', output):
         fail_test('RCCL test did not complete successfully, no bandwidth numbers printed - pls check')
+    return error_list
 
 
 # Not using the avg bus bandwidth verification currently ..
@@ -178,6 +180,162 @@ def check_avg_bus_bw(output, exp_res_dict):
             fail_test(f"Actual Avg Bus BW {actual_bw} is less than the expected Avg BW {exp_res_dict['avg_bus_bw']}")
 
 
+class RcclViolation(NamedTuple):
+    """One failed RCCL result check."""
+
+    check: str  # 'bus_bw', 'bw_dip' or 'lat_dip'
+    size: int
+    in_place: int
+    actual: float
+    reference: float  # expected bus BW, or the value at the previous checked msg size for dips
+    threshold: float
+    message: str
+
+
+RCCL_CHECKS = ('bus_bw', 'bw_dip', 'lat_dip')
+
+
+def load_rccl_results(results):
+    """
+    Load rccl-tests results into typed numpy columns, in measurement order.
+
+    Parameters:
+      results: List of result dicts as written by rccl-tests (-Z json), or that JSON as a string.
+
+    Returns:
+      dict: 'size' (int64), 'inPlace' (int8), 'busBw' (float64), 'time' (float64) arrays.
+    """
+    if isinstance(results, str):
+        results = json.loads(results.replace('\n', '').replace('\r', ''))
+    return {
+        'size': np.fromiter((int(r['size']) for r in results), dtype=np.int64, count=len(results)),
+        'inPlace': np.fromiter((int(r['inPlace']) for r in results), dtype=np.int8, count=len(results)),
+        'busBw': np.fromiter((float(r['busBw']) for r in results), dtype=np.float64, count=len(results)),
+        'time': np.fromiter((float(r['time']) for r in results), dtype=np.float64, count=len(results)),
+    }
+
+
+def _expected_bus_bw(exp_res_dict):
+    """Expected results {msg_size: {'bus_bw': ..}} -> sorted int sizes and their expected bus BW."""
+    sizes, bus_bw = [], []
+    for msg_size, exp in exp_res_dict.items():
+        try:
+            size = int(str(msg_size))
+        except ValueError:
+            continue
+        sizes.append(size)
+        bus_bw.append(float(exp['bus_bw']) if isinstance(exp, dict) and 'bus_bw' in exp else np.nan)
+    order = np.argsort(sizes, kind='stable')
+    return np.asarray(sizes, dtype=np.int64)[order], np.asarray(bus_bw, dtype=np.float64)[order]
+
+
+def validate_rccl_results(test_name, results, exp_res_dict=None, checks=RCCL_CHECKS, tolerance=0.95):
+    """
+    Evaluate the bus BW threshold and BW / latency dip checks over a set of RCCL results.
+
+    Parameters:
+      test_name (str): RCCL test name; alltoall tests are checked on out-of-place
+                       results (inPlace == 0), all others on in-place results.
+      results: Result list / JSON string (see load_rccl_results) or its loaded columns.
+      exp_res_dict (dict): Expected results {msg_size: {'bus_bw': <min bus BW>}}. Only these
+                           msg sizes are checked; without it no check runs.
+      checks (tuple): Any of 'bus_bw', 'bw_dip', 'lat_dip'.
+      tolerance (float): A value fails when below tolerance x its reference (5% by default).
+
+    Behavior:
+      - Results are loaded into typed arrays once and matched to the expected msg sizes
+        through an integer size index (np.searchsorted), no per-entry string compares.
+      - bus_bw: busBw below tolerance x expected bus BW.
+      - bw_dip / lat_dip: busBw / time below tolerance x the value of the previous checked
+        msg size, in measurement order.
+
+    Returns:
+      list[RcclViolation]: Every violation found, ordered by check then measurement order.
+    """
+    if not exp_res_dict:
+        log.info(f"No reference data provided for RCCL result checks, skipping validation for {test_name}")
+        return []
+
+    table = results if isinstance(results, dict) else load_rccl_results(results)
+    in_place = 0 if re.search('alltoall|all_to_all', test_name, re.I) else 1
+    place = 'out-of-place' if in_place == 0 else 'in-place'
+
+    exp_sizes, exp_bus_bw = _expected_bus_bw(exp_res_dict)
+    if not len(exp_sizes) or not len(table['size']):
+        return []
+    idx = np.minimum(np.searchsorted(exp_sizes, table['size']), len(exp_sizes) - 1)
+    selected = np.nonzero((table['inPlace'] == in_place) & (exp_sizes[idx] == table['size']))[0]
+    sizes = table['size'][selected]
+
+    violations = []
+    if 'bus_bw' in checks:
+        actual = table['busBw'][selected]
+        expected = exp_bus_bw[idx[selected]]
+        threshold = expected * tolerance
+        for i in np.nonzero(actual < threshold)[0]:
+            violations.append(
+                RcclViolation(
+                    'bus_bw',
+                    int(sizes[i]),
+                    in_place,
+                    float(actual[i]),
+                    float(expected[i]),
+                    float(threshold[i]),
+                    f"The actual {place} bus BW {actual[i]} for msg size {sizes[i]} is lower than expected bus BW "
+                    f"{expected[i]} (threshold with {1 - tolerance:.0%} tolerance: {threshold[i]:.2f})",
+                )
+            )
+
+    for check, column, label in (('bw_dip', 'busBw', 'BusBW'), ('lat_dip', 'time', 'latency')):
+        if check not in checks or len(selected) < 2:
+            continue
+        current = table[column][selected]
+        previous = np.concatenate(([0.0], current[:-1]))
+        threshold = previous * tolerance
+        for i in np.nonzero((previous > 0) & (current < threshold))[0]:
+            prev_label = 'BW' if check == 'bw_dip' else 'latency'
+            violations.append(
+                RcclViolation(
+                    check,
+                    int(sizes[i]),
+                    in_place,
+                    float(current[i]),
+                    float(previous[i]),
+                    float(threshold[i]),
+                    f"The {label} for msg size {sizes[i]} = {current[i]} is less than the earlier msg size "
+                    f"{sizes[i - 1]} = {prev_label} {previous[i]} (threshold with {1 - tolerance:.0%} tolerance: {threshold[i]:.2f})",
+                )
+            )
+    return violations
+
+
+def _report_violations(violations):
+    for violation in violations:
+        fail_test(violation.message)
+    return violations
+
+
+def verify_rccl_results(
+    test_name, results, exp_res_dict, verify_bus_bw='False', verify_bw_dip='True', verify_lat_dip='True'
+):
+    """
+    Run the enabled checks (config style 'True'/'False' flags) in one pass and record a
+    failure for every violation.
+
+    Returns:
+      list[RcclViolation]
+    """
+    checks = tuple(
+        check
+        for check, flag in zip(RCCL_CHECKS, (verify_bus_bw, verify_bw_dip, verify_lat_dip))
+        if re.search('True', str(flag), re.I)
+    )
+    if not checks:
+        return []
+    print(f'Verifying RCCL results for {test_name}: {", ".join(checks)}')
+    return _report_violations(validate_rccl_results(test_name, results, exp_res_dict, checks))
+
+
 def check_bus_bw(test_name, output, exp_res_dict):
     """
     Validate bus bandwidth results from an RCCL test against expected thresholds.
@@ -185,67 +343,19 @@ def check_bus_bw(test_name, output, exp_res_dict):
     Parameters:
       test_name (str): Name of the RCCL test (e.g., alltoall, all_reduce_perf).
                        Determines whether to check in-place or out-of-place results.
-      output (str): JSON string (possibly with newlines) produced by the RCCL test,
-                    containing a list of result dictionaries. Each entry typically includes:
-                      - 'size'   : message size for the measurement
-                      - 'busBw'  : measured bus bandwidth
-                      - 'inPlace': 0 (out-of-place) or 1 (in-place)
-      exp_res_dict (dict): Expected results dictionary with the structure:
-                    {
-                      <msg_size>: {
-                          'bus_bw': <min_expected_bus_bw>, ...
-                      }
-                    }
+      output: List of result dicts produced by the RCCL test (or its JSON string).
+      exp_res_dict (dict): Expected results {<msg_size>: {'bus_bw': <min_expected_bus_bw>, ...}}
 
     Behavior:
-      - Parses the JSON output and iterates over measured entries.
-      - For alltoall/all_to_all tests, validates out-of-place measurements (inPlace == 0).
-      - For other tests, validates in-place measurements (inPlace == 1).
-      - Compares measured busBw to minimum expected thresholds per message size.
-      - Calls fail_test(...) if any measurement is at least 5% below expectation.
+      - For alltoall/all_to_all tests, validates out-of-place measurements (inPlace == 0),
+        for other tests in-place measurements (inPlace == 1).
+      - Calls fail_test(...) for every measurement at least 5% below expectation.
 
-    Notes:
-      - Message sizes are compared as strings to avoid type mismatches between JSON and expectations.
-      - Assumes fail_test(...) is available in scope to signal test failure.
-      - 5% tolerance is applied: test only fails if actual < expected * 0.95
+    Returns:
+      list[RcclViolation]: The violations found (see validate_rccl_results).
     """
-
     print(f'exp_res_dict = {exp_res_dict}')
-
-    tolerance = 0.95  # 5% tolerance
-
-    # New hierarchical structure: {msg_size: {'bus_bw': bw_value}}
-    msg_size_list = list(exp_res_dict.keys())
-
-    print(test_name)
-    # act_res_dict = json.loads(output.replace( '\n', '').replace( '\r', ''))
-    act_res_dict = output
-    if re.search('alltoall|all_to_all', test_name, re.I):
-        for act_dict in act_res_dict:
-            if act_dict['inPlace'] == 0:
-                for msg_size in msg_size_list:
-                    if str(msg_size) == str(act_dict['size']):
-                        expected_bw = float(exp_res_dict[msg_size]['bus_bw'])
-                        actual_bw = float(act_dict['busBw'])
-                        threshold = expected_bw * tolerance
-                        print(f"Comparing: actual={actual_bw}, expected={expected_bw}, threshold={threshold:.2f}")
-                        if actual_bw < threshold:
-                            fail_test(
-                                f"The actual out-of-place bus BW {actual_bw} for msg size {act_dict['size']} is lower than expected bus BW {expected_bw} (threshold with 5% tolerance: {threshold:.2f})"
-                            )
-    else:
-        for act_dict in act_res_dict:
-            if act_dict['inPlace'] == 1:
-                for msg_size in msg_size_list:
-                    if str(msg_size) == str(act_dict['size']):
-                        expected_bw = float(exp_res_dict[msg_size]['bus_bw'])
-                        actual_bw = float(act_dict['busBw'])
-                        threshold = expected_bw * tolerance
-                        print(f"Comparing: actual={actual_bw}, expected={expected_bw}, threshold={threshold:.2f}")
-                        if actual_bw < threshold:
-                            fail_test(
-                                f"The actual in-place bus BW {actual_bw} for msg size {act_dict['size']} is lower than expected bus BW {expected_bw} (threshold with 5% tolerance: {threshold:.2f})"
-                            )
+    return _report_violations(validate_rccl_results(test_name, output, exp_res_dict, checks=('bus_bw',)))
 
 
 def check_bw_dip(test_name, output, exp_res_dict=None):
@@ -253,54 +363,9 @@ def check_bw_dip(test_name, output, exp_res_dict=None):
     Check for bandwidth dips as message size increases.
     Only fails if bandwidth drops by more than 5%.
     Only validates message sizes specified in the reference. If no reference provided, skips validation.
+    Returns the list of RcclViolation found.
     """
-    # act_res_dict = json.loads(output.replace( '\n', '').replace( '\r', ''))
-    act_res_dict = output
-    tolerance = 0.95  # 5% tolerance
-
-    # Get reference message sizes if provided
-    # If no reference data, skip validation entirely
-    if not exp_res_dict:
-        log.info(f"No reference data provided for BW dip check, skipping validation for {test_name}")
-        return
-
-    ref_msg_sizes = set(str(size) for size in exp_res_dict.keys())
-    log.info(f"Validating BW dip only for reference message sizes: {ref_msg_sizes}")
-
-    if re.search('alltoall|all_to_all', test_name, re.I):
-        last_bw = 0.0
-        last_msg_size = act_res_dict[0]['size']
-        for act_dict in act_res_dict:
-            if act_dict['inPlace'] == 0:
-                # Skip validation if this message size is not in reference
-                if str(act_dict['size']) not in ref_msg_sizes:
-                    continue
-
-                current_bw = float(act_dict['busBw'])
-                threshold = float(last_bw) * tolerance
-                if last_bw > 0 and current_bw < threshold:
-                    fail_test(
-                        f"The BusBW for msg size {act_dict['size']} = {current_bw} is less than the earlier msg size {last_msg_size} = BW {last_bw} (threshold with 5% tolerance: {threshold:.2f})"
-                    )
-                last_bw = act_dict['busBw']
-                last_msg_size = act_dict['size']
-    else:
-        last_bw = 0.0
-        last_msg_size = act_res_dict[0]['size']
-        for act_dict in act_res_dict:
-            if act_dict['inPlace'] == 1:
-                # Skip validation if this message size is not in reference
-                if str(act_dict['size']) not in ref_msg_sizes:
-                    continue
-
-                current_bw = float(act_dict['busBw'])
-                threshold = float(last_bw) * tolerance
-                if last_bw > 0 and current_bw < threshold:
-                    fail_test(
-                        f"The BusBW for msg size {act_dict['size']} = {current_bw} is less than the earlier msg size {last_msg_size} = BW {last_bw} (threshold with 5% tolerance: {threshold:.2f})"
-                    )
-                last_bw = act_dict['busBw']
-                last_msg_size = act_dict['size']
+    return _report_violations(validate_rccl_results(test_name, output, exp_res_dict, checks=('bw_dip',)))
 
 
 def check_lat_dip(test_name, output, exp_res_dict=None):
@@ -308,54 +373,9 @@ def check_lat_dip(test_name, output, exp_res_dict=None):
     Check for latency decreases as message size increases (which would be unexpected).
     Only fails if latency drops by more than 5%.
     Only validates message sizes specified in the reference. If no reference provided, skips validation.
+    Returns the list of RcclViolation found.
     """
-    # act_res_dict = json.loads(output.replace( '\n', '').replace( '\r', ''))
-    act_res_dict = output
-    tolerance = 0.95  # 5% tolerance
-
-    # Get reference message sizes if provided
-    # If no reference data, skip validation entirely
-    if not exp_res_dict:
-        log.info(f"No reference data provided for latency dip check, skipping validation for {test_name}")
-        return
-
-    ref_msg_sizes = set(str(size) for size in exp_res_dict.keys())
-    log.info(f"Validating latency dip only for reference message sizes: {ref_msg_sizes}")
-
-    if re.search('alltoall|all_to_all', test_name, re.I):
-        last_time = 0.0
-        last_msg_size = act_res_dict[0]['size']
-        for act_dict in act_res_dict:
-            if act_dict['inPlace'] == 0:
-                # Skip validation if this message size is not in reference
-                if str(act_dict['size']) not in ref_msg_sizes:
-                    continue
-
-                current_time = float(act_dict['time'])
-                threshold = float(last_time) * tolerance
-                if last_time > 0 and current_time < threshold:
-                    fail_test(
-                        f"The latency for msg size {act_dict['size']} = {current_time} is less than the earlier msg size {last_msg_size} = latency {last_time} (threshold with 5% tolerance: {threshold:.2f})"
-                    )
-                last_time = act_dict['time']
-                last_msg_size = act_dict['size']
-    else:
-        last_time = 0.0
-        last_msg_size = act_res_dict[0]['size']
-        for act_dict in act_res_dict:
-            if act_dict['inPlace'] == 1:
-                # Skip validation if this message size is not in reference
-                if str(act_dict['size']) not in ref_msg_sizes:
-                    continue
-
-                current_time = float(act_dict['time'])
-                threshold = float(last_time) * tolerance
-                if last_time > 0 and current_time < threshold:
-                    fail_test(
-                        f"The latency for msg size {act_dict['size']} = {current_time} is less than the earlier msg size {last_msg_size} = latency {last_time} (threshold with 5% tolerance: {threshold:.2f})"
-                    )
-                last_time = act_dict['time']
-                last_msg_size = act_dict['size']
+    return _report_violations(validate_rccl_results(test_name, output, exp_res_dict, checks=('lat_dip',)))
 
 
 def convert_to_graph_dict(result_dict):
@@ -663,15 +683,7 @@ def rccl_cluster_test(
     # If requested, verify measured bus bandwidths against provided expected Bandwidth
     test_exp_dict = exp_results_dict.get(test_name) if exp_results_dict else None
 
-    if re.search('True', verify_bus_bw, re.I):
-        if test_exp_dict:
-            check_bus_bw(test_name, result_out, test_exp_dict)
-
-    if re.search('True', verify_bw_dip, re.I):
-        check_bw_dip(test_name, result_out, test_exp_dict)
-
-    if re.search('True', verify_lat_dip, re.I):
-        check_lat_dip(test_name, result_out, test_exp_dict)
+    verify_rccl_results(test_name, result_out, test_exp_dict, verify_bus_bw, verify_bw_dip, verify_lat_dip)
 
     return result_out
 
@@ -679,6 +691,122 @@ def rccl_cluster_test(
 # Main RCCL Test library which gets invoked from cvs/test/rccl tests and accepts most of the
 # standard NCCL environment variables ..
 #
+def get_nic_type(nic_model):
+    """
+    Map a nic_model string from the config to the NIC type keys used in the expected
+    results dict ('ainic', 'thor' or 'connectx'), defaulting to 'ainic'.
+    """
+    if re.search('ainic|pensando|amd', nic_model, re.I):
+        nic_type = 'ainic'
+    elif re.search('broadcom|thor|bnxt', nic_model, re.I):
+        nic_type = 'thor'
+    elif re.search('mellanox|cx|nvidia', nic_model, re.I):
+        nic_type = 'connectx'
+    else:
+        nic_type = 'ainic'
+    log.info(f'Detected NIC type: {nic_type} from nic_model: {nic_model}')
+    return nic_type
+
+
+def _results_for_verification(aggregated_rccl_tests, raw_results):
+    # Convert aggregated results to format compatible with verification functions (using mean values)
+    results_for_verification = []
+    if aggregated_rccl_tests:
+        for agg_result in aggregated_rccl_tests:
+            results_for_verification.append(
+                {
+                    'name': agg_result.name,
+                    'size': agg_result.size,
+                    'type': agg_result.type,
+                    'inPlace': agg_result.inPlace,
+                    'busBw': agg_result.busBw_mean,
+                    'algBw': agg_result.algBw_mean,
+                    'time': agg_result.time_mean,
+                }
+            )
+        log.info(f'Converted {len(results_for_verification)} aggregated results for verification')
+    else:
+        # Fallback to raw results if aggregation wasn't performed
+        results_for_verification = raw_results
+        log.info('Using raw results for verification (no aggregation performed)')
+    return results_for_verification
+
+
+def _lookup_expected_results(exp_results_dict, nic_type, result_key):
+    # Get test-specific expected results from hierarchical structure
+    test_exp_dict = None
+    if exp_results_dict and isinstance(exp_results_dict, dict) and nic_type in exp_results_dict:
+        if result_key in exp_results_dict[nic_type]:
+            test_exp_dict = exp_results_dict[nic_type][result_key]
+            log.info(f'Found expected results: {nic_type}/{result_key}')
+    return test_exp_dict
+
+
+def build_rccl_mpirun_cmd(
+    test_name, dtype, result_file, launch_params, min_channels=None, max_channels=None, env_source_script=None
+):
+    """
+    Build the mpirun command line for one rccl-tests run.
+
+    Parameters:
+      test_name (str): RCCL test binary name (e.g., all_reduce_perf).
+      dtype (str): Data type passed to -d.
+      result_file (str): JSON result file passed to -x.
+      launch_params (dict): Settings shared by every run of a test session - install dirs
+        (mpi_install_dir, rccl_tests_install_dir), exported path/ld_library_path, rank count,
+        NCCL/UCX/MPI tuning (debug_level, gid_index, ucx_params, pml_param, ib_hca_list,
+        nccl_socket_ifname, oob_port, nccl_net_plugin) and the message size sweep
+        (start_msg_size, end_msg_size, step_function, threads_per_gpu, check_iteration_count,
+        warmup_iterations, no_of_iterations, no_of_cycles).
+      min_channels, max_channels (int): NCCL_MIN/MAX_NCHANNELS, RCCL defaults when None.
+      env_source_script (str): Script sourced before the test binary, if any.
+
+    Returns:
+      str: The mpirun command.
+    """
+    p = launch_params
+    # Wrap test binary in shell to source env script if provided
+    test_cmd = f'env && {p["rccl_tests_install_dir"]}/{test_name} -b {p["start_msg_size"]} -e {p["end_msg_size"]} -f {p["step_function"]} \
+            -g {p["threads_per_gpu"]} -c {p["check_iteration_count"]} -w {p["warmup_iterations"]} \
+            -d {dtype} -n {p["no_of_iterations"]} -N {p["no_of_cycles"]} -Z json -x {result_file}'
+
+    if env_source_script and env_source_script.lower() != 'none':
+        test_cmd = f'bash -c "source {env_source_script} && {test_cmd}"'
+    else:
+        # Always wrap in bash to interpret && shell operator
+        test_cmd = f'bash -c "{test_cmd}"'
+
+    # Build optional NCCL_SOCKET_IFNAME parameter
+    nccl_socket_ifname = p['nccl_socket_ifname']
+    nccl_socket_param = f'-x NCCL_SOCKET_IFNAME={nccl_socket_ifname}' if nccl_socket_ifname.strip() else ''
+
+    # Build optional NCCL channel parameters (only if specified, otherwise let RCCL use defaults)
+    nccl_min_channels_param = f'-x NCCL_MIN_NCHANNELS={min_channels}' if min_channels is not None else ''
+    nccl_max_channels_param = f'-x NCCL_MAX_NCHANNELS={max_channels}' if max_channels is not None else ''
+
+    return f'''{p["mpi_install_dir"]}/mpirun --np {p["no_of_global_ranks"]} \
+        --allow-run-as-root \
+        --hostfile /tmp/rccl_hosts_file.txt \
+        -x NCCL_DEBUG={p["debug_level"]} \
+        --bind-to numa \
+        -x NCCL_IB_GID_INDEX={p["gid_index"]} \
+        {p["ucx_params"]} \
+        -x NCCL_IB_PCI_RELAXED_ORDERING=1 \
+        -x PATH={p["path"]} \
+        -x LD_LIBRARY_PATH={p["ld_library_path"]} \
+        -x NCCL_IB_HCA={p["ib_hca_list"]} \
+        {nccl_socket_param} \
+        --mca btl ^vader,openib \
+        --mca btl_tcp_if_include {p["oob_port"]} \
+        --mca oob_tcp_if_include {p["oob_port"]} \
+        {p["pml_param"]} \
+        -x NCCL_NET_PLUGIN={p["nccl_net_plugin"]} \
+        {nccl_min_channels_param} \
+        {nccl_max_channels_param} \
+        {test_cmd}
+        '''
+
+
 def rccl_cluster_test_default(
     phdl,
     shdl,
@@ -814,6 +942,30 @@ def rccl_cluster_test_default(
     # Determine PML (Point-to-Point Messaging Layer) based on user config or auto-detection
     pml_param, ucx_params = determine_mpi_pml_config(mpi_pml, shdl, MPI_PATH, head_node, net_dev_list, ucx_tls)
 
+    launch_params = {
+        'mpi_install_dir': MPI_INSTALL_DIR,
+        'rccl_tests_install_dir': RCCL_TESTS_INSTALL_DIR,
+        'path': PATH,
+        'ld_library_path': LD_LIBRARY_PATH,
+        'no_of_global_ranks': no_of_global_ranks,
+        'debug_level': debug_level,
+        'gid_index': gid_index,
+        'ucx_params': ucx_params,
+        'pml_param': pml_param,
+        'ib_hca_list': ib_hca_list,
+        'nccl_socket_ifname': nccl_socket_ifname,
+        'oob_port': oob_port,
+        'nccl_net_plugin': nccl_net_plugin,
+        'start_msg_size': start_msg_size,
+        'end_msg_size': end_msg_size,
+        'step_function': step_function,
+        'threads_per_gpu': threads_per_gpu,
+        'check_iteration_count': check_iteration_count,
+        'warmup_iterations': warmup_iterations,
+        'no_of_iterations': no_of_iterations,
+        'no_of_cycles': no_of_cycles,
+    }
+
     all_raw_results = []
     all_validated_results = []
     base_path = Path(rccl_result_file)
@@ -823,48 +975,16 @@ def rccl_cluster_test_default(
         dtype_result_file = f'{base_path.parent}/{base_path.stem}_{dtype}.json'
         log.info(f'Running {test_name} with dtype={dtype}')
 
-        # Wrap test binary in shell to source env script if provided
-        test_cmd = (
-            f'env && {RCCL_TESTS_INSTALL_DIR}/{test_name} -b {start_msg_size} -e {end_msg_size} -f {step_function} \
-            -g {threads_per_gpu} -c {check_iteration_count} -w {warmup_iterations} \
-            -d {dtype} -n {no_of_iterations} -N {no_of_cycles} -Z json -x {dtype_result_file}'
+        cmd = build_rccl_mpirun_cmd(
+            test_name,
+            dtype,
+            dtype_result_file,
+            launch_params,
+            min_channels=min_channels,
+            max_channels=max_channels,
+            env_source_script=env_source_script,
         )
 
-        if env_source_script and env_source_script.lower() != 'none':
-            test_cmd = f'bash -c "source {env_source_script} && {test_cmd}"'
-        else:
-            # Always wrap in bash to interpret && shell operator
-            test_cmd = f'bash -c "{test_cmd}"'
-
-        # Build optional NCCL_SOCKET_IFNAME parameter
-        nccl_socket_param = f'-x NCCL_SOCKET_IFNAME={nccl_socket_ifname}' if nccl_socket_ifname.strip() else ''
-
-        # Build optional NCCL channel parameters (only if specified, otherwise let RCCL use defaults)
-        nccl_min_channels_param = f'-x NCCL_MIN_NCHANNELS={min_channels}' if min_channels is not None else ''
-        nccl_max_channels_param = f'-x NCCL_MAX_NCHANNELS={max_channels}' if max_channels is not None else ''
-
-        cmd = f'''{MPI_INSTALL_DIR}/mpirun --np {no_of_global_ranks} \
-        --allow-run-as-root \
-        --hostfile /tmp/rccl_hosts_file.txt \
-        -x NCCL_DEBUG={debug_level} \
-        --bind-to numa \
-        -x NCCL_IB_GID_INDEX={gid_index} \
-        {ucx_params} \
-        -x NCCL_IB_PCI_RELAXED_ORDERING=1 \
-        -x PATH={PATH} \
-        -x LD_LIBRARY_PATH={LD_LIBRARY_PATH} \
-        -x NCCL_IB_HCA={ib_hca_list} \
-        {nccl_socket_param} \
-        --mca btl ^vader,openib \
-        --mca btl_tcp_if_include {oob_port} \
-        --mca oob_tcp_if_include {oob_port} \
-        {pml_param} \
-        -x NCCL_NET_PLUGIN={nccl_net_plugin} \
-        {nccl_min_channels_param} \
-        {nccl_max_channels_param} \
-        {test_cmd}
-        '''
-
         print('%%%%%%%%%%%%%%%%')
         print(cmd)
         print('%%%%%%%%%%%%%%%%')
@@ -941,37 +1061,9 @@ def rccl_cluster_test_default(
     smi_out = smi_out_dict[head_node]
     get_model_from_rocm_smi_output(smi_out)
 
-    # Determine NIC type from nic_model parameter
-    if re.search('ainic|pensando|amd', nic_model, re.I):
-        nic_type = 'ainic'
-    elif re.search('broadcom|thor|bnxt', nic_model, re.I):
-        nic_type = 'thor'
-    elif re.search('mellanox|cx|nvidia', nic_model, re.I):
-        nic_type = 'connectx'
-    else:
-        nic_type = 'ainic'
-    log.info(f'Detected NIC type: {nic_type} from nic_model: {nic_model}')
+    nic_type = get_nic_type(nic_model)
 
-    # Convert aggregated results to format compatible with verification functions (using mean values)
-    results_for_verification = []
-    if aggregated_rccl_tests:
-        for agg_result in aggregated_rccl_tests:
-            results_for_verification.append(
-                {
-                    'name': agg_result.name,
-                    'size': agg_result.size,
-                    'type': agg_result.type,
-                    'inPlace': agg_result.inPlace,
-                    'busBw': agg_result.busBw_mean,
-                    'algBw': agg_result.algBw_mean,
-                    'time': agg_result.time_mean,
-                }
-            )
-        log.info(f'Converted {len(results_for_verification)} aggregated results for verification')
-    else:
-        # Fallback to raw results if aggregation wasn't performed
-        results_for_verification = all_raw_results
-        log.info('Using raw results for verification (no aggregation performed)')
+    results_for_verification = _results_for_verification(aggregated_rccl_tests, all_raw_results)
 
     # Build result key in format: test_name-data_types-global_ranks
     # Join all data types with underscores for the key
@@ -979,27 +1071,332 @@ def rccl_cluster_test_default(
     result_key = f'{test_name}-{dtypes_str}-{no_of_global_ranks}'
     log.info(f'Looking up results with key: {result_key} in nic_type: {nic_type}')
 
-    # Get test-specific expected results from hierarchical structure
-    test_exp_dict = None
-    if exp_results_dict and isinstance(exp_results_dict, dict) and nic_type in exp_results_dict:
-        if result_key in exp_results_dict[nic_type]:
-            test_exp_dict = exp_results_dict[nic_type][result_key]
-            log.info(f'Found expected results: {nic_type}/{result_key}')
+    test_exp_dict = _lookup_expected_results(exp_results_dict, nic_type, result_key)
 
     # If requested, verify measured bus bandwidths against provided expected Bandwidth
-    if re.search('True', verify_bus_bw, re.I):
-        if test_exp_dict:
-            check_bus_bw(test_name, results_for_verification, test_exp_dict)
-        else:
-            log.warning(f'verify_bus_bw enabled but no expected results found for {result_key}')
+    if re.search('True', verify_bus_bw, re.I) and not test_exp_dict:
+        log.warning(f'verify_bus_bw enabled but no expected results found for {result_key}')
+    verify_rccl_results(
+        test_name, results_for_verification, test_exp_dict, verify_bus_bw, verify_bw_dip, verify_lat_dip
+    )
+
+    return all_raw_results
 
-    if re.search('True', verify_bw_dip, re.I):
-        check_bw_dip(test_name, results_for_verification, test_exp_dict)
 
-    if re.search('True', verify_lat_dip, re.I):
-        check_lat_dip(test_name, results_for_verification, test_exp_dict)
+RCCL_SWEEP_MARKER = '__CVS_RCCL__'
 
-    return all_raw_results
+
+class RcclSweepConfig(NamedTuple):
+    """One configuration of a batched RCCL sweep."""
+
+    key: str
+    data_type: str
+    min_channels: Optional[int]
+    max_channels: Optional[int]
+    result_file: str
+
+
+def parse_channel_config(channel_config):
+    """
+    Parse a channel config string into (min_channels, max_channels).
+
+    'default' -> (None, None) which keeps the RCCL defaults, 'min-max' -> (min, max) and
+    a single value -> (value, value).
+    """
+    if str(channel_config).lower() == 'default':
+        return None, None
+    if '-' in str(channel_config):
+        min_channels, max_channels = str(channel_config).split('-')
+        return int(min_channels), int(max_channels)
+    return int(channel_config), int(channel_config)
+
+
+def build_rccl_sweep_configs(test_name, gpu_count, data_types, channel_configs, result_dir='/tmp'):
+    """
+    Expand data types x channel configs of one collective and GPU count into sweep configs.
+
+    Keys and result files follow the per-test naming of rccl_heatmap_cvs:
+    '<test_name>-<dtype>-<gpu_count>-ch<channel_config>' and
+    '<result_dir>/rccl_<test_name>_<dtype>_<gpu_count>_ch<channel_config>.json'.
+
+    Returns:
+      list[RcclSweepConfig]
+    """
+    configs = []
+    for channel_config in channel_configs:
+        min_channels, max_channels = parse_channel_config(channel_config)
+        for dtype in data_types:
+            configs.append(
+                RcclSweepConfig(
+                    key=f'{test_name}-{dtype}-{gpu_count}-ch{channel_config}',
+                    data_type=dtype,
+                    min_channels=min_channels,
+                    max_channels=max_channels,
+                    result_file=f'{result_dir}/rccl_{test_name}_{dtype}_{gpu_count}_ch{channel_config}.json',
+                )
+            )
+    return configs
+
+
+def build_rccl_sweep_script(test_name, sweep_configs, launch_params, env_source_script=None):
+    """
+    Build one shell script that runs every sweep config back-to-back on the head node.
+
+    Each run is framed by RCCL_SWEEP_MARKER lines and its JSON result file is printed
+    right after the run finishes, so the launches share one ssh session and the results
+    stream back in the same output instead of one mpirun + cat round trip per config:
+
+      __CVS_RCCL__ begin <key>
+      <mpirun output>
+      __CVS_RCCL__ result <key> <exit code>
+      <rccl-tests JSON>
+      __CVS_RCCL__ end <key>
+
+    A run whose results report '#wrong' > 0 (data corruption) ends the script, so no
+    further config is launched, like rccl_cluster_test_default stops after one.
+    """
+    lines = []
+    for config in sweep_configs:
+        cmd = build_rccl_mpirun_cmd(
+            test_name,
+            config.data_type,
+            config.result_file,
+            launch_params,
+            min_channels=config.min_channels,
+            max_channels=config.max_channels,
+            env_source_script=env_source_script,
+        )
+        lines.extend(
+            [
+                f'echo "{RCCL_SWEEP_MARKER} begin {config.key}"',
+                f'rm -f {config.result_file}',
+                f'{cmd.strip()} 2>&1',
+                f'echo "{RCCL_SWEEP_MARKER} result {config.key} $?"',
+                f'cat {config.result_file} 2>/dev/null',
+                f'echo "{RCCL_SWEEP_MARKER} end {config.key}"',
+                f'if grep -Eq \'"wrong"[[:space:]]*:[[:space:]]*"?[1-9]\' {config.result_file} 2>/dev/null; then',
+                f'  echo "SEVERE DATA CORRUPTION in {config.key}, skipping the remaining configs"; exit 1',
+                'fi',
+            ]
+        )
+    return '\n'.join(lines)
+
+
+def split_rccl_sweep_frames(output):
+    """
+    Split the output of a sweep script into per-config frames.
+
+    Returns:
+      dict: key -> {'log': run output, 'rc': exit code (None when the run did not finish),
+            'result': rccl-tests JSON text}, in run order.
+    """
+    frames = {}
+    frame = None
+    section = None
+    for line in output.splitlines():
+        if line.startswith(RCCL_SWEEP_MARKER):
+            fields = line.split()
+            if len(fields) >= 3 and fields[1] == 'begin':
+                frame = frames.setdefault(fields[2], {'log': [], 'rc': None, 'result': []})
+                section = 'log'
+            elif len(fields) >= 4 and fields[1] == 'result' and frame is not None:
+                frame['rc'] = int(fields[3]) if fields[3].lstrip('-').isdigit() else None
+                section = 'result'
+            elif fields[1:2] == ['end']:
+                frame = section = None
+            continue
+        if frame is not None:
+            frame[section].append(line)
+    return {
+        key: {'log': '\n'.join(frame['log']), 'rc': frame['rc'], 'result': ''.join(frame['result']).strip()}
+        for key, frame in frames.items()
+    }
+
+
+def rccl_cluster_sweep_test(
+    phdl,
+    shdl,
+    test_name,
+    cluster_node_list,
+    vpc_node_list,
+    user_name,
+    ib_hca_list,
+    net_dev_list,
+    oob_port,
+    no_of_global_ranks,
+    rocm_path_var,
+    mpi_dir,
+    mpi_path_var,
+    rccl_dir,
+    rccl_path_var,
+    rccl_tests_dir,
+    sweep_configs,
+    nccl_socket_ifname="",
+    gid_index=1,
+    start_msg_size=1024,
+    end_msg_size='16g',
+    step_function=2,
+    threads_per_gpu=1,
+    warmup_iterations=10,
+    no_of_iterations=20,
+    no_of_cycles=1,
+    check_iteration_count=1,
+    debug_level='INFO',
+    ucx_tls='tcp',
+    nccl_net_plugin=None,
+    mpi_pml="auto",
+    verify_bus_bw=False,
+    verify_bw_dip=True,
+    verify_lat_dip=True,
+    nic_model='ainic',
+    exp_results_dict=None,
+    env_source_script=None,
+    timeout_per_config=500,
+):
+    """
+    Run a batch of RCCL configs (data types x channel configs) of one collective with a
+    single launch session and verify each of them.
+
+    rccl_cluster_test_default pays for the hostfile and PML setup, one ssh round trip for
+    mpirun and one for reading the result file per data type; a heatmap sweep also wraps
+    every config in its own dmesg/snapshot bracket. Here the setup is done once and all
+    mpirun launches are pipelined back-to-back in one script on the head node (see
+    build_rccl_sweep_script), with the result JSON of each run streamed back in the same
+    output as soon as the run finishes.
+
+    Arguments:
+      Same as rccl_cluster_test_default, except:
+      sweep_configs: list[RcclSweepConfig] to run, see build_rccl_sweep_configs.
+      timeout_per_config: Seconds allowed per config, the whole sweep gets
+        timeout_per_config * len(sweep_configs).
+
+    Unlike rccl_cluster_test_default, which raises on data corruption ('#wrong' > 0), the
+    sweep fails the corrupted config and every config after it as skipped (the head node
+    script stops launching them), and still returns the results of the configs before it.
+
+    Returns:
+      dict: config key -> list of raw rccl-tests results (empty list for failed or skipped configs).
+    """
+
+    print(f'Starting RCCL Sweep ..........................................{test_name}')
+    log.info(f'Running {len(sweep_configs)} configs of {test_name} in one sweep: {[c.key for c in sweep_configs]}')
+
+    MPI_PATH = f'{mpi_path_var}'
+    PATH = f'{MPI_PATH}/bin:{rocm_path_var}/bin:$PATH'
+    LD_LIBRARY_PATH = f'{rccl_path_var}:{MPI_PATH}/lib:{rocm_path_var}/lib:$LD_LIBRARY_PATH'
+    head_node = cluster_node_list[0]
+
+    host_file_params = ''
+    proc_per_node = int(int(no_of_global_ranks) / len(cluster_node_list))
+    for node in vpc_node_list:
+        host_file_params = f'{host_file_params}' + f'{node} slots={proc_per_node}\n'
+    shdl.exec(f'sudo rm -f /tmp/rccl_hosts_file.txt; echo "{host_file_params}" > /tmp/rccl_hosts_file.txt')
+
+    pml_param, ucx_params = determine_mpi_pml_config(mpi_pml, shdl, MPI_PATH, head_node, net_dev_list, ucx_tls)
+    launch_params = {
+        'mpi_install_dir': mpi_dir,
+        'rccl_tests_install_dir': rccl_tests_dir,
+        'path': PATH,
+        'ld_library_path': LD_LIBRARY_PATH,
+        'no_of_global_ranks': no_of_global_ranks,
+        'debug_level': debug_level,
+        'gid_index': gid_index,
+        'ucx_params': ucx_params,
+        'pml_param': pml_param,
+        'ib_hca_list': ib_hca_list,
+        'nccl_socket_ifname': nccl_socket_ifname,
+        'oob_port': oob_port,
+        'nccl_net_plugin': nccl_net_plugin,
+        'start_msg_size': start_msg_size,
+        'end_msg_size': end_msg_size,
+        'step_function': step_function,
+        'threads_per_gpu': threads_per_gpu,
+        'check_iteration_count': check_iteration_count,
+        'warmup_iterations': warmup_iterations,
+        'no_of_iterations': no_of_iterations,
+        'no_of_cycles': no_of_cycles,
+    }
+    script = build_rccl_sweep_script(test_name, sweep_configs, launch_params, env_source_script=env_source_script)
+
+    def _progress(host, line):
+        if line.startswith(f'{RCCL_SWEEP_MARKER} result'):
+            fields = line.split()
+            log.info(f'RCCL sweep config {fields[2]} finished with exit code {fields[-1]}')
+
+    output = ''
+    try:
+        out_dict = shdl.exec(script, timeout=timeout_per_config * len(sweep_configs), callback=_progress)
+        output = out_dict[head_node]
+    except Exception as e:
+        log.error(f'Hit Exceptions with rccl sweep of {test_name} - exception {repr(e)}')
+        fail_test(f'Hit Exceptions with rccl sweep of {test_name} - exception {repr(e)}')
+    frames = split_rccl_sweep_frames(output)
+
+    # Collect basic GPU information via rocm-smi
+    smi_out_dict = shdl.exec('rocm-smi -a | head -30')
+    get_model_from_rocm_smi_output(smi_out_dict[head_node])
+    nic_type = get_nic_type(nic_model)
+
+    sweep_results = {}
+    corrupted_key = None
+    for config in sweep_configs:
+        sweep_results[config.key] = []
+        if corrupted_key is not None:
+            fail_test(f'RCCL sweep config {config.key} skipped after data corruption in {corrupted_key}')
+            continue
+        frame = frames.get(config.key)
+        if frame is None or frame['rc'] is None:
+            fail_test(f'RCCL sweep config {config.key} did not run to completion')
+            continue
+        scan_rccl_logs(frame['log'])
+        try:
+            raw_results = json.loads(frame['result'].replace('\r', ''))
+        except json.JSONDecodeError as e:
+            fail_test(f'RCCL sweep config {config.key} produced no valid JSON results in {config.result_file}: {e}')
+            continue
+
+        # Validate the results against the schema, skip verification of this config if not valid
+        try:
+            validated = [RcclTestsMultinodeRaw.model_validate(test_result) for test_result in raw_results]
+            log.info(f'Validation passed: {len(validated)} RcclTests schema validation passed for {config.key}')
+        except ValidationError as e:
+            if _is_severe_wrong_corruption_error(e):
+                fail_test(
+                    f'SEVERE DATA CORRUPTION: RCCL results of {config.key} have #wrong > 0 ({config.result_file}), '
+                    'skipping the remaining configs of the sweep'
+                )
+                corrupted_key = config.key
+            else:
+                fail_test(f'RCCL Test {config.key} schema validation failed: {e}')
+            continue
+        sweep_results[config.key] = raw_results
+
+        with open(config.result_file, 'w') as f:
+            json.dump(raw_results, f, indent=2)
+        aggregated_rccl_tests = None
+        try:
+            aggregated_rccl_tests = aggregate_rccl_test_results(validated)
+            base_path = Path(config.result_file)
+            with open(f'{base_path.parent}/{base_path.stem}_aggregated.json', 'w') as f:
+                json.dump([result.model_dump() for result in aggregated_rccl_tests], f, indent=2)
+        except (ValidationError, ValueError) as e:
+            log.error(f'Aggregation failed: {e}')
+            fail_test(f'RCCL Test {config.key} aggregation failed: {e}')
+
+        result_key = f'{test_name}-{config.data_type}-{no_of_global_ranks}'
+        test_exp_dict = _lookup_expected_results(exp_results_dict, nic_type, result_key)
+        if re.search('True', verify_bus_bw, re.I) and not test_exp_dict:
+            log.warning(f'verify_bus_bw enabled but no expected results found for {result_key}')
+        verify_rccl_results(
+            test_name,
+            _results_for_verification(aggregated_rccl_tests, raw_results),
+            test_exp_dict,
+            verify_bus_bw,
+            verify_bw_dip,
+            verify_lat_dip,
+        )
+
+    return sweep_results
 
 
 # Single node RCCL
@@ -1098,20 +1495,8 @@ def rccl_single_node_test(
     # If requested, verify measured bus bandwidths against provided expected Bandwidth
     test_exp_dict = exp_results_dict.get(test_name) if exp_results_dict else None
 
-    if re.search('True', verify_bus_bw, re.I):
-        for node in result_dict_out.keys():
-            result_out = json.loads(result_dict_out[node].replace('\n', '').replace('\r', ''))
-            if test_exp_dict:
-                check_bus_bw(test_name, result_out, test_exp_dict)
-
-    if re.search('True', verify_bw_dip, re.I):
-        for node in result_dict_out.keys():
-            result_out = json.loads(result_dict_out[node].replace('\n', '').replace('\r', ''))
-            check_bw_dip(test_name, result_out, test_exp_dict)
-
-    if re.search('True', verify_lat_dip, re.I):
-        for node in result_dict_out.keys():
-            result_out = json.loads(result_dict_out[node].replace('\n', '').replace('\r', ''))
-            check_lat_dip(test_name, result_out, test_exp_dict)
+    for node in result_dict_out.keys():
+        node_result = json.loads(result_dict_out[node].replace('\n', '').replace('\r', ''))
+        verify_rccl_results(test_name, node_result, test_exp_dict, verify_bus_bw, verify_bw_dip, verify_lat_dip)
 
     return result_out
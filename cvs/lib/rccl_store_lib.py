@@ -0,0 +1,332 @@
+'''
+Copyright 2025 Advanced Micro Devices, Inc.
+All rights reserved. This notice is intended as a precaution against inadvertent publication and does not imply publication or any waiver of confidentiality.
+The year included in the foregoing notice is the year of creation of the work.
+All code contained here is Property of Advanced Micro Devices, Inc.
+'''
+
+import os
+import re
+import time
+import uuid
+
+import pandas as pd
+
+from cvs.lib import globals
+
+# pyarrow provides the Parquet reader/writer and predicate pushdown for the store
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = ds = pq = None  # type: ignore
+
+log = globals.log
+
+DEFAULT_STORE_DIR = '/tmp/cvs/rccl_store'
+
+# Column name -> arrow type name. Measurement columns keep the rccl-tests JSON names
+# (name, type, inPlace, size, busBw, ..) so rows can be handed to convert_to_graph_dict.
+STORE_COLUMNS = {
+    'run_id': 'string',
+    'run_time': 'float64',
+    'rocm_version': 'string',
+    'series': 'string',
+    'name': 'string',
+    'type': 'string',
+    'redop': 'string',
+    'inPlace': 'int8',
+    'size': 'int64',
+    'nodes': 'int32',
+    'ranks': 'int32',
+    'numCycle': 'int32',
+    'time': 'float64',
+    'algBw': 'float64',
+    'busBw': 'float64',
+}
+
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024**2, 'G': 1024**3, 'T': 1024**4}
+
+COLLECTIVE_NAMES = {
+    'allreduce': 'AllReduce',
+    'allgather': 'AllGather',
+    'scatter': 'Scatter',
+    'gather': 'Gather',
+    'reducescatter': 'ReduceScatter',
+    'sendrecv': 'SendRecv',
+    'alltoall': 'AllToAll',
+    'alltoallv': 'AllToAllV',
+    'broadcast': 'Broadcast',
+}
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError('pyarrow is required for the RCCL results store, install it with: pip install pyarrow')
+
+
+def parse_size(size):
+    """
+    Convert a message size like 1048576, '1M', '1GB' or '16g' to bytes.
+    """
+    if isinstance(size, int):
+        return size
+    match = re.fullmatch(r'\s*(\d+)\s*([KMGT]?)I?B?\s*', str(size), re.I)
+    if not match:
+        raise ValueError(f'Invalid message size {size!r}')
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).upper()]
+
+
+def normalize_collective(name):
+    """
+    Map collective spellings ('all_reduce', 'all_reduce_perf', 'allreduce') to the
+    names rccl-tests writes in its JSON output ('AllReduce').
+    """
+    key = re.sub(r'_perf$', '', name.strip(), flags=re.I).lower().replace('_', '').replace('-', '')
+    return COLLECTIVE_NAMES.get(key, name)
+
+
+def _schema():
+    return pa.schema([(column, getattr(pa, type_name)()) for column, type_name in STORE_COLUMNS.items()])
+
+
+class RcclResultStore:
+    """
+    Append-only columnar store of RCCL measurements.
+
+    Every append writes one immutable Parquet file under store_dir, holding one row per
+    rccl-tests measurement (collective, dtype, size, in-place flag, ...) tagged with the
+    run id, run time, ROCm version and result series (e.g. 'all_reduce_perf-float-16-ch64').
+    Queries go through a pyarrow dataset over all files, so filters on the key columns are
+    pushed down and only the requested columns are read - no JSON is re-parsed.
+
+    Parameters:
+      store_dir (str): Directory holding the Parquet files (created on first append).
+
+    Example:
+      store = RcclResultStore('/shared/rccl_store')
+      store.append_series(rccl_res_dict, run_id='2026-10-17-10-00-00', rocm_version='7.0.2')
+      store.trend('all_reduce', '1G', last_runs=10)
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        _require_pyarrow()
+        self.store_dir = store_dir
+
+    # ------------------------------------------------------------------ writes
+
+    def append(self, results, run_id=None, rocm_version=None, series=None, run_time=None):
+        """
+        Append one batch of rccl-tests results.
+
+        Parameters:
+          results (list): rccl-tests JSON entries (dicts) or RcclTests models.
+          run_id (str): Run identifier, generated when not given.
+          rocm_version (str): ROCm version the run used.
+          series (str): Result series name, defaults to '<name>-<type>'.
+          run_time (float): Epoch seconds of the run, defaults to now.
+
+        Returns:
+          str: Path of the written Parquet file, None when results is empty.
+        """
+        run_id = run_id or time.strftime('%Y-%m-%d-%H-%M-%S')
+        run_time = time.time() if run_time is None else run_time
+        rows = {column: [] for column in STORE_COLUMNS}
+        for result in results:
+            entry = result.model_dump() if hasattr(result, 'model_dump') else result
+            rows['run_id'].append(run_id)
+            rows['run_time'].append(run_time)
+            rows['rocm_version'].append(rocm_version)
+            rows['series'].append(series or f"{entry['name']}-{entry['type']}")
+            rows['name'].append(normalize_collective(str(entry['name'])))
+            rows['type'].append(entry['type'])
+            rows['redop'].append(entry.get('redop'))
+            rows['inPlace'].append(int(entry['inPlace']))
+            rows['size'].append(int(entry['size']))
+            rows['nodes'].append(entry.get('nodes'))
+            rows['ranks'].append(entry.get('ranks'))
+            rows['numCycle'].append(entry.get('numCycle'))
+            for column in ('time', 'algBw', 'busBw'):
+                rows[column].append(float(entry[column]))
+        if not rows['run_id']:
+            return None
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = os.path.join(self.store_dir, f'{int(run_time * 1000)}-{uuid.uuid4().hex[:8]}.parquet')
+        tmp_path = path + '.tmp'
+        pq.write_table(pa.table(rows, schema=_schema()), tmp_path)
+        os.replace(tmp_path, path)
+        log.info(f'Appended {len(rows["run_id"])} RCCL results for run {run_id} to {path}')
+        return path
+
+    def append_series(self, series_dict, run_id=None, rocm_version=None, run_time=None):
+        """
+        Append a {series name: [rccl-tests JSON entries]} dict, e.g. the rccl_res_dict
+        collected by the RCCL test suites, as one run.
+
+        Returns:
+          list[str]: Paths of the written Parquet files.
+        """
+        run_id = run_id or time.strftime('%Y-%m-%d-%H-%M-%S')
+        run_time = time.time() if run_time is None else run_time
+        paths = []
+        for series, results in series_dict.items():
+            path = self.append(results, run_id=run_id, rocm_version=rocm_version, series=series, run_time=run_time)
+            if path:
+                paths.append(path)
+        return paths
+
+    # ------------------------------------------------------------------- reads
+
+    def _dataset(self):
+        if not os.path.isdir(self.store_dir):
+            return None
+        files = sorted(os.path.join(self.store_dir, f) for f in os.listdir(self.store_dir) if f.endswith('.parquet'))
+        if not files:
+            return None
+        return ds.dataset(files, schema=_schema(), format='parquet')
+
+    def runs(self, last=None):
+        """
+        List the runs in the store, oldest first.
+
+        Returns:
+          pandas.DataFrame: run_id, run_time, rocm_version, rows (measurement count).
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=['run_id', 'run_time', 'rocm_version', 'rows'])
+        df = dataset.to_table(columns=['run_id', 'run_time', 'rocm_version']).to_pandas()
+        runs = (
+            df.groupby('run_id', as_index=False, dropna=False)
+            .agg(run_time=('run_time', 'min'), rocm_version=('rocm_version', 'first'), rows=('run_time', 'size'))
+            .sort_values('run_time', kind='stable')
+            .reset_index(drop=True)
+        )
+        return runs.tail(last).reset_index(drop=True) if last else runs
+
+    def query(
+        self,
+        collective=None,
+        dtype=None,
+        size=None,
+        in_place=None,
+        nodes=None,
+        rocm_version=None,
+        series=None,
+        run_ids=None,
+        last_runs=None,
+        columns=None,
+    ):
+        """
+        Return the measurements matching every given filter.
+
+        Parameters:
+          collective (str): e.g. 'all_reduce' or 'AllReduce'.
+          dtype (str): e.g. 'float', 'bfloat16'.
+          size: Message size in bytes or as '1G' / '256M'.
+          in_place (int): 0 or 1.
+          nodes (int): Node count.
+          rocm_version (str): ROCm version.
+          series (str): Series name.
+          run_ids (list[str]): Only these runs.
+          last_runs (int): Only the last N runs (by run time) of the store.
+          columns (list[str]): Columns to read, all by default.
+
+        Returns:
+          pandas.DataFrame sorted by run_time and size.
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=columns or list(STORE_COLUMNS))
+
+        if last_runs:
+            last_ids = self.runs(last=last_runs)['run_id'].tolist()
+            run_ids = [run_id for run_id in run_ids if run_id in last_ids] if run_ids else last_ids
+
+        filters = []
+        if collective is not None:
+            filters.append(ds.field('name') == normalize_collective(collective))
+        if dtype is not None:
+            filters.append(ds.field('type') == dtype)
+        if size is not None:
+            filters.append(ds.field('size') == parse_size(size))
+        if in_place is not None:
+            filters.append(ds.field('inPlace') == int(in_place))
+        if nodes is not None:
+            filters.append(ds.field('nodes') == int(nodes))
+        if rocm_version is not None:
+            filters.append(ds.field('rocm_version') == rocm_version)
+        if series is not None:
+            filters.append(ds.field('series') == series)
+        if run_ids is not None:
+            filters.append(ds.field('run_id').isin(list(run_ids)))
+
+        expression = None
+        for condition in filters:
+            expression = condition if expression is None else expression & condition
+
+        read_columns = list(columns) if columns else list(STORE_COLUMNS)
+        for column in ('run_time', 'size'):
+            if column not in read_columns:
+                read_columns.append(column)
+        df = dataset.to_table(columns=read_columns, filter=expression).to_pandas()
+        df = df.sort_values(['run_time', 'size'], kind='stable').reset_index(drop=True)
+        return df[list(columns)] if columns else df
+
+    def trend(self, collective, size, dtype=None, in_place=0, metric='busBw', last_runs=10, **filters):
+        """
+        Per-run trend of one metric, e.g. busBw of all_reduce 1GB over the last 10 runs.
+
+        Several measurements of a run (cycles, series) are averaged.
+
+        Returns:
+          pandas.DataFrame: run_id, run_time, rocm_version, <metric>, samples - one row per run.
+        """
+        df = self.query(
+            collective=collective,
+            dtype=dtype,
+            size=size,
+            in_place=in_place,
+            last_runs=last_runs,
+            columns=['run_id', 'run_time', 'rocm_version', metric],
+            **filters,
+        )
+        if df.empty:
+            return pd.DataFrame(columns=['run_id', 'run_time', 'rocm_version', metric, 'samples'])
+        return (
+            df.groupby('run_id', as_index=False, dropna=False)
+            .agg(
+                run_time=('run_time', 'min'),
+                rocm_version=('rocm_version', 'first'),
+                **{metric: (metric, 'mean')},
+                samples=(metric, 'size'),
+            )
+            .sort_values('run_time', kind='stable')
+            .reset_index(drop=True)
+        )
+
+    def to_graph_dict(self, run_id=None, **filters):
+        """
+        Build the {series: {size: {'bus_bw', 'alg_bw', 'time'}}} dict that the heatmap and
+        graph builders take (same layout as convert_to_graph_dict), for run_id or the
+        latest run.
+        """
+        if run_id is None:
+            runs = self.runs(last=1)
+            if runs.empty:
+                return {}
+            run_id = runs['run_id'].iloc[0]
+        df = self.query(run_ids=[run_id], columns=['series', 'size', 'busBw', 'algBw', 'time'], **filters)
+        graph_dict = {}
+        for row in df.itertuples(index=False):
+            graph_dict.setdefault(row.series, {})[int(row.size)] = {
+                'bus_bw': row.busBw,
+                'alg_bw': row.algBw,
+                'time': row.time,
+            }
+        return graph_dict
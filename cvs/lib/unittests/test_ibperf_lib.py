@@ -49,5 +49,176 @@ class TestIbperfLib(unittest.TestCase):
         self.assertTrue(mock_workbook.close.called)
 
 
+BW_LOG = """ 4096 bytes of GPU buffer allocated.
+ #bytes     #iterations    BW peak[Gb/sec]    BW average[Gb/sec]   MsgRate[Mpps]
+ 8192       1000000          0.00               180.50               2.754000
+ 65536      1000000          0.00               390.00               0.744000
+ 65536      1000000          0.00               392.00               0.748000
+"""
+
+LAT_LOG = """ 4096 bytes of GPU buffer allocated.
+ #bytes #iterations    t_min[usec]    t_max[usec]  t_typical[usec]    t_avg[usec]    t_stdev[usec]   99% percentile[usec]   99.9% percentile[usec]
+ 2       1000          2.10           8.50         2.30               2.35           0.10            2.90                   8.40
+"""
+
+
+class TestIbPerfParsing(unittest.TestCase):
+    def test_parse_ib_bw_output_all_sizes(self):
+        rows = ibperf_lib.parse_ib_bw_output(BW_LOG)
+        self.assertEqual(rows[8192], [{'bw': '180.50', 'pps': '2.754000'}])
+        self.assertEqual([r['bw'] for r in rows[65536]], ['390.00', '392.00'])
+
+    def test_parse_ib_lat_output(self):
+        rows = ibperf_lib.parse_ib_lat_output(LAT_LOG)
+        self.assertEqual(rows[2][0]['t_avg'], '2.35')
+        self.assertEqual(rows[2][0]['t_99_9_pct'], '8.40')
+
+    def test_summarize_ib_samples(self):
+        single = ibperf_lib.summarize_ib_samples([{'bw': '1.5', 'pps': '2'}])
+        self.assertEqual(single, {'bw': '1.5', 'pps': '2'})
+        mean = ibperf_lib.summarize_ib_samples([{'bw': '390.00', 'pps': '1'}, {'bw': '392.00', 'pps': '3'}])
+        self.assertAlmostEqual(float(mean['bw']), 391.0)
+        self.assertEqual(mean['bw_samples'], ['390.00', '392.00'])
+
+
+class TestCollectIbPerfResults(unittest.TestCase):
+    def setUp(self):
+        ibperf_lib.globals.error_list = []
+
+    def framed(self, logs):
+        return ''.join(f'{ibperf_lib.IB_LOG_FRAME_MARKER} /tmp/ib_perf_{i}_logs\n{log}' for i, log in enumerate(logs))
+
+    def test_single_exec_for_all_instances(self):
+        phdl = MagicMock()
+        phdl.exec.return_value = {'node1': self.framed([BW_LOG, BW_LOG]), 'node2': self.framed([BW_LOG, BW_LOG])}
+        res = ibperf_lib.collect_ib_perf_results(phdl, 2, 65536, ibperf_lib.parse_ib_bw_output)
+        phdl.exec.assert_called_once()
+        self.assertEqual(res['node1'][0], {'bw': '390.00', 'pps': '0.744000'})
+        self.assertEqual(set(res['node2'].keys()), {0, 1})
+        self.assertEqual(ibperf_lib.globals.error_list, [])
+
+    def test_samples_are_averaged(self):
+        phdl = MagicMock()
+        phdl.exec.return_value = {'node1': self.framed([BW_LOG])}
+        res = ibperf_lib.collect_ib_perf_results(phdl, 1, 65536, ibperf_lib.parse_ib_bw_output, min_rows=2)
+        self.assertAlmostEqual(float(res['node1'][0]['bw']), 391.0)
+        self.assertIn('-ge 2', phdl.exec.call_args[0][0])
+
+    def test_missing_results_fail(self):
+        phdl = MagicMock()
+        phdl.exec.return_value = {'node1': self.framed([BW_LOG, ' 4096 bytes of GPU buffer allocated.\n'])}
+        res = ibperf_lib.collect_ib_perf_results(phdl, 2, 65536, ibperf_lib.parse_ib_bw_output)
+        self.assertEqual(list(res['node1'].keys()), [0])
+        self.assertEqual(len(ibperf_lib.globals.error_list), 1)
+
+    def test_get_ib_lat_numb_runs_once(self):
+        phdl = MagicMock()
+        phdl.exec.return_value = {'node1': LAT_LOG}
+        res = ibperf_lib.get_ib_lat_numb(phdl, 2, 'cat /tmp/ib_perf_0_logs')
+        phdl.exec.assert_called_once()
+        self.assertEqual(res['node1']['t_min'], '2.10')
+
+
+class TestIbPerfSweep(unittest.TestCase):
+    def setUp(self):
+        ibperf_lib.globals.error_list = []
+        # Two GPUs per NIC on both nodes
+        self.gpu_nic_dict = {
+            node: {f'card{i}': {'rdma_dev': f'rdma{i // 2}'} for i in range(8)} for node in ('node1', 'node2')
+        }
+        self.gpu_numa_dict = {
+            node: {f'card{i}': {'local_cpulist': f'{i * 8}-{i * 8 + 7}'} for i in range(8)}
+            for node in ('node1', 'node2')
+        }
+
+    def test_build_ib_lanes_never_share_a_nic(self):
+        lanes = ibperf_lib.build_ib_lanes(self.gpu_nic_dict, 'node1', 'node2')
+        self.assertEqual(lanes, [[0, 1], [2, 3], [4, 5], [6, 7]])
+
+        one_nic_per_gpu = {
+            node: {f'card{i}': {'rdma_dev': f'rdma{i}'} for i in range(8)} for node in ('node1', 'node2')
+        }
+        self.assertEqual(len(ibperf_lib.build_ib_lanes(one_nic_per_gpu, 'node1', 'node2')), 8)
+
+    def test_build_ib_sweep_points(self):
+        points = ibperf_lib.build_ib_sweep_points(['ib_write_bw', 'ib_write_lat'], [2, 4], ['8', '16'])
+        self.assertEqual(len(points), 6)
+        self.assertIn(('ib_write_bw', 4, '16'), points)
+        self.assertIn(('ib_write_lat', 2, None), points)
+
+    def test_build_ib_sweep_script_pins_and_pairs(self):
+        points = ibperf_lib.build_ib_sweep_points(['ib_write_bw'], [1024], ['8'])
+        script = ibperf_lib.build_ib_sweep_script(
+            'client', 'node2', 'node1', [[0, 1]], points, self.gpu_numa_dict, self.gpu_nic_dict, '/opt/perftest', '3'
+        )
+        self.assertIn('--physcpubind=8-15', script)
+        self.assertIn('-d rdma0 --use_rocm=1', script)
+        self.assertIn('node1 > /tmp/ib_sweep/ib_write_bw_s1024_q8_g1.log', script)
+        self.assertEqual(script.count(') &'), 1)
+        # The client keeps retrying for as long as its server can still be busy (duration + 60s)
+        self.assertIn('end=$((SECONDS + 120))', script)
+
+    def test_build_ib_sweep_script_multi_sample(self):
+        points = ibperf_lib.build_ib_sweep_points(['ib_write_bw'], [1024], ['8'])
+        script = ibperf_lib.build_ib_sweep_script(
+            'server',
+            'node1',
+            None,
+            [[0]],
+            points,
+            self.gpu_numa_dict,
+            self.gpu_nic_dict,
+            '/opt/perftest',
+            '3',
+            duration=30,
+            samples=3,
+        )
+        self.assertIn('-D 10 --run_infinitely', script)
+        self.assertIn('-lt 3 ]', script)
+        self.assertNotIn('SECONDS', script)
+
+    @patch('time.sleep')
+    def test_run_ib_perf_sweep_fills_matrix(self, mock_sleep):
+        log = """ 4096 bytes of GPU buffer allocated.
+ 1024       1000          0.00               100.00               2.000000
+ 1024       1000          0.00               200.00               4.000000
+ 1024       1000          0.00               300.00               6.000000
+"""
+        logs = ''.join(
+            f'{ibperf_lib.IB_LOG_FRAME_MARKER} /tmp/ib_sweep/ib_write_bw_s1024_q8_g{i}.log\n{log}' for i in range(8)
+        )
+        logs += f'{ibperf_lib.IB_LOG_FRAME_MARKER} {ibperf_lib.IB_SWEEP_DONE}\n'
+
+        def fake_exec(cmd, timeout=None, print_console=True):
+            if '.log.done' in cmd:
+                return {'node1': logs, 'node2': logs}
+            return {'node1': '', 'node2': ''}
+
+        phdl = MagicMock()
+        phdl.reachable_hosts = ['node1', 'node2']
+        phdl.exec.side_effect = fake_exec
+        results = []
+        res = ibperf_lib.run_ib_perf_sweep(
+            phdl,
+            ['ib_write_bw'],
+            self.gpu_numa_dict,
+            self.gpu_nic_dict,
+            {'node1': {}, 'node2': {}},
+            '/opt/perftest',
+            [1024],
+            '3',
+            qp_count_list=['8'],
+            on_result=lambda *args: results.append(args),
+            samples=2,
+        )
+        phdl.exec_cmd_list.assert_called_once()
+        result = res['ib_write_bw'][1024]['8']['node2'][7]
+        # Only the first samples rows are averaged
+        self.assertEqual(result['bw_samples'], ['100.00', '200.00'])
+        self.assertAlmostEqual(float(result['bw']), 150.0)
+        self.assertEqual(len(results), 16)
+        self.assertEqual(ibperf_lib.globals.error_list, [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -4,6 +4,11 @@ from unittest.mock import MagicMock
 import cvs.lib.linux_utils as linux_utils
 
 
+def discovery_output(**sections):
+    """Build topology discovery output holding the given sections."""
+    return ''.join(f'{linux_utils.TOPOLOGY_FRAME_MARKER} {name}\n{text}\n' for name, text in sections.items())
+
+
 class TestGetRdmaNicDict(unittest.TestCase):
     def test_get_rdma_nic_dict_with_hyphenated_devices(self):
         """Test that get_rdma_nic_dict properly parses hyphenated device names like tw-eth0."""
@@ -14,13 +19,13 @@ class TestGetRdmaNicDict(unittest.TestCase):
         rdma_link_output = """link rdma0/1 state ACTIVE physical_state LINK_UP netdev tw-eth0 
 link rdma1/1 state ACTIVE physical_state LINK_UP netdev tw-eth1"""
 
-        mock_phdl.exec.return_value = {'node1': rdma_link_output}
+        mock_phdl.exec.return_value = {'node1': discovery_output(rdma_link=rdma_link_output)}
 
         # Call the function
         result = linux_utils.get_rdma_nic_dict(mock_phdl)
 
         # Verify the function was called with correct command
-        mock_phdl.exec.assert_called_once_with('sudo rdma link')
+        mock_phdl.exec.assert_called_once_with(linux_utils.build_topology_discovery_cmd(), print_console=False)
 
         # Verify all RDMA devices are parsed
         self.assertIn('node1', result)
@@ -45,7 +50,7 @@ link rdma1/1 state ACTIVE physical_state LINK_UP netdev tw-eth1"""
         rdma_link_output = """link bnxt_re0/1 state ACTIVE physical_state LINK_UP netdev ens26np0 
 link bnxt_re1/1 state ACTIVE physical_state LINK_UP netdev ens27np1"""
 
-        mock_phdl.exec.return_value = {'node2': rdma_link_output}
+        mock_phdl.exec.return_value = {'node2': discovery_output(rdma_link=rdma_link_output)}
 
         # Call the function
         result = linux_utils.get_rdma_nic_dict(mock_phdl)
@@ -67,7 +72,7 @@ class TestGetActiveRdmaNicDict(unittest.TestCase):
         rdma_link_output = """link rdma0/1 state ACTIVE physical_state LINK_UP netdev tw-eth0 
 link rdma1/1 state DOWN physical_state LINK_DOWN netdev tw-eth1"""
 
-        mock_phdl.exec.return_value = {'node1': rdma_link_output}
+        mock_phdl.exec.return_value = {'node1': discovery_output(rdma_link=rdma_link_output)}
 
         # Call the function
         result = linux_utils.get_active_rdma_nic_dict(mock_phdl)
@@ -93,7 +98,7 @@ link rdma1/1 state DOWN physical_state LINK_DOWN netdev tw-eth1"""
         rdma_link_output = """link bnxt_re0/1 state ACTIVE physical_state LINK_UP netdev ens26np0 
 link bnxt_re1/1 state DOWN physical_state LINK_DOWN netdev ens27np1"""
 
-        mock_phdl.exec.return_value = {'node1': rdma_link_output}
+        mock_phdl.exec.return_value = {'node1': discovery_output(rdma_link=rdma_link_output)}
 
         # Call the function
         result = linux_utils.get_active_rdma_nic_dict(mock_phdl)
@@ -108,5 +113,78 @@ link bnxt_re1/1 state DOWN physical_state LINK_DOWN netdev ens27np1"""
         self.assertNotIn('bnxt_re1', result['node1'])
 
 
+class TestClusterTopology(unittest.TestCase):
+    def setUp(self):
+        self.mock_phdl = MagicMock()
+        self.mock_phdl.reachable_hosts = ['node1']
+        self.mock_phdl.exec.return_value = {
+            'node1': discovery_output(
+                rdma_link='link rdma0/1 state ACTIVE physical_state LINK_UP netdev eth0',
+                rdma_netdevs='rdma0 eth0',
+                gpu_bus='{"card0": {"PCI Bus": "0000:0C:00.0"}}',
+                gpu_numa='0000:0c:00.0 0 0-47,96-143\n0000:00:02.0 0 0-191',
+            )
+        }
+
+    def tearDown(self):
+        linux_utils.invalidate_topology()
+
+    def test_discovery_runs_once_until_invalidated(self):
+        linux_utils.get_rdma_nic_dict(self.mock_phdl)
+        linux_utils.get_active_rdma_nic_dict(self.mock_phdl)
+        self.assertEqual(linux_utils.get_rdma_capable_devices_dict(self.mock_phdl), {'node1': ['eth0']})
+        self.assertEqual(self.mock_phdl.exec.call_count, 1)
+
+        # Callers get copies, the cached view is not affected by modifications
+        linux_utils.get_rdma_nic_dict(self.mock_phdl)['node1'].clear()
+        self.assertIn('rdma0', linux_utils.get_rdma_nic_dict(self.mock_phdl)['node1'])
+
+        linux_utils.invalidate_topology(self.mock_phdl)
+        linux_utils.get_rdma_nic_dict(self.mock_phdl)
+        self.assertEqual(self.mock_phdl.exec.call_count, 2)
+
+        # A change of reachable hosts (e.g. pruned nodes) rediscovers as well
+        self.mock_phdl.reachable_hosts = []
+        linux_utils.get_rdma_nic_dict(self.mock_phdl)
+        self.assertEqual(self.mock_phdl.exec.call_count, 3)
+
+    def test_gpu_numa_dict(self):
+        result = linux_utils.get_gpu_numa_dict(self.mock_phdl)
+        self.assertEqual(result, {'node1': {'card0': {'local_cpulist': '0-47,96-143', 'numa_node': '0'}}})
+
+
+class TestGetNicEthtoolStatsDict(unittest.TestCase):
+    SWEEP_OUTPUT = """__CVS_ETHTOOL__ eth1 mlx5_1 ACTIVE 0x15b3:0x1021 0000:2a:00.0
+NIC statistics:
+     rx_packets: 10
+     tx_errors: 2
+__CVS_ETHTOOL__ eth0 mlx5_0 ACTIVE 0x15b3:0x1021 0000:0a:00.0
+NIC statistics:
+     rx_packets: 5
+__CVS_ETHTOOL__ mgmt0 mlx5_2 ACTIVE 0x15b3:0x101d 0000:8a:00.0
+     rx_packets: 7
+__CVS_ETHTOOL__ eth2 mlx5_3 DOWN 0x15b3:0x1021 0000:3a:00.0
+     rx_packets: 0
+"""
+
+    def test_single_sweep_per_node(self):
+        """All backend NIC counters come from one exec and are parsed per frame."""
+        mock_phdl = MagicMock()
+        mock_phdl.exec.return_value = {'node1': self.SWEEP_OUTPUT, 'node2': 'ABORT: Host Unreachable Error'}
+
+        result = linux_utils.get_nic_ethtool_stats_dict(mock_phdl)
+
+        mock_phdl.exec.assert_called_once()
+        mock_phdl.exec_cmd_list.assert_not_called()
+        # The differently modelled frontend NIC and the DOWN port are not backend interfaces
+        self.assertEqual(list(result['node1'].keys()), ['eth0', 'eth1'])
+        self.assertEqual(result['node1']['eth1'], {'rx_packets': '10', 'tx_errors': '2'})
+        self.assertEqual(result['node2'], {})
+
+    def test_convert_ethtool_out_to_dict(self):
+        out = "NIC statistics:\n     rx_packets: 12345\n     tx_errors: 0\n"
+        self.assertEqual(linux_utils.convert_ethtool_out_to_dict(out), {'rx_packets': '12345', 'tx_errors': '0'})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,53 @@
+# cvs/lib/unittests/test_log_scan_lib.py
+import re
+import unittest
+
+from cvs.lib.log_scan_lib import LogMatch, LogScanner, get_log_scanner
+
+
+class TestLogScanner(unittest.TestCase):
+    def setUp(self):
+        self.patterns = {
+            'nccl': 'NCCL ERROR|Test failure',
+            'fs_err': 'No such file or directory',
+            'gpu': 'GPU reset begin|GPU hang',
+        }
+
+    def test_scan_returns_structured_matches(self):
+        text = "ok\nNCCL ERROR foo\nstill ok\nopen: No such file or directory\n"
+        matches = LogScanner(self.patterns).scan(text, node='node1')
+        self.assertEqual(
+            matches,
+            [
+                LogMatch('node1', 2, ('nccl',), 'NCCL ERROR foo'),
+                LogMatch('node1', 4, ('fs_err',), 'open: No such file or directory'),
+            ],
+        )
+
+    def test_line_matching_several_patterns_reports_all(self):
+        text = "GPU hang then Test failure"
+        matches = LogScanner(self.patterns).scan(text)
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].patterns, ('nccl', 'gpu'))
+
+    def test_flags_and_no_match(self):
+        text = "gpu HANG detected\nclean line"
+        self.assertEqual(LogScanner(self.patterns).scan(text), [])
+        matches = LogScanner(self.patterns, re.I).scan(text)
+        self.assertEqual([(m.line_no, m.patterns) for m in matches], [(1, ('gpu',))])
+
+    def test_match_across_newline_is_not_reported(self):
+        scanner = LogScanner({'split': r'NCCL\s+ERROR'})
+        self.assertEqual(scanner.scan("NCCL\nERROR\n"), [])
+        self.assertEqual(scanner.scan("NCCL\nERROR\nNCCL ERROR")[0].line_no, 3)
+
+    def test_scan_dict_and_cache(self):
+        scanner = get_log_scanner(self.patterns)
+        self.assertIs(scanner, get_log_scanner(dict(self.patterns)))
+        result = scanner.scan_dict({'n1': 'GPU reset begin', 'n2': 'fine'})
+        self.assertEqual(result['n2'], [])
+        self.assertEqual(result['n1'][0].node, 'n1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+# cvs/lib/unittests/test_metrics_snapshot_lib.py
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import cvs.lib.verify_lib as verify_lib
+from cvs.lib.metrics_snapshot_lib import (
+    STAT_CLASS_ERR,
+    STAT_CLASS_NONE,
+    STAT_CLASS_THRESHOLD,
+    STAT_CLASS_WARN,
+    MetricsSnapshot,
+    SnapshotRecorder,
+    classify_stats,
+    read_snapshot_log,
+    snapshot_diff,
+)
+
+
+def _snapshot(rx_err, cnp, fw='1.2.3'):
+    return {
+        'eth_stats': {
+            'node1': {
+                'eth0': {'rx_err': rx_err, 'cnp_sent': str(cnp), 'fw_ver': fw, 'lanes': [1, 2]},
+                'eth1': {},
+            }
+        }
+    }
+
+
+class TestMetricsSnapshot(unittest.TestCase):
+    def test_from_dict_keeps_only_counters(self):
+        snap = MetricsSnapshot.from_dict(_snapshot(3, 10))
+        self.assertEqual(len(snap), 2)
+        self.assertEqual(list(snap.stat), ['rx_err', 'cnp_sent'])
+        self.assertEqual(snap.value.tolist(), [3, 10])
+        self.assertEqual(snap.raw[1], '10')
+        self.assertEqual(snap.layout, {'eth_stats': {'node1': ['eth0', 'eth1']}})
+
+    def test_diff_aligns_reordered_and_missing_counters(self):
+        before = MetricsSnapshot.from_dict(_snapshot(3, 10))
+        after_dict = _snapshot(5, 10)
+        after_dict['eth_stats']['node1']['eth0'] = {'cnp_sent': '12'}
+        before_rows, after_rows, delta = snapshot_diff(before, MetricsSnapshot.from_dict(after_dict))
+        self.assertEqual(before_rows.tolist(), [1])
+        self.assertEqual(after_rows.tolist(), [0])
+        self.assertEqual(delta.tolist(), [2])
+
+    def test_classify_stats_priority(self):
+        snap = MetricsSnapshot.from_dict(
+            {'c': {'n': {'d': {'rx_retry_err': 1, 'rx_err': 1, 'cnp_sent': 1, 'rx_bytes': 1}}}}
+        )
+        classes = classify_stats(snap.stat, 'retry', 'err', 'cnp')
+        self.assertEqual(classes.tolist(), [STAT_CLASS_WARN, STAT_CLASS_ERR, STAT_CLASS_THRESHOLD, STAT_CLASS_NONE])
+
+    def test_uint64_counters_do_not_overflow(self):
+        big = 2**64 - 10
+        before = MetricsSnapshot.from_dict({'c': {'n': {'d': {'rx_err': big}}}})
+        after = MetricsSnapshot.from_dict({'c': {'n': {'d': {'rx_err': big + 5}}}})
+        self.assertEqual(snapshot_diff(before, after)[2].tolist(), [5])
+
+
+class TestCompareClusterMetricsSnapshots(unittest.TestCase):
+    @patch('cvs.lib.verify_lib.log')
+    def test_compare_flags_increments(self, mock_log):
+        err_dict, stats_dict = verify_lib.compare_cluster_metrics_snapshots(_snapshot(3, 10), _snapshot(4, 5000))
+        self.assertEqual(len(err_dict['eth_stats']['node1']), 2)
+        self.assertIn('ERROR !!', err_dict['eth_stats']['node1'][0])
+        self.assertIn('threshold warn', err_dict['eth_stats']['node1'][1])
+        self.assertEqual(stats_dict['eth_stats']['node1']['eth0']['rx_err'], {'before': 3, 'after': 4, 'diff': 1})
+        self.assertEqual(stats_dict['eth_stats']['node1']['eth1'], {})
+
+    @patch('cvs.lib.verify_lib.log')
+    def test_compare_accepts_tables(self, mock_log):
+        before = MetricsSnapshot.from_dict(_snapshot(3, 10))
+        after = MetricsSnapshot.from_dict(_snapshot(3, 10))
+        err_dict, _ = verify_lib.compare_cluster_metrics_snapshots(before, after)
+        self.assertEqual(err_dict, {'eth_stats': {'node1': []}})
+
+
+class TestSnapshotRecorder(unittest.TestCase):
+    def test_reports_mid_run_jumps_and_logs_every_snapshot(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            recorder = SnapshotRecorder(log_dir, 'retry', 'err', 'cnp', 1000)
+            self.assertEqual(recorder.record(_snapshot(3, 10), timestamp=100.0), [])
+            # rx_err jumps in the middle interval only, cnp stays below the threshold
+            events = recorder.record(_snapshot(13, 500), timestamp=110.0)
+            self.assertEqual(recorder.record(_snapshot(13, 900), timestamp=120.0), [])
+            recorder.close()
+
+            self.assertEqual(len(events), 1)
+            self.assertEqual((events[0]['level'], events[0]['stat'], events[0]['delta']), ('ERROR', 'rx_err', 10))
+            self.assertEqual(events[0]['iteration'], 1)
+            self.assertAlmostEqual(events[0]['rate'], 1.0)
+            self.assertEqual(recorder.jumped[('eth_stats', 'node1', 'eth0', 'rx_err')]['max_iteration'], 1)
+            self.assertIn('rx_err incremented by 10', recorder.events_by_node()['node1'][0])
+
+            records = list(read_snapshot_log(log_dir))
+            self.assertEqual([r[0] for r in records], [0, 1, 2])
+            self.assertEqual([r[1] for r in records], [100.0, 110.0, 120.0])
+            self.assertEqual(
+                records[0][2], [('eth_stats', 'node1', 'eth0', 'rx_err'), ('eth_stats', 'node1', 'eth0', 'cnp_sent')]
+            )
+            self.assertEqual(records[2][3].tolist(), [13, 900])
+
+    def test_rerun_into_same_dir_keeps_both_runs(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            recorder = SnapshotRecorder(log_dir, 'retry', 'err', 'cnp', 1000)
+            recorder.record(_snapshot(3, 10), timestamp=100.0)
+            recorder.record(_snapshot(4, 20), timestamp=110.0)
+            recorder.close()
+            # A killed run leaves a partial record behind
+            with open(os.path.join(log_dir, 'snapshots.npys'), 'ab') as fp:
+                fp.write(b'\x93NUMPY')
+
+            second = {'eth_stats': {'node9': {'eth5': {'tx_err': 7}}}}
+            recorder = SnapshotRecorder(log_dir, 'retry', 'err', 'cnp', 1000)
+            recorder.record(second, timestamp=200.0)
+            recorder.record(second, timestamp=210.0)
+            recorder.close()
+
+            records = list(read_snapshot_log(log_dir))
+            self.assertEqual([(r[0], r[1]) for r in records], [(0, 100.0), (1, 110.0), (0, 200.0), (1, 210.0)])
+            first_keys = [('eth_stats', 'node1', 'eth0', 'rx_err'), ('eth_stats', 'node1', 'eth0', 'cnp_sent')]
+            self.assertEqual([r[2] for r in records[:2]], [first_keys, first_keys])
+            self.assertEqual(records[1][3].tolist(), [4, 20])
+            self.assertEqual([r[2] for r in records[2:]], [[('eth_stats', 'node9', 'eth5', 'tx_err')]] * 2)
+            self.assertEqual(records[3][3].tolist(), [7])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from cvs.lib.parallel_ssh_lib import Pssh
+from types import SimpleNamespace
+
+from cvs.lib.parallel_ssh_lib import Pssh, SSHConnectionPool, set_client_hosts
 
 
 class TestPsshExec(unittest.TestCase):
@@ -119,8 +121,39 @@ class TestPsshExec(unittest.TestCase):
         self.assertIn("host2", result)
         self.assertIn("success output", result["host1"])
         self.assertEqual(result["host2"], "Connection failed\n\nABORT: Host Unreachable Error")
-        # Client should be recreated once (init + prune)
-        self.assertEqual(mock_pssh_client.call_count, 2)
+        # Pruned hosts are dropped from the client in place, no new client
+        self.assertEqual(mock_pssh_client.call_count, 1)
+        self.assertEqual(self.mock_client.hosts, ["host1"])
+
+    @patch("cvs.lib.parallel_ssh_lib.ParallelSSHClient")
+    @patch.object(Pssh, "check_connectivity")
+    def test_deferred_pruning_keeps_host_list_until_block_exits(self, mock_check_connectivity, mock_pssh_client):
+        self.mock_client = MagicMock()
+        self.mock_client.hosts = ["host1", "host2", "host3"]
+        mock_pssh_client.return_value = self.mock_client
+        self.pssh = Pssh(MagicMock(), ["host1", "host2", "host3"], user="user", password="pass")
+        self.pssh.stop_on_errors = False
+        from pssh.exceptions import ConnectionError
+
+        failed = MagicMock(host="host2", stdout=[], stderr=[], exception=ConnectionError("Connection failed"))
+        ok = MagicMock(host="host1", stdout=["ok"], stderr=[], exception=None)
+        self.mock_client.run_command.return_value = [ok, failed]
+        mock_check_connectivity.return_value = ["host2"]
+
+        with self.pssh.deferred_pruning():
+            result = self.pssh.exec("echo hello")
+            # Host args built by a concurrent check from reachable_hosts still match the client
+            self.assertEqual(self.pssh.reachable_hosts, ["host1", "host2", "host3"])
+            self.assertEqual(self.mock_client.hosts, ["host1", "host2", "host3"])
+            self.assertEqual(self.pssh.unreachable_hosts, ["host2"])
+            self.assertIn("ABORT: Host Unreachable Error", result["host2"])
+            with self.pssh.deferred_pruning():
+                self.pssh.exec("echo again")
+            self.assertEqual(self.mock_client.hosts, ["host1", "host2", "host3"])
+
+        self.assertEqual(self.pssh.reachable_hosts, ["host1", "host3"])
+        self.assertEqual(self.mock_client.hosts, ["host1", "host3"])
+        self.assertEqual(self.pssh.unreachable_hosts, ["host2"])
 
     @patch("cvs.lib.parallel_ssh_lib.ParallelSSHClient")
     @patch.object(Pssh, "check_connectivity")
@@ -205,8 +238,8 @@ class TestPsshExec(unittest.TestCase):
         self.assertIn("success output", result["host1"])
         self.assertEqual(result["host2"], "Connection failed\n\nABORT: Host Unreachable Error")
         self.assertEqual(result["host3"], "Connection failed\n\nABORT: Host Unreachable Error")
-        # Client should be recreated once (init + prune)
-        self.assertEqual(mock_pssh_client.call_count, 2)
+        # Pruned hosts are dropped from the client in place, no new client
+        self.assertEqual(mock_pssh_client.call_count, 1)
 
     @patch.object(Pssh, "check_connectivity")
     @patch("cvs.lib.parallel_ssh_lib.ParallelSSHClient")
@@ -283,8 +316,8 @@ class TestPsshExec(unittest.TestCase):
         self.assertEqual(
             result["host2"], "Command timed out\nABORT: Timeout Error in Host: host2\n\nABORT: Host Unreachable Error"
         )
-        # Client recreated after pruning
-        self.assertEqual(mock_pssh_client.call_count, 2)
+        # Pruned hosts are dropped from the client in place, no new client
+        self.assertEqual(mock_pssh_client.call_count, 1)
 
     @patch.object(Pssh, "prune_unreachable_hosts")
     @patch.object(Pssh, "inform_unreachability")
@@ -516,7 +549,7 @@ class TestPsshExecCmdList(unittest.TestCase):
         self.assertEqual(
             result["host2"], "Command timed out\nABORT: Timeout Error in Host: host2\n\nABORT: Host Unreachable Error"
         )
-        self.assertEqual(mock_pssh_client.call_count, 2)
+        self.assertEqual(mock_pssh_client.call_count, 1)
 
     @patch("cvs.lib.parallel_ssh_lib.ParallelSSHClient")
     @patch.object(Pssh, "check_connectivity")
@@ -555,7 +588,7 @@ class TestPsshExecCmdList(unittest.TestCase):
         self.assertIn("host2", result)
         self.assertIn("success", result["host1"])
         self.assertEqual(result["host2"], "Connection failed\n\nABORT: Host Unreachable Error")
-        self.assertEqual(mock_pssh_client.call_count, 2)
+        self.assertEqual(mock_pssh_client.call_count, 1)
 
     @patch("cvs.lib.parallel_ssh_lib.ParallelSSHClient")
     @patch.object(Pssh, "check_connectivity")
@@ -602,7 +635,7 @@ class TestPsshExecCmdList(unittest.TestCase):
         self.assertIn("success", result["host1"])
         self.assertEqual(result["host2"], "Connection failed\n\nABORT: Host Unreachable Error")
         self.assertEqual(result["host3"], "Connection failed\n\nABORT: Host Unreachable Error")
-        self.assertEqual(mock_pssh_client.call_count, 2)
+        self.assertEqual(mock_pssh_client.call_count, 1)
 
     @patch("cvs.lib.parallel_ssh_lib.ParallelSSHClient")
     @patch.object(Pssh, "check_connectivity")
@@ -718,5 +751,193 @@ class TestPsshExecCmdList(unittest.TestCase):
             self.assertNotIn("host2 output line1", call)
 
 
+class TestPsshExecStream(unittest.TestCase):
+    @patch("cvs.lib.parallel_ssh_lib.ParallelSSHClient")
+    def setUp(self, mock_pssh_client):
+        self.mock_client = MagicMock()
+        mock_pssh_client.return_value = self.mock_client
+        self.host_list = ["host1", "host2"]
+        self.mock_log = MagicMock()
+        self.pssh = Pssh(self.mock_log, self.host_list, user="user", password="pass")
+
+    def _mock_output(self, host, stdout, stderr=None, exception=None):
+        mock_output = MagicMock()
+        mock_output.host = host
+        mock_output.stdout = stdout
+        mock_output.stderr = stderr or []
+        mock_output.exception = exception
+        return mock_output
+
+    def test_exec_stream_yields_all_host_lines(self):
+        # Test: exec_stream yields (host, line) for every line of every host
+        self.mock_client.run_command.return_value = [
+            self._mock_output("host1", ["a1", "a2"], ["e1"]),
+            self._mock_output("host2", ["b1"]),
+        ]
+
+        lines = list(self.pssh.exec_stream("dmesg"))
+
+        self.mock_client.run_command.assert_called_once_with("dmesg", stop_on_errors=True)
+        self.assertEqual(sorted(lines), [("host1", "a1"), ("host1", "a2"), ("host1", "e1"), ("host2", "b1")])
+        # Per-host ordering is preserved
+        self.assertEqual([line for host, line in lines if host == "host1"], ["a1", "a2", "e1"])
+
+    def test_exec_callback_receives_lines(self):
+        # Test: exec invokes callback per line and still returns the dict of strings
+        self.mock_client.run_command.return_value = [
+            self._mock_output("host1", ["a1\tx"]),
+            self._mock_output("host2", ["b1", "b2"]),
+        ]
+        seen = []
+
+        result = self.pssh.exec(
+            "echo hello", print_console=False, callback=lambda host, line: seen.append((host, line))
+        )
+
+        self.assertEqual(sorted(seen), [("host1", "a1\tx"), ("host2", "b1"), ("host2", "b2")])
+        self.assertEqual(result, {"host1": "a1   x\n", "host2": "b1\nb2\n"})
+        self.assertEqual(list(result.keys()), ["host1", "host2"])
+
+    @patch.object(Pssh, "check_connectivity")
+    def test_exec_read_timeout_attributed_to_single_host(self, mock_check_connectivity):
+        # Test: a read Timeout on host2 only marks host2, host1 output is kept intact
+        from pssh.exceptions import Timeout
+
+        self.pssh.stop_on_errors = False
+        mock_check_connectivity.return_value = []
+
+        def slow_stdout():
+            yield "partial"
+            raise Timeout("read timed out")
+
+        self.mock_client.run_command.return_value = [
+            self._mock_output("host1", ["ok"]),
+            self._mock_output("host2", slow_stdout()),
+        ]
+
+        result = self.pssh.exec("echo hello", timeout=5)
+
+        self.assertEqual(result["host1"], "ok\n")
+        self.assertIn("partial", result["host2"])
+        self.assertIn("ABORT: Timeout Error in Host: host2", result["host2"])
+
+    def test_exec_read_timeout_raised_when_stop_on_errors_true(self):
+        # Test: with stop_on_errors=True a read Timeout is re-raised to the caller
+        from pssh.exceptions import Timeout
+
+        def slow_stdout():
+            raise Timeout("read timed out")
+            yield
+
+        self.mock_client.run_command.return_value = [self._mock_output("host1", slow_stdout())]
+
+        with self.assertRaises(Timeout):
+            self.pssh.exec("echo hello", timeout=5)
+
+
+def _live_session():
+    return SimpleNamespace(session=object(), sock=SimpleNamespace(closed=False))
+
+
+class TestSSHConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = SSHConnectionPool()
+
+    def test_get_returns_live_session(self):
+        session = _live_session()
+        self.pool.put("host1", "user", session, pkey="id_rsa")
+
+        self.assertIs(self.pool.get("host1", "user", pkey="id_rsa"), session)
+        # Different credentials do not share sessions
+        self.assertIsNone(self.pool.get("host1", "other", pkey="id_rsa"))
+        self.assertIsNone(self.pool.get("host1", "user", pkey="other_key"))
+
+    def test_dead_session_is_dropped(self):
+        session = _live_session()
+        self.pool.put("host1", "user", session, pkey="id_rsa")
+        session.sock.closed = True
+
+        self.assertIsNone(self.pool.get("host1", "user", pkey="id_rsa"))
+
+    def test_seed_and_collect_client(self):
+        # Test: sessions dialed by one client are reused by the next one, only missing hosts are left to dial
+        first = SimpleNamespace(hosts=["host1", "host2"], _host_clients={})
+        first._host_clients[(0, "host1")] = _live_session()
+        first._host_clients[(1, "host2")] = _live_session()
+        self.pool.collect_client(first, "user", pkey="id_rsa")
+
+        second = SimpleNamespace(hosts=["host2", "host3"], _host_clients={})
+        self.pool.seed_client(second, "user", pkey="id_rsa")
+
+        self.assertEqual(list(second._host_clients.keys()), [(0, "host2")])
+        self.assertIs(second._host_clients[(0, "host2")], first._host_clients[(1, "host2")])
+
+    @patch("cvs.lib.parallel_ssh_lib.ssh_connection_pool", new_callable=SSHConnectionPool)
+    @patch("cvs.lib.parallel_ssh_lib.ParallelSSHClient")
+    @patch.object(Pssh, "check_connectivity")
+    def test_failed_hosts_are_evicted(self, mock_check_connectivity, mock_pssh_client, pool):
+        # Test: a host failing with ConnectionError is evicted from the pool so it is redialed next time
+        from pssh.exceptions import ConnectionError
+
+        mock_pssh_client.return_value = MagicMock()
+        pool.put("host1", "user", _live_session(), pkey="id_rsa")
+        pool.put("host2", "user", _live_session(), pkey="id_rsa")
+        pssh = Pssh(MagicMock(), ["host1", "host2"], user="user", stop_on_errors=False)
+        mock_check_connectivity.return_value = []
+
+        ok = MagicMock(host="host1", stdout=["ok"], stderr=[], exception=None)
+        failed = MagicMock(host="host2", stdout=[], stderr=[], exception=ConnectionError("Connection failed"))
+        pssh.client.run_command.return_value = [ok, failed]
+
+        pssh.exec("echo hello")
+
+        self.assertIsNotNone(pool.get("host1", "user", pkey="id_rsa"))
+        self.assertIsNone(pool.get("host2", "user", pkey="id_rsa"))
+
+
+class TestClientMembership(unittest.TestCase):
+    def setUp(self):
+        self.sessions = {host: _live_session() for host in ["host1", "host2", "host3"]}
+        self.client = SimpleNamespace(hosts=["host1", "host2", "host3"], _host_clients={})
+        for i, host in enumerate(self.client.hosts):
+            self.client._host_clients[(i, host)] = self.sessions[host]
+
+    def test_set_client_hosts_keeps_sessions_of_shifted_hosts(self):
+        removed = set_client_hosts(self.client, ["host1", "host3", "host4"])
+
+        self.assertEqual(removed, [self.sessions["host2"]])
+        self.assertEqual(self.client.hosts, ["host1", "host3", "host4"])
+        self.assertEqual(list(self.client._host_clients.keys()), [(0, "host1"), (1, "host3")])
+        self.assertIs(self.client._host_clients[(1, "host3")], self.sessions["host3"])
+
+    @patch("cvs.lib.parallel_ssh_lib.ssh_connection_pool", new_callable=SSHConnectionPool)
+    @patch("cvs.lib.parallel_ssh_lib.ParallelSSHClient")
+    def test_remove_and_add_hosts_in_place(self, mock_pssh_client, pool):
+        mock_pssh_client.return_value = self.client
+        pssh = Pssh(MagicMock(), ["host1", "host2", "host3"], user="user")
+        self.sessions["host2"]._disconnect = MagicMock()
+        self.sessions["host3"]._disconnect = MagicMock()
+        pool.put("host3", "user", self.sessions["host3"], pkey="id_rsa")
+
+        pssh.remove_hosts(["host2", "host3"])
+        # The removed session is torn down, a pooled one is left to the other handles sharing it
+        self.sessions["host2"]._disconnect.assert_called_once()
+        self.sessions["host3"]._disconnect.assert_not_called()
+        self.assertEqual(pssh.reachable_hosts, ["host1"])
+        pssh.add_hosts(["host3"])
+        self.assertEqual(pssh.reachable_hosts, ["host1", "host3"])
+
+        pssh.unreachable_hosts = ["host2"]
+        returned = _live_session()
+        pool.put("host2", "user", returned, pkey="id_rsa")
+        pssh.add_hosts(["host2"])
+
+        self.assertEqual(pssh.reachable_hosts, ["host1", "host3", "host2"])
+        self.assertEqual(pssh.unreachable_hosts, [])
+        self.assertIs(self.client._host_clients[(1, "host3")], self.sessions["host3"])
+        self.assertIs(self.client._host_clients[(2, "host2")], returned)
+        self.assertEqual(mock_pssh_client.call_count, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
 # cvs/lib/unittests/test_rccl_lib.py
 import unittest
-from unittest.mock import patch
+import json
+from unittest.mock import MagicMock, patch
 import cvs.lib.rccl_lib as rccl_lib
 
 
@@ -34,5 +35,201 @@ class TestRcclLib(unittest.TestCase):
         self.assertIsInstance(result, dict)
 
 
+def rccl_entries(rows):
+    """rows: (size, inPlace, busBw, time) tuples -> rccl-tests JSON entries."""
+    return [
+        {'name': 'AllReduce', 'size': size, 'type': 'float', 'inPlace': in_place, 'busBw': bw, 'algBw': bw, 'time': t}
+        for size, in_place, bw, t in rows
+    ]
+
+
+class TestValidateRcclResults(unittest.TestCase):
+    def setUp(self):
+        self.results = rccl_entries(
+            [
+                (1024, 0, 10.0, 5.0),
+                (1024, 1, 10.0, 5.0),
+                (2048, 0, 1.0, 1.0),
+                (2048, 1, 20.0, 6.0),
+                (4096, 1, 15.0, 4.0),
+                (8192, 1, 40.0, 9.0),
+            ]
+        )
+        self.exp = {
+            '1024': {'bus_bw': '10'},
+            '2048': {'bus_bw': '25'},
+            '4096': {'bus_bw': '14'},
+            '8192': {'bus_bw': '40'},
+        }
+
+    def test_bus_bw_threshold_uses_in_place_results(self):
+        violations = rccl_lib.validate_rccl_results('all_reduce_perf', self.results, self.exp, checks=('bus_bw',))
+        self.assertEqual([(v.check, v.size, v.actual) for v in violations], [('bus_bw', 2048, 20.0)])
+        self.assertAlmostEqual(violations[0].threshold, 23.75)
+
+    def test_alltoall_uses_out_of_place_results(self):
+        violations = rccl_lib.validate_rccl_results('alltoall_perf', self.results, self.exp, checks=('bus_bw',))
+        self.assertEqual([(v.size, v.in_place) for v in violations], [(2048, 0)])
+
+    def test_dips_compare_with_previous_reference_size(self):
+        violations = rccl_lib.validate_rccl_results('all_reduce_perf', self.results, self.exp)
+        dips = [(v.check, v.size, v.reference) for v in violations if v.check != 'bus_bw']
+        self.assertEqual(dips, [('bw_dip', 4096, 20.0), ('lat_dip', 4096, 6.0)])
+
+    def test_only_reference_sizes_are_checked(self):
+        violations = rccl_lib.validate_rccl_results('all_reduce_perf', self.results, {8192: {'bus_bw': 50}})
+        self.assertEqual([(v.check, v.size) for v in violations], [('bus_bw', 8192)])
+
+    def test_messages_report_the_tolerance_used(self):
+        violations = rccl_lib.validate_rccl_results('all_reduce_perf', self.results, self.exp, tolerance=0.9)
+        self.assertIn('threshold with 10% tolerance: 22.50', violations[0].message)
+        self.assertTrue(all('10% tolerance' in v.message for v in violations))
+
+    def test_no_reference_skips_validation(self):
+        self.assertEqual(rccl_lib.validate_rccl_results('all_reduce_perf', self.results, None), [])
+
+    @patch('cvs.lib.rccl_lib.fail_test')
+    def test_check_wrappers_report_every_violation(self, mock_fail_test):
+        violations = rccl_lib.check_bus_bw(
+            'all_reduce_perf', self.results, {'2048': {'bus_bw': 25}, '4096': {'bus_bw': 30}}
+        )
+        self.assertEqual(len(violations), 2)
+        self.assertEqual(mock_fail_test.call_count, 2)
+
+    @patch('cvs.lib.rccl_lib.fail_test')
+    def test_verify_rccl_results_flags(self, mock_fail_test):
+        violations = rccl_lib.verify_rccl_results('all_reduce_perf', self.results, self.exp, 'False', 'True', 'False')
+        self.assertEqual([v.check for v in violations], ['bw_dip'])
+        mock_fail_test.assert_called_once_with(violations[0].message)
+
+
+class TestRcclSweep(unittest.TestCase):
+    launch_params = {
+        'mpi_install_dir': '/opt/ompi',
+        'rccl_tests_install_dir': '/opt/rccl-tests/build',
+        'path': '/opt/ompi/bin:$PATH',
+        'ld_library_path': '/opt/ompi/lib:$LD_LIBRARY_PATH',
+        'no_of_global_ranks': 16,
+        'debug_level': 'INFO',
+        'gid_index': 1,
+        'ucx_params': '',
+        'pml_param': '--mca pml ob1',
+        'ib_hca_list': 'mlx5_0',
+        'nccl_socket_ifname': '',
+        'oob_port': 'eth0',
+        'nccl_net_plugin': None,
+        'start_msg_size': 1024,
+        'end_msg_size': '16g',
+        'step_function': 2,
+        'threads_per_gpu': 1,
+        'check_iteration_count': 1,
+        'warmup_iterations': 10,
+        'no_of_iterations': 20,
+        'no_of_cycles': 1,
+    }
+
+    def test_parse_channel_config(self):
+        self.assertEqual(rccl_lib.parse_channel_config('default'), (None, None))
+        self.assertEqual(rccl_lib.parse_channel_config('4-64'), (4, 64))
+        self.assertEqual(rccl_lib.parse_channel_config(32), (32, 32))
+
+    def test_build_sweep_configs_uses_heatmap_keys(self):
+        configs = rccl_lib.build_rccl_sweep_configs('all_reduce_perf', '16', ['float', 'half'], ['default', '4-64'])
+        self.assertEqual(
+            [c.key for c in configs],
+            [
+                'all_reduce_perf-float-16-chdefault',
+                'all_reduce_perf-half-16-chdefault',
+                'all_reduce_perf-float-16-ch4-64',
+                'all_reduce_perf-half-16-ch4-64',
+            ],
+        )
+        self.assertEqual(configs[2].result_file, '/tmp/rccl_all_reduce_perf_float_16_ch4-64.json')
+        self.assertEqual((configs[2].min_channels, configs[2].max_channels), (4, 64))
+
+    def test_sweep_script_runs_configs_in_order(self):
+        configs = rccl_lib.build_rccl_sweep_configs('all_reduce_perf', 16, ['float', 'half'], ['8'])
+        script = rccl_lib.build_rccl_sweep_script('all_reduce_perf', configs, self.launch_params)
+        self.assertEqual(script.count('/opt/ompi/mpirun --np 16'), 2)
+        self.assertLess(script.index('-d float'), script.index('-d half'))
+        self.assertIn('-x NCCL_MIN_NCHANNELS=8', script)
+        self.assertIn('cat /tmp/rccl_all_reduce_perf_half_16_ch8.json', script)
+
+    def test_sweep_script_stops_after_corruption(self):
+        configs = rccl_lib.build_rccl_sweep_configs('all_reduce_perf', 16, ['float', 'half'], ['8'])
+        script = rccl_lib.build_rccl_sweep_script('all_reduce_perf', configs, self.launch_params)
+        check = script.index('grep -Eq \'"wrong"', script.index('end all_reduce_perf-float-16-ch8'))
+        self.assertLess(check, script.index('begin all_reduce_perf-half-16-ch8'))
+        self.assertIn('exit 1', script[check : script.index('begin all_reduce_perf-half-16-ch8')])
+
+    @patch('cvs.lib.rccl_lib.get_model_from_rocm_smi_output')
+    @patch('cvs.lib.rccl_lib.determine_mpi_pml_config', return_value=('', ''))
+    @patch('cvs.lib.rccl_lib.fail_test')
+    def test_sweep_skips_configs_after_corruption(self, mock_fail_test, _pml, _smi):
+        configs = rccl_lib.build_rccl_sweep_configs('all_reduce_perf', 16, ['float', 'half', 'bfloat16'], ['8'])
+        entry = {
+            'numCycle': 0,
+            'name': 'AllReduce',
+            'size': 1024,
+            'type': 'float',
+            'redop': 'sum',
+            'inPlace': 0,
+            'time': 5.0,
+            'algBw': 10.0,
+            'busBw': 10.0,
+            'wrong': 3,
+            'nodes': 2,
+            'ranks': 16,
+            'ranksPerNode': 8,
+            'gpusPerRank': 1,
+        }
+        key = configs[0].key
+        output = '\n'.join(
+            [
+                f'__CVS_RCCL__ begin {key}',
+                '# Avg bus bandwidth    : 10.0',
+                f'__CVS_RCCL__ result {key} 0',
+                json.dumps([entry]),
+                f'__CVS_RCCL__ end {key}',
+                f'SEVERE DATA CORRUPTION in {key}, skipping the remaining configs',
+            ]
+        )
+        shdl = MagicMock()
+        shdl.exec.side_effect = lambda cmd, **kwargs: {'node1': output if cmd.startswith('echo') else ''}
+
+        args = ['node1', 'node2'], ['node1', 'node2'], 'user', 'mlx5_0', 'eth0', 'eth0', 16, '/opt/rocm'
+        args += '/opt/ompi', '/opt/ompi', '/opt/rccl', '/opt/rccl/lib', '/opt/rccl-tests'
+        results = rccl_lib.rccl_cluster_sweep_test(MagicMock(), shdl, 'all_reduce_perf', *args, configs)
+
+        self.assertEqual(results, {config.key: [] for config in configs})
+        messages = [call.args[0] for call in mock_fail_test.call_args_list]
+        self.assertEqual(len(messages), 3)
+        self.assertIn('SEVERE DATA CORRUPTION', messages[0])
+        self.assertIn(f'{configs[1].key} skipped after data corruption in {key}', messages[1])
+        self.assertIn(f'{configs[2].key} skipped after data corruption in {key}', messages[2])
+
+    def test_split_sweep_frames(self):
+        output = '\n'.join(
+            [
+                '__CVS_RCCL__ begin all_reduce_perf-float-16-chdefault',
+                '# Avg bus bandwidth : 10',
+                '__CVS_RCCL__ result all_reduce_perf-float-16-chdefault 0',
+                '[{"size": 1024,',
+                ' "busBw": 10.0}]',
+                '__CVS_RCCL__ end all_reduce_perf-float-16-chdefault',
+                '__CVS_RCCL__ begin all_reduce_perf-half-16-chdefault',
+                'NCCL ERROR timeout',
+            ]
+        )
+        frames = rccl_lib.split_rccl_sweep_frames(output)
+        first = frames['all_reduce_perf-float-16-chdefault']
+        self.assertEqual(first['rc'], 0)
+        self.assertEqual(first['log'], '# Avg bus bandwidth : 10')
+        self.assertEqual(first['result'], '[{"size": 1024, "busBw": 10.0}]')
+        second = frames['all_reduce_perf-half-16-chdefault']
+        self.assertIsNone(second['rc'])
+        self.assertEqual(second['log'], 'NCCL ERROR timeout')
+
+
 if __name__ == '__main__':
     unittest.main()
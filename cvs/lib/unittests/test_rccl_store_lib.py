@@ -0,0 +1,89 @@
+# cvs/lib/unittests/test_rccl_store_lib.py
+import shutil
+import tempfile
+import unittest
+
+import cvs.lib.rccl_store_lib as rccl_store_lib
+
+
+def rccl_results(bus_bw, sizes=(1024, 1073741824), dtype='float'):
+    return [
+        {
+            'numCycle': 0,
+            'name': 'AllReduce',
+            'size': size,
+            'type': dtype,
+            'redop': 'sum',
+            'inPlace': in_place,
+            'time': 10.0,
+            'algBw': bus_bw / 2,
+            'busBw': bus_bw + in_place,
+            'wrong': 0,
+        }
+        for size in sizes
+        for in_place in (0, 1)
+    ]
+
+
+class TestRcclStoreHelpers(unittest.TestCase):
+    def test_parse_size(self):
+        self.assertEqual(rccl_store_lib.parse_size(1024), 1024)
+        self.assertEqual(rccl_store_lib.parse_size('1G'), 1073741824)
+        self.assertEqual(rccl_store_lib.parse_size('256MB'), 268435456)
+        self.assertEqual(rccl_store_lib.parse_size('16g'), 17179869184)
+        with self.assertRaises(ValueError):
+            rccl_store_lib.parse_size('big')
+
+    def test_normalize_collective(self):
+        self.assertEqual(rccl_store_lib.normalize_collective('all_reduce'), 'AllReduce')
+        self.assertEqual(rccl_store_lib.normalize_collective('all_reduce_perf'), 'AllReduce')
+        self.assertEqual(rccl_store_lib.normalize_collective('AlltoAll'), 'AllToAll')
+
+
+@unittest.skipUnless(rccl_store_lib.PYARROW_AVAILABLE, 'pyarrow not installed')
+class TestRcclResultStore(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        self.store = rccl_store_lib.RcclResultStore(self.store_dir)
+        for i in range(4):
+            self.store.append_series(
+                {'all_reduce_perf-float-16': rccl_results(100.0 + i)},
+                run_id=f'run{i}',
+                rocm_version='7.0.2' if i < 2 else '7.1.0',
+                run_time=1000.0 + i,
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.store_dir)
+
+    def test_append_is_append_only(self):
+        self.assertIsNone(self.store.append([], run_id='empty'))
+        runs = self.store.runs()
+        self.assertEqual(runs['run_id'].tolist(), ['run0', 'run1', 'run2', 'run3'])
+        self.assertEqual(runs['rows'].tolist(), [4, 4, 4, 4])
+
+    def test_trend_last_runs(self):
+        trend = self.store.trend('all_reduce', '1G', last_runs=3)
+        self.assertEqual(trend['run_id'].tolist(), ['run1', 'run2', 'run3'])
+        self.assertEqual(trend['busBw'].tolist(), [101.0, 102.0, 103.0])
+
+    def test_query_filters(self):
+        df = self.store.query(size=1024, in_place=1, rocm_version='7.1.0')
+        self.assertEqual(df['run_id'].tolist(), ['run2', 'run3'])
+        self.assertEqual(df['busBw'].tolist(), [103.0, 104.0])
+        self.assertTrue(self.store.query(dtype='bfloat16').empty)
+
+    def test_to_graph_dict_latest_run(self):
+        graph_dict = self.store.to_graph_dict()
+        entry = graph_dict['all_reduce_perf-float-16'][1073741824]
+        self.assertEqual(entry, {'bus_bw': 104.0, 'alg_bw': 51.5, 'time': 10.0})
+
+    def test_empty_store(self):
+        store = rccl_store_lib.RcclResultStore(self.store_dir + '/missing')
+        self.assertTrue(store.runs().empty)
+        self.assertTrue(store.query(collective='all_reduce').empty)
+        self.assertEqual(store.to_graph_dict(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 # cvs/lib/unittests/test_utils_lib.py
+import os
+import tempfile
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 import cvs.lib.utils_lib as utils_lib
 
 
@@ -18,5 +20,65 @@ class TestUtilsLib(unittest.TestCase):
         mock_fail_test.assert_not_called()
 
 
+class TestCollectSystemMetadata(unittest.TestCase):
+    HEAD_OUTPUT = (
+        '__CVS_META__ fingerprint\nboot-1 6.2.0\n__CVS_META__ hostname\nhead01\n'
+        '__CVS_META__ rocm_version\n6.2.0\n__CVS_META__ kernel\n5.15.0\n'
+        '__CVS_META__ gpu_product\nGPU[0]\t\t: Card Series:\t\tAMD Instinct MI300X\n'
+        'GPU[1]\t\t: Card Series:\t\tAMD Instinct MI300X\n'
+        '__CVS_META__ rdma_devices\nmlx5_0\n__CVS_META__ rdma_nic_details\n@@ mlx5_0\nfw_ver:\t28.39.1002\n'
+    )
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.inventory_file = os.path.join(self.tmpdir.name, 'inventory.json')
+        self.cluster_dict = {'node_dict': {'head01': {}, 'node02': {}}}
+        self.phdl = MagicMock()
+        self.phdl.reachable_hosts = ['head01', 'node02']
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_single_round_trip(self):
+        self.phdl.exec_cmd_list.return_value = {
+            'head01': self.HEAD_OUTPUT,
+            'node02': '__CVS_META__ fingerprint\nboot-2 6.2.0\n__CVS_META__ hostname\nnode02\n',
+        }
+        metadata = utils_lib.collect_system_metadata(
+            self.phdl, self.cluster_dict, {}, inventory_file=self.inventory_file
+        )
+        self.phdl.exec.assert_not_called()
+        self.phdl.exec_cmd_list.assert_called_once()
+        head_cmd, node_cmd = self.phdl.exec_cmd_list.call_args[0][0]
+        self.assertIn('rocm_version', head_cmd)
+        self.assertNotIn('rocm_version', node_cmd)
+        self.assertEqual(metadata['hostnames'], {'head01': 'head01', 'node02': 'node02'})
+        self.assertEqual(metadata['rocm_version'], '6.2.0')
+        self.assertEqual(metadata['gpu_model'], 'AMD Instinct MI300X')
+        self.assertEqual(metadata['gpu_count'], 2)
+        self.assertEqual(metadata['rdma_nic_details'], [{'device': 'mlx5_0', 'fw_ver': '28.39.1002'}])
+
+    def test_inventory_revalidated_by_fingerprint(self):
+        self.phdl.exec_cmd_list.return_value = {'head01': self.HEAD_OUTPUT, 'node02': ''}
+        first = utils_lib.collect_system_metadata(self.phdl, self.cluster_dict, {}, inventory_file=self.inventory_file)
+
+        # Fingerprint unchanged: the node skips the full probe and only reports fingerprint/hostname
+        self.phdl.exec_cmd_list.return_value = {
+            'head01': '__CVS_META__ fingerprint\nboot-1 6.2.0\n__CVS_META__ hostname\nhead01\n',
+            'node02': '',
+        }
+        probe_dict, cache_hit = utils_lib.probe_cluster_inventory(
+            self.phdl, self.cluster_dict, {}, inventory_file=self.inventory_file
+        )
+        self.assertTrue(cache_hit)
+        head_cmd = self.phdl.exec_cmd_list.call_args[0][0][0]
+        self.assertIn("if [ \"$fp\" != 'boot-1 6.2.0' ]", head_cmd)
+        self.assertEqual(probe_dict['head01']['rocm_version'], '6.2.0')
+
+        second = utils_lib.collect_system_metadata(self.phdl, self.cluster_dict, {}, inventory_file=self.inventory_file)
+        for key in ('rocm_version', 'kernel', 'gpu_model', 'gpu_count', 'rdma_nic_details'):
+            self.assertEqual(first[key], second[key])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -88,5 +88,71 @@ class TestVerifyHostLspci(unittest.TestCase):
         mock_fail_test.assert_called()
 
 
+class TestDmesgScan(unittest.TestCase):
+    def setUp(self):
+        verify_lib.dmesg_cursor_dict.clear()
+
+    @patch("cvs.lib.verify_lib.fail_test")
+    def test_full_dmesg_scan_uses_cursor_on_next_call(self, mock_fail_test):
+        phdl = MagicMock()
+        phdl.reachable_hosts = ["node1", "node2"]
+        phdl.exec.return_value = {
+            "node1": "[   10.000000] amdgpu: GPU hang\n__CVS_DMESG_CURSOR__ boot1 10.000000",
+            "node2": "[   12.500000] all good\n__CVS_DMESG_CURSOR__ boot2 12.500000",
+        }
+
+        result = verify_lib.full_dmesg_scan(phdl, since_last_scan=True)
+        self.assertEqual(result, {"node1": ["[   10.000000] amdgpu: GPU hang"], "node2": []})
+        mock_fail_test.assert_called_once()
+        self.assertEqual(verify_lib.dmesg_cursor_dict, {"node1": ("boot1", 10.0), "node2": ("boot2", 12.5)})
+
+        phdl.exec_cmd_list.return_value = {
+            "node1": "__CVS_DMESG_CURSOR__ boot1 10.000000",
+            "node2": "__CVS_DMESG_CURSOR__ boot2 20.000000",
+        }
+        result = verify_lib.full_dmesg_scan(phdl, since_last_scan=True)
+        self.assertEqual(result, {"node1": [], "node2": []})
+        cmd_list = phdl.exec_cmd_list.call_args[0][0]
+        self.assertIn("lo=10.0;", cmd_list[0])
+        self.assertIn('[ "$bid" = "boot1" ] || lo=0', cmd_list[0])
+        self.assertIn("lo=12.5;", cmd_list[1])
+        self.assertEqual(verify_lib.dmesg_cursor_dict["node2"], ("boot2", 20.0))
+
+    @patch("cvs.lib.verify_lib.fail_test")
+    def test_full_dmesg_scan_defaults_to_whole_log(self, mock_fail_test):
+        phdl = MagicMock()
+        phdl.reachable_hosts = ["node1"]
+        verify_lib.dmesg_cursor_dict["node1"] = ("boot1", 10.0)
+        phdl.exec.return_value = {"node1": "[   1.000000] all good\n__CVS_DMESG_CURSOR__ boot1 12.000000"}
+
+        verify_lib.full_dmesg_scan(phdl)
+        phdl.exec_cmd_list.assert_not_called()
+        self.assertIn("lo=0;", phdl.exec.call_args[0][0])
+        self.assertEqual(verify_lib.dmesg_cursor_dict, {"node1": ("boot1", 10.0)})
+
+    def test_parse_dmesg_window_output_without_timestamps(self):
+        text_dict, cursor_dict = verify_lib.parse_dmesg_window_output(
+            {"node1": "GPU hang\nlater\n__CVS_DMESG_NO_TIMESTAMPS__\n__CVS_DMESG_CURSOR__ boot1 0.000000"}
+        )
+        self.assertEqual(text_dict, {"node1": "GPU hang\nlater"})
+        self.assertEqual(cursor_dict, {"node1": ("boot1", 0.0)})
+
+    @patch("cvs.lib.verify_lib.fail_test")
+    def test_verify_dmesg_for_errors_exact_window(self, mock_fail_test):
+        phdl = MagicMock()
+        phdl.exec.return_value = {"node1": "[ 5.000000] NIC Link is Down\n__CVS_DMESG_CURSOR__ b 5.000000"}
+
+        result = verify_lib.verify_dmesg_for_errors(
+            phdl, {"node1": "Mon Jan  2 03:04\n"}, {"node1": "Mon Jan  2 03:10\n"}, till_end_flag=False
+        )
+        self.assertEqual(result, {"node1": ["[ 5.000000] NIC Link is Down"]})
+        mock_fail_test.assert_called_once()
+        cmd = phdl.exec.call_args[0][0]
+        self.assertIn("date -d 'Mon Jan  2 03:04' +%s", cmd)
+        self.assertIn("$(date -d 'Mon Jan  2 03:10' +%s) + 59 - boot", cmd)
+        # Window scans do not move the incremental cursor
+        self.assertEqual(verify_lib.dmesg_cursor_dict, {})
+
+
 if __name__ == "__main__":
     unittest.main()
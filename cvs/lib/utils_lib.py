@@ -9,6 +9,8 @@ import re
 import os
 import sys
 import json
+import shlex
+import hashlib
 
 import pytest
 from cvs.lib import globals
@@ -414,16 +416,387 @@ def resolve_test_config_placeholders(config_dict, cluster_dict):
     return resolved_config
 
 
-def collect_system_metadata(phdl, cluster_dict, config_dict, test_command=None, env_vars=None):
+# Marker line printed before every section of the metadata probe output
+METADATA_MARKER = '__CVS_META__'
+
+DEFAULT_INVENTORY_DIR = '/tmp/cvs/inventory'
+
+ROCM_VERSION_CMD = (
+    'cat /opt/rocm/.info/version 2>/dev/null || cat /opt/rocm*/share/doc/rocm/version 2>/dev/null || echo "unknown"'
+)
+
+# Map of test config keys -> RCCL/NCCL environment variable names they are exported as (via mpirun -x)
+METADATA_ENV_VAR_MAPPING = {
+    'debug_level': 'NCCL_DEBUG',
+    'ib_hca_list': 'NCCL_IB_HCA',
+    'net_dev_list': 'UCX_NET_DEVICES',
+    'ucx_tls': 'UCX_TLS',
+    'nccl_net_plugin': 'NCCL_NET_PLUGIN',
+    'gid_index': 'NCCL_IB_GID_INDEX',
+    'oob_port': 'NCCL_SOCKET_IFNAME',
+    'rocm_path_var': 'ROCM_PATH',
+    'mpi_path_var': 'MPI_PATH',
+    'rccl_path_var': 'RCCL_PATH',
+}
+
+
+def _metadata_config_env_vars(config_dict):
+    """RCCL/NCCL environment variables set through the test config."""
+    rccl_env_vars = {}
+    for config_key, env_name in METADATA_ENV_VAR_MAPPING.items():
+        if config_key in config_dict and config_dict[config_key]:
+            value = config_dict[config_key]
+            if value and str(value).lower() not in ['none', 'null', '']:
+                rccl_env_vars[env_name] = str(value)
+    return rccl_env_vars
+
+
+def _metadata_git_dirs(config_dict):
+    """(section prefix, directory) of the git checkouts whose commit/branch is reported."""
+    git_dirs = []
+    for prefix, key in (('rccl', 'rccl_dir'), ('rccl_tests', 'rccl_tests_dir')):
+        if config_dict and key in config_dict and config_dict[key]:
+            git_dirs.append((prefix, config_dict[key]))
+    return git_dirs
+
+
+def _metadata_probe_sections(config_dict, env_vars=None):
+    """
+    Ordered list of (section name, shell command) run by the full metadata probe.
+
+    Every command runs in its own subshell so a `cd` in one section does not leak into
+    the next one.
+    """
+    sections = [
+        ('rocm_version', ROCM_VERSION_CMD),
+        ('os', 'cat /etc/os-release 2>/dev/null | grep -E "^(NAME|VERSION)=" | head -2'),
+        ('kernel', 'uname -r'),
+        ('gpu_product', 'rocm-smi --showproductname 2>/dev/null | grep "GPU"'),
+        ('rdma_devices', 'ibv_devinfo -l 2>/dev/null'),
+        (
+            'rdma_nic_details',
+            'ibv_devinfo -l 2>/dev/null | grep -v "^\\s*$" | head -8 | while read -r dev; do echo "@@ $dev"; '
+            'ibv_devinfo -d "$dev" 2>/dev/null | grep -E "board_id|fw_ver|node_guid|sys_image_guid" | head -4; done',
+        ),
+        (
+            'lspci',
+            'lspci 2>/dev/null | grep -iE "mellanox|infiniband|network.*amd|rdma.*amd|thor" | grep -vE "usb|audio"',
+        ),
+        ('rdma_drivers', 'lsmod 2>/dev/null | grep -E "^mlx|^ib_" | awk \'{print $1}\' | sort | head -10'),
+        ('mlx5_version', 'modinfo mlx5_core 2>/dev/null | grep "^version:" | head -1'),
+        ('bios_version', 'sudo dmidecode -s bios-version 2>/dev/null || echo "unknown"'),
+    ]
+    for prefix, git_dir in _metadata_git_dirs(config_dict):
+        sections.append(
+            (f'{prefix}_commit', f'cd {git_dir} 2>/dev/null && git rev-parse HEAD 2>/dev/null || echo "unknown"')
+        )
+        sections.append(
+            (
+                f'{prefix}_branch',
+                f'cd {git_dir} 2>/dev/null && git rev-parse --abbrev-ref HEAD 2>/dev/null || echo "unknown"',
+            )
+        )
+    if config_dict and 'mpi_dir' in config_dict and config_dict['mpi_dir']:
+        mpi_dir = config_dict['mpi_dir']
+        sections.append(
+            (
+                'mpi_version',
+                f'{mpi_dir}/bin/mpirun --version 2>/dev/null | head -1 || {mpi_dir}/mpirun --version 2>/dev/null | head -1 || mpirun --version 2>/dev/null | head -1 || echo "unknown"',
+            )
+        )
+    config_env_vars = _metadata_config_env_vars(config_dict or {})
+    for var_name in env_vars or []:
+        # Skip if already captured from config
+        if var_name not in config_env_vars:
+            sections.append((f'env:{var_name}', f'echo ${var_name}'))
+    return sections
+
+
+def build_metadata_probe_cmd(config_dict, env_vars=None, full=True, cached_fingerprint=None):
+    """
+    Build the single shell command that collects the metadata of one node.
+
+    Parameters:
+      config_dict (dict): Test configuration (rccl_dir, rccl_tests_dir and mpi_dir add sections).
+      env_vars (list): Optional shell environment variable names to capture.
+      full (bool): False only reports the fingerprint and hostname sections.
+      cached_fingerprint (str): Fingerprint of a cached inventory entry; the full probe is
+                                skipped on the node when its fingerprint still matches.
+
+    Behavior:
+      - Always prints the fingerprint section (boot id, ROCm version and the HEAD of the
+        configured git checkouts, on one line) and the hostname section.
+      - Each section is preceded by a "__CVS_META__ <name>" marker line, see
+        parse_metadata_probe_output.
+
+    Returns:
+      str: Shell command to pass to phdl.exec / phdl.exec_cmd_list.
+    """
+    fingerprint_parts = ['cat /proc/sys/kernel/random/boot_id', ROCM_VERSION_CMD]
+    for _, git_dir in _metadata_git_dirs(config_dict):
+        fingerprint_parts.append(f'git -C {git_dir} rev-parse HEAD')
+    lines = [
+        # Unquoted $( ) word splitting joins the lines with single spaces
+        'fp=$(echo $( { ' + '; '.join(f'( {part} )' for part in fingerprint_parts) + '; } 2>/dev/null ))',
+        f'echo "{METADATA_MARKER} fingerprint"; echo "$fp"',
+        f'echo "{METADATA_MARKER} hostname"; hostname',
+    ]
+    if full:
+        probe = [
+            f'echo "{METADATA_MARKER} {name}"; ( {cmd} )'
+            for name, cmd in _metadata_probe_sections(config_dict, env_vars)
+        ]
+        if cached_fingerprint is not None:
+            lines.append(f'if [ "$fp" != {shlex.quote(cached_fingerprint)} ]; then')
+            lines.extend(probe)
+            lines.append('fi')
+        else:
+            lines.extend(probe)
+    return '\n'.join(lines)
+
+
+def parse_metadata_probe_output(out_dict):
+    """
+    Split metadata probe output into sections.
+
+    Parameters:
+      out_dict (dict): node -> probe output as returned by phdl.exec / phdl.exec_cmd_list.
+
+    Returns:
+      dict: node -> {section name: stripped section text}. Nodes whose command failed
+            (no marker lines) map to an empty dict.
+    """
+    probe_dict = {}
+    for node, output in out_dict.items():
+        sections = {}
+        name = None
+        for line in output.split('\n'):
+            if line.startswith(METADATA_MARKER + ' '):
+                name = line[len(METADATA_MARKER) + 1 :].strip()
+                sections[name] = []
+            elif name is not None:
+                sections[name].append(line)
+        probe_dict[node] = {name: '\n'.join(text).strip() for name, text in sections.items()}
+    return probe_dict
+
+
+def get_inventory_file(cluster_dict, inventory_dir=DEFAULT_INVENTORY_DIR):
+    """Path of the cached metadata inventory of a cluster (one file per distinct node list)."""
+    node_key = '\n'.join(sorted(cluster_dict['node_dict'].keys()))
+    digest = hashlib.sha1(node_key.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(inventory_dir, f'inventory_{digest}.json')
+
+
+def _load_inventory(inventory_file):
+    try:
+        with open(inventory_file) as f:
+            inventory = json.load(f)
+        return inventory if isinstance(inventory, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_inventory(inventory_file, inventory):
+    try:
+        os.makedirs(os.path.dirname(inventory_file) or '.', exist_ok=True)
+        tmp_file = f'{inventory_file}.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(inventory, f, indent=2)
+        os.replace(tmp_file, inventory_file)
+    except OSError as e:
+        log.warning(f'Failed to write metadata inventory {inventory_file}: {e}')
+
+
+def probe_cluster_inventory(phdl, cluster_dict, config_dict, env_vars=None, inventory_file=None, use_cache=True):
+    """
+    Collect per-node metadata probe sections in a single round trip, reusing a cached inventory.
+
+    Parameters:
+      phdl: Parallel SSH handle over the cluster nodes.
+      cluster_dict (dict): Cluster configuration; the first node of node_dict is the head node.
+      config_dict (dict): Test configuration (see build_metadata_probe_cmd).
+      env_vars (list): Optional shell environment variable names to capture.
+      inventory_file (str): Inventory path, defaults to get_inventory_file(cluster_dict).
+      use_cache (bool): False ignores (but still rewrites) the cached inventory.
+
+    Behavior:
+      - The head node runs the full probe, every other node only reports its fingerprint and
+        hostname (the rest of their answers was never used).
+      - When the inventory holds head node sections collected by the same probe definition,
+        the head node runs the full probe only if its fingerprint (boot id, ROCm version,
+        configured git HEADs) changed, so an unchanged cluster costs one cheap exec.
+      - The refreshed inventory is written back to inventory_file.
+
+    Returns:
+      tuple: (probe_dict, cache_hit) where probe_dict maps node -> {section: text} and
+             cache_hit is True when the head node sections came from the inventory.
+    """
+    node_list = list(cluster_dict['node_dict'].keys())
+    head_node = node_list[0] if node_list else None
+    inventory_file = inventory_file or get_inventory_file(cluster_dict)
+
+    probe_key = hashlib.sha1(json.dumps(_metadata_probe_sections(config_dict, env_vars)).encode('utf-8')).hexdigest()
+    inventory = _load_inventory(inventory_file) if use_cache else {}
+    if inventory.get('probe_key') != probe_key:
+        inventory = {'probe_key': probe_key, 'nodes': {}}
+    cached_nodes = inventory.setdefault('nodes', {})
+
+    cmd_list = []
+    for host in phdl.reachable_hosts:
+        cached = cached_nodes.get(host, {})
+        if host == head_node:
+            cached_fingerprint = cached.get('fingerprint') if 'rocm_version' in cached.get('sections', {}) else None
+            cmd_list.append(build_metadata_probe_cmd(config_dict, env_vars, cached_fingerprint=cached_fingerprint))
+        else:
+            cmd_list.append(build_metadata_probe_cmd(config_dict, env_vars, full=False))
+    out_dict = phdl.exec_cmd_list(cmd_list, print_console=False)
+
+    cache_hit = False
+    probe_dict = {}
+    for node, sections in parse_metadata_probe_output(out_dict).items():
+        if 'fingerprint' not in sections:
+            log.warning(f'Metadata probe failed on {node}: {out_dict[node].strip()[:200]}')
+            probe_dict[node] = sections
+            continue
+        if node == head_node and 'rocm_version' not in sections and cached_nodes.get(node):
+            # Fingerprint unchanged, the full probe was skipped on the node
+            cache_hit = True
+            sections = dict(cached_nodes[node]['sections'], hostname=sections.get('hostname', ''))
+        cached_nodes[node] = {'fingerprint': sections['fingerprint'], 'sections': sections}
+        probe_dict[node] = sections
+
+    _save_inventory(inventory_file, inventory)
+    log.info(f'Metadata inventory {inventory_file}: head node {"revalidated from cache" if cache_hit else "probed"}')
+    return probe_dict, cache_hit
+
+
+def _parse_gpu_model(gpu_line):
+    """GPU model from a rocm-smi --showproductname line, e.g. "GPU[0] : Card Series: AMD Instinct MI300X"."""
+    if ':' not in gpu_line:
+        return gpu_line
+    # Split by colon and get the last part
+    parts = gpu_line.split(':')
+    if len(parts) < 2:
+        return gpu_line
+    # Get everything after the last colon and clean it up
+    gpu_model = parts[-1].strip()
+    if gpu_model:
+        return gpu_model
+    # Fallback: try second-to-last part
+    return parts[-2].strip() if len(parts) >= 3 else gpu_line
+
+
+def _parse_nic_models(nic_models):
+    """Categorize lspci RDMA NIC lines into ({vendor: [model]}, [model])."""
+    models = []
+    nic_summary = {}
+    for line in nic_models.split('\n'):
+        # Extract device description (everything after the last colon)
+        if not line.strip() or ':' not in line:
+            continue
+        parts = line.split(':', 2)
+        model = parts[2].strip() if len(parts) >= 3 else parts[1].strip()
+        models.append(model)
+
+        # Categorize by vendor
+        model_lower = model.lower()
+        if 'mellanox' in model_lower or 'connectx' in model_lower:
+            nic_summary.setdefault('mellanox', []).append(model)
+        elif 'amd' in model_lower or 'thor' in model_lower or 'rdma' in model_lower:
+            nic_summary.setdefault('amd', []).append(model)
+        else:
+            nic_summary.setdefault('other', []).append(model)
+    return nic_summary, models
+
+
+def _metadata_from_sections(metadata, sections):
+    """Fill metadata with the head node information found in its probe sections."""
+    if sections.get('rocm_version'):
+        metadata['rocm_version'] = sections['rocm_version']
+
+    if sections.get('os'):
+        metadata['os'] = sections['os'].replace('\n', ', ')
+
+    if sections.get('kernel'):
+        metadata['kernel'] = sections['kernel']
+
+    gpu_lines = [line for line in sections.get('gpu_product', '').split('\n') if line.strip()]
+    if gpu_lines:
+        metadata['gpu_model'] = _parse_gpu_model(gpu_lines[0].strip())
+        gpu_count = len([line for line in gpu_lines if 'GPU[' in line])
+        if gpu_count > 0:
+            metadata['gpu_count'] = gpu_count
+
+    # RDMA NIC info (InfiniBand/RoCE adapters used for RCCL)
+    ib_devices = [dev.strip() for dev in sections.get('rdma_devices', '').split('\n') if dev.strip()]
+    if ib_devices:
+        metadata['rdma_devices'] = ib_devices
+        nic_details = []
+        dev_dict = None
+        for line in sections.get('rdma_nic_details', '').split('\n'):
+            line = line.strip()
+            if line.startswith('@@ '):
+                dev_dict = {'device': line[3:]}
+            elif dev_dict is not None and ':' in line:
+                key, value = line.split(':', 1)
+                if len(dev_dict) == 1:
+                    nic_details.append(dev_dict)
+                dev_dict[key.strip()] = value.strip()
+        if nic_details:
+            metadata['rdma_nic_details'] = nic_details
+
+    # NIC models from lspci for RDMA devices (Mellanox, AMD Thor2, InfiniBand)
+    nic_summary, models = _parse_nic_models(sections.get('lspci', ''))
+    if models:
+        metadata['rdma_nic_models'] = nic_summary
+        # Also provide flat list for backward compatibility
+        metadata['rdma_nic_models_list'] = models
+
+    module_list = [m.strip() for m in sections.get('rdma_drivers', '').split('\n') if m.strip()]
+    if module_list:
+        metadata['rdma_drivers'] = module_list
+
+    mlx5_ver = sections.get('mlx5_version', '')
+    if mlx5_ver and ':' in mlx5_ver:
+        version = mlx5_ver.split(':', 1)[1].strip()
+        if version:
+            metadata['mlx5_driver_version'] = version
+
+    if 'bios_version' in sections:
+        metadata['bios_version'] = sections['bios_version']
+
+    for prefix in ('rccl', 'rccl_tests'):
+        commit = sections.get(f'{prefix}_commit', 'unknown')
+        if 'unknown' not in commit and len(commit) >= 7:  # Valid git hash (short or long)
+            metadata[f'{prefix}_commit'] = commit
+        branch = sections.get(f'{prefix}_branch', 'unknown')
+        if 'unknown' not in branch and branch:
+            metadata[f'{prefix}_branch'] = branch
+
+    mpi_ver = sections.get('mpi_version', '')
+    if mpi_ver and 'unknown' not in mpi_ver:
+        metadata['mpi_version'] = mpi_ver
+
+
+def collect_system_metadata(
+    phdl, cluster_dict, config_dict, test_command=None, env_vars=None, inventory_file=None, use_cache=True
+):
     """
     Collect comprehensive system metadata from compute nodes for test reporting.
 
+    All information is gathered with one probe command per node in a single round trip
+    (see probe_cluster_inventory); the head node details are cached in a per-cluster
+    inventory file and only re-collected when the node's boot id, ROCm version or the
+    configured RCCL checkouts change.
+
     Args:
         phdl: Parallel SSH handle to execute commands on all nodes
         cluster_dict: Cluster configuration dictionary
         config_dict: Test configuration dictionary
         test_command: Optional test command string that was run
         env_vars: Optional list of environment variable names to capture
+        inventory_file: Optional inventory path (default: one file per cluster under /tmp/cvs/inventory)
+        use_cache: Set to False to force a full re-collection
 
     Returns:
         dict: Metadata dictionary with system information
@@ -440,299 +813,37 @@ def collect_system_metadata(phdl, cluster_dict, config_dict, test_command=None,
     metadata['date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     metadata['timestamp'] = datetime.now().isoformat()
 
-    # Capture hostname(s)
-    try:
-        hostname_dict = phdl.exec('hostname')
-        metadata['hostnames'] = {node: hostname_dict[node].strip() for node in hostname_dict.keys()}
-    except Exception as e:
-        log.warning(f'Failed to get hostnames: {e}')
-
-    # Capture ROCm version
-    try:
-        rocm_dict = phdl.exec(
-            'cat /opt/rocm/.info/version 2>/dev/null || cat /opt/rocm*/share/doc/rocm/version 2>/dev/null || echo "unknown"'
-        )
-        if head_node and head_node in rocm_dict:
-            metadata['rocm_version'] = rocm_dict[head_node].strip()
-    except Exception as e:
-        log.warning(f'Failed to get ROCm version: {e}')
-
-    # Capture OS info
-    try:
-        os_dict = phdl.exec('cat /etc/os-release 2>/dev/null | grep -E "^(NAME|VERSION)=" | head -2')
-        if head_node and head_node in os_dict:
-            os_info = os_dict[head_node].strip()
-            metadata['os'] = os_info.replace('\n', ', ')
-    except Exception as e:
-        log.warning(f'Failed to get OS info: {e}')
-
-    # Capture kernel version
-    try:
-        kernel_dict = phdl.exec('uname -r')
-        if head_node and head_node in kernel_dict:
-            metadata['kernel'] = kernel_dict[head_node].strip()
-    except Exception as e:
-        log.warning(f'Failed to get kernel version: {e}')
-
-    # Capture GPU info
-    try:
-        gpu_dict = phdl.exec('rocm-smi --showproductname 2>/dev/null | grep "GPU" | head -1')
-        if head_node and head_node in gpu_dict:
-            gpu_line = gpu_dict[head_node].strip()
-            # Extract just the GPU model name (everything after "Card Series:" or similar)
-            # Format: "GPU[0]      : Card Series:       AMD Instinct MI300X"
-            if ':' in gpu_line:
-                # Split by colon and get the last part
-                parts = gpu_line.split(':')
-                if len(parts) >= 2:
-                    # Get everything after the last colon and clean it up
-                    gpu_model = parts[-1].strip()
-                    if gpu_model:
-                        metadata['gpu_model'] = gpu_model
-                    else:
-                        # Fallback: try second-to-last part
-                        gpu_model = parts[-2].strip() if len(parts) >= 3 else gpu_line
-                        metadata['gpu_model'] = gpu_model
-                else:
-                    metadata['gpu_model'] = gpu_line
-            else:
-                metadata['gpu_model'] = gpu_line
-
-            # Also get GPU count
-            gpu_count_dict = phdl.exec('rocm-smi --showproductname 2>/dev/null | grep "GPU\\[" | wc -l')
-            if head_node and head_node in gpu_count_dict:
-                try:
-                    gpu_count = int(gpu_count_dict[head_node].strip())
-                    if gpu_count > 0:
-                        metadata['gpu_count'] = gpu_count
-                except:
-                    pass
-    except Exception as e:
-        log.warning(f'Failed to get GPU info: {e}')
-
-    # Capture RDMA NIC info (InfiniBand/RoCE adapters used for RCCL)
-    try:
-        # Get list of IB devices
-        ib_devices_dict = phdl.exec('ibv_devinfo -l 2>/dev/null')
-        if head_node and head_node in ib_devices_dict:
-            ib_devices = [dev.strip() for dev in ib_devices_dict[head_node].strip().split('\n') if dev.strip()]
-            if ib_devices:
-                metadata['rdma_devices'] = ib_devices
-
-                # Get detailed info for each device
-                nic_details = []
-                for device in ib_devices[:8]:  # Limit to first 8 devices
-                    try:
-                        # Get device info including board_id (model), fw_ver, and node_guid
-                        dev_info_dict = phdl.exec(
-                            f'ibv_devinfo -d {device} 2>/dev/null | grep -E "board_id|fw_ver|node_guid|sys_image_guid" | head -4'
-                        )
-                        if head_node and head_node in dev_info_dict:
-                            dev_info = dev_info_dict[head_node].strip()
-                            if dev_info:
-                                # Parse and clean the output
-                                lines = [line.strip() for line in dev_info.split('\n') if line.strip()]
-                                dev_dict = {'device': device}
-                                for line in lines:
-                                    if ':' in line:
-                                        key, value = line.split(':', 1)
-                                        dev_dict[key.strip()] = value.strip()
-                                nic_details.append(dev_dict)
-                    except Exception as e:
-                        log.warning(f'Failed to get details for device {device}: {e}')
-
-                if nic_details:
-                    metadata['rdma_nic_details'] = nic_details
-    except Exception as e:
-        log.warning(f'Failed to get RDMA NIC info: {e}')
-
-    # Get NIC model from lspci for RDMA devices (Mellanox, AMD Thor2, InfiniBand)
+    probe_dict = {}
     try:
-        # Expanded grep to catch Mellanox, Thor2/RDMA, and other RDMA devices
-        nic_model_dict = phdl.exec(
-            'lspci 2>/dev/null | grep -iE "mellanox|infiniband|network.*amd|rdma.*amd|thor" | grep -vE "usb|audio"'
+        probe_dict, _ = probe_cluster_inventory(
+            phdl, cluster_dict, config_dict, env_vars=env_vars, inventory_file=inventory_file, use_cache=use_cache
         )
-        if head_node and head_node in nic_model_dict:
-            nic_models = nic_model_dict[head_node].strip()
-            if nic_models:
-                # Extract and categorize NIC models
-                models = []
-                mellanox_nics = []
-                amd_nics = []
-                other_nics = []
-
-                for line in nic_models.split('\n'):
-                    if line.strip():
-                        # Extract device description (everything after the last colon)
-                        if ':' in line:
-                            parts = line.split(':', 2)
-                            if len(parts) >= 3:
-                                model = parts[2].strip()
-                            elif len(parts) == 2:
-                                model = parts[1].strip()
-                            else:
-                                continue
-
-                            models.append(model)
-
-                            # Categorize by vendor
-                            model_lower = model.lower()
-                            if 'mellanox' in model_lower or 'connectx' in model_lower:
-                                mellanox_nics.append(model)
-                            elif 'amd' in model_lower or 'thor' in model_lower or 'rdma' in model_lower:
-                                amd_nics.append(model)
-                            else:
-                                other_nics.append(model)
-
-                if models:
-                    # Provide categorized view
-                    nic_summary = {}
-                    if mellanox_nics:
-                        nic_summary['mellanox'] = mellanox_nics
-                    if amd_nics:
-                        nic_summary['amd'] = amd_nics
-                    if other_nics:
-                        nic_summary['other'] = other_nics
-
-                    metadata['rdma_nic_models'] = nic_summary
-
-                    # Also provide flat list for backward compatibility
-                    metadata['rdma_nic_models_list'] = models
     except Exception as e:
-        log.warning(f'Failed to get NIC models from lspci: {e}')
-
-    # Get RDMA driver information
-    try:
-        # Get loaded RDMA modules
-        rdma_modules_dict = phdl.exec('lsmod 2>/dev/null | grep -E "^mlx|^ib_" | awk \'{print $1}\' | sort | head -10')
-        if head_node and head_node in rdma_modules_dict:
-            modules = rdma_modules_dict[head_node].strip()
-            if modules:
-                module_list = [m.strip() for m in modules.split('\n') if m.strip()]
-                if module_list:
-                    metadata['rdma_drivers'] = module_list
-
-        # Get driver version for mlx5_core (primary Mellanox driver)
-        mlx5_version_dict = phdl.exec('modinfo mlx5_core 2>/dev/null | grep "^version:" | head -1')
-        if head_node and head_node in mlx5_version_dict:
-            mlx5_ver = mlx5_version_dict[head_node].strip()
-            if mlx5_ver and ':' in mlx5_ver:
-                version = mlx5_ver.split(':', 1)[1].strip()
-                if version:
-                    metadata['mlx5_driver_version'] = version
-    except Exception as e:
-        log.warning(f'Failed to get RDMA driver info: {e}')
-
-    # Capture BIOS/IFWI version
-    try:
-        bios_dict = phdl.exec('sudo dmidecode -s bios-version 2>/dev/null || echo "unknown"')
-        if head_node and head_node in bios_dict:
-            metadata['bios_version'] = bios_dict[head_node].strip()
-    except Exception as e:
-        log.warning(f'Failed to get BIOS version: {e}')
-
-    # Capture RCCL info if available
-    try:
-        if 'rccl_dir' in config_dict and config_dict['rccl_dir']:
-            rccl_dir = config_dict['rccl_dir']
-
-            # Get RCCL commit hash
-            rccl_hash_dict = phdl.exec(f'cd {rccl_dir} 2>/dev/null && git rev-parse HEAD 2>/dev/null || echo "unknown"')
-            if head_node and head_node in rccl_hash_dict:
-                rccl_hash = rccl_hash_dict[head_node].strip()
-                if 'unknown' not in rccl_hash and len(rccl_hash) >= 7:  # Valid git hash (short or long)
-                    metadata['rccl_commit'] = rccl_hash
-
-            # Get RCCL branch name
-            rccl_branch_dict = phdl.exec(
-                f'cd {rccl_dir} 2>/dev/null && git rev-parse --abbrev-ref HEAD 2>/dev/null || echo "unknown"'
-            )
-            if head_node and head_node in rccl_branch_dict:
-                rccl_branch = rccl_branch_dict[head_node].strip()
-                if 'unknown' not in rccl_branch and rccl_branch:
-                    metadata['rccl_branch'] = rccl_branch
-    except Exception as e:
-        log.warning(f'Failed to get RCCL info: {e}')
-
-    # Capture RCCL-tests info if available
-    try:
-        if 'rccl_tests_dir' in config_dict and config_dict['rccl_tests_dir']:
-            rccl_tests_dir = config_dict['rccl_tests_dir']
+        log.warning(f'Failed to probe system metadata: {e}')
 
-            # Get RCCL-tests commit hash
-            tests_hash_dict = phdl.exec(
-                f'cd {rccl_tests_dir} 2>/dev/null && git rev-parse HEAD 2>/dev/null || echo "unknown"'
-            )
-            if head_node and head_node in tests_hash_dict:
-                tests_hash = tests_hash_dict[head_node].strip()
-                if 'unknown' not in tests_hash and len(tests_hash) >= 7:
-                    metadata['rccl_tests_commit'] = tests_hash
-
-            # Get RCCL-tests branch name
-            tests_branch_dict = phdl.exec(
-                f'cd {rccl_tests_dir} 2>/dev/null && git rev-parse --abbrev-ref HEAD 2>/dev/null || echo "unknown"'
-            )
-            if head_node and head_node in tests_branch_dict:
-                tests_branch = tests_branch_dict[head_node].strip()
-                if 'unknown' not in tests_branch and tests_branch:
-                    metadata['rccl_tests_branch'] = tests_branch
-    except Exception as e:
-        log.warning(f'Failed to get RCCL-tests info: {e}')
+    # Capture hostname(s)
+    hostnames = {node: sections['hostname'] for node, sections in probe_dict.items() if 'hostname' in sections}
+    if hostnames:
+        metadata['hostnames'] = hostnames
 
-    # Capture MPI info if available
+    head_sections = probe_dict.get(head_node, {}) if head_node else {}
     try:
-        if 'mpi_dir' in config_dict and config_dict['mpi_dir']:
-            mpi_dir = config_dict['mpi_dir']
-            # Try multiple ways to get MPI version
-            mpi_version_dict = phdl.exec(
-                f'{mpi_dir}/bin/mpirun --version 2>/dev/null | head -1 || {mpi_dir}/mpirun --version 2>/dev/null | head -1 || mpirun --version 2>/dev/null | head -1 || echo "unknown"'
-            )
-            if head_node and head_node in mpi_version_dict:
-                mpi_ver = mpi_version_dict[head_node].strip()
-                if mpi_ver and 'unknown' not in mpi_ver:
-                    metadata['mpi_version'] = mpi_ver
+        _metadata_from_sections(metadata, head_sections)
     except Exception as e:
-        log.warning(f'Failed to get MPI version: {e}')
+        log.warning(f'Failed to parse system metadata of {head_node}: {e}')
 
     # Capture test command if provided
     if test_command:
         metadata['test_command'] = test_command
 
     # Capture RCCL/NCCL environment variables from config (these are set via mpirun -x)
-    rccl_env_vars = {}
-    env_var_mapping = {
-        'debug_level': 'NCCL_DEBUG',
-        'ib_hca_list': 'NCCL_IB_HCA',
-        'net_dev_list': 'UCX_NET_DEVICES',
-        'ucx_tls': 'UCX_TLS',
-        'nccl_net_plugin': 'NCCL_NET_PLUGIN',
-        'gid_index': 'NCCL_IB_GID_INDEX',
-        'oob_port': 'NCCL_SOCKET_IFNAME',
-        'rocm_path_var': 'ROCM_PATH',
-        'mpi_path_var': 'MPI_PATH',
-        'rccl_path_var': 'RCCL_PATH',
-    }
-
-    for config_key, env_name in env_var_mapping.items():
-        if config_key in config_dict and config_dict[config_key]:
-            value = config_dict[config_key]
-            if value and str(value).lower() not in ['none', 'null', '']:
-                rccl_env_vars[env_name] = str(value)
+    rccl_env_vars = _metadata_config_env_vars(config_dict)
 
     # Also capture shell environment variables if requested
-    if env_vars:
-        for var_name in env_vars:
-            # Skip if already captured from config
-            if var_name in rccl_env_vars:
-                continue
-            try:
-                var_dict = phdl.exec(f'echo ${var_name}')
-                if head_node and head_node in var_dict:
-                    value = var_dict[head_node].strip()
-                    if value and value != var_name:  # Not just echoing the variable name
-                        rccl_env_vars[var_name] = value
-            except Exception as e:
-                log.warning(f'Failed to get env var {var_name}: {e}')
+    for var_name in env_vars or []:
+        value = head_sections.get(f'env:{var_name}')
+        if var_name not in rccl_env_vars and value and value != var_name:  # Not just echoing the variable name
+            rccl_env_vars[var_name] = value
 
     if rccl_env_vars:
         metadata['environment_variables'] = rccl_env_vars
@@ -7,9 +7,21 @@ All code contained here is Property of Advanced Micro Devices, Inc.
 
 import re
 
+import numpy as np
+
 from cvs.lib.utils_lib import *
 from cvs.lib.rocm_plib import *
 from cvs.lib import linux_utils
+from cvs.lib.log_scan_lib import get_log_scanner
+from cvs.lib.metrics_snapshot_lib import (
+    STAT_CLASS_ERR,
+    STAT_CLASS_THRESHOLD,
+    STAT_CLASS_WARN,
+    MetricsSnapshot,
+    as_snapshot,
+    classify_stats,
+    snapshot_diff,
+)
 
 
 err_patterns_dict = {
@@ -29,6 +41,82 @@ threshold_stats_pattern = 'cnp|ecn'
 threshold_counter_val = 1000
 
 
+# Per-node dmesg cursors kept across full_dmesg_scan calls: {node: (boot_id, last kernel timestamp seen)}
+dmesg_cursor_dict = {}
+
+DMESG_CURSOR_MARKER = '__CVS_DMESG_CURSOR__'
+DMESG_NO_TIMESTAMPS_MARKER = '__CVS_DMESG_NO_TIMESTAMPS__'
+
+
+def build_dmesg_window_cmd(lo_expr='0', hi_expr='-1', boot_id=None, exclude='ALLOWED|DENIED'):
+    """
+    Build a shell command that prints only the dmesg lines inside a window of kernel
+    (monotonic) timestamps, so nodes ship just the lines of interest.
+
+    Parameters:
+      lo_expr (str): Shell expression for the exclusive lower bound in seconds since boot.
+                     May reference $boot (boot time in epoch seconds).
+      hi_expr (str): Shell expression for the inclusive upper bound, or '-1' for no upper bound.
+      boot_id (str): When given and the node has rebooted since (different boot id), the
+                     lower bound is reset to 0 because kernel timestamps restarted.
+      exclude (str): awk regex of noisy lines to drop (e.g. 'ALLOWED|DENIED').
+
+    Output:
+      The selected lines in raw dmesg format ('[ 1234.567890] msg', monotonic seconds since
+      boot rather than the wall-clock times of dmesg -T), followed by one line
+      '__CVS_DMESG_CURSOR__ <boot_id> <last timestamp in window>' used as the next cursor.
+      Continuation lines without a timestamp belong to the preceding timestamp.
+      A node logging without timestamps (printk.time=0) can't be windowed: it ships its
+      whole log, flagged by a '__CVS_DMESG_NO_TIMESTAMPS__' line.
+    """
+    reset = f'[ "$bid" = "{boot_id}" ] || lo=0; ' if boot_id is not None else ''
+    awk_prog = (
+        'match($0, /^\\[ *[0-9]+\\.[0-9]+\\]/) { ts = substr($0, RSTART + 1, RLENGTH - 2) + 0; seen_ts = 1 } '
+        '!seen_ts || ((ts > lo + 0) && (hi < 0 || ts <= hi + 0)) { if (seen_ts) last = ts; '
+        f'if ($0 !~ /{exclude}/) print }} '
+        f'END {{ if (NR > 0 && !seen_ts) print "{DMESG_NO_TIMESTAMPS_MARKER}"; '
+        f'printf "{DMESG_CURSOR_MARKER} %s %.6f\\n", bid, (last == "" ? lo : last) }}'
+    )
+    return (
+        'bid=$(cat /proc/sys/kernel/random/boot_id); '
+        'boot=$(( $(date +%s) - $(cut -d. -f1 /proc/uptime) )); '
+        f'lo={lo_expr}; hi={hi_expr}; {reset}'
+        f"sudo dmesg | awk -v lo=\"$lo\" -v hi=\"$hi\" -v bid=\"$bid\" '{awk_prog}'"
+    )
+
+
+def parse_dmesg_window_output(output_dict):
+    """
+    Split build_dmesg_window_cmd output into dmesg text and cursors.
+
+    Returns:
+      tuple: ({node: dmesg text}, {node: (boot_id, last timestamp)}) - nodes whose output
+             has no cursor line (e.g. unreachable) are left out of the cursor dict.
+             Nodes logging without timestamps are reported and their whole log is returned.
+    """
+    text_dict = {}
+    cursor_dict = {}
+    for node, output in output_dict.items():
+        lines = []
+        for line in output.split('\n'):
+            if line.startswith(DMESG_NO_TIMESTAMPS_MARKER):
+                print(f'WARNING - dmesg on node {node} has no timestamps (printk.time=0), scanning all of it')
+            elif line.startswith(DMESG_CURSOR_MARKER):
+                fields = line.split()
+                if len(fields) == 3:
+                    cursor_dict[node] = (fields[1], float(fields[2]))
+            else:
+                lines.append(line)
+        text_dict[node] = '\n'.join(lines)
+    return text_dict, cursor_dict
+
+
+def _epoch_to_uptime_expr(time_string, slack=0):
+    """Shell expression converting a node-local date string to seconds since boot (needs $boot)."""
+    time_string = time_string.strip().replace("'", '')
+    return f"$(( $(date -d '{time_string}' +%s) + {slack} - boot ))"
+
+
 def verify_gpu_pcie_bus_width(phdl, expected_cards=8, gpu_pcie_speed=32, gpu_pcie_width=16):
     """
     Verify that all GPUs across nodes are operating at the expected PCIe link speed and width.
@@ -182,22 +270,24 @@ def verify_dmesg_for_errors(phdl, start_time_dict, end_time_dict, till_end_flag=
       end_time_dict (dict): Mapping of node -> end timestamp string (same format as start).
 
     Behavior:
-      - Extracts a human-readable timestamp prefix (e.g., 'Mon Jan  2 03:04:05') from provided times.
-      - Uses dmesg -T (human-readable timestamps) piped to awk to slice the log from start to end.
-      - Filters out lines containing 'ALLOWED' or 'DENIED' (non-fatal/noisy) via egrep -v.
-      - Scans each line against a set of known error regex patterns (err_patterns_dict).
-      - Immediately fails the test via fail_test if any error pattern is seen.
+      - Converts the start/end times to kernel (seconds since boot) timestamps on each node and
+        selects exactly the dmesg lines inside that window on the node (build_dmesg_window_cmd),
+        so only those lines are shipped back. Times without seconds cover the whole end minute.
+      - Filters out lines containing 'ALLOWED' or 'DENIED' (non-fatal/noisy).
+      - Scans the output in one pass against all known error regex patterns (err_patterns_dict)
+        using a compiled LogScanner.
+      - Calls fail_test for every matching line, naming the node, line number and matched patterns.
 
     Assumptions:
       - err_patterns_dict is defined in scope: {name: regex_pattern, ...}.
       - phdl.exec(cmd) returns a dict: { node: stdout_str }.
-      - Input timestamps contain a prefix matching the regex used here.
+      - Input timestamps are parseable by `date -d` on the nodes (e.g. output of `date`).
       - sudo is available and does not prompt for a password when running dmesg.
 
     Notes:
-      - This function fails fast on the first detected error to shorten feedback cycles.
-      - If start/end times are not aligned with dmesg -T formatting, the awk range may be empty.
-      - Consider handling cases where regex extraction fails (no match) to avoid attribute errors.
+      - Every matching line is reported (fail_test does not abort), so one call gives the full picture.
+      - Lines are returned in raw dmesg format ('[ 1234.567890] msg'), with monotonic seconds
+        since boot instead of the dmesg -T wall-clock times.
     """
 
     print('scan dmesg')
@@ -209,37 +299,27 @@ def verify_dmesg_for_errors(phdl, start_time_dict, end_time_dict, till_end_flag=
     start_time = start_time_dict[node0].rstrip("\n")
     end_time = end_time_dict[node0].rstrip("\n")
 
-    # Extract the "Mon Jan  2 03:04:05" style prefix from the provided timestamps
-    pattern = r"([a-zA-Z]+\s+[a-zA-Z]+\s+[0-9]+\s+[0-9]+\:[0-9]+)"
-    match = re.search(pattern, start_time)
-    start_pattern = match.group(1)
+    # Timestamps taken with minute resolution (date +"%a %b %e %H:%M") cover the whole end minute
+    end_slack = 0 if re.search(r'[0-9]+:[0-9]+:[0-9]+', end_time) else 59
 
-    # Extract end timestamp prefix similarly
-    pattern = r"([a-zA-Z]+\s+[a-zA-Z]+\s+[0-9]+\s+[0-9]+\:[0-9]+)"
-    match = re.search(pattern, end_time)
-    end_pattern = match.group(1)
-
-    # Pull human-readable dmesg and slice the lines between start and end timestamps.
+    # Each node converts the window to kernel timestamps and ships only the lines inside it.
     # Filter out allowed/denied lines to reduce noise. Return is a dict keyed by node.
-    if till_end_flag:
-        output_dict = phdl.exec(
-            f"sudo dmesg -T | sed -n '/{start_pattern}/,$p' | egrep -v 'ALLOWED|DENIED' --color=never"
-        )
-    else:
-        output_dict = phdl.exec(
-            f"sudo dmesg -T | awk '/{start_pattern}.*/,/{end_pattern}.*/' | egrep -v 'ALLOWED|DENIED' --color=never"
-        )
-    # print(output_dict)
-    for node in output_dict.keys():
+    cmd = build_dmesg_window_cmd(
+        lo_expr=_epoch_to_uptime_expr(start_time, slack=-1),
+        hi_expr='-1' if till_end_flag else _epoch_to_uptime_expr(end_time, slack=end_slack),
+    )
+    output_dict, _ = parse_dmesg_window_output(phdl.exec(cmd))
+
+    # Scan each node's sliced dmesg for all known error patterns in one pass
+    match_dict = get_log_scanner(err_patterns_dict, re.I).scan_dict(output_dict)
+    for node, matches in match_dict.items():
         err_dict[node] = []
-
-    # Iterate through each node's sliced dmesg and scan for known error patterns
-    for node in output_dict.keys():
-        for line in output_dict[node].split("\n"):
-            for err_key in err_patterns_dict.keys():
-                if re.search(f'{err_patterns_dict[err_key]}', line, re.I):
-                    fail_test(f'ERROR - Failue pattern ** {line} ** seen in Dmesg')
-                    err_dict[node].append(line)
+        for match in matches:
+            fail_test(
+                f'ERROR - Failue pattern ** {match.line} ** ({",".join(match.patterns)}) seen in Dmesg '
+                f'on node {node} line {match.line_no}'
+            )
+            err_dict[node].append(match.line)
 
     return err_dict
 
@@ -404,9 +484,9 @@ def full_journalctl_scan(phdl):
     Behavior:
       - Runs 'journalctl -k' (kernel messages) filtered through egrep for high-signal
         keywords: amdgpu, interrupt, error, fail, timeout, fault.
-      - Iterates over each node?s output and checks each line against regex patterns
-        defined in err_patterns_dict.
-      - If any line matches a known failure pattern, calls fail_test immediately
+      - Scans each node's output in one pass against the regex patterns defined in
+        err_patterns_dict (compiled once into a LogScanner).
+      - For every line that matches a known failure pattern, calls fail_test
         with a descriptive message including the offending line and node.
 
     Assumptions:
@@ -417,8 +497,7 @@ def full_journalctl_scan(phdl):
       - journalctl stores kernel logs (equivalent to dmesg -k), and system uses journald.
 
     Notes:
-      - This function fails fast on the first matching error; consider aggregating
-        all matches per node if you prefer a single consolidated report.
+      - Returns all matching lines per node: { node: [line, ...] }.
       - The initial egrep reduces volume; ensure it doesn?t hide relevant lines
         not containing those keywords if broader scanning is desired.
     """
@@ -426,40 +505,39 @@ def full_journalctl_scan(phdl):
     err_dict = {}
     # Fetch kernel logs filtered for likely error indicators across nodes
     out_dict = phdl.exec('sudo journalctl -k | egrep "amdgpu|interrupt|error|fail|timeout|fault"')
-    for node in out_dict.keys():
+    # Case-insensitive single-pass scan of each node's log against the known error patterns
+    match_dict = get_log_scanner(err_patterns_dict, re.I).scan_dict(out_dict)
+    for node, matches in match_dict.items():
         err_dict[node] = []
-
-    # For each node, scan each line against known error regex patterns
-    for node in out_dict.keys():
-        for line in out_dict[node].split("\n"):
-            for err_key in err_patterns_dict.keys():
-                # Case-insensitive match against the configured error patterns
-                if re.search(f'{err_patterns_dict[err_key]}', line, re.I):
-                    msg = f'ERROR - Failure pattern *** {line} *** seen in Dmesg on node {node}'
-                    fail_test(msg)
-                    err_dict[node].append(line)
+        for match in matches:
+            msg = f'ERROR - Failure pattern *** {match.line} *** seen in Dmesg on node {node}'
+            fail_test(msg)
+            err_dict[node].append(match.line)
     return err_dict
 
 
-def full_dmesg_scan(
-    phdl,
-):
+def full_dmesg_scan(phdl, since_last_scan=False):
     """
-    Scan dmesg across nodes for known error patterns and fail on first match.
+    Scan dmesg across nodes for known error patterns and fail on every match.
 
     Parameters:
       phdl: Host/process handle abstraction that supports:
             - exec(cmd: str) -> dict[node: str]
-              Executes the given command on all target nodes and returns a map of node to output.
+            - exec_cmd_list(cmd_list) -> dict[node: str], one command per phdl.reachable_hosts entry
+      since_last_scan (bool): Only ship and scan lines logged after the previous incremental call
+            for each node (tracked in dmesg_cursor_dict). The first scan of a node, and the first
+            scan after it rebooted, covers the whole ring buffer. By default every call scans the
+            whole ring buffer.
 
     Behavior:
-      - Runs `dmesg -T` to get human-readable timestamps from kernel logs on each node.
+      - Selects the new kernel log lines on each node (build_dmesg_window_cmd) using the node's
+        cursor, and records the last timestamp seen as the new cursor.
       - Filters out noisy lines:
           * Excludes lines containing 'initialized'
           * Excludes lines containing 'ALLOWED' or 'DENIED' (case-sensitive as written)
-      - Iterates through each remaining line and checks for matches against regex patterns
-        defined in err_patterns_dict.
-      - On the first match, invokes fail_test with a message indicating the failing line and node.
+      - Scans the remaining lines in one pass against the regex patterns defined in
+        err_patterns_dict (compiled once into a LogScanner).
+      - For every matching line, invokes fail_test with a message indicating the failing line and node.
 
     Assumptions:
       - err_patterns_dict is available in scope and maps labels to regex patterns:
@@ -469,31 +547,37 @@ def full_dmesg_scan(
       - phdl.exec runs the command on all relevant nodes and returns their outputs.
 
     Notes:
-      - This function fails fast. If you need a consolidated report of all matches,
-        consider accumulating them and failing once at the end.
-      - Current filters are simple grep/egrep; adjust if they exclude useful diagnostics.
-      - Consider adding case-insensitive filtering (e.g., grep -i) where appropriate.
+      - Returns all matching lines per node: { node: [line, ...] }, in raw dmesg format
+        ('[ 1234.567890] msg', monotonic seconds since boot, not dmesg -T wall-clock times).
     """
 
     print('scan dmesg')
 
     err_dict = {}
+    exclude = 'initialized|ALLOWED|DENIED'
 
-    # Pull human-readable kernel logs and filter out common noise
-    output_dict = phdl.exec("sudo dmesg -T | grep -v initialized | egrep -v 'ALLOWED|DENIED' --color=never")
-    for node in output_dict.keys():
+    # Ship only the lines after each node's cursor; nodes without a cursor send everything
+    hosts = list(getattr(phdl, 'reachable_hosts', None) or [])
+    if since_last_scan and hosts and any(node in dmesg_cursor_dict for node in hosts):
+        cmd_list = []
+        for node in hosts:
+            boot_id, last_ts = dmesg_cursor_dict.get(node, ('', 0))
+            cmd_list.append(build_dmesg_window_cmd(lo_expr=str(last_ts), boot_id=boot_id, exclude=exclude))
+        raw_dict = phdl.exec_cmd_list(cmd_list)
+    else:
+        raw_dict = phdl.exec(build_dmesg_window_cmd(exclude=exclude))
+    output_dict, cursor_dict = parse_dmesg_window_output(raw_dict)
+    if since_last_scan:
+        dmesg_cursor_dict.update(cursor_dict)
+
+    # Case-insensitive single-pass scan of each node's dmesg against the known error patterns
+    match_dict = get_log_scanner(err_patterns_dict, re.I).scan_dict(output_dict)
+    for node, matches in match_dict.items():
         err_dict[node] = []
-
-    # Iterate node-by-node through the filtered dmesg output
-    for node in output_dict.keys():
-        # Examine each line for any known failure pattern
-        for line in output_dict[node].split("\n"):
-            for err_key in err_patterns_dict.keys():
-                # Case-insensitive match against configured error regexes
-                if re.search(f'{err_patterns_dict[err_key]}', line, re.I):
-                    msg = f'ERROR - Failure pattern *** {line} *** seen in Dmesg on node {node}'
-                    fail_test(msg)
-                    err_dict[node].append(line)
+        for match in matches:
+            msg = f'ERROR - Failure pattern *** {match.line} *** seen in Dmesg on node {node}'
+            fail_test(msg)
+            err_dict[node].append(match.line)
     return err_dict
 
 
@@ -547,18 +631,19 @@ def verify_driver_errors(phdl):
     return err_dict
 
 
-def create_cluster_metrics_snapshot(
-    phdl,
-):
+def create_cluster_metrics_snapshot(phdl, as_table=False):
     """
     Collect a point-in-time snapshot of key cluster metrics across nodes.
 
     Parameters:
       phdl: Host/process handle abstraction used by utility functions to execute
             commands remotely and gather per-node metrics.
+      as_table (bool): Return the snapshot as a flat MetricsSnapshot table (counters only)
+            instead of the nested dict. Tables are much smaller to keep around and are
+            what compare_cluster_metrics_snapshots works on internally.
 
     Returns:
-      dict: A dictionary containing multiple categories of metrics aggregated
+      dict | MetricsSnapshot: A dictionary containing multiple categories of metrics aggregated
             across the cluster:
         - 'eth_stats': Per-node NIC ethtool statistics
         - 'rdma_stats': Per-node RDMA device statistics
@@ -582,6 +667,8 @@ def create_cluster_metrics_snapshot(
     s_dict['gpu_pcie_stats'] = get_amd_smi_pcie_metrics_dict(phdl)
 
     # s_dict['gpu_stats'] = get_gpu_metrics_dict( phdl )
+    if as_table:
+        return MetricsSnapshot.from_dict(s_dict)
     return s_dict
 
 
@@ -590,9 +677,9 @@ def get_metrics_snapshot_diff_dict(s_dict_before, s_dict_after):
     Compute a nested dictionary of deltas between two cluster metrics snapshots.
 
     Parameters:
-      s_dict_before (dict): Snapshot taken "before", structured as:
+      s_dict_before (dict | MetricsSnapshot): Snapshot taken "before", structured as:
                             { category: { node: { device: { stat_name: value, ... } } } }
-      s_dict_after  (dict): Snapshot taken "after", with the same structure/keys as s_dict_before.
+      s_dict_after  (dict | MetricsSnapshot): Snapshot taken "after", with the same structure/keys.
 
     Returns:
       dict: diff_dict with the same nested keys (category -> node -> device -> stat_name),
@@ -602,45 +689,24 @@ def get_metrics_snapshot_diff_dict(s_dict_before, s_dict_after):
               - lists are ignored (no diffs computed)
 
     Notes/Assumptions:
-      - Both snapshots have identical nested keys and shapes.
-      - Values can be ints, numeric strings, or textual strings; lists are skipped.
-      - Textual strings are detected via regex and excluded from diffing.
-      - This function does not handle missing keys or type mismatches gracefully.
+      - Both snapshots are flattened into MetricsSnapshot tables and diffed as int64 arrays.
+      - Counters missing from the "after" snapshot are left out of the diff.
     """
 
-    diff_dict = {}
-    # Pre-initialize the nested structure of diff_dict to mirror s_dict_before
-    # key_nam will be like rdma_stats, ethtool_stats etc.
+    before = as_snapshot(s_dict_before)
+    after = as_snapshot(s_dict_after)
 
-    for key_nam in s_dict_before.keys():
+    # Pre-initialize the nested structure of diff_dict to mirror the "before" snapshot
+    # key_nam will be like rdma_stats, ethtool_stats etc.
+    diff_dict = {}
+    for key_nam, node_dict in before.layout.items():
         diff_dict[key_nam] = {}
-        for node in s_dict_before[key_nam].keys():
-            diff_dict[key_nam][node] = {}
-            for dev_nam in s_dict_before[key_nam][node].keys():
-                diff_dict[key_nam][node][dev_nam] = {}
-
-    # Walk through all stats and compute numeric deltas where applicable
-    for key_nam in s_dict_before.keys():
-        for node in s_dict_before[key_nam].keys():
-            for dev_nam in s_dict_before[key_nam][node].keys():
-                for stat_nam in s_dict_before[key_nam][node][dev_nam].keys():
-                    # Skip lists entirely (no delta computed for list-type stats)
-                    if not isinstance(s_dict_before[key_nam][node][dev_nam][stat_nam], list):
-                        # If value is a string, only diff when it looks numeric (not textual)
-                        if isinstance(s_dict_before[key_nam][node][dev_nam][stat_nam], str):
-                            # Pattern matches alphabetic/._- tokens; if found, treat as textual and skip
-                            pattern = r"[a-z\.\_\-]+"
-                            if not re.search(pattern, s_dict_before[key_nam][node][dev_nam][stat_nam], re.I):
-                                # Treat as numeric string; compute integer delta
-                                diff_dict[key_nam][node][dev_nam][stat_nam] = int(
-                                    s_dict_after[key_nam][node][dev_nam][stat_nam]
-                                ) - int(s_dict_before[key_nam][node][dev_nam][stat_nam])
-                        # If value is an integer, compute direct delta
-                        elif isinstance(s_dict_before[key_nam][node][dev_nam][stat_nam], int):
-                            diff_dict[key_nam][node][dev_nam][stat_nam] = (
-                                s_dict_after[key_nam][node][dev_nam][stat_nam]
-                                - s_dict_before[key_nam][node][dev_nam][stat_nam]
-                            )
+        for node, dev_list in node_dict.items():
+            diff_dict[key_nam][node] = {dev_nam: {} for dev_nam in dev_list}
+
+    before_rows, _, delta = snapshot_diff(before, after)
+    for row, row_delta in zip(before_rows.tolist(), delta.tolist()):
+        diff_dict[before.category[row]][before.node[row]][before.device[row]][before.stat[row]] = row_delta
 
     return diff_dict
 
@@ -652,13 +718,14 @@ def compare_cluster_metrics_snapshots(s_dict_before, s_dict_after):
     classifying them as warnings, errors, or threshold-based warnings.
 
     Parameters:
-      s_dict_before (dict): "Before" snapshot with nested structure:
+      s_dict_before (dict | MetricsSnapshot): "Before" snapshot with nested structure:
                             { category: { node: { device: { stat_name: value, ... } } } }
-      s_dict_after  (dict): "After" snapshot with identical structure/keys to s_dict_before.
+      s_dict_after  (dict | MetricsSnapshot): "After" snapshot with identical structure/keys.
 
     Behavior:
-      - Computes a diff dictionary (after - before) via get_metrics_snapshot_diff_dict.
-      - Iterates all stats and:
+      - Flattens both snapshots into MetricsSnapshot tables and computes all deltas
+        (after - before) as one array operation.
+      - Classifies every distinct stat name once and then, per counter:
           * If stat name matches warn_stats_pattern and delta > 0: logs/prints a WARN.
           * If stat name matches err_stats_pattern and delta > 0: logs/prints an ERROR.
           * If stat name matches threshold_stats_pattern and delta > threshold_counter_val:
@@ -666,12 +733,10 @@ def compare_cluster_metrics_snapshots(s_dict_before, s_dict_after):
       - Prints start and completion messages to track progress.
 
     Assumptions:
-      - get_metrics_snapshot_diff_dict is available and returns numeric deltas for comparable stats.
       - warn_stats_pattern, err_stats_pattern, threshold_stats_pattern are valid regex strings
         available in scope and intended to match stat names.
       - threshold_counter_val is an int threshold available in scope for threshold-based warnings.
-      - log is a logger with warn/error methods; re (regex) is imported.
-      - All diff values for matched stats are numeric or numeric strings (castable to int).
+      - log is a logger with warn/error methods.
     """
 
     print('Compare 2 cluster snapshots')
@@ -686,73 +751,55 @@ def compare_cluster_metrics_snapshots(s_dict_before, s_dict_after):
     # after in the snaphot Diff tables for GPU and NIC metrics
     err_stats_diff_dict = {}
 
-    # Compute per-stat deltas between the two snapshots:
-    # diff_dict mirrors the structure {category -> node -> device -> stat_name -> delta}.
-    diff_dict = get_metrics_snapshot_diff_dict(s_dict_before, s_dict_after)
-
-    # Walk the nested structure and evaluate each stat's delta against patterns/thresholds.
-    for key_nam in diff_dict.keys():  # category (e.g., eth_stats, rdma_stats)
+    before = as_snapshot(s_dict_before)
+    after = as_snapshot(s_dict_after)
+    for key_nam, node_dict in before.layout.items():  # category (e.g., eth_stats, rdma_stats)
         err_dict[key_nam] = {}
         err_stats_diff_dict[key_nam] = {}
-        for node in diff_dict[key_nam].keys():  # node identifier
+        for node, dev_list in node_dict.items():
             err_dict[key_nam][node] = []
-            err_stats_diff_dict[key_nam][node] = {}
-            for dev_nam in diff_dict[key_nam][node].keys():  # device/interface identifier
-                err_stats_diff_dict[key_nam][node][dev_nam] = {}
-                for stat_nam in diff_dict[key_nam][node][dev_nam].keys():  # metric/statistic identifier
-                    # Warning counters: log when any positive increase occurs
-                    if re.search(f'{warn_stats_pattern}', stat_nam, re.I):
-                        if int(diff_dict[key_nam][node][dev_nam][stat_nam]) > 0:
-                            msg = f'WARN !! cluster snapshot showing some warning counters going up - {key_nam} {node} {dev_nam} {stat_nam} have incremented by {diff_dict[key_nam][node][dev_nam][stat_nam]} Before = {s_dict_before[key_nam][node][dev_nam][stat_nam]} After = {s_dict_after[key_nam][node][dev_nam][stat_nam]}'
-                            log.warn(msg)
-                            print(msg)
-                            err_dict[key_nam][node].append(msg)
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam] = {}
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['before'] = s_dict_before[key_nam][node][
-                            dev_nam
-                        ][stat_nam]
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['after'] = s_dict_after[key_nam][node][
-                            dev_nam
-                        ][stat_nam]
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['diff'] = int(
-                            err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['after']
-                        ) - int(err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['before'])
-
-                    # Error counters: log when any positive increase occurs
-                    elif re.search(f'{err_stats_pattern}', stat_nam, re.I):
-                        if int(diff_dict[key_nam][node][dev_nam][stat_nam]) > 0:
-                            msg = f'ERROR !! cluster snapshot showing some error counters going up - {key_nam} {node} {dev_nam} {stat_nam} have incremented by {diff_dict[key_nam][node][dev_nam][stat_nam]} Before = {s_dict_before[key_nam][node][dev_nam][stat_nam]} After = {s_dict_after[key_nam][node][dev_nam][stat_nam]}'
-                            log.error(msg)
-                            print(msg)
-                            err_dict[key_nam][node].append(msg)
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam] = {}
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['before'] = s_dict_before[key_nam][node][
-                            dev_nam
-                        ][stat_nam]
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['after'] = s_dict_after[key_nam][node][
-                            dev_nam
-                        ][stat_nam]
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['diff'] = int(
-                            err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['after']
-                        ) - int(err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['before'])
-
-                    # Threshold-based warning counters: require delta to exceed a configured threshold
-                    elif re.search(f'{threshold_stats_pattern}', stat_nam, re.I):
-                        if int(diff_dict[key_nam][node][dev_nam][stat_nam]) > threshold_counter_val:
-                            msg = f'WARN !! cluster snapshot showing some threshold warn counters going up - {key_nam} {node} {dev_nam} {stat_nam} have incremented by {diff_dict[key_nam][node][dev_nam][stat_nam]} Before = {s_dict_before[key_nam][node][dev_nam][stat_nam]} After = {s_dict_after[key_nam][node][dev_nam][stat_nam]}'
-                            log.warn(msg)
-                            print(msg)
-                            err_dict[key_nam][node].append(msg)
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam] = {}
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['before'] = s_dict_before[key_nam][node][
-                            dev_nam
-                        ][stat_nam]
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['after'] = s_dict_after[key_nam][node][
-                            dev_nam
-                        ][stat_nam]
-                        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['diff'] = int(
-                            err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['after']
-                        ) - int(err_stats_diff_dict[key_nam][node][dev_nam][stat_nam]['before'])
+            err_stats_diff_dict[key_nam][node] = {dev_nam: {} for dev_nam in dev_list}
+
+    # Per-counter deltas and stat classes as arrays, then the alerting decision as array ops
+    before_rows, after_rows, delta = snapshot_diff(before, after)
+    stat_class = classify_stats(
+        before.stat[before_rows], warn_stats_pattern, err_stats_pattern, threshold_stats_pattern
+    )
+    increased = np.asarray(delta > 0, dtype=bool)
+    alert = ((stat_class == STAT_CLASS_WARN) | (stat_class == STAT_CLASS_ERR)) & increased
+    alert |= (stat_class == STAT_CLASS_THRESHOLD) & np.asarray(delta > threshold_counter_val, dtype=bool)
+
+    msg_prefix = {
+        STAT_CLASS_WARN: 'WARN !! cluster snapshot showing some warning counters going up',
+        STAT_CLASS_ERR: 'ERROR !! cluster snapshot showing some error counters going up',
+        STAT_CLASS_THRESHOLD: 'WARN !! cluster snapshot showing some threshold warn counters going up',
+    }
+
+    # Only classified counters are visited in Python (for the report tables), in snapshot order
+    for i in np.flatnonzero(stat_class).tolist():
+        b_row = before_rows[i]
+        key_nam, node, dev_nam, stat_nam = (
+            before.category[b_row],
+            before.node[b_row],
+            before.device[b_row],
+            before.stat[b_row],
+        )
+        before_val = before.raw[b_row]
+        after_val = after.raw[after_rows[i]]
+        diff_val = int(delta[i])
+        if alert[i]:
+            msg = f'{msg_prefix[stat_class[i]]} - {key_nam} {node} {dev_nam} {stat_nam} have incremented by {diff_val} Before = {before_val} After = {after_val}'
+            if stat_class[i] == STAT_CLASS_ERR:
+                log.error(msg)
+            else:
+                log.warn(msg)
+            print(msg)
+            err_dict[key_nam][node].append(msg)
+        err_stats_diff_dict[key_nam][node][dev_nam][stat_nam] = {
+            'before': before_val,
+            'after': after_val,
+            'diff': diff_val,
+        }
 
     print('Completed comparing the cluster snapshots')
     return err_dict, err_stats_diff_dict
@@ -5,66 +5,99 @@ The year included in the foregoing notice is the year of creation of the work.
 All code contained here is Property of Advanced Micro Devices, Inc.
 '''
 
+import os
 import sys
 import logging
 import argparse
 import time
 
+import gevent
+
 from cvs.monitors.base import MonitorPlugin
 from cvs.lib import parallel_ssh_lib
 from cvs.lib import verify_lib
 from cvs.lib import linux_utils
 from cvs.lib import rocm_plib
 from cvs.lib import html_lib
+from cvs.lib.metrics_snapshot_lib import SnapshotRecorder
 
 log = logging.getLogger()
 
 
-def general_health_checks(
-    phdl,
-):
-    health_dict = {}
-    print('Verify General Health Checks')
+# (health_dict key, verify_lib check[, keyword arguments]) run by general_health_checks. The checks
+# are independent of each other and each one is a cluster wide exec, so they are run concurrently.
+GENERAL_HEALTH_CHECKS = [
     # Check PCIe Bus and Width
-    try:
-        health_dict['gpu_pcie_link'] = verify_lib.verify_gpu_pcie_bus_width(phdl)
-    except Exception as e:
-        print(f'ERROR running verify_gpu_pcie_bus_width, due to exception {e}')
-    # Check Dmesg for errors
-    try:
-        health_dict['dmesg_scan'] = verify_lib.full_dmesg_scan(phdl)
-    except Exception as e:
-        print(f'ERROR running full_dmesg_scan, due to exception {e}')
+    ('gpu_pcie_link', 'verify_gpu_pcie_bus_width'),
+    # Check Dmesg for errors, only the lines logged since the previous run of the checks
+    ('dmesg_scan', 'full_dmesg_scan', {'since_last_scan': True}),
     # Check Dmesg for AMD GPU driver errors
-    try:
-        health_dict['driver_errors'] = verify_lib.verify_driver_errors(phdl)
-    except Exception as e:
-        print(f'ERROR running verify_driver_errors, due to exception {e}')
+    ('driver_errors', 'verify_driver_errors'),
     # journlctl scan
-    try:
-        health_dict['journlctl_scan'] = verify_lib.full_journalctl_scan(phdl)
-    except Exception as e:
-        print(f'ERROR running full_journalctl_scan, due to exception {e}')
+    ('journlctl_scan', 'full_journalctl_scan'),
     # Check for any link flap evidence
-    try:
-        health_dict['nic_link_flap'] = verify_lib.verify_nic_link_flap(phdl)
-    except Exception as e:
-        print(f'ERROR running verify_nic_link_flap, due to exception {e}')
+    ('nic_link_flap', 'verify_nic_link_flap'),
     # Check for GPU PCIe errors from amd-smi commands
-    try:
-        health_dict['gpu_pcie_errors'] = verify_lib.verify_gpu_pcie_errors(phdl)
-    except Exception as e:
-        print(f'ERROR running verify_gpu_pcie_errors, due to exception {e}')
+    ('gpu_pcie_errors', 'verify_gpu_pcie_errors'),
     # Verify PCIe status from Host OS side ..
+    ('host_pcie', 'verify_host_lspci'),
+]
+
+
+def run_health_check(phdl, key, check_name, health_dict, timings, timeout=None, kwargs=None):
+    """Run one verify_lib check, storing its result in health_dict[key] and its duration in timings."""
+    start = time.time()
     try:
-        health_dict['host_pcie'] = verify_lib.verify_host_lspci(phdl)
+        with gevent.Timeout(timeout):
+            health_dict[key] = getattr(verify_lib, check_name)(phdl, **(kwargs or {}))
+    except gevent.Timeout:
+        print(f'ERROR running {check_name}, timed out after {timeout} seconds')
     except Exception as e:
-        print(f'ERROR running verify_host_lspci, due to exception {e}')
-    return health_dict
+        print(f'ERROR running {check_name}, due to exception {e}')
+    timings[check_name] = time.time() - start
+
+
+def general_health_checks(phdl, parallel=True, check_timeout=None, timings=None):
+    """
+    Run the GENERAL_HEALTH_CHECKS.
 
+    With parallel set every check runs in its own greenlet: the ssh I/O of the checks
+    interleaves over the sessions phdl already holds, so the wall time is that of the
+    slowest check. check_timeout (seconds) bounds each check, a check that fails or
+    times out is reported and left out of the returned dict.
 
-def build_html_report(phdl, html_file, gen_health_dict, start_time, snapshot_err_dict, snapshot_err_stats_dict):
-    # stats collection
+    timings, if given, is filled with check name -> duration in seconds.
+    """
+    health_dict = {}
+    timings = {} if timings is None else timings
+    print('Verify General Health Checks')
+    start = time.time()
+    if parallel:
+        # A check pruning a host must not change the host list under another check's exec_cmd_list
+        with phdl.deferred_pruning():
+            greenlets = [
+                gevent.spawn(run_health_check, phdl, key, check_name, health_dict, timings, check_timeout, *kwargs)
+                for key, check_name, *kwargs in GENERAL_HEALTH_CHECKS
+            ]
+            gevent.joinall(greenlets)
+    else:
+        for key, check_name, *kwargs in GENERAL_HEALTH_CHECKS:
+            run_health_check(phdl, key, check_name, health_dict, timings, check_timeout, *kwargs)
+
+    print(f'General health checks completed in {time.time() - start:.1f} seconds')
+    for check_name, duration in sorted(timings.items(), key=lambda item: item[1], reverse=True):
+        print(f'  {check_name:<28} {duration:8.1f} s')
+        log.info(f'Health check {check_name} took {duration:.1f} seconds')
+
+    # Keep the usual key order regardless of completion order
+    return {key: health_dict[key] for key, *_ in GENERAL_HEALTH_CHECKS if key in health_dict}
+
+
+def build_html_report(
+    phdl, html_file, gen_health_dict, start_time, snapshot_err_dict, snapshot_err_stats_dict, interval_jumps_dict=None
+):
+    # stats collection - rediscover the NIC topology so the report shows current link states
+    linux_utils.invalidate_topology(phdl)
     try:
         lshw_dict = linux_utils.get_lshw_network_dict(phdl)
     except Exception as e:
@@ -275,6 +308,16 @@ def build_html_report(phdl, html_file, gen_health_dict, start_time, snapshot_err
         'snaperrlogsrdmaid',
     )
 
+    # Counters that jumped between consecutive snapshots, with when and how fast
+    if interval_jumps_dict is not None:
+        html_lib.build_err_log_table(
+            html_file,
+            interval_jumps_dict,
+            'Per-interval counter jumps across all snapshots',
+            'snapintervaljumptable',
+            'snapintervaljumpid',
+        )
+
     html_lib.build_snapshot_stats_diff_table(
         html_file,
         snapshot_err_stats_dict['rdma_stats'],
@@ -313,6 +356,17 @@ def build_html_report(phdl, html_file, gen_health_dict, start_time, snapshot_err
     html_lib.build_html_page_footer(html_file)
 
 
+def record_snapshot(recorder, snapshot):
+    """Record a snapshot and report the counters that jumped since the previous one."""
+    for event in recorder.record(snapshot):
+        msg = recorder.format_event(event)
+        if event['level'] == 'ERROR':
+            log.error(msg)
+        else:
+            log.warning(msg)
+        print(msg)
+
+
 # Things to do
 # Html table comparison of error counters ..
 # check and add Pytorch, tensorflow error patterns
@@ -342,6 +396,23 @@ class CheckClusterHealthMonitor(MonitorPlugin):
             "--time_between_iters", type=int, default=60, help="Time duration to sleep between iterations"
         )
         parser.add_argument("--report_file", default="./cluster_report.html", help="Output HTML report file path")
+        parser.add_argument(
+            "--snapshot_dir",
+            default="./cluster_snapshots",
+            help="Directory holding the on-disk snapshot log of each run, in its own run-<date>-<time> "
+            "subdirectory (older runs are kept)",
+        )
+        parser.add_argument(
+            "--check_timeout",
+            type=int,
+            default=900,
+            help="Timeout in seconds for each of the general health checks (run concurrently)",
+        )
+        parser.add_argument(
+            "--sequential_checks",
+            action="store_true",
+            help="Run the general health checks one after another instead of concurrently",
+        )
         return parser
 
     def monitor(self, args):
@@ -364,17 +435,31 @@ class CheckClusterHealthMonitor(MonitorPlugin):
         start_time = phdl.exec('date')
 
         # Run general health checks and scan historic errors
-        gen_health_dict = general_health_checks(phdl)
+        gen_health_dict = general_health_checks(
+            phdl, parallel=not args.sequential_checks, check_timeout=args.check_timeout
+        )
+
+        # Every snapshot is streamed to disk and diffed against the previous one, so counter
+        # jumps in the middle of a long run are reported with the interval they happened in.
+        # Each run logs to its own subdirectory, whose iterations start at 0 again.
+        snapshot_dir = os.path.join(args.snapshot_dir, time.strftime('run-%Y%m%d-%H%M%S'))
+        recorder = SnapshotRecorder(
+            snapshot_dir,
+            verify_lib.warn_stats_pattern,
+            verify_lib.err_stats_pattern,
+            verify_lib.threshold_stats_pattern,
+            verify_lib.threshold_counter_val,
+        )
 
         # Take cluster metrics snapshot before iterations
-        snapshot_dict_before = verify_lib.create_cluster_metrics_snapshot(phdl)
+        snapshot_dict_before = verify_lib.create_cluster_metrics_snapshot(phdl, as_table=True)
+        recorder.record(snapshot_dict_before)
 
-        snapshot_iters_dict = {}
         for i in range(1, int(args.iterations) + 1):
             print('#------------------------------------------------------------#')
             print(f'Starting Iteration - {i}')
             print('#------------------------------------------------------------#')
-            snapshot_iters_dict[i] = verify_lib.create_cluster_metrics_snapshot(phdl)
+            record_snapshot(recorder, verify_lib.create_cluster_metrics_snapshot(phdl, as_table=True))
             print('#............................................................#')
             print(f'Waiting for {args.time_between_iters} for time between iterations - Iteration {i}')
             print('#............................................................#')
@@ -382,14 +467,26 @@ class CheckClusterHealthMonitor(MonitorPlugin):
 
         print('Completed all iterations, taking final snapshot for comparison')
 
-        snapshot_dict_after = verify_lib.create_cluster_metrics_snapshot(phdl)
+        snapshot_dict_after = verify_lib.create_cluster_metrics_snapshot(phdl, as_table=True)
+        record_snapshot(recorder, snapshot_dict_after)
+        recorder.close()
+        print(
+            f'Recorded {recorder.iterations} snapshots in {snapshot_dir}, '
+            f'{recorder.total_events} counter jumps across {len(recorder.jumped)} counters'
+        )
         (snapshot_err_logs_dict, snapshot_err_stats_dict) = verify_lib.compare_cluster_metrics_snapshots(
             snapshot_dict_before, snapshot_dict_after
         )
 
         # Build cluster html report
         build_html_report(
-            phdl, html_report_file, gen_health_dict, start_time, snapshot_err_logs_dict, snapshot_err_stats_dict
+            phdl,
+            html_report_file,
+            gen_health_dict,
+            start_time,
+            snapshot_err_logs_dict,
+            snapshot_err_stats_dict,
+            interval_jumps_dict=recorder.events_by_node(),
         )
 
         print(gen_health_dict)
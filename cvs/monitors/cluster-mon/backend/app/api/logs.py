@@ -3,14 +3,33 @@ System logs API endpoints.
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import Dict, Any
+from typing import Dict, Any, List, NamedTuple, Optional, Pattern, Tuple
 import logging
+import re
+import shlex
+import time
 from datetime import datetime
 
+from app.core.log_index import Word, required_words
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# grep flags taking an argument (-A 5 / -A5)
+_GREP_ARG_FLAGS = {'A', 'B', 'C', 'm'}
+
+_POSIX_CLASSES = {
+    '[:alpha:]': 'a-zA-Z',
+    '[:digit:]': '0-9',
+    '[:alnum:]': 'a-zA-Z0-9',
+    '[:upper:]': 'A-Z',
+    '[:lower:]': 'a-z',
+    '[:space:]': '\\s',
+    '[:xdigit:]': '0-9A-Fa-f',
+    '[:punct:]': '!-/:-@\\[-`{-~',
+}
+
 
 def validate_grep_command(grep_cmd: str) -> tuple[bool, str]:
     """
@@ -71,12 +90,166 @@ def validate_grep_command(grep_cmd: str) -> tuple[bool, str]:
     return True, ""
 
 
+class GrepQuery(NamedTuple):
+    """A grep pipeline translated for the log index."""
+
+    patterns: List[Tuple[Pattern, bool]]  # (regex, invert) per grep segment
+    words: List[Word]  # words every match contains
+    count: bool  # -c
+    max_count: Optional[int]  # -m N
+    only_matching: bool  # -o
+
+
+def _grep_to_python_regex(pattern: str, extended: bool) -> str:
+    """Translate a grep basic (BRE) or extended (ERE) regular expression to Python syntax."""
+    for posix, python in _POSIX_CLASSES.items():
+        pattern = pattern.replace(posix, python)
+    if extended:
+        return pattern
+    # BRE: \+ \? \| \( \) \{ \} are operators, the bare characters are literals
+    translated = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            translated.append(escaped if escaped in '+?|(){}' else char + escaped)
+            i += 2
+            continue
+        translated.append('\\' + char if char in '+?|(){}' else char)
+        i += 1
+    return ''.join(translated)
+
+
+def parse_grep_command(grep_cmd: str) -> GrepQuery:
+    """
+    Translate a validated grep/egrep pipeline into regexes for the log index.
+
+    Matching flags -i, -v, -E, -w, -x and output flags -c, -m, -o are honoured; -n and
+    the context flags -A/-B/-C are accepted and ignored (they only make sense on a stream).
+
+    Raises:
+        ValueError: If a segment has no pattern or the pattern is not a valid regex
+    """
+    patterns, words = [], []
+    count = only_matching = False
+    max_count = None
+
+    for segment in grep_cmd.split('|'):
+        segment = segment.strip()
+        if not segment:
+            continue
+        args = shlex.split(segment)
+        extended = args[0] == 'egrep'
+        flags = set()
+        pattern = None
+        i = 1
+        while i < len(args):
+            arg = args[i]
+            if arg.startswith('-') and len(arg) > 1 and pattern is None:
+                letters = arg[1:].split('=')[0]
+                for j, letter in enumerate(letters):
+                    if letter in _GREP_ARG_FLAGS:
+                        value = letters[j + 1 :] or (arg.split('=', 1)[1] if '=' in arg else None)
+                        if value is None and i + 1 < len(args):
+                            i += 1
+                            value = args[i]
+                        if letter == 'm' and value is not None and value.isdigit():
+                            max_count = int(value) if max_count is None else min(max_count, int(value))
+                        break
+                    flags.add(letter)
+            elif pattern is None:
+                pattern = arg
+            i += 1
+        if pattern is None:
+            raise ValueError(f"No pattern in: {segment}")
+
+        invert = 'v' in flags
+        count = count or 'c' in flags
+        only_matching = only_matching or 'o' in flags
+        regex = _grep_to_python_regex(pattern, extended or 'E' in flags)
+        if not invert:
+            words.extend(word for word in required_words(regex) if word not in words)
+        if 'w' in flags:
+            regex = rf'(?<!\w)(?:{regex})(?!\w)'
+        if 'x' in flags:
+            regex = rf'^(?:{regex})$'
+        try:
+            patterns.append((re.compile(regex, re.IGNORECASE if 'i' in flags else 0), invert))
+        except re.error as e:
+            raise ValueError(f"Invalid pattern '{pattern}': {e}")
+
+    return GrepQuery(patterns, words, count, max_count, only_matching)
+
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+
+async def _ready_log_index():
+    """The log index, after its first pull (later pulls run in the background)."""
+    from app.main import app_state, fetch_new_log_messages
+
+    return await app_state.log_index.ready(app_state.ssh_manager, fetch_new_log_messages)
+
+
+def _index_section(index, nodes: List[str], matches: Dict[str, list], error: str) -> Dict[str, Any]:
+    """{node: formatted lines} like the collectors return, with an error for nodes never pulled."""
+    section = {}
+    for node in nodes:
+        if node in matches:
+            section[node] = "\n".join(entry.format(decode=True) for entry in matches[node])
+        elif not index.is_ingested(node) and node in index.node_errors:
+            section[node] = {"error": error}
+        else:
+            section[node] = ""
+    return section
+
+
+async def _indexed_dmesg_errors(since: Optional[datetime], until: Optional[datetime]) -> Dict[str, Any]:
+    """The /dmesg sections, answered from the log index."""
+    from app.main import app_state
+    from app.collectors.logs_collector import AMD_LOG_EXCLUDE_PATTERN, AMD_LOG_PATTERN, USERSPACE_ERROR_PATTERN
+
+    index = await _ready_log_index()
+    nodes = list(app_state.ssh_manager.host_list)
+    window = {"since": _epoch(since), "until": _epoch(until)}
+
+    amd = index.search(
+        [(re.compile(AMD_LOG_PATTERN, re.I), False), (re.compile(AMD_LOG_EXCLUDE_PATTERN, re.I), True)],
+        sources=["kernel"],
+        max_level=4,
+        **window,
+    )
+    dmesg = index.search(sources=["kernel"], max_level=3, **window)
+    userspace = index.search(
+        [(re.compile(USERSPACE_ERROR_PATTERN, re.I), False)], sources=["kernel"], max_level=4, **window
+    )
+    journal = index.search(sources=["journal"], **window)
+
+    logger.info(f"API: Returning indexed logs - {len(amd)} nodes with AMD logs, {len(dmesg)} with dmesg errors")
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "amd_logs": _index_section(index, nodes, amd, "Failed to collect AMD logs"),
+        "dmesg_errors": _index_section(index, nodes, dmesg, "Failed to collect logs"),
+        "userspace_errors": _index_section(index, nodes, userspace, "Failed to collect logs"),
+        "journal_errors": _index_section(index, nodes, journal, "Failed to collect logs"),
+        "index_age_seconds": round(time.time() - index.ingested_at, 1),
+    }
+
+
 @router.get("/dmesg")
-async def get_dmesg_errors() -> Dict[str, Any]:
+async def get_dmesg_errors(
+    since: Optional[datetime] = Query(None, description="Only messages logged at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only messages logged before this time"),
+    live: bool = Query(False, description="Collect from the nodes over SSH instead of the log index"),
+) -> Dict[str, Any]:
     """
     Get dmesg error logs from all cluster nodes.
 
-    Collects: :emerg, :alert, :crit, :err level messages
+    Collects: :emerg, :alert, :crit, :err level messages (AMD and userspace sections up to :warn),
+    plus journal errors. Answered from the log index, which pulls new messages from the
+    nodes in the background; live=true runs the dmesg commands on every node instead.
     """
     from app.main import app_state
 
@@ -87,6 +260,9 @@ async def get_dmesg_errors() -> Dict[str, Any]:
         raise HTTPException(status_code=503, detail="SSH manager not initialized")
 
     try:
+        if not live:
+            return await _indexed_dmesg_errors(since, until)
+
         from app.collectors.logs_collector import LogsCollector
 
         collector = LogsCollector()
@@ -110,6 +286,47 @@ async def get_dmesg_errors() -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Failed to collect logs: {str(e)}")
 
 
+async def _search_log_index(
+    grep_command: str, query: GrepQuery, since: Optional[datetime], until: Optional[datetime], max_lines: int
+) -> Dict[str, Any]:
+    """Run a translated grep pipeline on the log index."""
+    from app.main import app_state
+
+    index = await _ready_log_index()
+    matches = index.search(query.patterns, query.words, since=_epoch(since), until=_epoch(until))
+
+    search_results, match_counts = {}, {}
+    for node, entries in matches.items():
+        if query.max_count is not None:
+            entries = entries[: query.max_count]
+        if not entries:
+            continue
+        match_counts[node] = len(entries)
+        if query.count:
+            search_results[node] = str(len(entries))
+            continue
+        if query.only_matching:
+            positive = [pattern for pattern, invert in query.patterns if not invert]
+            lines = [m.group(0) for entry in entries for m in positive[-1].finditer(entry.text)] if positive else []
+        else:
+            lines = [entry.format() for entry in entries]
+        search_results[node] = "\n".join(lines[:max_lines])
+
+    total_matches = sum(match_counts.values())
+    logger.info(f"Indexed search complete: {total_matches} matches on {len(search_results)} nodes")
+
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "grep_command": grep_command,
+        "results": search_results,
+        "match_counts": match_counts,
+        "total_matches": total_matches,
+        "total_nodes_searched": len(app_state.ssh_manager.host_list),
+        "nodes_with_results": len(search_results),
+        "index_age_seconds": round(time.time() - index.ingested_at, 1),
+    }
+
+
 @router.get("/search")
 async def search_dmesg_logs(
     grep_command: str = Query(
@@ -118,14 +335,25 @@ async def search_dmesg_logs(
         max_length=500,
         description="grep/egrep command (e.g., \"grep -i 'error' | grep -v 'vital'\")",
     ),
+    since: Optional[datetime] = Query(None, description="Only messages logged at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only messages logged before this time"),
+    max_lines: int = Query(5, ge=1, le=1000, description="Matching lines returned per node"),
+    live: bool = Query(False, description="Run the grep on every node's full dmesg over SSH"),
 ) -> Dict[str, Any]:
     """
     Search dmesg logs across all cluster nodes using custom grep command.
 
     Allows powerful grep/egrep pipe commands with strict validation for security.
+    By default the search runs on the log index (kernel messages up to :warn and journal
+    errors of every node), with full match counts; live=true greps each node's full dmesg
+    over SSH instead (first 5 lines per node, no counts).
 
     Args:
         grep_command: grep/egrep command with pipes (e.g., "grep -i 'error' | grep -v 'vital'")
+        since: Only messages logged at or after this time (log index only)
+        until: Only messages logged before this time (log index only)
+        max_lines: Matching lines returned per node (log index only)
+        live: Search over SSH instead of the log index
 
     Returns:
         {
@@ -135,7 +363,9 @@ async def search_dmesg_logs(
                 "node1": "first 5 matching lines",
                 "node2": "first 5 matching lines",
                 ...
-            }
+            },
+            "match_counts": {"node1": 12, ...},  # log index only
+            "total_matches": 12  # log index only
         }
     """
     from app.main import app_state
@@ -154,6 +384,17 @@ async def search_dmesg_logs(
 
     logger.info(f"Grep command validated successfully: {grep_command}")
 
+    if not live:
+        try:
+            query = parse_grep_command(grep_command)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid grep command: {e}")
+        try:
+            return await _search_log_index(grep_command, query, since, until, max_lines)
+        except Exception as e:
+            logger.error(f"API: Failed to search log index: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to search logs: {str(e)}")
+
     try:
         # Build safe command: sudo dmesg -T | <validated_grep_command> | head -5
         # Add head -5 to limit output per node
@@ -2,6 +2,8 @@
 Metrics API endpoints.
 """
 
+import asyncio
+
 from fastapi import APIRouter, HTTPException, Query
 from typing import Dict, Any, Optional
 
@@ -27,28 +29,43 @@ async def get_latest_metrics() -> Dict[str, Any]:
 async def get_metrics_history(
     node: Optional[str] = Query(None, description="Filter by node hostname"),
     metric_type: Optional[str] = Query(None, description="Filter by metric type (gpu|nic)"),
-    duration: int = Query(3600, description="Time range in seconds (default: 1 hour)"),
+    duration: int = Query(3600, gt=0, description="Time range in seconds (default: 1 hour)"),
+    metric: Optional[str] = Query(None, description="Filter by series name substring (e.g. temperature)"),
+    max_points: int = Query(300, gt=0, le=5000, description="Maximum points per series (downsampled)"),
 ) -> Dict[str, Any]:
     """
-    Get historical metrics.
-
-    Note: This is a placeholder. In production, this would query InfluxDB.
+    Get historical metrics from the embedded time-series store.
 
     Args:
         node: Optional node filter
         metric_type: Optional metric type filter
         duration: Time range in seconds
+        metric: Optional series name filter
+        max_points: Maximum number of points per series
 
     Returns:
-        Historical metrics data
+        Historical metrics data, averaged into at most max_points time buckets
     """
-    # TODO: Implement InfluxDB query
-    return {
-        "message": "Historical metrics not yet implemented",
-        "note": "This will query InfluxDB in production",
-        "params": {
-            "node": node,
-            "metric_type": metric_type,
-            "duration": duration,
-        },
+    from app.main import app_state
+
+    if metric_type is not None and metric_type not in ("gpu", "nic"):
+        raise HTTPException(status_code=400, detail="metric_type must be 'gpu' or 'nic'")
+    if app_state.metrics_history is None:
+        raise HTTPException(status_code=503, detail="Metrics history not available yet")
+
+    history = await asyncio.to_thread(
+        app_state.metrics_history.query,
+        node=node,
+        metric_type=metric_type,
+        duration=duration,
+        max_points=max_points,
+        metric=metric,
+    )
+    history["params"] = {
+        "node": node,
+        "metric_type": metric_type,
+        "duration": duration,
+        "metric": metric,
+        "max_points": max_points,
     }
+    return history
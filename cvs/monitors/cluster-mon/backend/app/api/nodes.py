@@ -2,18 +2,22 @@
 Node-level API endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
-from app.api.cluster import check_node_health
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from typing import Dict, Any
+from app.core.node_summary import respond_json
 
 router = APIRouter()
 
 
 @router.get("")
-async def list_nodes() -> List[Dict[str, Any]]:
+async def list_nodes(request: Request) -> Response:
     """
     List all cluster nodes with basic status.
 
+    Served from the per-node summary index built once per polling round; the response
+    carries an ETag and a matching If-None-Match gets 304 Not Modified.
+
     Returns:
         [
             {
@@ -22,135 +26,19 @@ async def list_nodes() -> List[Dict[str, Any]]:
                 "gpu_count": 8,
                 "avg_gpu_util": 75.5,
                 "avg_gpu_temp": 68.2,
+                "avg_gpu_power": 550.0,
                 "health_issues": []
             },
             ...
         ]
     """
-    from app.main import app_state
+    from app.main import app_state, refresh_node_summary
 
     if not app_state.ssh_manager:
-        return []
-
-    nodes_list = []
-    gpu_data = app_state.latest_metrics.get("gpu", {})
-    util_data = gpu_data.get("utilization", {})
-    temp_data = gpu_data.get("temperature", {})
-
-    # Process all configured nodes (use stable status from app_state)
-    all_nodes = app_state.ssh_manager.host_list
-
-    for node in all_nodes:
-        # Get stable status (requires 5 consecutive failures to change)
-        stable_status = app_state.node_health_status.get(node, 'healthy')
-
-        # Check for hardware health issues
-        has_metrics_error = node in util_data and isinstance(util_data[node], dict) and 'error' in util_data[node]
-        health_status, health_issues = check_node_health(node, gpu_data, has_metrics_error)
-
-        # Use stable status if it's unreachable
-        if stable_status == 'unreachable':
-            health_status = 'unreachable'
-            health_issues = [f'Unreachable after {app_state.node_failure_count.get(node, 0)} consecutive failures']
-
-        node_info = {
-            "hostname": node,
-            "status": health_status,
-            "gpu_count": 0,
-            "avg_gpu_util": 0.0,
-            "avg_gpu_temp": 0.0,
-            "health_issues": health_issues,
-        }
-
-        # Calculate GPU stats - handle both list and dict formats
-        if node in util_data:
-            node_util = util_data[node]
-
-            # Handle list format (new amd-smi format)
-            if isinstance(node_util, list):
-                node_info["gpu_count"] = len(node_util)
-                total_util = 0
-                for gpu_entry in node_util:
-                    if isinstance(gpu_entry, dict):
-                        # Try different field names for utilization
-                        usage = gpu_entry.get("usage", {})
-                        if isinstance(usage, dict):
-                            gfx_activity = usage.get("gfx_activity", {})
-                            if isinstance(gfx_activity, dict):
-                                util = gfx_activity.get("value", 0)
-                            else:
-                                util = 0
-                        else:
-                            util = gpu_entry.get("GPU use (%)", 0)
-                        total_util += float(util) if util else 0
-
-                node_info["avg_gpu_util"] = (
-                    round(total_util / node_info["gpu_count"], 2) if node_info["gpu_count"] > 0 else 0
-                )
-
-            # Handle dict format (old rocm-smi format)
-            elif isinstance(node_util, dict) and 'error' not in node_util:
-                node_info["gpu_count"] = len(node_util)
-                total_util = 0
-                for gpu_metrics in node_util.values():
-                    if isinstance(gpu_metrics, dict):
-                        util = gpu_metrics.get("GPU use (%)", 0)
-                        total_util += float(util) if util else 0
-
-                node_info["avg_gpu_util"] = (
-                    round(total_util / node_info["gpu_count"], 2) if node_info["gpu_count"] > 0 else 0
-                )
-
-        if node in temp_data:
-            node_temp = temp_data[node]
-            total_temp = 0
-            temp_count = 0
-
-            # Handle list format (new amd-smi format)
-            if isinstance(node_temp, list):
-                for gpu_entry in node_temp:
-                    if isinstance(gpu_entry, dict):
-                        # Try to get temperature from new format
-                        temp_data_field = gpu_entry.get("temperature", {})
-                        if isinstance(temp_data_field, dict):
-                            # Try different sensor names
-                            temp = temp_data_field.get(
-                                "hotspot", temp_data_field.get("edge", temp_data_field.get("junction", 0))
-                            )
-                            if isinstance(temp, dict):
-                                temp = temp.get("value", 0)
-                        else:
-                            temp = 0
-                        if temp:
-                            try:
-                                total_temp += float(temp)
-                                temp_count += 1
-                            except (ValueError, TypeError):
-                                pass
-
-            # Handle dict format (old rocm-smi format)
-            elif isinstance(node_temp, dict) and 'error' not in node_temp:
-                for gpu_temp in node_temp.values():
-                    if isinstance(gpu_temp, dict):
-                        # Try junction (hotspot) first, then edge, then memory
-                        temp = gpu_temp.get(
-                            "Temperature (Sensor junction) (C)",
-                            gpu_temp.get(
-                                "Temperature (Sensor edge) (C)", gpu_temp.get("Temperature (Sensor memory) (C)", 0)
-                            ),
-                        )
-                        if temp:
-                            try:
-                                total_temp += float(temp)
-                                temp_count += 1
-                            except (ValueError, TypeError):
-                                pass
-
-            node_info["avg_gpu_temp"] = round(total_temp / temp_count, 2) if temp_count > 0 else 0
-
-        nodes_list.append(node_info)
+        return JSONResponse([])
 
-    return nodes_list
+    index = app_state.node_summary or refresh_node_summary()
+    return respond_json(request, index.nodes_body, index.nodes_etag)
 
 
 @router.get("/{node_id}")
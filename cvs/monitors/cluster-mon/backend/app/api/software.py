@@ -4,18 +4,16 @@ Software information API endpoints for GPU and NIC.
 
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
-import time
 
 router = APIRouter()
 
 
-@router.get("/gpu")
-async def get_gpu_software_info() -> Dict[str, Any]:
+async def _cached_software_info(name: str, description: str) -> Dict[str, Any]:
     """
-    Get GPU software information (ROCM, firmware, drivers, libraries).
+    Return a software inventory cache payload immediately, with its age.
 
-    Returns cached data (TTL: 180 seconds) since software rarely changes.
-    Returns immediately with cached data while refreshing in background if needed.
+    A stale cache is refreshed in the background; only a request made before the first
+    refresh has completed waits for it.
     """
     from app.main import app_state
 
@@ -23,30 +21,20 @@ async def get_gpu_software_info() -> Dict[str, Any]:
         raise HTTPException(status_code=503, detail="SSH manager not initialized")
 
     try:
-        current_time = time.time()
-        cache_age = current_time - app_state.gpu_software_cache_time
-
-        # If cache is valid (less than 180 seconds old), return it immediately
-        if cache_age < app_state.software_cache_ttl and app_state.cached_gpu_software:
-            return app_state.cached_gpu_software
-
-        # If cache is stale or empty, collect new data
-        from app.collectors.gpu_software_collector import GPUSoftwareCollector
-
-        collector = GPUSoftwareCollector()
-        software_info = await collector.collect_all_software_info(app_state.ssh_manager)
+        return await app_state.software_caches[name].get(app_state.ssh_manager)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to collect {description}: {str(e)}")
 
-        # Update cache
-        app_state.cached_gpu_software = software_info
-        app_state.gpu_software_cache_time = current_time
 
-        return software_info
+@router.get("/gpu")
+async def get_gpu_software_info() -> Dict[str, Any]:
+    """
+    Get GPU software information (ROCM, firmware, drivers, libraries).
 
-    except Exception as e:
-        # If collection fails but we have cached data, return it
-        if app_state.cached_gpu_software:
-            return app_state.cached_gpu_software
-        raise HTTPException(status_code=500, detail=f"Failed to collect GPU software info: {str(e)}")
+    Returns cached data (refreshed every 180 seconds) since software rarely changes,
+    with cache_age_seconds and refreshing fields.
+    """
+    return await _cached_software_info("gpu", "GPU software info")
 
 
 @router.get("/nic")
@@ -54,39 +42,10 @@ async def get_nic_software_info() -> Dict[str, Any]:
     """
     Get NIC software information (firmware, drivers, statistics).
 
-    Returns cached data (TTL: 180 seconds) since software rarely changes.
-    Returns immediately with cached data while refreshing in background if needed.
+    Returns cached data (refreshed every 180 seconds) since software rarely changes,
+    with cache_age_seconds and refreshing fields.
     """
-    from app.main import app_state
-
-    if not app_state.ssh_manager:
-        raise HTTPException(status_code=503, detail="SSH manager not initialized")
-
-    try:
-        current_time = time.time()
-        cache_age = current_time - app_state.nic_software_cache_time
-
-        # If cache is valid (less than 180 seconds old), return it immediately
-        if cache_age < app_state.software_cache_ttl and app_state.cached_nic_software:
-            return app_state.cached_nic_software
-
-        # If cache is stale or empty, collect new data
-        from app.collectors.nic_software_collector import NICSoftwareCollector
-
-        collector = NICSoftwareCollector()
-        software_info = await collector.collect_all_software_info(app_state.ssh_manager)
-
-        # Update cache
-        app_state.cached_nic_software = software_info
-        app_state.nic_software_cache_time = current_time
-
-        return software_info
-
-    except Exception as e:
-        # If collection fails but we have cached data, return it
-        if app_state.cached_nic_software:
-            return app_state.cached_nic_software
-        raise HTTPException(status_code=500, detail=f"Failed to collect NIC software info: {str(e)}")
+    return await _cached_software_info("nic", "NIC software info")
 
 
 @router.get("/nic/advanced")
@@ -94,38 +53,10 @@ async def get_nic_advanced_info() -> Dict[str, Any]:
     """
     Get advanced NIC information (PCIe, congestion control).
 
-    Returns cached data (TTL: 180 seconds) for instant display.
+    Returns cached data (refreshed every 180 seconds) for instant display,
+    with cache_age_seconds and refreshing fields.
     """
-    from app.main import app_state
-
-    if not app_state.ssh_manager:
-        raise HTTPException(status_code=503, detail="SSH manager not initialized")
-
-    try:
-        current_time = time.time()
-        cache_age = current_time - app_state.nic_advanced_cache_time
-
-        # If cache is valid (less than 180 seconds old), return it immediately
-        if cache_age < app_state.software_cache_ttl and app_state.cached_nic_advanced:
-            return app_state.cached_nic_advanced
-
-        # If cache is stale or empty, collect new data
-        from app.collectors.nic_advanced_collector import NICAdvancedCollector
-
-        collector = NICAdvancedCollector()
-        advanced_info = await collector.collect_all_nic_advanced_info(app_state.ssh_manager)
-
-        # Update cache
-        app_state.cached_nic_advanced = advanced_info
-        app_state.nic_advanced_cache_time = current_time
-
-        return advanced_info
-
-    except Exception as e:
-        # If collection fails but we have cached data, return it
-        if app_state.cached_nic_advanced:
-            return app_state.cached_nic_advanced
-        raise HTTPException(status_code=500, detail=f"Failed to collect NIC advanced info: {str(e)}")
+    return await _cached_software_info("nic_advanced", "NIC advanced info")
 
 
 @router.get("/nic/devlink")
@@ -0,0 +1,164 @@
+"""
+Batched per-node metrics collection.
+
+Runs every GPU and NIC polling command on each node in a single SSH round trip.
+A small python3 script (amd-smi already requires python3 on the nodes) executes the
+commands locally on the node and prints one framed JSON document with the output of each
+command. The document is split back into the per-command {host: output} dictionaries the
+GPU/NIC collectors already know how to parse.
+"""
+
+import base64
+import json
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Section name -> (group, command). Commands in the same group run one after another on the
+# node (amd-smi calls do not like running concurrently), groups run in parallel. Each group
+# shares the exec timeout, so a slow command only loses its own section, not the node.
+COLLECTION_COMMANDS = {
+    "amd_smi_metric": ("gpu", "amd-smi metric --json"),
+    "amd_smi_pcie": ("gpu", "amd-smi metric --pcie --json"),
+    "amd_smi_xgmi": ("gpu", "amd-smi metric --xgmi-err --json"),
+    "amd_smi_ecc": ("gpu", "amd-smi metric --ecc --json"),
+    "rdma_link": ("rdma", "rdma link"),
+    "rdma_stats": ("rdma", "rdma statistic show --json 2>/dev/null || echo '{}'"),
+    "rdma_res": ("rdma", "rdma res"),
+    "ip_addr": ("ip", "ip addr show | grep -A 5 mtu --color=never"),
+    "ip_link_stats": ("ip", "ip -s link show"),
+    "lldp": ("lldp", "sudo lldpctl -f json 2>/dev/null || echo '{}'"),
+}
+
+FRAME_BEGIN = "<<CVS_BATCH_BEGIN>>"
+FRAME_END = "<<CVS_BATCH_END>>"
+
+# Seconds of the exec timeout reserved for shipping the script and returning the frame
+EXEC_TIMEOUT_SLACK = 10
+
+_REMOTE_SCRIPT = """
+import json
+import subprocess
+import threading
+import time
+
+COMMANDS = {commands}
+TIMEOUT = {timeout}
+BUDGET = {budget}
+result = {{}}
+deadline = time.time() + BUDGET
+
+
+def run_group(names):
+    for i, name in enumerate(names):
+        cmd = COMMANDS[name][1]
+        # Fair share of what is left of the budget; time a fast command leaves goes to the next ones
+        timeout = min(TIMEOUT, (deadline - time.time()) / (len(names) - i))
+        if timeout <= 0:
+            result[name] = {{"rc": -1, "out": "ERROR: Timeout budget exhausted before running: %s" % cmd}}
+            continue
+        try:
+            p = subprocess.run(["bash", "-c", cmd], stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+            out = p.stdout.decode("utf-8", "replace") + p.stderr.decode("utf-8", "replace")
+            result[name] = {{"rc": p.returncode, "out": out}}
+        except subprocess.TimeoutExpired:
+            result[name] = {{"rc": -1, "out": "ERROR: Timeout after %.0fs running: %s" % (timeout, cmd)}}
+
+
+groups = {{}}
+for name, (group, _) in COMMANDS.items():
+    groups.setdefault(group, []).append(name)
+threads = [threading.Thread(target=run_group, args=(names,)) for names in groups.values()]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+
+print("{begin}")
+print(json.dumps(result))
+print("{end}")
+"""
+
+
+class BatchMetricsCollector:
+    """Collects the output of all polling commands from every node with one exec per poll."""
+
+    def __init__(self, commands: Dict[str, tuple] = None, command_timeout: int = 60):
+        self.commands = commands or COLLECTION_COMMANDS
+        self.command_timeout = command_timeout
+
+    def build_command(self, exec_timeout: int = 120) -> str:
+        """
+        Build the single remote command for one poll.
+
+        Args:
+            exec_timeout: Timeout of the SSH exec running the command. The commands of a group
+                share it (less EXEC_TIMEOUT_SLACK), each capped at command_timeout, so the
+                frame is printed before the exec times out.
+
+        The script is shipped base64 encoded so it survives any quoting applied by the
+        SSH manager (jump host wrapping included).
+        """
+        script = _REMOTE_SCRIPT.format(
+            commands=repr(self.commands),
+            timeout=self.command_timeout,
+            budget=max(exec_timeout - EXEC_TIMEOUT_SLACK, 1),
+            begin=FRAME_BEGIN,
+            end=FRAME_END,
+        )
+        encoded = base64.b64encode(script.encode("utf-8")).decode("ascii")
+        return f"echo {encoded} | base64 -d | python3 -"
+
+    def parse_batch_output(self, output: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+        """
+        Split per-node framed JSON documents into per-command outputs.
+
+        Args:
+            output: Dictionary mapping host -> raw output of the batched command
+
+        Returns:
+            Dictionary mapping section name -> {host: command output}. A node whose batched
+            exec failed gets the same ERROR/ABORT string for every section, so collectors
+            report it exactly like a failed individual command.
+        """
+        sections = {name: {} for name in self.commands}
+
+        for host, out_str in output.items():
+            error = None
+            doc = None
+            if out_str.startswith("ERROR") or out_str.startswith("ABORT"):
+                error = out_str
+            else:
+                begin = out_str.find(FRAME_BEGIN)
+                end = out_str.find(FRAME_END, begin + 1)
+                if begin < 0 or end < 0:
+                    error = f"ERROR: Batched collection returned no frame: {out_str.strip()[:200]}"
+                else:
+                    try:
+                        doc = json.loads(out_str[begin + len(FRAME_BEGIN) : end])
+                    except json.JSONDecodeError as e:
+                        error = f"ERROR: Batched collection frame is not valid JSON: {e}"
+
+            if error is not None:
+                logger.warning(f"Batched collection failed on {host}: {error[:200]}")
+                for name in sections:
+                    sections[name][host] = error
+                continue
+
+            for name in sections:
+                entry = doc.get(name) or {}
+                sections[name][host] = entry.get("out", "")
+
+        return sections
+
+    async def collect(self, ssh_manager, timeout: int = 120) -> Dict[str, Dict[str, str]]:
+        """
+        Run all polling commands on every node in one round trip.
+
+        Returns:
+            Dictionary mapping section name (see COLLECTION_COMMANDS) -> {host: command output}
+        """
+        logger.info(f"Collecting {len(self.commands)} metric commands per node in one batched exec")
+        output = await ssh_manager.exec_async(self.build_command(timeout), timeout=timeout)
+        return self.parse_batch_output(output)
@@ -5,7 +5,7 @@ Adapted from CVS rocm_plib.py
 
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -81,7 +81,7 @@ class GPUMetricsCollector:
         """
         logger.info("Collecting GPU utilization")
         # Use amd-smi metric which provides comprehensive GPU metrics
-        output = ssh_manager.exec("amd-smi metric --json", timeout=120)
+        output = await ssh_manager.exec_async("amd-smi metric --json", timeout=120)
         return self.parse_json_output(output)
 
     async def collect_gpu_memory(self, ssh_manager) -> Dict[str, Any]:
@@ -100,7 +100,7 @@ class GPUMetricsCollector:
             }
         """
         logger.info("Collecting GPU memory usage")
-        output = ssh_manager.exec("amd-smi metric --json", timeout=120)
+        output = await ssh_manager.exec_async("amd-smi metric --json", timeout=120)
         return self.parse_json_output(output)
 
     async def collect_gpu_temperature(self, ssh_manager) -> Dict[str, Any]:
@@ -120,7 +120,7 @@ class GPUMetricsCollector:
         """
         logger.info("Collecting GPU temperature")
         # amd-smi metric provides temperature in the main metric output
-        output = ssh_manager.exec("amd-smi metric --json", timeout=120)
+        output = await ssh_manager.exec_async("amd-smi metric --json", timeout=120)
         return self.parse_json_output(output)
 
     async def collect_gpu_power(self, ssh_manager) -> Dict[str, Any]:
@@ -139,7 +139,7 @@ class GPUMetricsCollector:
             }
         """
         logger.info("Collecting GPU power metrics")
-        output = ssh_manager.exec("amd-smi metric --power --json", timeout=120)
+        output = await ssh_manager.exec_async("amd-smi metric --power --json", timeout=120)
         return self.parse_json_output(output)
 
     async def collect_gpu_metrics(self, ssh_manager) -> Dict[str, Any]:
@@ -158,7 +158,7 @@ class GPUMetricsCollector:
             }
         """
         logger.info("Collecting comprehensive GPU metrics")
-        output = ssh_manager.exec("amd-smi metric --json", timeout=120)
+        output = await ssh_manager.exec_async("amd-smi metric --json", timeout=120)
         return self.parse_json_output(output)
 
     async def collect_pcie_metrics(self, ssh_manager) -> Dict[str, Any]:
@@ -177,7 +177,7 @@ class GPUMetricsCollector:
             }
         """
         logger.info("Collecting PCIe metrics")
-        output = ssh_manager.exec("amd-smi metric --pcie --json", timeout=120)
+        output = await ssh_manager.exec_async("amd-smi metric --pcie --json", timeout=120)
         return self.parse_json_output(output)
 
     async def collect_xgmi_metrics(self, ssh_manager) -> Dict[str, Any]:
@@ -196,7 +196,7 @@ class GPUMetricsCollector:
             }
         """
         logger.info("Collecting XGMI metrics")
-        output = ssh_manager.exec("amd-smi metric --xgmi-err --json", timeout=120)
+        output = await ssh_manager.exec_async("amd-smi metric --xgmi-err --json", timeout=120)
         logger.info('%%%%%%%%%%%')
         logger.info('parsed value of xgmi')
         logger.info(output)
@@ -219,7 +219,7 @@ class GPUMetricsCollector:
             }
         """
         logger.info("Collecting RAS error metrics")
-        output = ssh_manager.exec("amd-smi metric --ecc --json", timeout=120)
+        output = await ssh_manager.exec_async("amd-smi metric --ecc --json", timeout=120)
         logger.info('%%%%%%%%%%')
         logger.info('Output of ecc')
         logger.info(output)
@@ -239,7 +239,7 @@ class GPUMetricsCollector:
             }
         """
         logger.info("Collecting GPU info")
-        output = ssh_manager.exec("rocm-smi --loglevel error --showproductname --json", timeout=120)
+        output = await ssh_manager.exec_async("rocm-smi --loglevel error --showproductname --json", timeout=120)
         return self.parse_json_output(output)
 
     async def collect_pcie_info(self, ssh_manager) -> Dict[str, Any]:
@@ -259,13 +259,13 @@ class GPUMetricsCollector:
         logger.info("Collecting PCIe link info via lspci")
 
         # First get BDF (Bus/Device/Function) addresses from amd-smi
-        static_output = ssh_manager.exec("amd-smi static --json", timeout=120)
+        static_output = await ssh_manager.exec_async("amd-smi static --json", timeout=120)
         static_data = self.parse_json_output(static_output)
 
         # OPTIMIZATION: Run lspci once per node instead of once per GPU
         # This reduces 288 commands (36 nodes * 8 GPUs) to just 36 commands!
         logger.info("Running lspci once per node (optimized)")
-        lspci_output = ssh_manager.exec("bash -c 'sudo lspci -vvv 2>/dev/null'", timeout=120)
+        lspci_output = await ssh_manager.exec_async("bash -c 'sudo lspci -vvv 2>/dev/null'", timeout=120)
 
         pcie_info = {}
         import re
@@ -311,11 +311,18 @@ class GPUMetricsCollector:
 
         return pcie_info
 
-    async def collect_all_metrics(self, ssh_manager) -> Dict[str, Any]:
+    async def collect_all_metrics(
+        self, ssh_manager, batch: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
         """
         Collect all GPU metrics.
         Optimized to call amd-smi metric --json once and parse all data from it.
 
+        Args:
+            ssh_manager: SSH manager used when no batch is given
+            batch: Per-command outputs from BatchMetricsCollector.collect(); when given, no
+                   extra round trips are made
+
         Returns:
             {
                 "timestamp": "2025-02-11T12:00:00Z",
@@ -329,34 +336,32 @@ class GPUMetricsCollector:
                 "info": {...}
             }
         """
-        import asyncio
-
         logger.info("Collecting all GPU metrics")
 
-        # OPTIMIZATION: Call amd-smi metric --json ONCE to get ALL data
-        # This single command includes: utilization, memory, temperature, PCIe, XGMI, and ECC metrics
-        logger.info("Calling amd-smi metric --json for comprehensive GPU data")
-        amd_smi_output = await asyncio.to_thread(ssh_manager.exec, "amd-smi metric --json")
+        if batch is not None:
+            amd_smi_output = batch["amd_smi_metric"]
+            pcie_output = batch["amd_smi_pcie"]
+            xgmi_output = batch["amd_smi_xgmi"]
+            ecc_output = batch["amd_smi_ecc"]
+        else:
+            # amd-smi metric --json includes utilization, memory, temperature and power;
+            # dedicated commands give cleaner PCIe, XGMI and ECC data
+            logger.info("Calling amd-smi metric --json for comprehensive GPU data")
+            amd_smi_output = await ssh_manager.exec_async("amd-smi metric --json")
+            pcie_output = await ssh_manager.exec_async("amd-smi metric --pcie --json")
+            xgmi_output = await ssh_manager.exec_async("amd-smi metric --xgmi-err --json")
+            ecc_output = await ssh_manager.exec_async("amd-smi metric --ecc --json")
+
         amd_smi_data = self.parse_json_output(amd_smi_output)
+        pcie_data = self.parse_json_output(pcie_output)
+        xgmi_data = self.parse_json_output(xgmi_output)
+        ecc_data = self.parse_json_output(ecc_output)
 
         # Parse all metrics from single amd-smi output
         utilization = self._parse_utilization_from_amd_smi(amd_smi_data)
         memory = self._parse_memory_from_amd_smi(amd_smi_data)
         temperature = self._parse_temperature_from_amd_smi(amd_smi_data)
 
-        # Call dedicated commands for PCIe and ECC for cleaner data
-        logger.info("Collecting PCIe metrics with dedicated command")
-        pcie_output = await asyncio.to_thread(ssh_manager.exec, "amd-smi metric --pcie --json")
-        pcie_data = self.parse_json_output(pcie_output)
-
-        logger.info("Collecting XGMI metrics with dedicated command")
-        xgmi_output = await asyncio.to_thread(ssh_manager.exec, "amd-smi metric --xgmi-err --json")
-        xgmi_data = self.parse_json_output(xgmi_output)
-
-        logger.info("Collecting ECC/RAS metrics with dedicated command")
-        ecc_output = await asyncio.to_thread(ssh_manager.exec, "amd-smi metric --ecc --json")
-        ecc_data = self.parse_json_output(ecc_output)
-
         # Parse for frontend display
         pcie_info = self._parse_pcie_metrics_from_amd_smi(pcie_data)
 
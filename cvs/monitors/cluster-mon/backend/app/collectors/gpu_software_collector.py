@@ -15,6 +15,14 @@ logger = logging.getLogger(__name__)
 class GPUSoftwareCollector:
     """Collects GPU software and firmware information."""
 
+    # Per-node fingerprint of everything collect_all_software_info reports: boot id (firmware
+    # is loaded at boot), ROCm version, loaded amdgpu build, VBIOS and package database changes
+    FINGERPRINT_CMD = (
+        "bash -c 'cat /proc/sys/kernel/random/boot_id /opt/rocm*/.info/version /sys/module/amdgpu/srcversion "
+        "/sys/class/drm/card*/device/vbios_version 2>/dev/null; "
+        "stat -c %Y /var/lib/dpkg/status /var/lib/rpm /lib/firmware/amdgpu 2>/dev/null' | md5sum"
+    )
+
     @staticmethod
     def parse_json_output(output_dict: Dict[str, str]) -> Dict[str, Any]:
         """Parse JSON output from command execution."""
@@ -183,13 +191,11 @@ class GPUSoftwareCollector:
 
         return lib_info
 
-    async def collect_all_software_info(self, ssh_manager) -> Dict[str, Any]:
+    async def collect_version_summary(self, ssh_manager) -> Dict[str, Any]:
         """
-        Collect all GPU software information.
+        Collect ROCm, AMD SMI and amdgpu driver versions.
 
-        OPTIMIZATION: Use minimal commands:
-        - amd-smi version --json (for ROCm, AMDSMI, and amdgpu driver versions)
-        - amd-smi firmware --json (for firmware versions per GPU)
+        Command: amd-smi version --json
 
         amd-smi version --json output format:
         [{
@@ -200,16 +206,9 @@ class GPUSoftwareCollector:
             "amdgpu_version": "6.16.6",
             "amd_hsmp_driver_version": "N/A"
         }]
-
-        Returns consolidated software info for all nodes.
         """
-
-        logger.info("Collecting all GPU software information (optimized)")
-
-        # IMPORTANT: Run commands SEQUENTIALLY to avoid parallel-ssh thread safety issues
-        # asyncio.gather() was causing "munmap_chunk(): invalid pointer" crashes
+        logger.info("Collecting AMD SMI version summary")
         version_output = await ssh_manager.exec_async("amd-smi version --json", timeout=60)
-        firmware_output = await ssh_manager.exec_async("amd-smi firmware --json", timeout=120)
 
         # Parse amd-smi version --json output
         rocm_version_info = {}
@@ -234,8 +233,25 @@ class GPUSoftwareCollector:
             else:
                 rocm_version_info[host] = {'rocm_version': 'N/A', 'amdgpu_version': 'N/A'}
 
-        # Parse firmware
-        gpu_firmware = self.parse_json_output(firmware_output) if isinstance(firmware_output, dict) else {}
+        return rocm_version_info
+
+    async def collect_all_software_info(self, ssh_manager) -> Dict[str, Any]:
+        """
+        Collect all GPU software information.
+
+        OPTIMIZATION: Use minimal commands:
+        - amd-smi version --json (for ROCm, AMDSMI, and amdgpu driver versions)
+        - amd-smi firmware --json (for firmware versions per GPU)
+
+        Returns consolidated software info for all nodes.
+        """
+
+        logger.info("Collecting all GPU software information (optimized)")
+
+        # IMPORTANT: Run commands SEQUENTIALLY to avoid parallel-ssh thread safety issues
+        # asyncio.gather() was causing "munmap_chunk(): invalid pointer" crashes
+        rocm_version_info = await self.collect_version_summary(ssh_manager)
+        gpu_firmware = await self.collect_gpu_firmware(ssh_manager)
 
         software_info = {
             "timestamp": datetime.utcnow().isoformat() + "Z",
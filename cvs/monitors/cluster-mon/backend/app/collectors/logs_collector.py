@@ -2,16 +2,172 @@
 System logs collector for dmesg errors.
 """
 
+import base64
+import json
 import logging
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Filters of the /api/logs/dmesg sections, applied to kernel messages up to warn level
+AMD_LOG_PATTERN = r"PCIe|XGMI|amdgpu|epyc|cpu|ionic|bnxt|mlnx|mellanox|Link|error|fail"
+AMD_LOG_EXCLUDE_PATTERN = r"vital buffer"
+USERSPACE_ERROR_PATTERN = (
+    r"oom|out of memory|killed process|segfault|general protection|call trace|bug:|hardware error|mce|"
+    r"stack trace|pytorch|torch|tensorflow|megatron|jax|vllm|sglang|triton.*error|triton.*exception|triton.*failed"
+)
+
+FRAME_BEGIN = "<<CVS_LOGS_BEGIN>>"
+FRAME_END = "<<CVS_LOGS_END>>"
+
+# Prints the kernel (emerg..warn) and journal (emerg..err) messages logged at or after the
+# node's cursor. The kernel cursor only applies to the same boot id (dmesg timestamps restart
+# at every boot), the journal cursor to the same machine id; without one, up to MAX_LINES
+# messages are backfilled. Messages at the cursor timestamp itself are returned again and
+# deduplicated by LogIndex, since several can share one timestamp.
+_INGEST_SCRIPT = """
+import json
+import subprocess
+import time
+
+CURSOR = {cursor}
+MAX_LINES = {max_lines}
+BACKFILL_SECONDS = {backfill_seconds}
+TIMEOUT = {timeout}
+
+
+def read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def run(cmd):
+    try:
+        p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=TIMEOUT)
+        return p.stdout.decode("utf-8", "replace")
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+
+
+boot_id = read("/proc/sys/kernel/random/boot_id")
+machine_id = read("/etc/machine-id")
+now = time.time()
+doc = {{"boot_id": boot_id, "machine_id": machine_id, "boot_time": now - float(read("/proc/uptime").split()[0])}}
+
+since = CURSOR["kmsg"] if CURSOR and CURSOR["boot_id"] == boot_id else -1.0
+kmsg = []
+for line in run(["sudo", "dmesg", "-r", "-l", "emerg,alert,crit,err,warn"]).splitlines():
+    if line.startswith("<") and ">[" in line and "]" in line:
+        prio, _, rest = line[1:].partition(">[")
+        stamp, _, text = rest.partition("]")
+        try:
+            kmsg.append([int(prio), float(stamp), text[1:] if text.startswith(" ") else text])
+        except ValueError:
+            continue
+    elif kmsg and line.strip():
+        kmsg[-1][2] += " " + line.strip()
+doc["kmsg"] = [entry for entry in kmsg if entry[1] >= since][-MAX_LINES:]
+
+cursor = CURSOR["journal"] if CURSOR and CURSOR["machine_id"] == machine_id else 0
+start = int(cursor / 1e6) if cursor else int(now - BACKFILL_SECONDS)
+journal = []
+cmd = ["sudo", "journalctl", "-q", "--no-pager", "-o", "json", "-p", "err", "-n", str(MAX_LINES), "--since", "@%d" % start]
+for line in run(cmd).splitlines():
+    try:
+        entry = json.loads(line)
+        stamp = int(entry["__REALTIME_TIMESTAMP"])
+        prio = int(entry.get("SYSLOG_FACILITY", 1)) * 8 + int(entry.get("PRIORITY", 3))
+    except (ValueError, KeyError, TypeError):
+        continue
+    message = entry.get("MESSAGE")
+    if stamp < cursor or entry.get("_TRANSPORT") == "kernel" or not isinstance(message, str):
+        continue
+    journal.append([prio, stamp, entry.get("SYSLOG_IDENTIFIER") or entry.get("_COMM") or "", message])
+doc["journal"] = journal
+
+print("{begin}")
+print(json.dumps(doc))
+print("{end}")
+"""
+
 
 class LogsCollector:
     """Collects system error logs from dmesg."""
 
+    def build_ingest_command(
+        self, cursor: Optional[Dict[str, Any]], max_lines: int, backfill_seconds: int, timeout: int = 60
+    ) -> str:
+        """
+        Build the remote command returning the log messages of one node since its cursor.
+
+        Args:
+            cursor: {"boot_id", "kmsg": last dmesg timestamp, "machine_id", "journal": last
+                realtime usec} of the node (see LogIndex.cursors), None for a first pull
+            max_lines: Most recent messages returned per stream
+            backfill_seconds: Journal history read when a node has no journal cursor yet
+            timeout: Per-command timeout on the node
+
+        The script is shipped base64 encoded, like the batched metrics script.
+        """
+        script = _INGEST_SCRIPT.format(
+            cursor=repr(cursor),
+            max_lines=int(max_lines),
+            backfill_seconds=int(backfill_seconds),
+            timeout=int(timeout),
+            begin=FRAME_BEGIN,
+            end=FRAME_END,
+        )
+        encoded = base64.b64encode(script.encode("utf-8")).decode("ascii")
+        return f"echo {encoded} | base64 -d | python3 -"
+
+    async def collect_new_messages(
+        self,
+        ssh_manager,
+        cursors: Dict[str, Optional[Dict[str, Any]]],
+        max_lines: int = 5000,
+        backfill_seconds: int = 604800,
+    ) -> Dict[str, Any]:
+        """
+        Collect the kernel and journal error messages logged since the last collection.
+
+        Args:
+            cursors: {node: cursor} of the nodes to pull from; each node is only sent its own
+                cursor, so the command size doesn't grow with the cluster
+
+        Returns:
+            {
+                "node1": {"boot_id": ..., "machine_id": ..., "boot_time": epoch,
+                          "kmsg": [[priority, dmesg timestamp, text], ...],
+                          "journal": [[priority, realtime usec, identifier, text], ...]},
+                "node2": "ERROR: ...",
+                ...
+            }
+        """
+        cmds = {
+            node: self.build_ingest_command(cursor, max_lines, backfill_seconds) for node, cursor in cursors.items()
+        }
+        output = await ssh_manager.exec_async(cmds, timeout=120, print_console=False)
+
+        messages = {}
+        for node, out_str in output.items():
+            if out_str.startswith("ERROR") or out_str.startswith("ABORT"):
+                messages[node] = out_str
+                continue
+            begin = out_str.find(FRAME_BEGIN)
+            end = out_str.find(FRAME_END, begin + 1)
+            if begin < 0 or end < 0:
+                messages[node] = f"ERROR: Log collection returned no frame: {out_str.strip()[:200]}"
+                continue
+            try:
+                messages[node] = json.loads(out_str[begin + len(FRAME_BEGIN) : end])
+            except json.JSONDecodeError as e:
+                messages[node] = f"ERROR: Log collection frame is not valid JSON: {e}"
+        return messages
+
     async def collect_dmesg_errors(self, ssh_manager) -> Dict[str, Any]:
         """
         Collect critical system errors from dmesg.
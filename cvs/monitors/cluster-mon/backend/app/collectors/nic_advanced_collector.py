@@ -15,6 +15,12 @@ logger = logging.getLogger(__name__)
 class NICAdvancedCollector:
     """Collects vendor-specific NIC information and congestion metrics."""
 
+    # Per-node fingerprint of the PCIe inventory: boot id, PCI device set and NIC link speed/width
+    FINGERPRINT_CMD = (
+        "bash -c 'cat /proc/sys/kernel/random/boot_id /sys/class/net/*/device/current_link_speed "
+        "/sys/class/net/*/device/current_link_width 2>/dev/null; ls /sys/bus/pci/devices' | md5sum"
+    )
+
     async def collect_nic_pcie_info(self, ssh_manager) -> Dict[str, Any]:
         """
         Collect PCIe information for all NICs using lspci.
@@ -6,7 +6,7 @@ Adapted from CVS linux_utils.py
 import re
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -33,7 +33,11 @@ class NICMetricsCollector:
             }
         """
         logger.info("Collecting RDMA link info")
-        output = ssh_manager.exec("rdma link", timeout=60)
+        output = await ssh_manager.exec_async("rdma link", timeout=60)
+        return self._parse_rdma_links(output)
+
+    def _parse_rdma_links(self, output: Dict[str, str]) -> Dict[str, Any]:
+        """Parse `rdma link` output (host -> command output)."""
 
         rdma_dict = {}
         for node, out_str in output.items():
@@ -82,7 +86,13 @@ class NICMetricsCollector:
         """
         logger.info("Collecting RDMA statistics (includes congestion control metrics)")
         # Use bash -c to properly handle shell redirection and || operator
-        output = ssh_manager.exec("bash -c 'rdma statistic show --json 2>/dev/null || echo \"{}\"'", timeout=60)
+        output = await ssh_manager.exec_async(
+            "bash -c 'rdma statistic show --json 2>/dev/null || echo \"{}\"'", timeout=60
+        )
+        return self._parse_rdma_stats(output)
+
+    def _parse_rdma_stats(self, output: Dict[str, str]) -> Dict[str, Any]:
+        """Parse `rdma statistic show --json` output (host -> command output)."""
 
         logger.info(f"RDMA stats output received from {len(output)} nodes")
 
@@ -165,7 +175,11 @@ class NICMetricsCollector:
 
         # Run 'ip -s link' once per node to get all interface stats
         cmd = "ip -s link show"
-        output = ssh_manager.exec(cmd, timeout=60)
+        output = await ssh_manager.exec_async(cmd, timeout=60)
+        return self._parse_ip_link_stats(output)
+
+    def _parse_ip_link_stats(self, output: Dict[str, str]) -> Dict[str, Any]:
+        """Parse `ip -s link show` output (host -> command output)."""
 
         eth_stats = {}
 
@@ -263,7 +277,11 @@ class NICMetricsCollector:
             }
         """
         logger.info("Collecting IP address info")
-        output = ssh_manager.exec("bash -c 'ip addr show | grep -A 5 mtu --color=never'", timeout=60)
+        output = await ssh_manager.exec_async("bash -c 'ip addr show | grep -A 5 mtu --color=never'", timeout=60)
+        return self._parse_ip_addr(output)
+
+    def _parse_ip_addr(self, output: Dict[str, str]) -> Dict[str, Any]:
+        """Parse `ip addr show` output (host -> command output)."""
 
         ip_dict = {}
 
@@ -339,7 +357,11 @@ class NICMetricsCollector:
         """
         logger.info("Collecting LLDP info")
         # Use bash -c to properly handle shell redirection and || operator
-        output = ssh_manager.exec("bash -c 'sudo lldpctl -f json 2>/dev/null || echo \"{}\"'", timeout=60)
+        output = await ssh_manager.exec_async("bash -c 'sudo lldpctl -f json 2>/dev/null || echo \"{}\"'", timeout=60)
+        return self._parse_lldp(output)
+
+    def _parse_lldp(self, output: Dict[str, str]) -> Dict[str, Any]:
+        """Parse `lldpctl -f json` output (host -> command output)."""
 
         lldp_dict = {}
         for node, out_str in output.items():
@@ -420,9 +442,16 @@ class NICMetricsCollector:
 
         return filtered_lldp
 
-    async def collect_all_metrics(self, ssh_manager) -> Dict[str, Any]:
+    async def collect_all_metrics(
+        self, ssh_manager, batch: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
         """
-        Collect all NIC metrics in parallel.
+        Collect all NIC metrics.
+
+        Args:
+            ssh_manager: SSH manager used when no batch is given
+            batch: Per-command outputs from BatchMetricsCollector.collect(); when given, no
+                   extra round trips are made
 
         Returns:
             {
@@ -437,37 +466,29 @@ class NICMetricsCollector:
 
         logger.info("Collecting all NIC metrics")
 
-        # Collect SEQUENTIALLY (one command completes before next starts)
-        rdma_links = await self.collect_rdma_links(ssh_manager)
-        rdma_stats = await self.collect_rdma_stats(ssh_manager)
-        ip_addr = await self.collect_ip_addr(ssh_manager)
-        lldp = await self.collect_lldp(ssh_manager)
-        results = [rdma_links, rdma_stats, ip_addr, lldp]
-
-        # Get interface info first for ethtool
-        ip_data = results[2] if not isinstance(results[2], Exception) else {}
-
-        # Build interface list for ethtool
-        interfaces = {}
-        for node, iface_data in ip_data.items():
-            if isinstance(iface_data, dict) and "error" not in iface_data:
-                interfaces[node] = list(iface_data.keys())
-
-        # Collect ethtool stats with interface list
-        ethtool_stats = await self.collect_ethtool_stats(ssh_manager, interfaces)
-
-        # Collect RDMA resources
-        rdma_res = await self.collect_rdma_resources(ssh_manager)
+        if batch is not None:
+            rdma_links_data = self._parse_rdma_links(batch["rdma_link"])
+            rdma_stats = self._parse_rdma_stats(batch["rdma_stats"])
+            ip_data = self._parse_ip_addr(batch["ip_addr"])
+            lldp_data = self._parse_lldp(batch["lldp"])
+            ethtool_stats = self._parse_ip_link_stats(batch["ip_link_stats"])
+            rdma_res = self._parse_rdma_resources(batch["rdma_res"])
+        else:
+            # Collect SEQUENTIALLY (one command completes before next starts)
+            rdma_links_data = await self.collect_rdma_links(ssh_manager)
+            rdma_stats = await self.collect_rdma_stats(ssh_manager)
+            ip_data = await self.collect_ip_addr(ssh_manager)
+            lldp_data = await self.collect_lldp(ssh_manager)
+            ethtool_stats = await self.collect_ethtool_stats(ssh_manager)
+            rdma_res = await self.collect_rdma_resources(ssh_manager)
 
         # Filter LLDP data to only include RDMA interfaces
-        rdma_links_data = results[0] if not isinstance(results[0], Exception) else {}
-        lldp_data = results[3] if not isinstance(results[3], Exception) else {}
         filtered_lldp = self._filter_lldp_by_rdma(lldp_data, rdma_links_data)
 
         metrics = {
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "rdma_links": rdma_links_data,
-            "rdma_stats": results[1] if not isinstance(results[1], Exception) else {},
+            "rdma_stats": rdma_stats,
             "rdma_resources": rdma_res,
             "ip_addr": ip_data,
             "lldp": filtered_lldp,
@@ -490,7 +511,11 @@ class NICMetricsCollector:
             }
         """
         logger.info("Collecting RDMA resources")
-        output = ssh_manager.exec("rdma res", timeout=60)
+        output = await ssh_manager.exec_async("rdma res", timeout=60)
+        return self._parse_rdma_resources(output)
+
+    def _parse_rdma_resources(self, output: Dict[str, str]) -> Dict[str, Any]:
+        """Parse `rdma res` output (host -> command output)."""
 
         rdma_res = {}
         for node, out_str in output.items():
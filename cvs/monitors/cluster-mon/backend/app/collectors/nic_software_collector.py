@@ -10,12 +10,22 @@ import logging
 from typing import Dict, Any
 from datetime import datetime
 
+from app.core.inventory_cache import HostSubset
+
 logger = logging.getLogger(__name__)
 
 
 class NICSoftwareCollector:
     """Collects NIC software, firmware, and detailed statistics."""
 
+    # Per-node fingerprint of the NIC inventory (firmware, drivers, PCI devices): boot id,
+    # interface set, RDMA firmware, loaded driver builds and package database changes
+    FINGERPRINT_CMD = (
+        "bash -c 'cat /proc/sys/kernel/random/boot_id /sys/class/infiniband/*/fw_ver "
+        "/sys/class/net/*/device/driver/module/srcversion 2>/dev/null; ls /sys/class/net /sys/bus/pci/devices; "
+        "stat -c %Y /var/lib/dpkg/status /var/lib/rpm 2>/dev/null' | md5sum"
+    )
+
     async def collect_nic_firmware_version(self, ssh_manager) -> Dict[str, Any]:
         """
         Collect NIC firmware versions.
@@ -41,7 +51,7 @@ class NICSoftwareCollector:
 
             for iface in interfaces[:10]:  # Limit to first 10 interfaces
                 cmd = f"sudo ethtool -i {iface} 2>/dev/null"
-                output = await ssh_manager.exec_async(cmd, timeout=60)
+                output = await HostSubset(ssh_manager, [host]).exec_async(cmd, timeout=60)
 
                 if host in output and output[host]:
                     info = {}
@@ -75,14 +85,18 @@ class NICSoftwareCollector:
 
         driver_info = {}
 
+        # Each command runs once on all nodes, results are split per node below
+        mlx_output = await ssh_manager.exec_async(commands[0], timeout=60)
+        bnxt_output = await ssh_manager.exec_async(commands[1], timeout=60)
+        amd_output = await ssh_manager.exec_async(commands[2], timeout=60)
+
         for host in ssh_manager.reachable_hosts:
             driver_info[host] = {}
 
             # Check Mellanox (NVIDIA CX7)
-            output = await ssh_manager.exec_async(commands[0], timeout=60)
-            if host in output and output[host] and "modinfo" not in output[host]:
+            if host in mlx_output and mlx_output[host] and "modinfo" not in mlx_output[host]:
                 mlx_info = {}
-                for line in output[host].split("\n"):
+                for line in mlx_output[host].split("\n"):
                     if ":" in line:
                         key, value = line.split(":", 1)
                         mlx_info[key.strip()] = value.strip()
@@ -90,10 +104,9 @@ class NICSoftwareCollector:
                     driver_info[host]["mlx5_core"] = mlx_info
 
             # Check Broadcom (Thor2)
-            output = await ssh_manager.exec_async(commands[1], timeout=60)
-            if host in output and output[host] and "modinfo" not in output[host]:
+            if host in bnxt_output and bnxt_output[host] and "modinfo" not in bnxt_output[host]:
                 bnxt_info = {}
-                for line in output[host].split("\n"):
+                for line in bnxt_output[host].split("\n"):
                     if ":" in line:
                         key, value = line.split(":", 1)
                         bnxt_info[key.strip()] = value.strip()
@@ -101,10 +114,9 @@ class NICSoftwareCollector:
                     driver_info[host]["bnxt_en"] = bnxt_info
 
             # Check AMD AINIC
-            output = await ssh_manager.exec_async(commands[2], timeout=60)
-            if host in output and output[host] and "Not loaded" not in output[host]:
+            if host in amd_output and amd_output[host] and "Not loaded" not in amd_output[host]:
                 amd_info = {}
-                for line in output[host].split("\n"):
+                for line in amd_output[host].split("\n"):
                     if ":" in line:
                         key, value = line.split(":", 1)
                         amd_info[key.strip()] = value.strip()
@@ -191,7 +203,7 @@ class NICSoftwareCollector:
 
             for iface in interfaces[:10]:  # Limit to first 10
                 cmd = f"sudo ethtool -S {iface} 2>/dev/null"
-                output = await ssh_manager.exec_async(cmd, timeout=60)
+                output = await HostSubset(ssh_manager, [host]).exec_async(cmd, timeout=60)
 
                 if host in output and output[host] and "NOT_AVAILABLE" not in output[host]:
                     stats = {}
@@ -0,0 +1,311 @@
+"""
+Asyncio-native remote execution backend.
+
+Runs commands on many hosts concurrently on the event loop using asyncssh, with a
+bounded number of in-flight sessions, a per-host timeout and proper cancellation.
+Used behind Pssh.exec_async and JumpHostPssh.exec_async so a slow node never blocks
+the WebSocket broadcast or the API handlers.
+"""
+
+import asyncio
+import logging
+import os
+import shlex
+from typing import Callable, Dict, List, Optional, Union
+
+# asyncssh is optional - callers fall back to running the blocking exec() in a thread
+try:
+    import asyncssh
+
+    ASYNCSSH_AVAILABLE = True
+except ImportError:
+    asyncssh = None  # type: ignore
+    ASYNCSSH_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Connection failures that mean the node (not the command) is the problem
+if ASYNCSSH_AVAILABLE:
+    _UNREACHABLE_ERRORS = (OSError, asyncssh.DisconnectError, asyncssh.ChannelOpenError)
+else:
+    _UNREACHABLE_ERRORS = (OSError,)
+
+
+class JumpHostConnectionError(Exception):
+    """Raised when the jump host itself cannot be reached (not attributed to any node)."""
+
+
+class AsyncSSHEngine:
+    """
+    Base class: fan a command out to hosts with bounded concurrency and per-host timeouts.
+
+    Subclasses implement _run_on_host(). Results use the same string conventions as the
+    blocking Pssh classes: command output on success, "ABORT: ..." when the host could not
+    be reached or timed out, "ERROR: ..." for any other failure.
+    """
+
+    def __init__(self, max_concurrency: int = 50, default_timeout: Optional[int] = 120):
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self._loop = None
+        self._semaphore = None
+
+    def _bind_loop(self):
+        """Reset loop-bound state when called from a different event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._reset_connections()
+
+    def _reset_connections(self):
+        pass
+
+    async def _run_on_host(self, host: str, cmd: str, timeout: Optional[int]) -> str:
+        raise NotImplementedError
+
+    async def _exec_one(self, host: str, cmd: str, timeout: Optional[int], on_unreachable: Optional[Callable]) -> str:
+        async with self._semaphore:
+            try:
+                if timeout:
+                    return await asyncio.wait_for(self._run_on_host(host, cmd, timeout), timeout)
+                return await self._run_on_host(host, cmd, timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"[{host}] Command timed out after {timeout}s")
+                return f"ABORT: Timeout Error in Host: {host}"
+            except _UNREACHABLE_ERRORS as e:
+                logger.warning(f"[{host}] Connection failed: {e}")
+                self._drop_connection(host)
+                if on_unreachable:
+                    on_unreachable(host)
+                return f"ABORT: Host Unreachable Error - {str(e)[:100]}"
+            except Exception as e:
+                logger.error(f"[{host}] Exception: {e}")
+                return f"ERROR: {str(e)}"
+
+    def _drop_connection(self, host: str):
+        pass
+
+    async def exec(
+        self,
+        hosts: List[str],
+        cmd: Union[str, Dict[str, str]],
+        timeout: Optional[int] = None,
+        on_unreachable: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, str]:
+        """
+        Run cmd on all hosts concurrently.
+
+        Args:
+            hosts: Hosts to run on
+            cmd: Shell command, or {host: command} to run a different command on each host
+            timeout: Per-host timeout in seconds (defaults to default_timeout)
+            on_unreachable: Called with the host name when a host cannot be connected to
+
+        Returns:
+            Dictionary mapping host -> output string, in the order of hosts
+
+        Cancelling the awaiting task cancels every in-flight host command.
+        """
+        self._bind_loop()
+        timeout = timeout if timeout is not None else self.default_timeout
+        per_host = cmd if isinstance(cmd, dict) else dict.fromkeys(hosts, cmd)
+        outputs = await asyncio.gather(
+            *(self._exec_one(host, per_host[host], timeout, on_unreachable) for host in hosts)
+        )
+        return dict(zip(hosts, outputs))
+
+    def close(self):
+        """Close all connections held by the engine."""
+        self._reset_connections()
+
+
+class DirectAsyncSSHEngine(AsyncSSHEngine):
+    """
+    Direct SSH to each node (optionally through a proxy host), one cached connection per host.
+    Dead connections are dropped and redialed on the next command.
+    """
+
+    def __init__(
+        self,
+        user: str,
+        password: Optional[str] = None,
+        pkey: Optional[str] = None,
+        proxy_host: Optional[str] = None,
+        proxy_user: Optional[str] = None,
+        proxy_password: Optional[str] = None,
+        proxy_pkey: Optional[str] = None,
+        connect_timeout: int = 30,
+        max_concurrency: int = 50,
+        default_timeout: Optional[int] = 120,
+    ):
+        super().__init__(max_concurrency=max_concurrency, default_timeout=default_timeout)
+        self.user = user
+        self.password = password
+        self.pkey = os.path.expanduser(pkey) if pkey else None
+        self.proxy_host = proxy_host
+        self.proxy_user = proxy_user
+        self.proxy_password = proxy_password
+        self.proxy_pkey = os.path.expanduser(proxy_pkey) if proxy_pkey else None
+        self.connect_timeout = connect_timeout
+        self._connections = {}
+        self._connecting = {}
+        self._tunnel = None
+        self._tunnel_lock = None
+
+    def _reset_connections(self):
+        self._connections = {}
+        self._connecting = {}
+        self._tunnel = None
+        self._tunnel_lock = asyncio.Lock()
+
+    def _drop_connection(self, host: str):
+        conn = self._connections.pop(host, None)
+        if conn is not None:
+            conn.close()
+
+    async def _get_tunnel(self):
+        if self.proxy_host is None:
+            return None
+        async with self._tunnel_lock:
+            if self._tunnel is None or self._tunnel.is_closed():
+                try:
+                    self._tunnel = await asyncssh.connect(
+                        self.proxy_host,
+                        username=self.proxy_user or self.user,
+                        password=self.proxy_password,
+                        client_keys=[self.proxy_pkey] if self.proxy_pkey else None,
+                        known_hosts=None,
+                        connect_timeout=self.connect_timeout,
+                    )
+                except (OSError, asyncssh.Error) as e:
+                    raise JumpHostConnectionError(f"Proxy host connection failed: {e}") from e
+            return self._tunnel
+
+    async def _connect(self, host: str):
+        return await asyncssh.connect(
+            host,
+            username=self.user,
+            password=self.password,
+            client_keys=[self.pkey] if self.pkey and self.password is None else None,
+            known_hosts=None,
+            tunnel=await self._get_tunnel(),
+            connect_timeout=self.connect_timeout,
+            keepalive_interval=30,
+        )
+
+    async def _get_connection(self, host: str):
+        conn = self._connections.get(host)
+        if conn is not None and not conn.is_closed():
+            return conn
+        # Coalesce concurrent connects to the same host into one handshake
+        pending = self._connecting.get(host)
+        if pending is None:
+            pending = asyncio.ensure_future(self._connect(host))
+            self._connecting[host] = pending
+        try:
+            conn = await asyncio.shield(pending)
+        finally:
+            if self._connecting.get(host) is pending and pending.done():
+                del self._connecting[host]
+        self._connections[host] = conn
+        return conn
+
+    async def _run_on_host(self, host: str, cmd: str, timeout: Optional[int]) -> str:
+        conn = await self._get_connection(host)
+        # The process context closes the channel on timeout/cancellation
+        async with conn.create_process(cmd, stderr=asyncssh.STDOUT) as process:
+            stdout, _ = await process.communicate()
+        return stdout or ""
+
+    def close(self):
+        for conn in self._connections.values():
+            conn.close()
+        if self._tunnel is not None:
+            self._tunnel.close()
+        self._reset_connections()
+
+
+class JumpHostAsyncSSHEngine(AsyncSSHEngine):
+    """
+    Reach nodes by running ssh on the jump host, using the node key stored there.
+    All node commands are multiplexed as channels over a single jump host connection, so
+    max_concurrency must stay below the jump host's sshd MaxSessions.
+    """
+
+    def __init__(
+        self,
+        jump_host: str,
+        jump_user: str,
+        jump_password: Optional[str] = None,
+        jump_pkey: Optional[str] = None,
+        target_user: Optional[str] = None,
+        target_pkey: Optional[str] = None,
+        connect_timeout: int = 30,
+        max_concurrency: int = 5,
+        default_timeout: Optional[int] = 60,
+    ):
+        super().__init__(max_concurrency=max_concurrency, default_timeout=default_timeout)
+        self.jump_host = jump_host
+        self.jump_user = jump_user
+        self.jump_password = jump_password
+        self.jump_pkey = os.path.expanduser(jump_pkey) if jump_pkey else None
+        self.target_user = target_user
+        self.target_pkey = target_pkey
+        self.connect_timeout = connect_timeout
+        self._jump_conn = None
+        self._jump_lock = None
+
+    def _reset_connections(self):
+        self._jump_conn = None
+        self._jump_lock = asyncio.Lock()
+
+    async def _get_jump_connection(self):
+        async with self._jump_lock:
+            if self._jump_conn is None or self._jump_conn.is_closed():
+                logger.info(f"Opening async connection to jump host: {self.jump_host}")
+                try:
+                    self._jump_conn = await asyncssh.connect(
+                        self.jump_host,
+                        username=self.jump_user,
+                        password=self.jump_password,
+                        client_keys=[self.jump_pkey] if self.jump_pkey and not self.jump_password else None,
+                        known_hosts=None,
+                        connect_timeout=self.connect_timeout,
+                        keepalive_interval=30,
+                    )
+                except (OSError, asyncssh.Error) as e:
+                    raise JumpHostConnectionError(f"Jump host connection failed: {e}") from e
+            return self._jump_conn
+
+    def _wrap_command(self, host: str, cmd: str, timeout: Optional[int]) -> str:
+        # timeout on the jump host makes sure the ssh process does not outlive a cancelled channel
+        return (
+            f"timeout {timeout or 60} ssh -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null "
+            "-o ConnectTimeout=30 -o ConnectionAttempts=2 -o BatchMode=yes "
+            f"-i {self.target_pkey} {self.target_user}@{host} {shlex.quote(cmd)}"
+        )
+
+    async def _run_on_host(self, host: str, cmd: str, timeout: Optional[int]) -> str:
+        conn = await self._get_jump_connection()
+        try:
+            process = await conn.create_process(self._wrap_command(host, cmd, timeout))
+        except asyncssh.ChannelOpenError as e:
+            # Out of sessions on the jump host, not a node failure
+            raise JumpHostConnectionError(f"Jump host channel open failed: {e}") from e
+        async with process:
+            stdout, stderr = await process.communicate()
+        if stderr and any(
+            x in stderr.lower()
+            for x in ['connection timed out', 'connection refused', 'no route to host', 'host is down']
+        ):
+            # The jump host is fine, the node behind it is not
+            raise ConnectionRefusedError(stderr.strip())
+        if stderr and not stdout:
+            return f"ERROR: {stderr}"
+        return stdout or ""
+
+    def close(self):
+        if self._jump_conn is not None:
+            self._jump_conn.close()
+        self._reset_connections()
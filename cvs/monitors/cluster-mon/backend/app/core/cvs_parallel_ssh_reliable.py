@@ -19,7 +19,10 @@ from paramiko import SSHClient
 from scp import SCPClient
 
 # TCP probe for fast reachability detection
-from app.core.host_probe import discover_reachable_hosts
+from app.core.host_probe import HostRttTracker, async_discover_reachable_hosts, discover_reachable_hosts
+
+# Non-blocking execution backend for exec_async()
+from app.core.async_ssh import ASYNCSSH_AVAILABLE, DirectAsyncSSHEngine
 
 # Module-level logger
 logger = logging.getLogger(__name__)
@@ -28,6 +31,54 @@ logger = logging.getLogger(__name__)
 _ssh_lock = threading.Lock()
 
 
+# set_client_hosts and close_session intentionally duplicate the helpers of cvs/lib/parallel_ssh_lib.py:
+# the cluster-mon backend is deployed standalone and does not import the cvs package.
+def set_client_hosts(client, hosts):
+    """
+    Change the host list of a ParallelSSHClient in place, keeping the established session
+    of every host that stays.
+
+    ParallelSSHClient keys its sessions by (index, host), so assigning client.hosts directly
+    drops the session of every host whose index shifts - removing host 0 of 600 would redial
+    the other 599. The surviving sessions are re-keyed to their new index instead, new hosts
+    are dialed lazily on the next command.
+
+    Returns:
+        list: Sessions of the hosts that were removed, for the caller to close (see close_session).
+    """
+    hosts = list(hosts)
+    host_clients = getattr(client, '_host_clients', None)
+    if not isinstance(host_clients, dict):
+        client.hosts = hosts
+        return []
+
+    sessions = {}
+    for (_, host), session in host_clients.items():
+        sessions.setdefault(host, []).append(session)
+    host_clients.clear()
+    client.hosts = hosts
+    for i, host in enumerate(hosts):
+        if sessions.get(host):
+            host_clients[(i, host)] = sessions[host].pop(0)
+    return [session for remaining in sessions.values() for session in remaining]
+
+
+def close_session(session):
+    """
+    Tear down the transport of a pssh SSHClient session now.
+
+    SSHClient.disconnect() is a deprecated no-op in parallel-ssh 2.x; _disconnect() is what
+    the client runs when it is de-allocated.
+    """
+    disconnect = getattr(session, '_disconnect', None)
+    if disconnect is None:
+        return
+    try:
+        disconnect()
+    except Exception:
+        pass
+
+
 class Pssh:
     """
     ParallelSessions - Uses the pssh library that is based of Paramiko, that lets you take
@@ -63,6 +114,25 @@ class Pssh:
         self.unreachable_hosts = []
         self.proxy_host = proxy_host
         self.timeout = timeout
+        # Connect RTT history per host, gives each host an adaptive probe timeout
+        self.rtt_tracker = HostRttTracker()
+
+        # asyncio backend used by exec_async(); shares nothing with the blocking ParallelSSHClient
+        self.async_engine = None
+        if ASYNCSSH_AVAILABLE:
+            self.async_engine = DirectAsyncSSHEngine(
+                user=self.user,
+                password=self.password,
+                pkey=self.pkey if self.password is None else None,
+                proxy_host=proxy_host,
+                proxy_user=proxy_user,
+                proxy_password=proxy_password,
+                proxy_pkey=proxy_pkey,
+                connect_timeout=timeout,
+                max_concurrency=50,
+            )
+        else:
+            logger.warning("asyncssh not installed - exec_async() will run exec() in a worker thread")
 
         # Build client parameters
         # Set num_retries=1 (one retry) for faster failure on unreachable nodes
@@ -105,7 +175,7 @@ class Pssh:
         logger.info(f"Probing {len(host_list)} hosts for reachability...")
         probe_start = time.time()
         self.reachable_hosts, self.unreachable_hosts = discover_reachable_hosts(
-            host_list, port=22, timeout=5, max_workers=100
+            host_list, port=22, timeout=5, rtt_tracker=self.rtt_tracker
         )
         probe_duration = time.time() - probe_start
         logger.info(
@@ -166,10 +236,27 @@ class Pssh:
         to detect nodes that have come online or gone offline.
         """
         logger.info("Refreshing host reachability...")
-        old_reachable = set(self.reachable_hosts)
 
         # Re-probe all original hosts
-        new_reachable, new_unreachable = discover_reachable_hosts(self.host_list, port=22, timeout=5, max_workers=100)
+        new_reachable, new_unreachable = discover_reachable_hosts(
+            self.host_list, port=22, timeout=5, rtt_tracker=self.rtt_tracker
+        )
+        return self._update_reachability(new_reachable, new_unreachable)
+
+    async def refresh_host_reachability_async(self):
+        """
+        Same as refresh_host_reachability, but probes on the caller's event loop
+        instead of tying up a worker thread.
+        """
+        logger.info("Refreshing host reachability...")
+        new_reachable, new_unreachable = await async_discover_reachable_hosts(
+            self.host_list, port=22, timeout=5, rtt_tracker=self.rtt_tracker
+        )
+        return self._update_reachability(new_reachable, new_unreachable)
+
+    def _update_reachability(self, new_reachable, new_unreachable):
+        """Store new probe results, returns True if the reachable host list changed."""
+        old_reachable = set(self.reachable_hosts)
 
         # Check for changes
         new_reachable_set = set(new_reachable)
@@ -189,10 +276,14 @@ class Pssh:
 
         return len(old_reachable) != len(new_reachable_set) or old_reachable != new_reachable_set
 
-    def recreate_client(self):
+    def recreate_client(self, force=False):
         """
-        Recreate ParallelSSHClient with current reachable_hosts.
+        Bring the ParallelSSHClient in line with the current reachable_hosts.
         Called after host reachability changes are detected.
+
+        Hosts that went away are removed and hosts that came back are added in place, so
+        sessions to every other host survive a flapping node. force=True (or no client yet)
+        builds a new client, used for the periodic refresh of stale connections.
         """
         if not self.reachable_hosts:
             logger.warning("No reachable hosts! Clearing client.")
@@ -204,6 +295,11 @@ class Pssh:
                 self.client = None
             return
 
+        if self.client is not None and not force:
+            with _ssh_lock:
+                self._sync_client_hosts()
+            return
+
         logger.info(f"Recreating ParallelSSHClient with {len(self.reachable_hosts)} reachable hosts...")
 
         # Disconnect old client
@@ -229,6 +325,38 @@ class Pssh:
         self.client = ParallelSSHClient(self.reachable_hosts, **client_params)
         logger.info("✅ ParallelSSHClient recreated successfully")
 
+    def _sync_client_hosts(self):
+        """Apply reachable_hosts to the running client in place, closing the sessions of removed hosts."""
+        old_hosts = set(self.client.hosts)
+        removed = old_hosts - set(self.reachable_hosts)
+        added = set(self.reachable_hosts) - old_hosts
+        if not removed and not added and len(old_hosts) == len(self.reachable_hosts):
+            return
+        for session in set_client_hosts(self.client, self.reachable_hosts):
+            close_session(session)
+        logger.info(
+            f"Updated ParallelSSHClient hosts in place: {len(removed)} removed, {len(added)} added, "
+            f"{len(self.reachable_hosts) - len(added)} sessions kept"
+        )
+
+    def remove_hosts(self, hosts):
+        """Move hosts to the unreachable list and drop them from the running client in place."""
+        hosts = [host for host in hosts if host in self.reachable_hosts]
+        self.reachable_hosts = [host for host in self.reachable_hosts if host not in hosts]
+        self.unreachable_hosts = self.unreachable_hosts + [host for host in hosts if host not in self.unreachable_hosts]
+        if self.client is not None:
+            self._sync_client_hosts()
+
+    def add_hosts(self, hosts):
+        """Move hosts back to the reachable list, they are dialed on the next command."""
+        hosts = [host for host in hosts if host not in self.reachable_hosts]
+        self.unreachable_hosts = [host for host in self.unreachable_hosts if host not in hosts]
+        self.reachable_hosts = self.reachable_hosts + hosts
+        if self.client is not None:
+            self._sync_client_hosts()
+        else:
+            self.recreate_client()
+
     def _handle_connection_failure(self):
         """
         Handle connection failures during command execution.
@@ -252,33 +380,15 @@ class Pssh:
         of potential unreachability, so we perform an additional connectivity check before pruning. This ensures
         that hosts are not permanently removed from the list for recoverable errors.
         """
-        initial_unreachable_len = len(self.unreachable_hosts)
         failed_hosts = [
             item.host for item in output if item.exception and isinstance(item.exception, (ConnectionError, Timeout))
         ]
         unreachable = self.check_connectivity(failed_hosts)
         for host in unreachable:
             print(f"Host {host} is unreachable, pruning from reachable hosts list.")
-            self.unreachable_hosts.append(host)
-            self.reachable_hosts.remove(host)
-        if len(self.unreachable_hosts) > initial_unreachable_len:
-            # Recreate client with filtered reachable_hosts, only if hosts were actually pruned
-            if self.password is None:
-                self.client = ParallelSSHClient(
-                    self.reachable_hosts,
-                    user=self.user,
-                    pkey=self.pkey,
-                    num_retries=1,
-                    pool_size=50,
-                )
-            else:
-                self.client = ParallelSSHClient(
-                    self.reachable_hosts,
-                    user=self.user,
-                    password=self.password,
-                    num_retries=1,
-                    pool_size=50,
-                )
+        if unreachable:
+            # Drop only the pruned hosts from the client, sessions to the remaining hosts stay up
+            self.remove_hosts(unreachable)
 
     def inform_unreachability(self, cmd_output):
         """
@@ -375,6 +485,8 @@ class Pssh:
         # CRITICAL: Acquire lock to prevent concurrent SSH operations
         # parallel-ssh/paramiko/libssh2 are NOT thread-safe
         with _ssh_lock:
+            # Apply hosts marked unreachable by exec_async() while the client was busy
+            self._sync_client_hosts()
             logger.info(f"CVS Pssh executing: {cmd[:100]}...")
             logger.info(f"Calling ParallelSSHClient.run_command() on {len(self.reachable_hosts)} reachable nodes...")
             logger.info(f"  Timeout: {timeout if timeout else 'default'}")
@@ -419,6 +531,19 @@ class Pssh:
         cmd_output = self._process_output(output, cmd_list=cmd_list, print_console=print_console)
         return cmd_output
 
+    def _exec_per_host(self, cmds, timeout=None, print_console=True):
+        """exec_cmd_list() for a {host: command} dict; hosts without a command run 'true'."""
+        if not self.client:
+            return {host: "ABORT: Host Unreachable Error" for host in cmds}
+        with _ssh_lock:
+            self._sync_client_hosts()
+            cmd_output = self.exec_cmd_list(
+                [cmds.get(host, 'true') for host in self.client.hosts], timeout, print_console
+            )
+        for host in cmds:
+            cmd_output.setdefault(host, "ABORT: Host Unreachable Error")
+        return cmd_output
+
     def scp_file(self, local_file, remote_file, recurse=False):
         print('About to copy local file {} to remote {} on all Hosts'.format(local_file, remote_file))
         cmds = self.client.copy_file(local_file, remote_file, recurse=recurse)
@@ -446,16 +571,58 @@ class Pssh:
         print('Destroying Current phdl connections ..')
         if self.client:
             del self.client
+        if self.async_engine is not None:
+            self.async_engine.close()
+
+    def _mark_unreachable(self, host):
+        """Move a host that failed to connect during exec_async() to the unreachable list and out of the client."""
+        if host in self.reachable_hosts:
+            logger.warning(f"[{host}] Marking as unreachable")
+            self.reachable_hosts.remove(host)
+            self.unreachable_hosts.append(host)
+            # Don't wait on a command running in a worker thread: exec() syncs the client before its next command
+            if self.client is not None and _ssh_lock.acquire(blocking=False):
+                try:
+                    self._sync_client_hosts()
+                finally:
+                    _ssh_lock.release()
 
-    async def exec_async(self, cmd, timeout=None, print_console=True):
+    async def exec_async(self, cmd, timeout=None, print_console=True, hosts=None):
         """
-        Async wrapper for exec() that runs in a thread pool to avoid blocking the event loop.
+        Execute cmd on all reachable hosts without blocking the event loop.
+
+        Uses the asyncio SSH engine (bounded concurrency, per-host timeout, cancellable),
+        so one slow node only delays its own result. Falls back to running exec() in a
+        worker thread when asyncssh is not installed.
 
-        This allows async API endpoints to call SSH commands without blocking other requests.
+        hosts restricts the command (and the returned dict) to those hosts. cmd can also be a
+        {host: command} dict, which runs each host's own command on those hosts only.
         """
         import asyncio
 
-        return await asyncio.to_thread(self.exec, cmd, timeout, print_console)
+        wanted = None if hosts is None else set(hosts)
+        if isinstance(cmd, dict):
+            wanted = set(cmd) if wanted is None else wanted.intersection(cmd)
+        if self.async_engine is None:
+            if isinstance(cmd, dict):
+                cmd_output = await asyncio.to_thread(self._exec_per_host, cmd, timeout, print_console)
+            else:
+                cmd_output = await asyncio.to_thread(self.exec, cmd, timeout, print_console)
+            if wanted is None:
+                return cmd_output
+            return {host: output for host, output in cmd_output.items() if host in wanted}
+
+        targets = [host for host in self.reachable_hosts if wanted is None or host in wanted]
+        summary = "per-host commands" if isinstance(cmd, dict) else cmd[:100]
+        logger.info(f"CVS Pssh async executing on {len(targets)} reachable nodes: {summary}...")
+        cmd_output = await self.async_engine.exec(targets, cmd, timeout=timeout, on_unreachable=self._mark_unreachable)
+        for host in self.unreachable_hosts:
+            if wanted is None or host in wanted:
+                cmd_output.setdefault(host, "ABORT: Host Unreachable Error")
+
+        failed = sum(1 for v in cmd_output.values() if v.startswith("ERROR") or v.startswith("ABORT"))
+        logger.info(f"✅ CVS Pssh async completed: {len(cmd_output) - failed} successful, {failed} failed")
+        return cmd_output
 
 
 def scp(src, dst, srcusername, srcpassword, dstusername=None, dstpassword=None):
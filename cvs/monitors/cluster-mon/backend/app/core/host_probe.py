@@ -2,16 +2,20 @@
 TCP socket-based host reachability probing.
 
 Provides lightweight TCP connection testing to quickly determine which hosts
-are reachable before attempting SSH connections.
+are reachable before attempting SSH connections. Probes are non-blocking asyncio
+connects, all in flight at once, with optional SSH banner checks and adaptive
+per-host timeouts learned from connect RTTs.
 """
 
+import asyncio
+import resource
 import socket
 import time
 import logging
 import paramiko
 import json
-from typing import List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -42,44 +46,153 @@ def tcp_probe(host: str, port: int = 22, timeout: int = 5) -> Tuple[str, bool]:
         return host, False
 
 
-def discover_reachable_hosts(
-    hosts: List[str], port: int = 22, timeout: int = 5, max_workers: int = 100
+class HostRttTracker:
+    """
+    Per-host connect RTT history used to pick adaptive probe timeouts.
+
+    Keeps a smoothed RTT and RTT variance per host (the TCP retransmission timer
+    estimator, RFC 6298), so a host that normally answers in 1ms is not given the
+    full default timeout on every sweep:
+
+    - host with RTT samples: clamp(srtt + 4 * rttvar, min_timeout, max timeout)
+    - host that was probed but never answered: min(down_timeout, max timeout)
+    - host never probed: the max timeout
+    """
+
+    def __init__(self, min_timeout: float = 0.25, down_timeout: float = 1.0):
+        self.min_timeout = min_timeout
+        self.down_timeout = down_timeout
+        self.srtt: Dict[str, float] = {}
+        self.rttvar: Dict[str, float] = {}
+        self.last_ok: Dict[str, bool] = {}
+
+    def timeout_for(self, host: str, max_timeout: float) -> float:
+        if host in self.srtt:
+            return min(max(self.srtt[host] + 4 * self.rttvar[host], self.min_timeout), max_timeout)
+        if host in self.last_ok:
+            return min(self.down_timeout, max_timeout)
+        return max_timeout
+
+    def record(self, host: str, ok: bool, rtt: Optional[float] = None):
+        self.last_ok[host] = ok
+        if not ok or rtt is None:
+            return
+        if host not in self.srtt:
+            self.srtt[host] = rtt
+            self.rttvar[host] = rtt / 2
+        else:
+            self.rttvar[host] = 0.75 * self.rttvar[host] + 0.25 * abs(self.srtt[host] - rtt)
+            self.srtt[host] = 0.875 * self.srtt[host] + 0.125 * rtt
+
+    def was_reachable(self, host: str) -> bool:
+        return self.last_ok.get(host, False)
+
+
+async def async_tcp_probe(
+    host: str, port: int = 22, timeout: float = 5, check_banner: bool = False
+) -> Tuple[str, bool, Optional[float]]:
+    """
+    Non-blocking TCP connect to host:port.
+
+    With check_banner, the first line the server sends must start with "SSH-", which
+    tells a live sshd apart from a port that merely accepts connections (e.g. a hung
+    sshd or a load balancer). The banner read shares the same timeout.
+
+    Returns:
+        Tuple of (host, is_reachable, connect_rtt_seconds or None)
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        rtt = loop.time() - start
+        if check_banner:
+            banner = await asyncio.wait_for(reader.readline(), max(timeout - rtt, 0.001))
+            if not banner.startswith(b"SSH-"):
+                return host, False, rtt
+        return host, True, rtt
+    except (OSError, asyncio.TimeoutError, ValueError):
+        # Any failure (timeout, connection refused, no route, DNS) means unreachable
+        return host, False, None
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _probe_concurrency_limit(max_concurrency: int) -> int:
+    """Cap in-flight sockets below the process file descriptor limit."""
+    try:
+        soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    except (ValueError, OSError):
+        return max_concurrency
+    if soft_limit == resource.RLIM_INFINITY:
+        return max_concurrency
+    return max(1, min(max_concurrency, soft_limit - 256))
+
+
+async def async_discover_reachable_hosts(
+    hosts: List[str],
+    port: int = 22,
+    timeout: float = 5,
+    max_concurrency: int = 4096,
+    check_banner: bool = False,
+    rtt_tracker: Optional[HostRttTracker] = None,
 ) -> Tuple[List[str], List[str]]:
     """
-    Probe multiple hosts in parallel to determine which are reachable.
+    Probe hosts concurrently on the event loop to determine which are reachable.
 
-    Uses ThreadPoolExecutor to probe many hosts concurrently. For 617 nodes,
-    this completes in ~10 seconds with 100 workers (reduced for stability).
+    All connects are in flight at once (bounded by max_concurrency and the fd limit),
+    so a sweep takes about as long as the slowest timeout instead of
+    hosts / workers * timeout. With an rtt_tracker, each host gets an adaptive timeout
+    from its RTT history; a host that answered last time but misses its adaptive
+    timeout is re-probed once with the full timeout before being declared unreachable,
+    so a short timeout never turns a slow answer into a flap.
 
     Args:
         hosts: List of hostnames/IPs to probe
         port: TCP port to probe (default 22 for SSH)
-        timeout: Per-host timeout in seconds (default 5)
-        max_workers: Maximum number of concurrent probe threads (default 100)
+        timeout: Maximum per-host timeout in seconds (default 5)
+        max_concurrency: Maximum number of sockets in flight (default 4096)
+        check_banner: Require an SSH banner, not just an open port
+        rtt_tracker: HostRttTracker for adaptive timeouts, fixed timeout when None
 
     Returns:
-        Tuple of (reachable_hosts, unreachable_hosts)
+        Tuple of (reachable_hosts, unreachable_hosts), each in input order
     """
     if not hosts:
         return [], []
 
     logger.info(f"Probing {len(hosts)} hosts for reachability (port {port}, timeout {timeout}s)...")
     probe_start = time.time()
-
-    reachable = []
-    unreachable = []
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all probe tasks
-        futures = {executor.submit(tcp_probe, host, port, timeout): host for host in hosts}
-
-        # Collect results as they complete
-        for future in as_completed(futures):
-            host, is_reachable = future.result()
-            if is_reachable:
-                reachable.append(host)
-            else:
-                unreachable.append(host)
+    semaphore = asyncio.Semaphore(_probe_concurrency_limit(max_concurrency))
+
+    async def probe(host: str, host_timeout: float):
+        async with semaphore:
+            return await async_tcp_probe(host, port, host_timeout, check_banner)
+
+    def timeout_for(host: str) -> float:
+        return rtt_tracker.timeout_for(host, timeout) if rtt_tracker else timeout
+
+    results = await asyncio.gather(*(probe(host, timeout_for(host)) for host in hosts))
+    status = {host: (ok, rtt) for host, ok, rtt in results}
+
+    # Second chance with the full timeout for previously reachable hosts that missed a shortened timeout
+    if rtt_tracker:
+        retry = [
+            host
+            for host in hosts
+            if not status[host][0] and rtt_tracker.was_reachable(host) and timeout_for(host) < timeout
+        ]
+        if retry:
+            logger.info(f"Re-probing {len(retry)} previously reachable hosts with the full {timeout}s timeout")
+            for host, ok, rtt in await asyncio.gather(*(probe(host, timeout) for host in retry)):
+                status[host] = (ok, rtt)
+        for host, (ok, rtt) in status.items():
+            rtt_tracker.record(host, ok, rtt)
+
+    reachable = [host for host in hosts if status[host][0]]
+    unreachable = [host for host in hosts if not status[host][0]]
 
     probe_duration = time.time() - probe_start
     logger.info(f"Probe completed in {probe_duration:.2f}s: {len(reachable)} reachable, {len(unreachable)} unreachable")
@@ -87,6 +200,32 @@ def discover_reachable_hosts(
     return reachable, unreachable
 
 
+def discover_reachable_hosts(
+    hosts: List[str],
+    port: int = 22,
+    timeout: float = 5,
+    max_concurrency: int = 4096,
+    check_banner: bool = False,
+    rtt_tracker: Optional[HostRttTracker] = None,
+) -> Tuple[List[str], List[str]]:
+    """
+    Blocking wrapper around async_discover_reachable_hosts for synchronous callers.
+
+    Runs the probe on its own event loop; when called from a thread that already runs
+    an event loop, the probe loop runs in a helper thread instead.
+
+    Returns:
+        Tuple of (reachable_hosts, unreachable_hosts)
+    """
+    coro = async_discover_reachable_hosts(hosts, port, timeout, max_concurrency, check_banner, rtt_tracker)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
 def probe_from_bastion(
     jump_client: paramiko.SSHClient, hosts: List[str], port: int = 22, timeout: int = 5
 ) -> Tuple[str, List[str]]:
@@ -112,28 +251,31 @@ def probe_from_bastion(
     probe_start = time.time()
 
     # Build Python script to run on jump host
-    # Uses same tcp_probe logic but outputs JSON
+    # Same non-blocking connect as async_tcp_probe, all hosts in flight at once, outputs JSON
     probe_script = f"""
-import socket
+import asyncio
 import json
-import sys
 
 hosts = {hosts}
 port = {port}
 timeout = {timeout}
 
-reachable = []
-unreachable = []
+async def probe(host, semaphore):
+    async with semaphore:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            writer.close()
+            return True
+        except Exception:
+            return False
 
-for host in hosts:
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(timeout)
-    try:
-        sock.connect((host, port))
-        sock.close()
-        reachable.append(host)
-    except Exception:
-        unreachable.append(host)
+async def main():
+    semaphore = asyncio.Semaphore(512)
+    return await asyncio.gather(*(probe(host, semaphore) for host in hosts))
+
+status = asyncio.run(main())
+reachable = [host for host, ok in zip(hosts, status) if ok]
+unreachable = [host for host, ok in zip(hosts, status) if not ok]
 
 # Output JSON result
 print(json.dumps({{"reachable": reachable, "unreachable": unreachable}}))
@@ -144,7 +286,7 @@ print(json.dumps({{"reachable": reachable, "unreachable": unreachable}}))
         # Use heredoc to avoid quoting issues
         stdin, stdout, stderr = jump_client.exec_command(
             f"python3 - <<'EOF'\n{probe_script}\nEOF",
-            timeout=max(60, len(hosts) * timeout // 10),  # Generous timeout based on node count
+            timeout=max(60, timeout * 4),  # Probes run concurrently, a few timeouts cover any node count
         )
 
         # Read output
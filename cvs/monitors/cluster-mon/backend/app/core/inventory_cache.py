@@ -0,0 +1,257 @@
+"""
+Per-node software inventory cache with stale-while-revalidate refresh.
+
+Software inventory (ROCm, driver and firmware versions, NIC devices) rarely changes, so
+each cache keeps the last collected value of every node and serves it immediately along
+with its age. A background task refreshes every cache on a jittered interval: a cheap
+fingerprint command (package database, driver/firmware versions, boot id) runs on all
+nodes and the inventory collectors then only query the nodes whose fingerprint changed
+or whose entry is older than max_age. Volatile sections (NIC counters) have no
+fingerprint and are re-collected from every node on each refresh.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def _failed(output: Optional[str]) -> bool:
+    return not output or output.startswith("ERROR") or output.startswith("ABORT")
+
+
+def _has_error(value: Any) -> bool:
+    return isinstance(value, dict) and "error" in value
+
+
+class HostSubset:
+    """
+    View of an SSH manager restricted to some hosts.
+
+    Collectors take an ssh_manager and run their commands through exec_async; handing
+    them a HostSubset runs those commands on the given hosts only.
+    """
+
+    def __init__(self, ssh_manager, hosts):
+        if isinstance(ssh_manager, HostSubset):
+            hosts = ssh_manager._wanted.intersection(hosts)
+            ssh_manager = ssh_manager.ssh_manager
+        self.ssh_manager = ssh_manager
+        self._wanted = set(hosts)
+
+    @property
+    def host_list(self) -> List[str]:
+        return [host for host in self.ssh_manager.host_list if host in self._wanted]
+
+    @property
+    def reachable_hosts(self) -> List[str]:
+        return [host for host in self.ssh_manager.reachable_hosts if host in self._wanted]
+
+    @property
+    def unreachable_hosts(self) -> List[str]:
+        return [host for host in self.ssh_manager.unreachable_hosts if host in self._wanted]
+
+    async def exec_async(self, cmd, timeout=None, print_console=True, hosts=None):
+        wanted = self._wanted if hosts is None else self._wanted.intersection(hosts)
+        return await self.ssh_manager.exec_async(cmd, timeout=timeout, print_console=print_console, hosts=wanted)
+
+
+@dataclass(frozen=True)
+class InventorySection:
+    """
+    One top-level key of a cached payload.
+
+    Args:
+        name: Payload key, e.g. "gpu_firmware"
+        collect: Coroutine function taking an ssh_manager, returning {host: value}
+        volatile: Counters and other values that change without the fingerprint changing;
+            re-collected from every node on each refresh
+    """
+
+    name: str
+    collect: Callable[[Any], Awaitable[Dict[str, Any]]]
+    volatile: bool = False
+
+
+class NodeInventoryCache:
+    """
+    Cached {"timestamp": ..., <section>: {host: value}} payload kept per node.
+
+    Args:
+        name: Cache name, used in log messages
+        sections: Payload sections, collected in this order
+        fingerprint_cmd: Command printing a per-node fingerprint of everything the
+            inventory sections report; None re-collects every node on each refresh
+        ttl: Seconds after which the payload is stale and gets refreshed
+        max_age: Seconds after which a node is re-collected even if its fingerprint is unchanged
+        jitter: Fraction of ttl the refresh interval is randomized by
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sections: Sequence[InventorySection],
+        fingerprint_cmd: Optional[str] = None,
+        ttl: float = 180,
+        max_age: float = 3600,
+        jitter: float = 0.2,
+    ):
+        self.name = name
+        self.sections = list(sections)
+        self.fingerprint_cmd = fingerprint_cmd
+        self.ttl = ttl
+        self.max_age = max_age
+        self.jitter = jitter
+        self.refreshed_at: float = 0
+        self._values: Dict[str, Dict[str, Any]] = {section.name: {} for section in self.sections}
+        self._fingerprints: Dict[str, tuple] = {}  # host -> (fingerprint or None, collected_at)
+        self._payload: Optional[dict] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def refreshing(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def is_stale(self) -> bool:
+        return self._payload is None or time.time() - self.refreshed_at >= self.ttl
+
+    def clear(self):
+        """Drop all cached data (e.g. on configuration reload)."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._values = {section.name: {} for section in self.sections}
+        self._fingerprints = {}
+        self._payload = None
+        self.refreshed_at = 0
+
+    def snapshot(self) -> Optional[dict]:
+        """Cached payload with its age in seconds, None before the first refresh."""
+        if self._payload is None:
+            return None
+        return {
+            **self._payload,
+            "cache_age_seconds": round(time.time() - self.refreshed_at, 1),
+            "refreshing": self.refreshing,
+        }
+
+    def _needs_collect(self, host: str, fingerprint: Optional[str], now: float) -> bool:
+        entry = self._fingerprints.get(host)
+        if entry is None:
+            return True
+        known, collected_at = entry
+        if now - collected_at >= self.max_age:
+            return True
+        if _failed(fingerprint):
+            # Keep the last collected entry while the node can't be fingerprinted
+            return False
+        return known is None or fingerprint.strip() != known
+
+    async def refresh(self, ssh_manager) -> dict:
+        """
+        Re-collect the nodes whose fingerprint changed, and the volatile sections.
+
+        Returns:
+            The new payload (without age fields)
+        """
+        async with self._lock:
+            started = time.time()
+            hosts = list(ssh_manager.host_list)
+            inventory = [section for section in self.sections if not section.volatile]
+            volatile = [section for section in self.sections if section.volatile]
+
+            fingerprints: Dict[str, str] = {}
+            if self.fingerprint_cmd and inventory:
+                fingerprints = await ssh_manager.exec_async(self.fingerprint_cmd, timeout=60, print_console=False)
+                changed = [host for host in hosts if self._needs_collect(host, fingerprints.get(host), started)]
+            else:
+                changed = hosts
+
+            # IMPORTANT: Collect SEQUENTIALLY, like the collectors themselves (parallel-ssh thread safety)
+            if changed and inventory:
+                subset = HostSubset(ssh_manager, changed)
+                for section in inventory:
+                    values = await section.collect(subset)
+                    section_values = self._values[section.name]
+                    for host in changed:
+                        if host in values:
+                            section_values[host] = values[host]
+                        else:
+                            section_values.pop(host, None)
+                for host in changed:
+                    fingerprint = fingerprints.get(host)
+                    ok = not _failed(fingerprint) and not any(
+                        _has_error(self._values[section.name].get(host)) for section in inventory
+                    )
+                    # Nodes that failed to collect get no fingerprint, so the next refresh retries them
+                    self._fingerprints[host] = (fingerprint.strip() if ok else None, started)
+
+            for section in volatile:
+                self._values[section.name] = await section.collect(ssh_manager)
+
+            # Drop nodes removed from the cluster
+            known = set(hosts)
+            self._fingerprints = {host: entry for host, entry in self._fingerprints.items() if host in known}
+            payload = {"timestamp": datetime.utcnow().isoformat() + "Z"}
+            for section in self.sections:
+                section_values = {host: value for host, value in self._values[section.name].items() if host in known}
+                self._values[section.name] = section_values
+                payload[section.name] = {host: section_values[host] for host in hosts if host in section_values}
+
+            self._payload = payload
+            self.refreshed_at = time.time()
+            logger.info(
+                f"{self.name} inventory refreshed in {self.refreshed_at - started:.1f}s "
+                f"({len(changed) if inventory else 0} of {len(hosts)} nodes re-collected)"
+            )
+            return payload
+
+    def refresh_in_background(self, ssh_manager) -> asyncio.Task:
+        """Start a refresh unless one is already running; returns the refresh task."""
+        if not self.refreshing:
+            self._task = asyncio.create_task(self.refresh(ssh_manager))
+            self._task.add_done_callback(self._log_failure)
+        return self._task
+
+    def _log_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"{self.name} inventory refresh failed: {task.exception()}")
+
+    async def get(self, ssh_manager) -> dict:
+        """
+        Cached payload, returned immediately; a stale payload triggers a background refresh.
+
+        Only a call made before the first refresh has completed waits for it.
+        """
+        if self._payload is None:
+            await asyncio.shield(self.refresh_in_background(ssh_manager))
+        elif self.is_stale():
+            self.refresh_in_background(ssh_manager)
+        return self.snapshot()
+
+    async def run(self, get_manager: Callable[[], Any]):
+        """
+        Refresh loop: refresh every ttl seconds, shortened by up to jitter * ttl so that the
+        payload is renewed before handlers see it stale and caches don't sweep in lockstep.
+
+        Args:
+            get_manager: Returns the current ssh_manager (or None)
+        """
+        await asyncio.sleep(random.uniform(0, self.jitter * self.ttl))
+        while True:
+            manager = get_manager()
+            if manager is not None:
+                # A failed refresh is logged by _log_failure and the last payload keeps being served
+                task = self.refresh_in_background(manager)
+                try:
+                    await asyncio.wait([task])
+                except asyncio.CancelledError:
+                    task.cancel()
+                    raise
+            await asyncio.sleep(self.ttl * random.uniform(1 - self.jitter, 1))
@@ -4,13 +4,16 @@ Based on working test_auth_script.py approach.
 """
 
 import paramiko
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Union
 import logging
 import time
 
 # TCP probe for fast reachability detection
 from app.core.host_probe import probe_from_bastion
 
+# Non-blocking execution backend for exec_async()
+from app.core.async_ssh import ASYNCSSH_AVAILABLE, JumpHostAsyncSSHEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,6 +54,22 @@ class JumpHostPssh:
         self.jump_transport = None
         self.client = None
 
+        # asyncio backend used by exec_async(), multiplexes node commands over one jump host connection
+        self.async_engine = None
+        if ASYNCSSH_AVAILABLE:
+            self.async_engine = JumpHostAsyncSSHEngine(
+                jump_host=jump_host,
+                jump_user=jump_user,
+                jump_password=jump_password,
+                jump_pkey=jump_pkey,
+                target_user=target_user,
+                target_pkey=target_pkey,
+                connect_timeout=timeout,
+                max_concurrency=max_parallel,
+            )
+        else:
+            logger.warning("asyncssh not installed - exec_async() will run exec() in a worker thread")
+
         # Properties for compatibility
         self.host_list = self.target_hosts
         self.reachable_hosts = self.target_hosts.copy()
@@ -227,18 +246,21 @@ class JumpHostPssh:
             logger.error(f"[{node}] Exception: {e}")
             return f"ERROR: {str(e)}"
 
-    def exec(self, cmd: str, timeout: Optional[int] = None, print_console: bool = True) -> Dict[str, str]:
+    def exec(
+        self, cmd: Union[str, Dict[str, str]], timeout: Optional[int] = None, print_console: bool = True
+    ) -> Dict[str, str]:
         """
         Execute command on all nodes in parallel via jump host.
         Uses ThreadPoolExecutor for parallel execution.
         Skips unreachable nodes and reports them separately.
+        A {node: command} dict runs each node's own command on those nodes only.
         """
         # Ensure jump host connection is active before executing
         if not self._ensure_jump_host_connection():
             logger.error("Cannot execute command - jump host connection failed")
             return {node: "ERROR: Jump host connection failed" for node in self.target_hosts}
 
-        logger.info(f"Executing command: {cmd[:100]}...")
+        logger.info(f"Executing command: {'per-node commands' if isinstance(cmd, dict) else cmd[:100]}...")
         logger.info(
             f"Total nodes: {len(self.target_hosts)}, Reachable: {len(self.reachable_hosts)}, Unreachable: {len(self.unreachable_hosts)}"
         )
@@ -258,8 +280,12 @@ class JumpHostPssh:
             # Execute in parallel using ThreadPoolExecutor on reachable hosts only
             with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
                 # Submit tasks only for reachable nodes
+                targets = [node for node in self.reachable_hosts if not isinstance(cmd, dict) or node in cmd]
                 future_to_node = {
-                    executor.submit(self._execute_on_node, node, cmd, timeout): node for node in self.reachable_hosts
+                    executor.submit(
+                        self._execute_on_node, node, cmd[node] if isinstance(cmd, dict) else cmd, timeout
+                    ): node
+                    for node in targets
                 }
 
                 # Collect results as they complete
@@ -304,9 +330,60 @@ class JumpHostPssh:
                 self._handle_connection_failure()
             raise
 
-    async def exec_async(self, cmd, timeout=None, print_console=True):
-        """Async wrapper - just calls exec() directly."""
-        return self.exec(cmd, timeout, print_console)
+    def _mark_unreachable(self, node):
+        """Move a node that failed to connect during exec_async() to the unreachable list."""
+        if node not in self.unreachable_hosts:
+            logger.warning(f"[{node}] Marking as unreachable")
+            self.unreachable_hosts.append(node)
+        if node in self.reachable_hosts:
+            self.reachable_hosts.remove(node)
+
+    async def exec_async(self, cmd, timeout=None, print_console=True, hosts=None):
+        """
+        Execute command on all reachable nodes via the jump host without blocking the event loop.
+
+        Uses the asyncio SSH engine (bounded by max_parallel, per-node timeout, cancellable).
+        Falls back to running exec() in a worker thread when asyncssh is not installed.
+
+        hosts restricts the command (and the returned dict) to those nodes. cmd can also be a
+        {node: command} dict, which runs each node's own command on those nodes only.
+        """
+        import asyncio
+
+        wanted = None if hosts is None else set(hosts)
+        if isinstance(cmd, dict):
+            wanted = set(cmd) if wanted is None else wanted.intersection(cmd)
+        if self.async_engine is None:
+            results = await asyncio.to_thread(self.exec, cmd, timeout, print_console)
+            if wanted is None:
+                return results
+            return {node: output for node, output in results.items() if node in wanted}
+
+        summary = "per-node commands" if isinstance(cmd, dict) else cmd[:100]
+        logger.info(f"Executing command (async): {summary}...")
+        results = {
+            node: "ABORT: Host Unreachable Error" for node in self.unreachable_hosts if wanted is None or node in wanted
+        }
+        results.update(
+            await self.async_engine.exec(
+                [node for node in self.reachable_hosts if wanted is None or node in wanted],
+                cmd,
+                timeout=timeout,
+                on_unreachable=self._mark_unreachable,
+            )
+        )
+
+        fail_count = sum(1 for v in results.values() if v.startswith("ERROR") or v.startswith("ABORT"))
+        logger.info(f"Results: {len(results) - fail_count} successful, {fail_count} failed")
+
+        # If too many failures, trigger re-probe (connection issue detection)
+        total = len(self.target_hosts) if wanted is None else len(results)
+        failure_rate = fail_count / total if total else 0
+        if failure_rate > 0.5 and fail_count > 5:
+            logger.warning(f"High failure rate ({failure_rate:.1%}) - triggering re-probe")
+            await asyncio.to_thread(self._handle_connection_failure)
+
+        return results
 
     def get_reachable_hosts(self):
         """Return list of reachable hosts."""
@@ -360,7 +437,7 @@ class JumpHostPssh:
             # Keep existing lists on error
             return False
 
-    def recreate_client(self):
+    def recreate_client(self, force=False):
         """
         Recreate client connection (no-op for JumpHostPssh).
 
@@ -391,6 +468,8 @@ class JumpHostPssh:
     def destroy_clients(self):
         """Clean up connections."""
         logger.info("Closing connections...")
+        if self.async_engine is not None:
+            self.async_engine.close()
         if self.client:
             try:
                 self.client.disconnect()
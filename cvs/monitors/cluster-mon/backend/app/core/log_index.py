@@ -0,0 +1,462 @@
+"""
+In-memory inverted index of cluster system logs.
+
+Kernel (dmesg, emerg..warn) and journal (emerg..err) messages are pulled from every node
+incrementally: each pull only returns what was logged since the node's own cursors. Messages
+are appended to an index mapping each lowercased word token to the ids of the messages
+containing it. A search narrows the candidates with the words its patterns require and
+only runs the regexes on those, so /api/logs queries are answered locally (full match
+counts, time filtering) instead of fanning a grep out to the cluster. Retention is
+bounded by message age and by messages kept per node.
+"""
+
+import asyncio
+import bisect
+import itertools
+import logging
+import re
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LEVEL_NAMES = ("emerg", "alert", "crit", "err", "warn", "notice", "info", "debug")
+FACILITY_NAMES = ("kern", "user", "mail", "daemon", "auth", "syslog", "lpr", "news", "uucp", "cron", "authpriv", "ftp")
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+# Cursor fields shipped to the node with each pull
+_REMOTE_CURSOR_KEYS = ("boot_id", "kmsg", "machine_id", "journal")
+
+
+def tokenize(text: str) -> set:
+    """Lowercased word tokens of a message."""
+    return set(_TOKEN_RE.findall(text.lower()))
+
+
+class Word(NamedTuple):
+    """A lowercased word every match of a regex contains, and where it sits in its token."""
+
+    text: str
+    starts_token: bool  # preceded by a non-word character, so the token starts with text
+    ends_token: bool  # followed by a non-word character, so the token ends with text
+
+
+def required_words(pattern: str, min_length: int = 3) -> List[Word]:
+    """
+    Lowercased words that every string matched by a Python regex contains.
+
+    Only literal runs that can't be skipped (not inside a character class, not followed by
+    an optional quantifier) are used; a pattern with alternation requires nothing. Words
+    shorter than min_length are dropped as too unselective. A word next to a literal
+    non-word character, \\b, \\s, \\W, ^ or $ is known to start or end its token.
+
+    Returns:
+        List of words, e.g. [Word("amdgpu", False, False), Word("ring", False, True),
+        Word("timeout", True, False)] for r"amdgpu.*ring \\w+ timeout"
+    """
+    runs, run = [], []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped in "bsWnrt":
+                # Matches (or sits next to) a non-word character: a token boundary
+                run.append(" ")
+            elif escaped.isalnum():
+                runs.append("".join(run))
+                run = []
+            else:
+                run.append(escaped)
+            continue
+        if char == "|":
+            return []
+        if char == "[":
+            # Skip the character class: a leading ^ and ] are part of it
+            i += 1
+            if i < len(pattern) and pattern[i] == "^":
+                i += 1
+            if i < len(pattern) and pattern[i] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            runs.append("".join(run))
+            run = []
+        elif char in "*?{":
+            # The preceding character is optional
+            run = run[:-1]
+            runs.append("".join(run))
+            run = []
+            if char == "{":
+                closing = pattern.find("}", i)
+                i = closing if closing >= 0 else len(pattern)
+        elif char in "^$":
+            run.append(" ")
+        elif char in "+.()":
+            runs.append("".join(run))
+            run = []
+        else:
+            run.append(char)
+        i += 1
+    runs.append("".join(run))
+
+    words = []
+    for literal in runs:
+        literal = literal.lower()
+        for match in _TOKEN_RE.finditer(literal):
+            word = Word(match.group(), match.start() > 0, match.end() < len(literal))
+            if len(word.text) >= min_length and word not in words:
+                words.append(word)
+    return words
+
+
+class LogEntry(NamedTuple):
+    """One log message of one node."""
+
+    node: str
+    time: float  # epoch seconds
+    source: str  # "kernel" or "journal"
+    facility: int
+    level: int  # 0 (emerg) .. 7 (debug)
+    text: str
+
+    def format(self, decode: bool = False) -> str:
+        """Format like dmesg -T (with decode, like dmesg --decode -T)."""
+        line = f"[{time.ctime(self.time)}] {self.text}"
+        if not decode:
+            return line
+        facility = FACILITY_NAMES[self.facility] if self.facility < len(FACILITY_NAMES) else str(self.facility)
+        return f"{facility:<6}:{LEVEL_NAMES[self.level]:<6}: {line}"
+
+
+class LogIndex:
+    """
+    Inverted index of the error-level log messages of all nodes.
+
+    Args:
+        retention_seconds: Messages older than this are dropped
+        max_entries_per_node: Most recent messages kept per node
+    """
+
+    def __init__(self, retention_seconds: float = 7 * 24 * 3600, max_entries_per_node: int = 5000):
+        self.retention_seconds = retention_seconds
+        self.max_entries_per_node = max_entries_per_node
+        self.ingested_at: float = 0
+        self.node_errors: Dict[str, str] = {}  # node -> error of its last failed pull
+        self._entries: Dict[int, LogEntry] = {}
+        self._node_ids: Dict[str, Deque[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        # Sorted tokens and sorted reversed tokens, for prefix and suffix lookups; rebuilt
+        # lazily once new tokens were indexed
+        self._sorted_tokens: Optional[Tuple[List[str], List[str]]] = None
+        self._removed = 0  # removed ids still referenced by postings
+        self._next_id = 0
+        # node -> {"boot_id", "kmsg": last dmesg timestamp, "machine_id", "journal": last realtime usec,
+        #          "kmsg_seen"/"journal_seen": Counter of the (priority, text) indexed at that timestamp}
+        self._cursors: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def refreshing(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def clear(self):
+        """Drop all messages and cursors (e.g. on configuration reload)."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.ingested_at = 0
+        self.node_errors = {}
+        self._entries = {}
+        self._node_ids = {}
+        self._postings = {}
+        self._sorted_tokens = None
+        self._removed = 0
+        self._cursors = {}
+
+    def is_ingested(self, node: str) -> bool:
+        """True once a pull from node has succeeded."""
+        return node in self._cursors
+
+    def cursors(self, nodes: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Cursor of each node for its next pull: {"boot_id", "kmsg": last dmesg timestamp,
+        "machine_id", "journal": last realtime usec}, None for a node never pulled.
+        """
+        result = {}
+        for node in nodes:
+            cursor = self._cursors.get(node)
+            result[node] = None if cursor is None else {key: cursor[key] for key in _REMOTE_CURSOR_KEYS}
+        return result
+
+    @staticmethod
+    def _unseen(cursor: Dict[str, Any], stream: str, records: List[Tuple[Any, tuple]]) -> List[Tuple[Any, tuple]]:
+        """
+        Records of a pull not indexed yet, advancing the stream's cursor.
+
+        A pull returns every record at or after the cursor timestamp, since several messages
+        can share one (a kernel trace, boot messages at 0.000000). The cursor remembers the
+        (priority, text) of the records already indexed at its timestamp, and only those are
+        skipped again.
+
+        Args:
+            records: (timestamp, (priority, text)) pairs, oldest first
+        """
+        last, seen = cursor[stream], cursor[stream + "_seen"]
+        remaining = Counter(seen)
+        new = []
+        for stamp, key in records:
+            if stamp < last:
+                continue
+            if stamp == last and remaining[key] > 0:
+                remaining[key] -= 1
+                continue
+            new.append((stamp, key))
+        if new:
+            newest = max(stamp for stamp, _ in new)
+            if newest == last:
+                seen = seen + Counter(key for _, key in new)
+            else:
+                seen = Counter(key for stamp, key in new if stamp == newest)
+            cursor[stream], cursor[stream + "_seen"] = newest, seen
+        return new
+
+    def add(self, node: str, doc: Dict[str, Any]) -> int:
+        """
+        Index the messages of one pull from node (see LogsCollector.collect_new_messages).
+
+        Returns:
+            Number of new messages
+        """
+        cursor = self._cursors.get(node)
+        if cursor is None:
+            cursor = self._cursors[node] = {
+                "boot_id": None,
+                "kmsg": -1.0,
+                "kmsg_seen": Counter(),
+                "machine_id": None,
+                "journal": 0,
+                "journal_seen": Counter(),
+            }
+        if doc.get("boot_id") != cursor["boot_id"]:
+            cursor.update(boot_id=doc.get("boot_id"), kmsg=-1.0, kmsg_seen=Counter())
+        if doc.get("machine_id") != cursor["machine_id"]:
+            cursor.update(machine_id=doc.get("machine_id"), journal=0, journal_seen=Counter())
+
+        boot_time = doc.get("boot_time", 0)
+        new = []
+        kmsg = [(stamp, (priority, text)) for priority, stamp, text in doc.get("kmsg", [])]
+        for stamp, (priority, text) in self._unseen(cursor, "kmsg", kmsg):
+            new.append(LogEntry(node, boot_time + stamp, "kernel", priority >> 3, priority & 7, text))
+        journal = [
+            (stamp, (priority, f"{ident}: {text}" if ident else text))
+            for priority, stamp, ident, text in doc.get("journal", [])
+        ]
+        for stamp, (priority, text) in self._unseen(cursor, "journal", journal):
+            new.append(LogEntry(node, stamp / 1e6, "journal", priority >> 3, priority & 7, text))
+        self.node_errors.pop(node, None)
+
+        new.sort(key=lambda entry: entry.time)
+        ids = self._node_ids.setdefault(node, deque())
+        for entry in new:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            ids.append(entry_id)
+            for token in tokenize(entry.text):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = []
+                    self._sorted_tokens = None
+                postings.append(entry_id)
+        return len(new)
+
+    def remove_node(self, node: str):
+        """Drop a node removed from the cluster."""
+        for entry_id in self._node_ids.pop(node, ()):
+            del self._entries[entry_id]
+            self._removed += 1
+        self._cursors.pop(node, None)
+        self.node_errors.pop(node, None)
+
+    def expire(self, now: Optional[float] = None):
+        """Apply the retention limits, compacting the postings once half of their ids are gone."""
+        cutoff = (now or time.time()) - self.retention_seconds
+        for ids in self._node_ids.values():
+            while ids and (len(ids) > self.max_entries_per_node or self._entries[ids[0]].time < cutoff):
+                del self._entries[ids.popleft()]
+                self._removed += 1
+        if self._removed > len(self._entries):
+            postings = {}
+            for token, ids in self._postings.items():
+                live = [entry_id for entry_id in ids if entry_id in self._entries]
+                if live:
+                    postings[token] = live
+            self._postings = postings
+            self._sorted_tokens = None
+            self._removed = 0
+
+    def _tokens_with(self, word: Word) -> Optional[List[str]]:
+        """Indexed tokens holding word where it sits, None when it doesn't start or end its token."""
+        if word.starts_token and word.ends_token:
+            return [word.text] if word.text in self._postings else []
+        if not (word.starts_token or word.ends_token):
+            return None
+        if self._sorted_tokens is None:
+            self._sorted_tokens = (sorted(self._postings), sorted(token[::-1] for token in self._postings))
+        if word.starts_token:
+            tokens, prefix = self._sorted_tokens[0], word.text
+        else:
+            tokens, prefix = self._sorted_tokens[1], word.text[::-1]
+        matches = []
+        for token in itertools.islice(tokens, bisect.bisect_left(tokens, prefix), None):
+            if not token.startswith(prefix):
+                break
+            matches.append(token if word.starts_token else token[::-1])
+        return matches
+
+    def _candidates(self, words: Iterable[Word]) -> Optional[List[int]]:
+        """
+        Ids of the messages that may hold every word, None when no word narrows the search.
+
+        A word that neither starts nor ends its token can't be looked up in the index and is
+        left to the regex filter.
+        """
+        lookups = []
+        for word in words:
+            tokens = self._tokens_with(word)
+            if tokens is not None:
+                lookups.append(tokens)
+        result = None
+        for tokens in sorted(lookups, key=len):
+            ids = set()
+            for token in tokens:
+                ids.update(self._postings.get(token, ()))
+            result = ids if result is None else result & ids
+            if not result:
+                return []
+        return None if result is None else sorted(result)
+
+    def search(
+        self,
+        patterns: Sequence[Tuple[Pattern, bool]] = (),
+        words: Iterable[Word] = (),
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        sources: Optional[Iterable[str]] = None,
+        max_level: Optional[int] = None,
+    ) -> Dict[str, List[LogEntry]]:
+        """
+        Find the messages matching all patterns.
+
+        Args:
+            patterns: (regex, invert) pairs; a message matches when every regex is found in
+                it, or for inverted ones is not found
+            words: Words every matching message contains (see required_words), used to
+                pick the candidates from the index
+            since: Only messages logged at or after this epoch time
+            until: Only messages logged before this epoch time
+            sources: Only these sources ("kernel", "journal")
+            max_level: Only messages of this level or more severe (3 = err, 4 = warn)
+
+        Returns:
+            {node: [matching entries, oldest first]}, with every match (no limit)
+        """
+        candidates = self._candidates(words)
+        sources = set(sources) if sources is not None else None
+        matches: Dict[str, List[LogEntry]] = {}
+        for entry_id in self._entries if candidates is None else candidates:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                continue
+            if since is not None and entry.time < since:
+                continue
+            if until is not None and entry.time >= until:
+                continue
+            if sources is not None and entry.source not in sources:
+                continue
+            if max_level is not None and entry.level > max_level:
+                continue
+            if all((pattern.search(entry.text) is None) == invert for pattern, invert in patterns):
+                matches.setdefault(entry.node, []).append(entry)
+        for entries in matches.values():
+            entries.sort(key=lambda entry: entry.time)
+        return matches
+
+    async def refresh(self, ssh_manager, fetch: Callable[[Any, dict], Awaitable[Dict[str, Any]]]) -> int:
+        """
+        Pull and index the messages logged since the last pull.
+
+        Args:
+            ssh_manager: SSH manager of the cluster
+            fetch: Coroutine function (ssh_manager, {node: cursor}) -> {node: pull document or error string}
+
+        Returns:
+            Number of new messages
+        """
+        async with self._lock:
+            started = time.time()
+            results = await fetch(ssh_manager, self.cursors(ssh_manager.host_list))
+            added = 0
+            for node, doc in results.items():
+                if isinstance(doc, dict):
+                    added += self.add(node, doc)
+                else:
+                    self.node_errors[node] = doc
+
+            known = set(ssh_manager.host_list)
+            for node in set(self._node_ids) | set(self._cursors):
+                if node not in known:
+                    self.remove_node(node)
+            self.expire()
+            self.ingested_at = time.time()
+            logger.info(
+                f"Log index: {added} new messages from {len(results)} nodes in {self.ingested_at - started:.1f}s, "
+                f"{len(self._entries)} indexed, {len(self.node_errors)} nodes failed"
+            )
+            return added
+
+    def refresh_in_background(self, ssh_manager, fetch) -> asyncio.Task:
+        """Start a pull unless one is already running; returns the pull task."""
+        if not self.refreshing:
+            self._task = asyncio.create_task(self.refresh(ssh_manager, fetch))
+            self._task.add_done_callback(self._log_failure)
+        return self._task
+
+    def _log_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Log index refresh failed: {task.exception()}")
+
+    async def ready(self, ssh_manager, fetch) -> "LogIndex":
+        """Return the index, waiting for the first pull only if none has completed yet."""
+        if not self.ingested_at:
+            await asyncio.shield(self.refresh_in_background(ssh_manager, fetch))
+        return self
+
+    async def run(self, get_manager: Callable[[], Any], fetch, interval: float):
+        """
+        Pull loop: index new messages every interval seconds.
+
+        Args:
+            get_manager: Returns the current ssh_manager (or None)
+            fetch: See refresh()
+            interval: Seconds between pulls
+        """
+        while True:
+            manager = get_manager()
+            if manager is not None:
+                # A failed pull is logged by _log_failure; the next one retries from the same cursors
+                task = self.refresh_in_background(manager, fetch)
+                try:
+                    await asyncio.wait([task])
+                except asyncio.CancelledError:
+                    task.cancel()
+                    raise
+            await asyncio.sleep(interval)
@@ -0,0 +1,293 @@
+"""
+Embedded time-series store for polled metrics.
+
+Every polling round is flattened into numeric series keyed by (node, metric type, series
+name), e.g. ("node1", "gpu", "utilization/card0/GPU use (%)"). Rounds are kept in columnar
+in-memory ring buffers (one row per round, one column per series). When the buffer fills
+up it is compacted into an on-disk segment (plain .npy files opened with mmap), and
+segments older than the retention window are deleted. Range queries merge segments and
+the live buffer and downsample to a bounded number of points.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (metric type, section in the collector payload) pairs that are recorded
+HISTORY_SECTIONS = (
+    ("gpu", "utilization"),
+    ("gpu", "memory"),
+    ("gpu", "temperature"),
+    ("nic", "rdma_stats"),
+)
+
+SeriesKey = Tuple[str, str, str]
+
+
+def _to_float(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_timestamp(timestamp) -> float:
+    """Collector timestamps are ISO strings with a trailing Z; fall back to now."""
+    if isinstance(timestamp, str):
+        try:
+            return datetime.fromisoformat(timestamp.rstrip("Z") + "+00:00").timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def flatten_metrics(metrics: Dict[str, Any]) -> Dict[SeriesKey, float]:
+    """
+    Flatten a metrics payload (as stored in AppState.latest_metrics) into numeric series.
+
+    Only per-node, per-device numeric leaves of HISTORY_SECTIONS are kept, e.g.
+    gpu.utilization[node]["card0"]["GPU use (%)"] -> (node, "gpu", "utilization/card0/GPU use (%)").
+    """
+    samples = {}
+    for metric_type, section in HISTORY_SECTIONS:
+        section_data = (metrics.get(metric_type) or {}).get(section)
+        if not isinstance(section_data, dict):
+            continue
+        for node, devices in section_data.items():
+            if not isinstance(devices, dict) or "error" in devices:
+                continue
+            for device, fields in devices.items():
+                if not isinstance(fields, dict):
+                    continue
+                for field, value in fields.items():
+                    number = _to_float(value)
+                    if number is not None:
+                        samples[(node, metric_type, f"{section}/{device}/{field}")] = number
+    return samples
+
+
+class MetricsHistoryStore:
+    """
+    Columnar ring buffer plus mmap'd on-disk segments.
+
+    Args:
+        data_dir: Directory for compacted segments (created on demand)
+        buffer_rows: Number of polling rounds kept in memory before compaction
+        retention_seconds: Segments whose newest sample is older than this are deleted
+    """
+
+    def __init__(self, data_dir: str, buffer_rows: int = 360, retention_seconds: int = 7 * 24 * 3600):
+        self.data_dir = data_dir
+        self.buffer_rows = buffer_rows
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._series: Dict[SeriesKey, int] = {}
+        self._timestamps = np.empty(buffer_rows, dtype=np.float64)
+        self._values = np.full((buffer_rows, 64), np.nan, dtype=np.float32)
+        self._rows = 0
+        self._segments: List[Dict[str, Any]] = []
+        self._load_segments()
+
+    # ------------------------------------------------------------------ writes
+
+    def append(self, metrics: Dict[str, Any]):
+        """Record one polling round."""
+        samples = flatten_metrics(metrics)
+        if not samples:
+            return
+        timestamp = _parse_timestamp(metrics.get("timestamp"))
+
+        with self._lock:
+            for key in samples:
+                if key not in self._series:
+                    self._series[key] = len(self._series)
+            if len(self._series) > self._values.shape[1]:
+                grown = np.full(
+                    (self.buffer_rows, max(len(self._series), 2 * self._values.shape[1])), np.nan, np.float32
+                )
+                grown[:, : self._values.shape[1]] = self._values
+                self._values = grown
+
+            row = self._rows
+            self._timestamps[row] = timestamp
+            columns = np.fromiter((self._series[key] for key in samples), dtype=np.int64, count=len(samples))
+            self._values[row, columns] = np.fromiter(samples.values(), dtype=np.float32, count=len(samples))
+            self._rows += 1
+
+            if self._rows == self.buffer_rows:
+                self._compact()
+
+    def flush(self):
+        """Compact whatever is in the ring buffer to disk (used on shutdown)."""
+        with self._lock:
+            if self._rows:
+                self._compact()
+
+    def _compact(self):
+        """Write the buffered rows to a new segment and reset the buffer. Caller holds the lock."""
+        rows = self._rows
+        series = sorted(self._series, key=self._series.get)
+        name = f"segment-{int(self._timestamps[0] * 1000)}"
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            base = os.path.join(self.data_dir, name)
+            np.save(base + ".ts.npy", self._timestamps[:rows])
+            np.save(base + ".values.npy", self._values[:rows, : len(series)])
+            with open(base + ".series.json", "w") as f:
+                json.dump([list(key) for key in series], f)
+            self._segments.append(self._open_segment(base))
+            logger.info(f"Compacted {rows} metric rows x {len(series)} series into {name}")
+        except OSError as e:
+            # Keep serving what is in memory; the buffer is recycled either way
+            logger.error(f"Failed to write metrics history segment {name}: {e}")
+
+        self._series = {}
+        self._values = np.full((self.buffer_rows, max(64, len(series))), np.nan, dtype=np.float32)
+        self._rows = 0
+        self._apply_retention()
+
+    def _open_segment(self, base: str) -> Dict[str, Any]:
+        timestamps = np.load(base + ".ts.npy", mmap_mode="r")
+        with open(base + ".series.json") as f:
+            series = {tuple(key): i for i, key in enumerate(json.load(f))}
+        return {
+            "base": base,
+            "start": float(timestamps[0]),
+            "end": float(timestamps[-1]),
+            "timestamps": timestamps,
+            "values": np.load(base + ".values.npy", mmap_mode="r"),
+            "series": series,
+        }
+
+    def _load_segments(self):
+        if not os.path.isdir(self.data_dir):
+            return
+        for entry in sorted(os.listdir(self.data_dir)):
+            if not entry.endswith(".series.json"):
+                continue
+            base = os.path.join(self.data_dir, entry[: -len(".series.json")])
+            try:
+                self._segments.append(self._open_segment(base))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable metrics history segment {base}: {e}")
+        self._segments.sort(key=lambda s: s["start"])
+        self._apply_retention()
+        logger.info(f"Loaded {len(self._segments)} metrics history segments from {self.data_dir}")
+
+    def _apply_retention(self):
+        cutoff = time.time() - self.retention_seconds
+        keep = []
+        for segment in self._segments:
+            if segment["end"] >= cutoff:
+                keep.append(segment)
+                continue
+            for suffix in (".ts.npy", ".values.npy", ".series.json"):
+                try:
+                    os.remove(segment["base"] + suffix)
+                except OSError:
+                    pass
+        self._segments = keep
+
+    # ------------------------------------------------------------------- reads
+
+    def query(
+        self,
+        node: Optional[str] = None,
+        metric_type: Optional[str] = None,
+        duration: int = 3600,
+        max_points: int = 300,
+        metric: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Return series in the last `duration` seconds, downsampled to at most max_points
+        buckets by averaging.
+
+        Args:
+            node: Only this node
+            metric_type: Only "gpu" or "nic" series
+            duration: Time range in seconds, ending now
+            max_points: Maximum number of points per series
+            metric: Only series whose name contains this substring (e.g. "temperature")
+
+        Returns:
+            {
+                "start": ..., "end": ..., "step": ...,
+                "timestamps": [bucket start, ...],
+                "series": {node: {metric_type: {series name: [value or None, ...]}}}
+            }
+        """
+        end = time.time()
+        start = end - duration
+        max_points = max(1, max_points)
+
+        def wanted(key: SeriesKey) -> bool:
+            return (
+                (node is None or key[0] == node)
+                and (metric_type is None or key[1] == metric_type)
+                and (metric is None or metric in key[2])
+            )
+
+        # Gather (timestamps, values, column keys) chunks overlapping the range
+        chunks = []
+        with self._lock:
+            sources = [(s["timestamps"], s["values"], s["series"]) for s in self._segments if s["end"] >= start]
+            if self._rows:
+                sources.append(
+                    (
+                        self._timestamps[: self._rows].copy(),
+                        self._values[: self._rows, : len(self._series)].copy(),
+                        dict(self._series),
+                    )
+                )
+        for timestamps, values, series in sources:
+            mask = timestamps >= start
+            if not mask.any():
+                continue
+            keys = [key for key in series if wanted(key)]
+            if not keys:
+                continue
+            columns = [series[key] for key in keys]
+            chunks.append((np.asarray(timestamps[mask]), np.asarray(values[mask][:, columns]), keys))
+
+        step = duration / max_points
+        result = {"start": start, "end": end, "step": step, "timestamps": [], "series": {}}
+        if not chunks:
+            return result
+
+        # Bucket every sample, then average per (bucket, series) with bincount
+        all_keys = list(dict.fromkeys(key for _, _, keys in chunks for key in keys))
+        key_index = {key: i for i, key in enumerate(all_keys)}
+        sums = np.zeros((max_points, len(all_keys)))
+        counts = np.zeros((max_points, len(all_keys)))
+        for timestamps, values, keys in chunks:
+            buckets = np.minimum(((timestamps - start) / step).astype(np.int64), max_points - 1)
+            columns = np.array([key_index[key] for key in keys])
+            valid = ~np.isnan(values)
+            flat = (buckets[:, None] * len(all_keys) + columns[None, :])[valid]
+            sums += np.bincount(flat, weights=values[valid], minlength=sums.size).reshape(sums.shape)
+            counts += np.bincount(flat, minlength=counts.size).reshape(counts.shape)
+
+        populated = counts.any(axis=1)
+        with np.errstate(invalid="ignore"):
+            means = (sums / counts)[populated]
+        result["timestamps"] = (start + np.nonzero(populated)[0] * step).round(3).tolist()
+        for i, (key_node, key_type, name) in enumerate(all_keys):
+            column = means[:, i]
+            result["series"].setdefault(key_node, {}).setdefault(key_type, {})[name] = [
+                None if np.isnan(v) else round(float(v), 3) for v in column
+            ]
+        return result
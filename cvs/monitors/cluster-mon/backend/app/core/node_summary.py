@@ -0,0 +1,383 @@
+"""
+Per-node summary index served by /api/nodes and /api/cluster/status.
+
+The collection loop builds the index once per polling round: one typed NodeSummary per
+node (status, GPU count, average utilization/temperature/power, health issues) plus the
+cluster-wide status. Both JSON bodies are serialized once at build time and tagged with an
+ETag, so an API request is a dict lookup and a conditional request from a polling browser
+is answered with 304 Not Modified without touching the raw metrics tree.
+"""
+
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+
+def _dumps(data) -> bytes:
+    # Same encoding as FastAPI's JSONResponse
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def check_node_health(
+    node: str, gpu_data: dict, metrics_error: bool = False, stable_status: str = "healthy"
+) -> Tuple[str, list]:
+    """
+    Check if a node is healthy based on error metrics.
+
+    Args:
+        node: Node hostname
+        gpu_data: The "gpu" part of the latest metrics payload
+        metrics_error: Metrics collection for this node returned an error
+        stable_status: Node status from the failure counter (requires 5 consecutive failures)
+
+    Returns:
+        Tuple of (status, issues_list)
+        Status can be: "healthy", "unhealthy", or "unreachable"
+    """
+    issues = []
+
+    # If metrics collection had an error, this indicates connectivity issue
+    if metrics_error:
+        # Don't immediately mark as unreachable, use stable status
+        if stable_status == 'unreachable':
+            return 'unreachable', ['Node unreachable via SSH']
+        # Otherwise check for hardware errors below
+        status = stable_status
+    else:
+        status = "healthy"
+
+    # Check RAS errors
+    ras_data = gpu_data.get("ras_errors", {}).get(node, {})
+    if isinstance(ras_data, dict) and "gpu_data" in ras_data:
+        for gpu in ras_data["gpu_data"]:
+            ecc = gpu.get("ecc", {})
+            uncorrectable = ecc.get("total_uncorrectable", 0)
+            correctable = ecc.get("total_correctable", 0)
+
+            if uncorrectable > 0:
+                status = "unhealthy"
+                issues.append(f"GPU {gpu['gpu']}: {uncorrectable} uncorrectable ECC errors")
+            elif correctable > 10:  # Threshold for correctable errors
+                status = "unhealthy"
+                issues.append(f"GPU {gpu['gpu']}: {correctable} correctable ECC errors")
+
+    # Check PCIe errors
+    pcie_data = gpu_data.get("pcie", {}).get(node, {})
+    if isinstance(pcie_data, dict) and "gpu_data" in pcie_data:
+        for gpu in pcie_data["gpu_data"]:
+            pcie = gpu.get("pcie", {})
+            replay_count = pcie.get("replay_count", 0)
+            nak_count = pcie.get("nak_count", 0)
+
+            # Convert to int if string
+            try:
+                replay_count = int(replay_count) if replay_count else 0
+                nak_count = int(nak_count) if nak_count else 0
+            except (ValueError, TypeError):
+                replay_count = 0
+                nak_count = 0
+
+            if replay_count > 100 or nak_count > 100:  # Error thresholds
+                status = "unhealthy"
+                issues.append(f"GPU {gpu['gpu']}: PCIe errors (replay: {replay_count}, nak: {nak_count})")
+
+    # Check XGMI errors
+    xgmi_data = gpu_data.get("xgmi", {}).get(node, {})
+    if isinstance(xgmi_data, dict) and "gpu_data" in xgmi_data:
+        for gpu in xgmi_data["gpu_data"]:
+            xgmi = gpu.get("xgmi", {})
+            error_count = xgmi.get("error_count", 0)
+
+            if error_count > 10:  # XGMI error threshold
+                status = "unhealthy"
+                issues.append(f"GPU {gpu['gpu']}: {error_count} XGMI errors")
+
+    # Check temperature (warning, not critical)
+    temp_data = gpu_data.get("temperature", {}).get(node, {})
+    if isinstance(temp_data, dict):
+        for gpu_id, gpu_temp in temp_data.items():
+            if isinstance(gpu_temp, dict):
+                temp = gpu_temp.get("Temperature (Sensor edge) (c)")
+                if temp and float(temp) > 85:
+                    if status == "healthy":
+                        status = "unhealthy"
+                    issues.append(f"{gpu_id}: High temperature {temp}°C")
+
+    return status, issues
+
+
+def _node_utilization(node_util) -> Tuple[int, float]:
+    """GPU count and average utilization of one node, for both amd-smi (list) and rocm-smi (dict) layouts."""
+    values = []
+    # Handle list format (new amd-smi format)
+    if isinstance(node_util, list):
+        for gpu_entry in node_util:
+            util = 0
+            if isinstance(gpu_entry, dict):
+                usage = gpu_entry.get("usage", {})
+                if isinstance(usage, dict):
+                    gfx_activity = usage.get("gfx_activity", {})
+                    util = gfx_activity.get("value", 0) if isinstance(gfx_activity, dict) else 0
+                else:
+                    util = gpu_entry.get("GPU use (%)", 0)
+            values.append(float(util) if util else 0)
+        gpu_count = len(node_util)
+    # Handle dict format (old rocm-smi format)
+    elif isinstance(node_util, dict) and 'error' not in node_util:
+        for gpu_metrics in node_util.values():
+            if isinstance(gpu_metrics, dict):
+                util = gpu_metrics.get("GPU use (%)", 0)
+                values.append(float(util) if util else 0)
+        gpu_count = len(node_util)
+    else:
+        return 0, 0.0
+    return gpu_count, round(sum(values) / gpu_count, 2) if gpu_count > 0 else 0
+
+
+def _node_temperature(node_temp) -> float:
+    """Average GPU temperature of one node (hotspot/junction first, then edge, then memory)."""
+    temps = []
+    # Handle list format (new amd-smi format)
+    if isinstance(node_temp, list):
+        for gpu_entry in node_temp:
+            if not isinstance(gpu_entry, dict):
+                continue
+            temp_field = gpu_entry.get("temperature", {})
+            temp = 0
+            if isinstance(temp_field, dict):
+                temp = temp_field.get("hotspot", temp_field.get("edge", temp_field.get("junction", 0)))
+                if isinstance(temp, dict):
+                    temp = temp.get("value", 0)
+            temps.append(temp)
+    # Handle dict format (old rocm-smi format)
+    elif isinstance(node_temp, dict) and 'error' not in node_temp:
+        for gpu_temp in node_temp.values():
+            if isinstance(gpu_temp, dict):
+                temps.append(
+                    gpu_temp.get(
+                        "Temperature (Sensor junction) (C)",
+                        gpu_temp.get(
+                            "Temperature (Sensor edge) (C)", gpu_temp.get("Temperature (Sensor memory) (C)", 0)
+                        ),
+                    )
+                )
+    values = []
+    for temp in temps:
+        if temp:
+            try:
+                values.append(float(temp))
+            except (ValueError, TypeError):
+                pass
+    return round(sum(values) / len(values), 2) if values else 0
+
+
+def _node_power(node_power) -> float:
+    """Average GPU socket power (W) of one node, from amd-smi metric output."""
+    values = []
+    if isinstance(node_power, dict) and isinstance(node_power.get("gpu_data"), list):
+        for gpu_entry in node_power["gpu_data"]:
+            power = gpu_entry.get("power", {}) if isinstance(gpu_entry, dict) else {}
+            socket_power = power.get("socket_power", "") if isinstance(power, dict) else ""
+            if isinstance(socket_power, dict):
+                socket_power = socket_power.get("value", "")
+            try:
+                values.append(float(str(socket_power).split()[0]))
+            except (ValueError, IndexError):
+                pass
+    return round(sum(values) / len(values), 2) if values else 0
+
+
+@dataclass(frozen=True)
+class NodeSummary:
+    """Summary row of one node, as served by /api/nodes."""
+
+    hostname: str
+    status: str
+    gpu_count: int
+    avg_gpu_util: float
+    avg_gpu_temp: float
+    avg_gpu_power: float
+    health_issues: Tuple[str, ...]
+    # Hardware-only status (collection errors ignored), counted by /api/cluster/status
+    hardware_status: str = field(default="healthy", compare=False)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["health_issues"] = list(self.health_issues)
+        del data["hardware_status"]
+        return data
+
+
+def _cluster_gpu_averages(gpu_data: dict) -> dict:
+    """Cluster-wide GPU count and average utilization/memory/temperature (rocm-smi dict layout)."""
+    total_gpus = 0
+    utils, memory_utils, temps = [], [], []
+
+    for node_data in gpu_data.get("utilization", {}).values():
+        if isinstance(node_data, dict) and "error" not in node_data:
+            total_gpus += len(node_data.keys())
+            for gpu_metrics in node_data.values():
+                if isinstance(gpu_metrics, dict):
+                    util = gpu_metrics.get("GPU use (%)", 0)
+                    if util:
+                        utils.append(float(util))
+
+    for node_data in gpu_data.get("memory", {}).values():
+        if isinstance(node_data, dict) and "error" not in node_data:
+            for gpu_metrics in node_data.values():
+                if isinstance(gpu_metrics, dict):
+                    mem_used = gpu_metrics.get("VRAM Total Used Memory (B)", 0)
+                    mem_total = gpu_metrics.get("VRAM Total Memory (B)", 0)
+                    if mem_total and int(mem_total) > 0:
+                        memory_utils.append((int(mem_used) / int(mem_total)) * 100)
+
+    for node_data in gpu_data.get("temperature", {}).values():
+        if isinstance(node_data, dict) and "error" not in node_data:
+            for gpu_metrics in node_data.values():
+                if isinstance(gpu_metrics, dict):
+                    temp = gpu_metrics.get("Temperature (Sensor junction) (C)") or gpu_metrics.get(
+                        "Temperature (Sensor edge) (C)"
+                    )
+                    if temp:
+                        temps.append(float(temp))
+
+    return {
+        "total_gpus": total_gpus,
+        "avg_gpu_utilization": round(sum(utils) / len(utils) if utils else 0, 2),
+        "avg_gpu_memory_utilization": round(sum(memory_utils) / len(memory_utils) if memory_utils else 0, 2),
+        "avg_gpu_temperature": round(sum(temps) / len(temps) if temps else 0, 1),
+    }
+
+
+class NodeSummaryIndex:
+    """
+    Node summaries and cluster status of one polling round, with pre-serialized bodies.
+
+    Build with NodeSummaryIndex.build(); the index is immutable, the collection loop
+    replaces it every round. Serve with respond_json(request, index.nodes_body, index.nodes_etag).
+    """
+
+    def __init__(self, nodes: List[NodeSummary], cluster_status: dict):
+        self.nodes = tuple(nodes)
+        self.by_host: Dict[str, NodeSummary] = {node.hostname: node for node in self.nodes}
+        self.cluster_status = cluster_status
+        self.built_at = time.time()
+        self.nodes_body = _dumps([node.to_dict() for node in self.nodes])
+        self.status_body = _dumps(cluster_status)
+        self.nodes_etag = self._etag(self.nodes_body)
+        self.status_etag = self._etag(self.status_body)
+
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        # Content hash, so an unchanged round keeps its ETag and clients keep getting 304
+        return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+    @classmethod
+    def build(
+        cls,
+        latest_metrics: dict,
+        host_list: Iterable[str],
+        reachable_hosts: Iterable[str],
+        unreachable_hosts: Iterable[str],
+        node_health_status: Optional[dict] = None,
+        node_failure_count: Optional[dict] = None,
+    ) -> "NodeSummaryIndex":
+        """
+        Build the index from the latest metrics payload and the SSH manager host lists.
+
+        Args:
+            latest_metrics: Payload of the last collection round ({"gpu": ..., "nic": ..., "timestamp": ...})
+            host_list: All configured nodes
+            reachable_hosts, unreachable_hosts: Current probe results
+            node_health_status: Stable status per node ('healthy'|'unhealthy'|'unreachable')
+            node_failure_count: Consecutive collection failures per node
+        """
+        node_health_status = node_health_status or {}
+        node_failure_count = node_failure_count or {}
+        gpu_data = latest_metrics.get("gpu", {}) if isinstance(latest_metrics, dict) else {}
+        if not isinstance(gpu_data, dict):
+            gpu_data = {}
+        util_data = gpu_data.get("utilization", {})
+        temp_data = gpu_data.get("temperature", {})
+        power_data = gpu_data.get("power", {})
+        reachable = set(reachable_hosts)
+
+        nodes = []
+        for node in host_list:
+            # Get stable status (requires 5 consecutive failures to change)
+            stable_status = node_health_status.get(node, 'healthy')
+            has_metrics_error = node in util_data and isinstance(util_data[node], dict) and 'error' in util_data[node]
+            status, issues = check_node_health(node, gpu_data, has_metrics_error, stable_status)
+            hardware_status = check_node_health(node, gpu_data)[0] if has_metrics_error else status
+
+            # Use stable status if it's unreachable
+            if stable_status == 'unreachable':
+                status = 'unreachable'
+                issues = [f'Unreachable after {node_failure_count.get(node, 0)} consecutive failures']
+
+            gpu_count, avg_util = _node_utilization(util_data.get(node))
+            nodes.append(
+                NodeSummary(
+                    hostname=node,
+                    status=status,
+                    gpu_count=gpu_count,
+                    avg_gpu_util=avg_util,
+                    avg_gpu_temp=_node_temperature(temp_data.get(node)),
+                    avg_gpu_power=_node_power(power_data.get(node)),
+                    health_issues=tuple(issues),
+                    hardware_status=hardware_status if node in reachable else "unreachable",
+                )
+            )
+
+        reachable_summaries = [node for node in nodes if node.hostname in reachable]
+        healthy_nodes = sum(1 for node in reachable_summaries if node.hardware_status == "healthy")
+        unhealthy_nodes = len(reachable_summaries) - healthy_nodes
+        unreachable_nodes = len(list(unreachable_hosts))
+
+        # Determine overall cluster status
+        if unreachable_nodes > 0:
+            cluster_health = "critical"
+        elif unhealthy_nodes > 0:
+            cluster_health = "degraded"
+        else:
+            cluster_health = "healthy"
+
+        averages = _cluster_gpu_averages(gpu_data)
+        cluster_status = {
+            "total_nodes": len(nodes),
+            "healthy_nodes": healthy_nodes,
+            "unhealthy_nodes": unhealthy_nodes,
+            "unreachable_nodes": unreachable_nodes,
+            "total_gpus": averages["total_gpus"],
+            "avg_gpu_utilization": averages["avg_gpu_utilization"],
+            "avg_gpu_memory_utilization": averages["avg_gpu_memory_utilization"],
+            "avg_gpu_temperature": averages["avg_gpu_temperature"],
+            "status": cluster_health,
+            "last_update": latest_metrics.get("timestamp") if isinstance(latest_metrics, dict) else None,
+        }
+        return cls(nodes, cluster_status)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def respond_json(request: Request, body: bytes, etag: str) -> Response:
+    """
+    Serve a pre-serialized JSON body with its ETag, or 304 Not Modified when the client
+    already holds this version (If-None-Match).
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -163,6 +163,35 @@ class SimpleConfig:
     def polling_stagger_delay(self) -> int:
         return self.config_data.get("polling", {}).get("stagger_delay", 2)
 
+    # Metrics history
+    @property
+    def history_dir(self) -> str:
+        import os
+
+        default_dir = os.path.join(os.getenv("CLUSTER_MONITOR_HOME", "."), "data/history")
+        return os.getenv("HISTORY__DIR", self.config_data.get("history", {}).get("dir", default_dir))
+
+    @property
+    def history_buffer_rows(self) -> int:
+        return self.config_data.get("history", {}).get("buffer_rows", 360)
+
+    @property
+    def history_retention_hours(self) -> int:
+        return self.config_data.get("history", {}).get("retention_hours", 168)
+
+    # System log index
+    @property
+    def logs_ingest_interval(self) -> int:
+        return self.config_data.get("logs", {}).get("ingest_interval", 60)
+
+    @property
+    def logs_retention_hours(self) -> int:
+        return self.config_data.get("logs", {}).get("retention_hours", 168)
+
+    @property
+    def logs_max_entries_per_node(self) -> int:
+        return self.config_data.get("logs", {}).get("max_entries_per_node", 5000)
+
     # Alert Thresholds
     @property
     def gpu_temp_threshold(self) -> float:
@@ -0,0 +1,180 @@
+"""
+WebSocket metrics fan-out.
+
+Each polling round is diffed against the previous one and serialized once, as a full
+snapshot and as a delta frame holding only the changed values. Every client gets its
+own sender task and a single pending-frame slot, so a slow socket never delays the
+others. A frame still pending when the next round arrives is stale: it is dropped and
+that client is resynced with a full snapshot instead of the delta.
+
+Frames:
+    {"type": "metrics", "seq": N, "data": {...}}
+    {"type": "metrics_delta", "seq": N, "base": N-1, "changes": [[path, value], ...], "removed": [path, ...]}
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps(data) -> str:
+    # Same encoding as WebSocket.send_json
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def diff_metrics(old: Any, new: Any, path: Optional[List[str]] = None) -> Tuple[List[list], List[list]]:
+    """
+    Diff two metrics payloads.
+
+    Dicts are compared key by key; any other value (lists included) is replaced as a whole.
+
+    Returns:
+        (changes, removed): changes is a list of [path, new value], removed a list of paths,
+        where a path is the list of dict keys leading to the value
+    """
+    path = path or []
+    changes, removed = [], []
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        if old != new:
+            changes.append([path, new])
+        return changes, removed
+
+    for key, value in new.items():
+        if key not in old:
+            changes.append([path + [key], value])
+        elif old[key] is not value:
+            sub_changes, sub_removed = diff_metrics(old[key], value, path + [key])
+            changes.extend(sub_changes)
+            removed.extend(sub_removed)
+    for key in old:
+        if key not in new:
+            removed.append(path + [key])
+    return changes, removed
+
+
+class ClientChannel:
+    """One WebSocket client: a pending metrics frame, queued control messages and a sender task."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.last_seq: Optional[int] = None  # seq of the last metrics frame handed to this client
+        self.pending: Optional[str] = None
+        self.control = deque()
+        self.dropped = 0
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._sender())
+
+    def offer(self, seq: int, full_text: str, delta_text: Optional[str]):
+        """Queue the frame for round seq, replacing (and counting) a stale pending frame."""
+        if self.pending is not None:
+            self.dropped += 1
+            self.pending = full_text
+        elif delta_text is not None and self.last_seq == seq - 1:
+            self.pending = delta_text
+        else:
+            self.pending = full_text
+        self.last_seq = seq
+        self._wakeup.set()
+
+    def send_control(self, text: str):
+        self.control.append(text)
+        self._wakeup.set()
+
+    async def _sender(self):
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self.control:
+                    await self.websocket.send_text(self.control.popleft())
+                if self.pending is not None:
+                    text, self.pending = self.pending, None
+                    await self.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to send metrics to client: {e}")
+            self.closed = True
+
+    async def close(self):
+        self.closed = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+class MetricsBroadcaster:
+    """Serializes each metrics round once and hands it to every client channel."""
+
+    def __init__(self):
+        self.clients: List[ClientChannel] = []
+        self.seq = 0
+        self._last_metrics: Optional[Dict[str, Any]] = None
+        self._full_text: Optional[str] = None
+
+    def _encode(self, metrics: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        seq = self.seq + 1
+        full_text = _dumps({"type": "metrics", "seq": seq, "data": metrics})
+        delta_text = None
+        if self._last_metrics is not None:
+            changes, removed = diff_metrics(self._last_metrics, metrics)
+            delta_text = _dumps(
+                {"type": "metrics_delta", "seq": seq, "base": seq - 1, "changes": changes, "removed": removed}
+            )
+        return full_text, delta_text
+
+    async def publish(self, metrics: Dict[str, Any]):
+        """Encode one round (off the event loop) and offer it to every connected client."""
+        if not self.clients:
+            # Nobody to diff for; the snapshot is encoded when the next client connects
+            self.seq += 1
+            self._last_metrics = metrics
+            self._full_text = None
+            return
+
+        full_text, delta_text = await asyncio.to_thread(self._encode, metrics)
+        self.seq += 1
+        self._last_metrics = metrics
+        self._full_text = full_text
+
+        for client in [c for c in self.clients if c.closed]:
+            await self.remove(client)
+        for client in self.clients:
+            client.offer(self.seq, full_text, delta_text)
+
+        if delta_text is not None:
+            logger.debug(f"Broadcast round {self.seq}: full {len(full_text)} bytes, delta {len(delta_text)} bytes")
+
+    def add(self, websocket: WebSocket) -> ClientChannel:
+        """Register a client and queue the current full snapshot for it."""
+        client = ClientChannel(websocket)
+        client.start()
+        if self._full_text is None and self._last_metrics is not None:
+            self._full_text = _dumps({"type": "metrics", "seq": self.seq, "data": self._last_metrics})
+        if self._full_text is not None:
+            client.offer(self.seq, self._full_text, None)
+        self.clients.append(client)
+        return client
+
+    def resync(self, client: ClientChannel):
+        """Queue a full snapshot for a client that lost track of the delta sequence."""
+        if self._full_text is not None:
+            client.offer(self.seq, self._full_text, None)
+
+    async def remove(self, client: ClientChannel):
+        if client in self.clients:
+            self.clients.remove(client)
+        await client.close()
@@ -9,7 +9,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from typing import List, Union, Optional
+from typing import Dict, Union, Optional
 import os
 import time
 from pathlib import Path
@@ -19,6 +19,16 @@ from app.core.cvs_parallel_ssh_reliable import Pssh
 from app.core.jump_host_pssh import JumpHostPssh
 from app.collectors.gpu_collector import GPUMetricsCollector
 from app.collectors.nic_collector import NICMetricsCollector
+from app.collectors.batch_collector import BatchMetricsCollector
+from app.collectors.gpu_software_collector import GPUSoftwareCollector
+from app.collectors.nic_software_collector import NICSoftwareCollector
+from app.collectors.nic_advanced_collector import NICAdvancedCollector
+from app.collectors.logs_collector import LogsCollector
+from app.core.inventory_cache import InventorySection, NodeInventoryCache
+from app.core.log_index import LogIndex
+from app.core.metrics_store import MetricsHistoryStore
+from app.core.ws_broadcast import MetricsBroadcaster
+from app.core.node_summary import NodeSummaryIndex
 from app.api import router as api_router
 
 # Configure logging based on DEBUG environment variable
@@ -56,6 +66,52 @@ logger = logging.getLogger(__name__)
 logger.info(f"Logging initialized - DEBUG_MODE: {DEBUG_MODE}, LOG_LEVEL: {logging.getLevelName(LOG_LEVEL)}")
 
 
+def build_software_caches(ttl: int) -> Dict[str, NodeInventoryCache]:
+    """
+    Per-node software inventory caches served by /api/software, kept fresh by software_refresh_loop().
+
+    Inventory sections are only re-collected on nodes whose fingerprint changed; the NIC
+    counter sections are volatile and re-collected from every node on each refresh.
+    """
+    gpu = GPUSoftwareCollector()
+    nic = NICSoftwareCollector()
+    nic_advanced = NICAdvancedCollector()
+    return {
+        "gpu": NodeInventoryCache(
+            "GPU software",
+            [
+                InventorySection("rocm_version", gpu.collect_version_summary),
+                InventorySection("gpu_firmware", gpu.collect_gpu_firmware),
+            ],
+            fingerprint_cmd=gpu.FINGERPRINT_CMD,
+            ttl=ttl,
+        ),
+        "nic": NodeInventoryCache(
+            "NIC software",
+            [
+                InventorySection("nic_firmware", nic.collect_nic_firmware_version),
+                InventorySection("nic_drivers", nic.collect_nic_driver_version),
+                InventorySection("rdma_statistics", nic.collect_rdma_statistics_detailed, volatile=True),
+                InventorySection("ethtool_statistics", nic.collect_ethtool_statistics_detailed, volatile=True),
+                InventorySection("pci_devices", nic.collect_pci_device_info),
+            ],
+            fingerprint_cmd=nic.FINGERPRINT_CMD,
+            ttl=ttl,
+        ),
+        "nic_advanced": NodeInventoryCache(
+            "NIC advanced",
+            [
+                InventorySection("nic_pcie", nic_advanced.collect_nic_pcie_info),
+                InventorySection("congestion", nic_advanced.collect_congestion_info, volatile=True),
+                InventorySection("mellanox", nic_advanced.collect_mellanox_info),
+                InventorySection("broadcom", nic_advanced.collect_broadcom_info),
+            ],
+            fingerprint_cmd=nic_advanced.FINGERPRINT_CMD,
+            ttl=ttl,
+        ),
+    }
+
+
 # Global state
 class AppState:
     """Global application state."""
@@ -64,21 +120,28 @@ class AppState:
         self.ssh_manager: Optional[Union[Pssh, JumpHostPssh]] = None
         self.gpu_collector: GPUMetricsCollector = None
         self.nic_collector: NICMetricsCollector = None
+        self.batch_collector: BatchMetricsCollector = None
         self.latest_metrics: dict = {}
-        self.websocket_clients: List[WebSocket] = []
+        # Per-node summary and cluster status of the latest round, rebuilt by refresh_node_summary()
+        self.node_summary: Optional[NodeSummaryIndex] = None
+        self.metrics_history: Optional[MetricsHistoryStore] = None
+        self.broadcaster = MetricsBroadcaster()
         self.collection_task: asyncio.Task = None
         self.is_collecting: bool = False
         # Node health tracking (for stability - require 5 consecutive failures)
         self.node_failure_count: dict = {}  # {node: consecutive_failure_count}
         self.node_health_status: dict = {}  # {node: 'healthy'|'unhealthy'|'unreachable'}
-        # Software info cache (updated every 180 seconds since it rarely changes)
-        self.cached_gpu_software: dict = {}
-        self.cached_nic_software: dict = {}
-        self.cached_nic_advanced: dict = {}
-        self.gpu_software_cache_time: float = 0
-        self.nic_software_cache_time: float = 0
-        self.nic_advanced_cache_time: float = 0
+        # Software info caches (per node, refreshed in the background every 180 seconds)
         self.software_cache_ttl: int = 180  # 3 minutes
+        self.software_caches: Dict[str, NodeInventoryCache] = build_software_caches(self.software_cache_ttl)
+        self.software_refresh_task: Optional[asyncio.Task] = None
+        # System log index behind /api/logs, fed incrementally by log_ingest_loop()
+        self.logs_collector = LogsCollector()
+        self.log_index = LogIndex(
+            retention_seconds=settings.logs_retention_hours * 3600,
+            max_entries_per_node=settings.logs_max_entries_per_node,
+        )
+        self.log_ingest_task: Optional[asyncio.Task] = None
         # SECURITY: Passwords stored in memory only (never persisted to disk)
         self.ssh_password: str = None  # Direct SSH password
         self.jump_host_password: str = None  # Jump host password
@@ -118,6 +181,18 @@ async def reload_configuration():
                     await app_state.probe_task
                 except asyncio.CancelledError:
                     pass
+            if app_state.software_refresh_task:
+                app_state.software_refresh_task.cancel()
+                try:
+                    await app_state.software_refresh_task
+                except asyncio.CancelledError:
+                    pass
+            if app_state.log_ingest_task:
+                app_state.log_ingest_task.cancel()
+                try:
+                    await app_state.log_ingest_task
+                except asyncio.CancelledError:
+                    pass
 
         # 2. Close existing SSH connections
         if app_state.ssh_manager:
@@ -127,14 +202,12 @@ async def reload_configuration():
 
         # 3. Clear cached data
         app_state.latest_metrics = {}
+        app_state.node_summary = None
         app_state.node_failure_count = {}
         app_state.node_health_status = {}
-        app_state.cached_gpu_software = {}
-        app_state.cached_nic_software = {}
-        app_state.cached_nic_advanced = {}
-        app_state.gpu_software_cache_time = 0
-        app_state.nic_software_cache_time = 0
-        app_state.nic_advanced_cache_time = 0
+        for cache in app_state.software_caches.values():
+            cache.clear()
+        app_state.log_index.clear()
 
         # 4. Reload configuration from files
         logger.info("Reloading configuration from cluster.yaml and nodes.txt...")
@@ -235,6 +308,8 @@ async def reload_configuration():
             app_state.is_collecting = True
             app_state.collection_task = asyncio.create_task(collect_metrics_loop())
             app_state.probe_task = asyncio.create_task(periodic_host_probe())
+            app_state.software_refresh_task = asyncio.create_task(software_refresh_loop())
+            app_state.log_ingest_task = asyncio.create_task(log_ingest_loop())
             logger.info("Metrics collection and periodic probe restarted")
 
         logger.info("Configuration reload completed successfully!")
@@ -287,6 +362,34 @@ def update_node_status(node: str, is_error: bool, error_type: str = 'unreachable
     return app_state.node_health_status[node]
 
 
+def refresh_node_summary() -> Optional[NodeSummaryIndex]:
+    """
+    Rebuild the per-node summary index served by /api/nodes and /api/cluster/status.
+    Called once per collection round and whenever host reachability changes.
+    """
+    manager = app_state.ssh_manager
+    if manager is None:
+        app_state.node_summary = None
+        return None
+    app_state.node_summary = NodeSummaryIndex.build(
+        app_state.latest_metrics,
+        manager.host_list,
+        manager.reachable_hosts,
+        manager.unreachable_hosts,
+        app_state.node_health_status,
+        app_state.node_failure_count,
+    )
+    return app_state.node_summary
+
+
+async def collect_round():
+    """Collect one round of GPU and NIC metrics, one round trip per node for all polling commands."""
+    batch = await app_state.batch_collector.collect(app_state.ssh_manager)
+    gpu_metrics = await app_state.gpu_collector.collect_all_metrics(app_state.ssh_manager, batch=batch)
+    nic_metrics = await app_state.nic_collector.collect_all_metrics(app_state.ssh_manager, batch=batch)
+    return gpu_metrics, nic_metrics
+
+
 async def collect_metrics_loop():
     """Background task to collect metrics periodically."""
     logger.info("Starting metrics collection loop")
@@ -297,8 +400,7 @@ async def collect_metrics_loop():
 
             # Collect GPU and NIC metrics with connection error handling
             try:
-                gpu_metrics = await app_state.gpu_collector.collect_all_metrics(app_state.ssh_manager)
-                nic_metrics = await app_state.nic_collector.collect_all_metrics(app_state.ssh_manager)
+                gpu_metrics, nic_metrics = await collect_round()
             except ConnectionError as e:
                 # Connection error during metrics collection - trigger immediate re-probe
                 logger.error(f"ConnectionError during metrics collection: {e}")
@@ -306,10 +408,10 @@ async def collect_metrics_loop():
 
                 # Trigger immediate re-probe
                 if app_state.ssh_manager:
-                    changed = await asyncio.to_thread(app_state.ssh_manager.refresh_host_reachability)
+                    changed = await refresh_host_reachability(app_state.ssh_manager)
                     if changed:
                         await asyncio.to_thread(app_state.ssh_manager.recreate_client)
-                        logger.info("SSH client recreated with updated reachable hosts")
+                        logger.info("SSH client updated with current reachable hosts")
 
                 # Continue to next iteration (skip this round)
                 logger.info("Skipping this metrics collection round, will retry next interval")
@@ -340,11 +442,15 @@ async def collect_metrics_loop():
 
             # Store in app state
             app_state.latest_metrics = metrics_payload
+            refresh_node_summary()
+            if app_state.metrics_history:
+                # Off the event loop: a full ring buffer is compacted to disk
+                await asyncio.to_thread(app_state.metrics_history.append, metrics_payload)
 
             # Broadcast to WebSocket clients
             await broadcast_metrics(metrics_payload)
 
-            logger.info(f"Metrics collected successfully. {len(app_state.websocket_clients)} clients notified")
+            logger.info(f"Metrics collected successfully. {len(app_state.broadcaster.clients)} clients notified")
 
         except asyncio.CancelledError:
             logger.info("Metrics collection task cancelled")
@@ -359,22 +465,20 @@ async def collect_metrics_loop():
 
 
 async def broadcast_metrics(metrics: dict):
-    """Broadcast metrics to all connected WebSocket clients."""
-    if not app_state.websocket_clients:
-        return
+    """Broadcast metrics to all connected WebSocket clients (serialized once, delta-encoded)."""
+    await app_state.broadcaster.publish(metrics)
 
-    disconnected_clients = []
 
-    for client in app_state.websocket_clients:
-        try:
-            await client.send_json({"type": "metrics", "data": metrics})
-        except Exception as e:
-            logger.warning(f"Failed to send metrics to client: {e}")
-            disconnected_clients.append(client)
+async def refresh_host_reachability(ssh_manager) -> bool:
+    """
+    Re-probe hosts without blocking the event loop.
 
-    # Remove disconnected clients
-    for client in disconnected_clients:
-        app_state.websocket_clients.remove(client)
+    Direct SSH probes run natively on the event loop; the jump host probe (a blocking
+    paramiko exec) runs in a worker thread.
+    """
+    if hasattr(ssh_manager, "refresh_host_reachability_async"):
+        return await ssh_manager.refresh_host_reachability_async()
+    return await asyncio.to_thread(ssh_manager.refresh_host_reachability)
 
 
 async def periodic_host_probe():
@@ -403,11 +507,13 @@ async def periodic_host_probe():
             old_reachable = set(app_state.ssh_manager.reachable_hosts)
             old_unreachable = set(app_state.ssh_manager.unreachable_hosts)
 
-            # Re-probe (run in executor to avoid blocking event loop)
-            changed = await asyncio.to_thread(app_state.ssh_manager.refresh_host_reachability)
+            # Re-probe without blocking the event loop
+            changed = await refresh_host_reachability(app_state.ssh_manager)
 
             new_reachable = set(app_state.ssh_manager.reachable_hosts)
             new_unreachable = set(app_state.ssh_manager.unreachable_hosts)
+            if changed:
+                refresh_node_summary()
             logger.info(new_unreachable)
 
             # Check for changes
@@ -435,10 +541,11 @@ async def periodic_host_probe():
                 recreation_reason = f"periodic refresh (probe #{app_state.probe_count})"
                 logger.info(f"Forcing SSH client recreation after {app_state.probe_count} probes (1 hour)")
 
-            # Recreate client if needed
+            # Update the client in place on reachability changes, rebuild it on the periodic refresh
             if should_recreate:
-                await asyncio.to_thread(app_state.ssh_manager.recreate_client)
-                logger.info(f"✅ SSH client recreated - reason: {recreation_reason}")
+                force = recreation_reason != "reachability changed"
+                await asyncio.to_thread(app_state.ssh_manager.recreate_client, force)
+                logger.info(f"✅ SSH client {'recreated' if force else 'updated'} - reason: {recreation_reason}")
 
             app_state.last_probe_time = time.time()
             logger.info(f"Periodic probe completed - next probe in {PROBE_INTERVAL} seconds")
@@ -453,6 +560,31 @@ async def periodic_host_probe():
     logger.info("Periodic host probe task stopped")
 
 
+async def software_refresh_loop():
+    """
+    Background task keeping the software inventory caches fresh, so /api/software
+    handlers never wait on a cluster sweep (stale-while-revalidate).
+    """
+    logger.info("Software inventory refresh task started")
+    await asyncio.gather(*(cache.run(lambda: app_state.ssh_manager) for cache in app_state.software_caches.values()))
+
+
+async def fetch_new_log_messages(ssh_manager, cursors: dict) -> dict:
+    """Pull the kernel/journal error messages logged after the given cursors from every node."""
+    return await app_state.logs_collector.collect_new_messages(
+        ssh_manager,
+        cursors,
+        max_lines=settings.logs_max_entries_per_node,
+        backfill_seconds=settings.logs_retention_hours * 3600,
+    )
+
+
+async def log_ingest_loop():
+    """Background task feeding new dmesg/journal error messages into the log index."""
+    logger.info(f"Log ingest task started (every {settings.logs_ingest_interval} seconds)")
+    await app_state.log_index.run(lambda: app_state.ssh_manager, fetch_new_log_messages, settings.logs_ingest_interval)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
@@ -464,8 +596,15 @@ async def lifespan(app: FastAPI):
     # Initialize collectors (lightweight, no SSH needed)
     app_state.gpu_collector = GPUMetricsCollector()
     app_state.nic_collector = NICMetricsCollector()
+    app_state.batch_collector = BatchMetricsCollector()
     logger.info("Collectors initialized")
 
+    app_state.metrics_history = MetricsHistoryStore(
+        settings.history_dir,
+        buffer_rows=settings.history_buffer_rows,
+        retention_seconds=settings.history_retention_hours * 3600,
+    )
+
     if not nodes:
         logger.warning("No nodes configured! Please add nodes to config/nodes.txt")
         logger.info("Waiting for user to configure nodes via web UI...")
@@ -515,6 +654,8 @@ async def lifespan(app: FastAPI):
                 app_state.is_collecting = True
                 app_state.collection_task = asyncio.create_task(collect_metrics_loop())
                 app_state.probe_task = asyncio.create_task(periodic_host_probe())
+                app_state.software_refresh_task = asyncio.create_task(software_refresh_loop())
+                app_state.log_ingest_task = asyncio.create_task(log_ingest_loop())
                 logger.info("✅ Metrics collection started automatically")
 
         except Exception as e:
@@ -540,11 +681,30 @@ async def lifespan(app: FastAPI):
             await app_state.probe_task
         except asyncio.CancelledError:
             pass
+    if app_state.software_refresh_task:
+        app_state.software_refresh_task.cancel()
+        try:
+            await app_state.software_refresh_task
+        except asyncio.CancelledError:
+            pass
+    if app_state.log_ingest_task:
+        app_state.log_ingest_task.cancel()
+        try:
+            await app_state.log_ingest_task
+        except asyncio.CancelledError:
+            pass
+    for cache in app_state.software_caches.values():
+        cache.clear()
+    app_state.log_index.clear()
 
     # Close SSH connections
     if app_state.ssh_manager:
         app_state.ssh_manager.destroy_clients()
 
+    # Persist buffered metrics history
+    if app_state.metrics_history:
+        app_state.metrics_history.flush()
+
     logger.info("Shutdown complete")
 
 
@@ -571,28 +731,26 @@ app.add_middleware(
 async def websocket_metrics(websocket: WebSocket):
     """WebSocket endpoint for real-time metrics streaming."""
     await websocket.accept()
-    app_state.websocket_clients.append(websocket)
-    logger.info(f"WebSocket client connected. Total clients: {len(app_state.websocket_clients)}")
+    # Initial full snapshot is queued by the broadcaster, later rounds arrive as deltas
+    client = app_state.broadcaster.add(websocket)
+    logger.info(f"WebSocket client connected. Total clients: {len(app_state.broadcaster.clients)}")
 
     try:
-        # Send initial metrics
-        if app_state.latest_metrics:
-            await websocket.send_json({"type": "metrics", "data": app_state.latest_metrics})
-
         # Keep connection alive
         while True:
             # Wait for client messages (ping/pong)
             data = await websocket.receive_text()
             if data == "ping":
-                await websocket.send_text("pong")
+                client.send_control("pong")
+            elif data == "resync":
+                app_state.broadcaster.resync(client)
 
     except WebSocketDisconnect:
         logger.info("WebSocket client disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        if websocket in app_state.websocket_clients:
-            app_state.websocket_clients.remove(websocket)
+        await app_state.broadcaster.remove(client)
 
 
 # Include API router FIRST (highest priority)
@@ -607,7 +765,7 @@ async def health():
         "status": "healthy",
         "ssh_manager": app_state.ssh_manager is not None,
         "collecting": app_state.is_collecting,
-        "clients": len(app_state.websocket_clients),
+        "clients": len(app_state.broadcaster.clients),
     }
 
 
@@ -0,0 +1 @@
+"""Backend unit tests (run from backend/: python -m unittest discover -s tests -t .)"""
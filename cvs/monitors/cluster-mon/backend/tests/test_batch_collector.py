@@ -0,0 +1,67 @@
+# cvs/monitors/cluster-mon/backend/tests/test_batch_collector.py
+import json
+import subprocess
+import time
+import unittest
+
+from app.collectors.batch_collector import (
+    COLLECTION_COMMANDS,
+    EXEC_TIMEOUT_SLACK,
+    FRAME_BEGIN,
+    FRAME_END,
+    BatchMetricsCollector,
+)
+
+
+def _run(cmd):
+    return subprocess.run(["bash", "-c", cmd], stdout=subprocess.PIPE, timeout=60).stdout.decode()
+
+
+class TestBatchMetricsCollector(unittest.TestCase):
+    def test_build_command_runs_every_section(self):
+        collector = BatchMetricsCollector(
+            commands={"a": ("g1", "echo one"), "b": ("g1", "echo two >&2"), "c": ("g2", "printf 'x\\ty'")}
+        )
+        sections = collector.parse_batch_output({"node1": _run(collector.build_command())})
+
+        self.assertEqual(sections, {"a": {"node1": "one\n"}, "b": {"node1": "two\n"}, "c": {"node1": "x\ty"}})
+
+    def test_slow_command_only_loses_its_own_section(self):
+        # The group shares exec_timeout - slack (2s): the slow command gets its 1s share,
+        # the next command the rest, and the frame is printed well before the exec timeout
+        collector = BatchMetricsCollector(
+            commands={"slow": ("gpu", "sleep 30"), "fast": ("gpu", "echo ok"), "other": ("ip", "echo ip")},
+            command_timeout=60,
+        )
+        started = time.time()
+        out = _run(collector.build_command(exec_timeout=EXEC_TIMEOUT_SLACK + 2))
+        self.assertLess(time.time() - started, 5)
+
+        sections = collector.parse_batch_output({"node1": out})
+        self.assertTrue(sections["slow"]["node1"].startswith("ERROR: Timeout after"))
+        self.assertEqual(sections["fast"]["node1"], "ok\n")
+        self.assertEqual(sections["other"]["node1"], "ip\n")
+
+    def test_parse_batch_output_errors(self):
+        collector = BatchMetricsCollector()
+        doc = {name: {"rc": 0, "out": name} for name in COLLECTION_COMMANDS}
+        del doc["lldp"]
+        sections = collector.parse_batch_output(
+            {
+                "node1": f"motd\n{FRAME_BEGIN}\n{json.dumps(doc)}\n{FRAME_END}\n",
+                "node2": "ABORT: Host Unreachable Error",
+                "node3": "python3: command not found",
+                "node4": f"{FRAME_BEGIN}\n{{not json\n{FRAME_END}\n",
+            }
+        )
+
+        self.assertEqual(set(sections), set(COLLECTION_COMMANDS))
+        self.assertEqual(sections["amd_smi_metric"]["node1"], "amd_smi_metric")
+        self.assertEqual(sections["lldp"]["node1"], "")
+        self.assertEqual(sections["rdma_link"]["node2"], "ABORT: Host Unreachable Error")
+        self.assertTrue(sections["ip_addr"]["node3"].startswith("ERROR: Batched collection returned no frame"))
+        self.assertTrue(sections["ip_addr"]["node4"].startswith("ERROR: Batched collection frame is not valid JSON"))
+
+
+if __name__ == "__main__":
+    unittest.main()
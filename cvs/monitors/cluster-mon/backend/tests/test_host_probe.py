@@ -0,0 +1,62 @@
+# cvs/monitors/cluster-mon/backend/tests/test_host_probe.py
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from app.core.host_probe import HostRttTracker, async_discover_reachable_hosts
+
+
+class TestHostRttTracker(unittest.TestCase):
+    def test_smoothed_rtt_and_variance(self):
+        tracker = HostRttTracker(min_timeout=0.0)
+        tracker.record('node1', True, 0.4)
+        # First sample: srtt = rtt, rttvar = rtt / 2
+        self.assertAlmostEqual(tracker.srtt['node1'], 0.4)
+        self.assertAlmostEqual(tracker.rttvar['node1'], 0.2)
+        self.assertAlmostEqual(tracker.timeout_for('node1', 5), 0.4 + 4 * 0.2)
+
+        tracker.record('node1', True, 0.8)
+        # rttvar uses the srtt before this sample
+        self.assertAlmostEqual(tracker.rttvar['node1'], 0.75 * 0.2 + 0.25 * 0.4)
+        self.assertAlmostEqual(tracker.srtt['node1'], 0.875 * 0.4 + 0.125 * 0.8)
+
+        # A failed probe keeps the estimate
+        tracker.record('node1', False)
+        self.assertAlmostEqual(tracker.srtt['node1'], 0.45)
+        self.assertFalse(tracker.was_reachable('node1'))
+
+    def test_timeout_is_clamped(self):
+        tracker = HostRttTracker(min_timeout=0.25, down_timeout=1.0)
+        tracker.record('fast', True, 0.001)
+        tracker.record('slow', True, 3.0)
+        tracker.record('down', False)
+        self.assertEqual(tracker.timeout_for('fast', 5), 0.25)
+        self.assertEqual(tracker.timeout_for('slow', 5), 5)
+        self.assertEqual(tracker.timeout_for('down', 5), 1.0)
+        self.assertEqual(tracker.timeout_for('down', 0.5), 0.5)
+        self.assertEqual(tracker.timeout_for('never-probed', 5), 5)
+
+    def test_previously_reachable_host_gets_a_second_chance(self):
+        tracker = HostRttTracker()
+        tracker.record('node1', True, 0.001)
+        tracker.record('node2', False)
+        timeouts = []
+
+        async def fake_probe(host, port, timeout, check_banner):
+            timeouts.append((host, timeout))
+            # node1 only answers within the full timeout
+            return host, host == 'node1' and timeout == 5, 0.5
+
+        with patch('app.core.host_probe.async_tcp_probe', fake_probe):
+            reachable, unreachable = asyncio.run(
+                async_discover_reachable_hosts(['node1', 'node2'], timeout=5, rtt_tracker=tracker)
+            )
+
+        self.assertEqual((reachable, unreachable), (['node1'], ['node2']))
+        # node2 wasn't reachable before, so it isn't re-probed
+        self.assertEqual(timeouts, [('node1', 0.25), ('node2', 1.0), ('node1', 5)])
+        self.assertTrue(tracker.was_reachable('node1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# cvs/monitors/cluster-mon/backend/tests/test_inventory_cache.py
+import asyncio
+import unittest
+
+from app.core.inventory_cache import InventorySection, NodeInventoryCache
+
+
+class FakeManager:
+    def __init__(self, hosts):
+        self.host_list = list(hosts)
+        self.reachable_hosts = list(hosts)
+        self.unreachable_hosts = []
+        self.fingerprints = {host: 'v1' for host in hosts}
+
+    async def exec_async(self, cmd, timeout=None, print_console=True, hosts=None):
+        return {host: self.fingerprints[host] for host in self.host_list if hosts is None or host in hosts}
+
+
+class RecordingSection:
+    """Section collector returning '<name>-<call>' per host and recording the hosts of each call."""
+
+    def __init__(self, name, errors=()):
+        self.name = name
+        self.errors = set(errors)
+        self.calls = []
+
+    async def __call__(self, ssh_manager):
+        self.calls.append(list(ssh_manager.host_list))
+        return {
+            host: {'error': 'timeout'} if host in self.errors else f'{self.name}-{len(self.calls)}'
+            for host in ssh_manager.host_list
+        }
+
+
+class TestNodeInventoryCache(unittest.TestCase):
+    def setUp(self):
+        self.manager = FakeManager(['node1', 'node2', 'node3'])
+        self.firmware = RecordingSection('firmware')
+        self.counters = RecordingSection('counters')
+        self.cache = NodeInventoryCache(
+            'test',
+            [InventorySection('firmware', self.firmware), InventorySection('counters', self.counters, volatile=True)],
+            fingerprint_cmd='fingerprint',
+        )
+
+    def refresh(self):
+        return asyncio.run(self.cache.refresh(self.manager))
+
+    def test_unchanged_fingerprints_skip_the_inventory(self):
+        payload = self.refresh()
+        self.assertEqual(self.firmware.calls, [['node1', 'node2', 'node3']])
+        self.assertEqual(payload['firmware'], {host: 'firmware-1' for host in self.manager.host_list})
+
+        payload = self.refresh()
+        self.assertEqual(len(self.firmware.calls), 1)
+        # Volatile sections are re-collected from every node each time
+        self.assertEqual(self.counters.calls[-1], ['node1', 'node2', 'node3'])
+        self.assertEqual(payload['counters'], {host: 'counters-2' for host in self.manager.host_list})
+        self.assertEqual(payload['firmware'], {host: 'firmware-1' for host in self.manager.host_list})
+
+        # Only the node whose fingerprint changed is re-collected
+        self.manager.fingerprints['node2'] = 'v2'
+        payload = self.refresh()
+        self.assertEqual(self.firmware.calls[-1], ['node2'])
+        self.assertEqual(payload['firmware'], {'node1': 'firmware-1', 'node2': 'firmware-2', 'node3': 'firmware-1'})
+
+        # A node that can't be fingerprinted keeps its last entry
+        self.manager.fingerprints['node3'] = 'ERROR: timeout'
+        payload = self.refresh()
+        self.assertEqual(len(self.firmware.calls), 2)
+        self.assertEqual(payload['firmware']['node3'], 'firmware-1')
+
+    def test_failed_nodes_are_retried(self):
+        self.firmware.errors = {'node2'}
+        self.refresh()
+        self.firmware.errors = set()
+        payload = self.refresh()
+        self.assertEqual(self.firmware.calls[-1], ['node2'])
+        self.assertEqual(payload['firmware']['node2'], 'firmware-2')
+
+    def test_removed_nodes_are_dropped(self):
+        self.refresh()
+        self.manager.host_list = ['node1', 'node3']
+        payload = self.refresh()
+        self.assertEqual(list(payload['firmware']), ['node1', 'node3'])
+        self.assertEqual(list(payload['counters']), ['node1', 'node3'])
+
+    def test_entries_older_than_max_age_are_recollected(self):
+        self.cache.max_age = 0
+        self.refresh()
+        self.refresh()
+        self.assertEqual(self.firmware.calls, [['node1', 'node2', 'node3']] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
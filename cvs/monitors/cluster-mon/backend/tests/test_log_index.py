@@ -0,0 +1,126 @@
+# cvs/monitors/cluster-mon/backend/tests/test_log_index.py
+import asyncio
+import base64
+import json
+import re
+import unittest
+
+from app.collectors.logs_collector import FRAME_BEGIN, FRAME_END, LogsCollector
+from app.core.log_index import LogIndex, required_words
+
+
+def _pull(kmsg=(), journal=(), boot_id='boot-1'):
+    return {'boot_id': boot_id, 'machine_id': 'machine-1', 'boot_time': 1000.0, 'kmsg': kmsg, 'journal': journal}
+
+
+def _texts(index, node='node1'):
+    return [entry.text for entry in index.search().get(node, [])]
+
+
+class RecordingPostings(dict):
+    """Postings that record the tokens looked up and fail on a scan of the vocabulary."""
+
+    def __init__(self, postings):
+        super().__init__(postings)
+        self.touched = set()
+
+    def get(self, token, default=None):
+        self.touched.add(token)
+        return super().get(token, default)
+
+    def __getitem__(self, token):
+        self.touched.add(token)
+        return super().__getitem__(token)
+
+    def items(self):
+        raise AssertionError('the vocabulary was scanned')
+
+    values = items
+
+
+class FakeManager:
+    def __init__(self, hosts):
+        self.host_list = hosts
+        self.commands = {}
+
+    async def exec_async(self, cmd, timeout=None, print_console=True, hosts=None):
+        self.commands = cmd
+        return {node: f'{FRAME_BEGIN}\n{json.dumps(_pull())}\n{FRAME_END}\n' for node in cmd}
+
+
+class TestLogIndex(unittest.TestCase):
+    def test_keeps_messages_sharing_a_timestamp(self):
+        index = LogIndex()
+        trace = [[4, 6.0, 'Call Trace:'], [4, 6.0, ' dump_stack+0x1'], [4, 6.0, ' panic']]
+        self.assertEqual(index.add('node1', _pull([[3, 0.0, 'boot warning']] + trace)), 4)
+        self.assertEqual(_texts(index), ['boot warning', 'Call Trace:', ' dump_stack+0x1', ' panic'])
+
+        # The next pull returns the cursor timestamp again, with one more message at it
+        self.assertEqual(index.add('node1', _pull(trace + [[4, 6.0, ' panic'], [3, 7.0, 'later']])), 2)
+        self.assertEqual(index.add('node1', _pull([[3, 7.0, 'later']])), 0)
+        self.assertEqual(_texts(index).count(' panic'), 2)
+        self.assertEqual(len(index), 6)
+
+    def test_journal_and_reboot(self):
+        index = LogIndex()
+        journal = [[27, 5_000_000, 'kubelet', 'failed'], [27, 5_000_000, 'kubelet', 'failed again']]
+        self.assertEqual(index.add('node1', _pull([[3, 1.0, 'old boot']], journal)), 3)
+        self.assertEqual(index.add('node1', _pull(journal=journal)), 0)
+        # dmesg timestamps restart on a new boot id
+        self.assertEqual(index.add('node1', _pull([[3, 1.0, 'new boot']], journal, boot_id='boot-2')), 1)
+        self.assertIn('kubelet: failed again', _texts(index))
+
+    def test_each_node_is_sent_only_its_own_cursor(self):
+        index = LogIndex()
+        index.add('node1', _pull([[3, 6.0, 'x']]))
+        manager = FakeManager(['node1', 'node2'])
+        asyncio.run(index.refresh(manager, LogsCollector().collect_new_messages))
+
+        scripts = {
+            node: base64.b64decode(re.search(r'echo (\S+) \|', cmd).group(1)).decode()
+            for node, cmd in manager.commands.items()
+        }
+        self.assertIn(
+            "CURSOR = {'boot_id': 'boot-1', 'kmsg': 6.0, 'machine_id': 'machine-1', 'journal': 0}", scripts['node1']
+        )
+        self.assertIn('CURSOR = None', scripts['node2'])
+        self.assertTrue(index.is_ingested('node2'))
+
+        # The command of a node doesn't grow with the number of nodes
+        size = len(manager.commands['node1'])
+        hosts = [f'node{i}' for i in range(1, 1001)]
+        for node in hosts[1:]:
+            index.add(node, _pull([[3, 6.0, 'x']], boot_id=f'boot-{node}'))
+        manager = FakeManager(hosts)
+        asyncio.run(index.refresh(manager, LogsCollector().collect_new_messages))
+        self.assertEqual(len(manager.commands), 1000)
+        self.assertEqual(len(manager.commands['node1']), size)
+
+    def test_query_only_touches_the_postings_of_its_words(self):
+        index = LogIndex()
+        noise = [[3, float(i), f'amdgpu 0000:{i:04x}:00.0: page fault addr 0x{i:08x}'] for i in range(200)]
+        hits = [
+            [3, 300.0, 'amdgpu: ring gfx_0.0.0 timeout, signaled seq=1'],
+            [3, 301.0, 'amdgpu: ring sdma0 timeouts seen'],
+            [3, 302.0, 'amdgpu: timeout waiting on ring'],
+        ]
+        index.add('node1', _pull(noise + hits))
+        index._postings = RecordingPostings(index._postings)
+
+        pattern = r'ring \S+ timeout'
+        matches = index.search([(re.compile(pattern), False)], required_words(pattern))
+        self.assertEqual([entry.text for entry in matches['node1']], [hits[0][2], hits[1][2]])
+        # 'ring' ends its token, 'timeout' starts it: only the tokens ending in 'ring' and
+        # starting with 'timeout' are looked up
+        self.assertEqual(index._postings.touched, {'ring', 'timeout', 'timeouts'})
+
+        # A word inside its tokens can't be looked up and is left to the regex
+        index._postings.touched.clear()
+        pattern = r'gfx.*imeou'
+        matches = index.search([(re.compile(pattern), False)], required_words(pattern))
+        self.assertEqual(len(matches['node1']), 1)
+        self.assertEqual(index._postings.touched, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# cvs/monitors/cluster-mon/backend/tests/test_metrics_store.py
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from app.core.metrics_store import MetricsHistoryStore
+
+NOW = 1_700_000_000.0
+
+
+def _round(offset, value, node='node1'):
+    """Metrics payload of one polling round logged offset seconds from NOW."""
+    stamp = datetime.fromtimestamp(NOW + offset, timezone.utc).replace(tzinfo=None).isoformat() + 'Z'
+    return {'timestamp': stamp, 'gpu': {'utilization': {node: {'card0': {'GPU use (%)': value}}}}}
+
+
+class TestMetricsHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.clock = patch('app.core.metrics_store.time.time', return_value=NOW)
+        self.clock.start()
+        self.addCleanup(self.clock.stop)
+
+    def test_query_trims_the_window_and_averages_buckets(self):
+        # Two rounds per segment: the query merges two segments and the live buffer
+        store = MetricsHistoryStore(self.data_dir, buffer_rows=2)
+        for offset, value in [(-700, 100), (-550, 10), (-500, 20), (-350, 30), (-10, 40)]:
+            store.append(_round(offset, value))
+        self.assertEqual(len([name for name in os.listdir(self.data_dir) if name.endswith('.series.json')]), 2)
+
+        result = store.query(duration=600, max_points=4)
+        self.assertEqual(result['step'], 150)
+        # The round before the window is dropped and the empty third bucket is left out
+        start = NOW - 600
+        self.assertEqual(result['timestamps'], [start, start + 150, start + 450])
+        self.assertEqual(result['series'], {'node1': {'gpu': {'utilization/card0/GPU use (%)': [15.0, 30.0, 40.0]}}})
+
+    def test_filters_series(self):
+        store = MetricsHistoryStore(self.data_dir)
+        store.append(_round(-10, 50, node='node1'))
+        store.append(_round(-10, 60, node='node2'))
+        self.assertEqual(list(store.query(node='node2')['series']), ['node2'])
+        self.assertEqual(store.query(metric_type='nic')['series'], {})
+        self.assertEqual(store.query(metric='temperature')['series'], {})
+
+    def test_segments_past_retention_are_deleted(self):
+        store = MetricsHistoryStore(self.data_dir, buffer_rows=1, retention_seconds=300)
+        store.append(_round(-1000, 10))
+        store.append(_round(-100, 20))
+        self.assertEqual(len([name for name in os.listdir(self.data_dir) if name.endswith('.series.json')]), 1)
+
+        # A restarted store loads the remaining segment from disk
+        reloaded = MetricsHistoryStore(self.data_dir, buffer_rows=1, retention_seconds=300)
+        result = reloaded.query(duration=3600, max_points=1)
+        self.assertEqual(result['series']['node1']['gpu']['utilization/card0/GPU use (%)'], [20.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# cvs/monitors/cluster-mon/backend/tests/test_node_summary.py
+import json
+import unittest
+
+from fastapi import Request
+
+from app.core.node_summary import NodeSummaryIndex, respond_json
+
+
+def _metrics(util, timestamp='2025-01-01T00:00:00Z'):
+    return {
+        'timestamp': timestamp,
+        'gpu': {
+            'utilization': {
+                'node1': {'card0': {'GPU use (%)': util}, 'card1': {'GPU use (%)': 50}},
+                'node2': {'error': 'ssh timeout'},
+            },
+            'temperature': {'node1': {'card0': {'Temperature (Sensor edge) (C)': 40}}},
+        },
+    }
+
+
+def _build(metrics):
+    return NodeSummaryIndex.build(metrics, ['node1', 'node2'], ['node1', 'node2'], [])
+
+
+def _request(if_none_match=None):
+    headers = [] if if_none_match is None else [(b'if-none-match', if_none_match.encode())]
+    return Request({'type': 'http', 'method': 'GET', 'path': '/api/nodes', 'headers': headers})
+
+
+class TestNodeSummaryIndex(unittest.TestCase):
+    def test_summaries(self):
+        index = _build(_metrics(30))
+        nodes = json.loads(index.nodes_body)
+        self.assertEqual([node['hostname'] for node in nodes], ['node1', 'node2'])
+        self.assertEqual((nodes[0]['gpu_count'], nodes[0]['avg_gpu_util']), (2, 40.0))
+        self.assertNotIn('hardware_status', nodes[0])
+        self.assertEqual(index.by_host['node1'].avg_gpu_temp, 40.0)
+        self.assertEqual(index.cluster_status['total_gpus'], 2)
+        self.assertEqual(index.cluster_status['status'], 'healthy')
+
+    def test_etag_is_stable_for_unchanged_content(self):
+        first, second = _build(_metrics(30)), _build(_metrics(30, timestamp='2025-01-01T00:00:05Z'))
+        self.assertEqual(first.nodes_etag, second.nodes_etag)
+        # The cluster status carries the round timestamp
+        self.assertNotEqual(first.status_etag, second.status_etag)
+        self.assertNotEqual(first.nodes_etag, _build(_metrics(31)).nodes_etag)
+
+    def test_respond_json_honours_if_none_match(self):
+        index = _build(_metrics(30))
+        response = respond_json(_request(), index.nodes_body, index.nodes_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.body, index.nodes_body)
+        self.assertEqual(response.headers['etag'], index.nodes_etag)
+
+        for header in (index.nodes_etag, f'"stale", W/{index.nodes_etag}', '*'):
+            response = respond_json(_request(header), index.nodes_body, index.nodes_etag)
+            self.assertEqual(response.status_code, 304, header)
+            self.assertEqual(response.body, b'')
+            self.assertEqual(response.headers['etag'], index.nodes_etag)
+
+        response = respond_json(_request('"stale"'), index.nodes_body, index.nodes_etag)
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
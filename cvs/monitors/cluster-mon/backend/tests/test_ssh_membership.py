@@ -0,0 +1,60 @@
+# cvs/monitors/cluster-mon/backend/tests/test_ssh_membership.py
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.core.cvs_parallel_ssh_reliable import Pssh, _ssh_lock
+
+
+class TestClientMembership(unittest.TestCase):
+    def setUp(self):
+        self.sessions = {host: SimpleNamespace(_disconnect=MagicMock()) for host in ["node1", "node2", "node3"]}
+        client = SimpleNamespace(hosts=["node1", "node2", "node3"], _host_clients={})
+        for i, host in enumerate(client.hosts):
+            client._host_clients[(i, host)] = self.sessions[host]
+        # Skip __init__, which probes the hosts
+        self.pssh = Pssh.__new__(Pssh)
+        self.pssh.client = client
+        self.pssh.reachable_hosts = ["node1", "node2", "node3"]
+        self.pssh.unreachable_hosts = []
+
+    def test_remove_hosts_closes_only_removed_sessions(self):
+        self.pssh.remove_hosts(["node1"])
+
+        self.sessions["node1"]._disconnect.assert_called_once()
+        self.sessions["node2"]._disconnect.assert_not_called()
+        self.assertEqual(self.pssh.unreachable_hosts, ["node1"])
+        self.assertEqual(
+            self.pssh.client._host_clients, {(0, "node2"): self.sessions["node2"], (1, "node3"): self.sessions["node3"]}
+        )
+
+    def test_add_hosts_keeps_sessions(self):
+        self.pssh.remove_hosts(["node2"])
+        self.pssh.add_hosts(["node2"])
+
+        self.assertEqual(self.pssh.client.hosts, ["node1", "node3", "node2"])
+        self.assertEqual(list(self.pssh.client._host_clients), [(0, "node1"), (1, "node3")])
+        self.sessions["node3"]._disconnect.assert_not_called()
+
+    def test_mark_unreachable_drops_the_host_from_the_client(self):
+        self.pssh._mark_unreachable("node2")
+
+        self.assertEqual(self.pssh.client.hosts, ["node1", "node3"])
+        self.assertEqual(self.pssh.unreachable_hosts, ["node2"])
+        self.sessions["node2"]._disconnect.assert_called_once()
+
+    def test_mark_unreachable_while_the_client_is_busy(self):
+        with _ssh_lock:
+            self.pssh._mark_unreachable("node2")
+        self.assertEqual(self.pssh.client.hosts, ["node1", "node2", "node3"])
+
+        # The next blocking command applies it first
+        self.pssh.client.run_command = MagicMock(return_value=[])
+        self.pssh._process_output = MagicMock(return_value={})
+        self.pssh.stop_on_errors = True
+        self.pssh.exec("hostname", print_console=False)
+        self.assertEqual(self.pssh.client.hosts, ["node1", "node3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# cvs/monitors/cluster-mon/backend/tests/test_ws_broadcast.py
+import asyncio
+import json
+import unittest
+
+from app.core.ws_broadcast import MetricsBroadcaster, diff_metrics
+
+
+class FakeWebSocket:
+    """Records the frames sent; a blocked socket holds its send until released."""
+
+    def __init__(self, blocked=False, broken=False):
+        self.frames = []
+        self.broken = broken
+        self.released = asyncio.Event()
+        if not blocked:
+            self.released.set()
+
+    async def send_text(self, text):
+        if self.broken:
+            raise ConnectionResetError('client went away')
+        await self.released.wait()
+        self.frames.append(json.loads(text))
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestMetricsBroadcaster(unittest.TestCase):
+    def test_diff_metrics(self):
+        old = {'gpu': {'node1': {'temp': 40, 'use': 10}, 'node2': {'temp': 50}}, 'ts': 1}
+        new = {'gpu': {'node1': {'temp': 41, 'use': 10}}, 'ts': 2, 'nic': [1]}
+        changes, removed = diff_metrics(old, new)
+        self.assertEqual(changes, [[['gpu', 'node1', 'temp'], 41], [['ts'], 2], [['nic'], [1]]])
+        self.assertEqual(removed, [['gpu', 'node2']])
+
+    def test_slow_client_is_resynced_without_blocking_the_others(self):
+        async def scenario():
+            broadcaster = MetricsBroadcaster()
+            fast, slow = FakeWebSocket(), FakeWebSocket(blocked=True)
+            broadcaster.add(fast)
+            slow_client = broadcaster.add(slow)
+
+            # The slow client is stuck sending round 1 while rounds 2..4 are published
+            for value in range(1, 5):
+                await broadcaster.publish({'gpu': {'node1': {'temp': value}}})
+                await _settle()
+            self.assertEqual([frame['type'] for frame in fast.frames], ['metrics'] + ['metrics_delta'] * 3)
+            self.assertEqual(fast.frames[-1]['changes'], [[['gpu', 'node1', 'temp'], 4]])
+            self.assertEqual(slow.frames, [])
+            # Only the newest round stays pending, the stale ones are dropped
+            self.assertEqual(slow_client.dropped, 2)
+
+            slow.released.set()
+            await _settle()
+            self.assertEqual([frame['seq'] for frame in slow.frames], [1, 4])
+            # The dropped rounds can't be applied as deltas, so it gets a full snapshot
+            self.assertEqual(slow.frames[-1]['type'], 'metrics')
+            self.assertEqual(slow.frames[-1]['data'], {'gpu': {'node1': {'temp': 4}}})
+
+            for client in list(broadcaster.clients):
+                await broadcaster.remove(client)
+
+        asyncio.run(scenario())
+
+    def test_failed_client_is_removed(self):
+        async def scenario():
+            broadcaster = MetricsBroadcaster()
+            good, broken = FakeWebSocket(), FakeWebSocket(broken=True)
+            broadcaster.add(good)
+            broadcaster.add(broken)
+            await broadcaster.publish({'ts': 1})
+            await _settle()
+            await broadcaster.publish({'ts': 2})
+            await _settle()
+            self.assertEqual([client.websocket for client in broadcaster.clients], [good])
+            self.assertEqual([frame['seq'] for frame in good.frames], [1, 2])
+
+            await broadcaster.remove(broadcaster.clients[0])
+
+        with self.assertLogs('app.core.ws_broadcast', 'WARNING'):
+            asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
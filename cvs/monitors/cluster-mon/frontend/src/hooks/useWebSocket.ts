@@ -40,7 +40,10 @@ export function useWebSocket() {
           }
 
           const data = JSON.parse(event.data)
-          updateFromWebSocket(data)
+          if (!updateFromWebSocket(data)) {
+            // Missed a delta frame - request a full snapshot
+            ws.send('resync')
+          }
         } catch (error) {
           console.error('Failed to parse WebSocket message:', error)
         }
@@ -51,12 +51,40 @@ export interface MetricsData {
   nic: any
 }
 
+type MetricsPath = string[]
+
+// Apply a metrics_delta frame, copying only the objects along each changed path
+function applyMetricsDelta(base: any, changes: [MetricsPath, any][], removed: MetricsPath[]): any {
+  const root = { ...base }
+  const copied = new Set<any>([root])
+  const parentOf = (path: MetricsPath) => {
+    let node = root
+    for (const key of path.slice(0, -1)) {
+      if (!copied.has(node[key])) {
+        node[key] = node[key] && typeof node[key] === 'object' ? { ...node[key] } : {}
+        copied.add(node[key])
+      }
+      node = node[key]
+    }
+    return node
+  }
+  for (const [path, value] of changes) {
+    if (path.length === 0) return value
+    parentOf(path)[path[path.length - 1]] = value
+  }
+  for (const path of removed) {
+    delete parentOf(path)[path[path.length - 1]]
+  }
+  return root
+}
+
 interface ClusterStore {
   // State
   clusterStatus: ClusterStatus | null
   nodes: NodeInfo[]
   selectedNode: NodeInfo | null
   latestMetrics: MetricsData | null
+  metricsSeq: number | null
   gpuSoftwareData: any | null
   nicSoftwareData: any | null
   nicAdvancedData: any | null
@@ -73,15 +101,16 @@ interface ClusterStore {
   setNICAdvancedData: (data: any) => void
   setConnected: (connected: boolean) => void
   setError: (error: string | null) => void
-  updateFromWebSocket: (data: any) => void
+  updateFromWebSocket: (data: any) => boolean
 }
 
-export const useClusterStore = create<ClusterStore>((set) => ({
+export const useClusterStore = create<ClusterStore>((set, get) => ({
   // Initial state
   clusterStatus: null,
   nodes: [],
   selectedNode: null,
   latestMetrics: null,
+  metricsSeq: null,
   gpuSoftwareData: null,
   nicSoftwareData: null,
   nicAdvancedData: null,
@@ -109,7 +138,22 @@ export const useClusterStore = create<ClusterStore>((set) => ({
 
   updateFromWebSocket: (data) => {
     if (data.type === 'metrics' && data.data) {
-      set({ latestMetrics: data.data, isConnected: true, error: null })
+      set({ latestMetrics: data.data, metricsSeq: data.seq ?? null, isConnected: true, error: null })
+      return true
+    } else if (data.type === 'metrics_delta') {
+      const { latestMetrics, metricsSeq } = get()
+      if (!latestMetrics || metricsSeq !== data.base) {
+        // Out of sync - caller asks the server for a full snapshot
+        console.warn(`Ignoring metrics delta ${data.seq} (have ${metricsSeq}, need ${data.base})`)
+        return false
+      }
+      set({
+        latestMetrics: applyMetricsDelta(latestMetrics, data.changes, data.removed),
+        metricsSeq: data.seq,
+        isConnected: true,
+        error: null,
+      })
     }
+    return true
   },
 }))
@@ -14,6 +14,7 @@ import traceback
 from datetime import datetime
 from cvs.cli_plugins.generate_plugin import GeneratorPlugin
 from cvs.lib import html_lib
+from cvs.lib import rccl_store_lib
 
 
 class HeatmapGenerator(GeneratorPlugin):
@@ -41,10 +42,14 @@ Examples:
   # Auto-named output in /tmp
   cvs generate heatmap -a actual.json -r reference.json
 
+  # Latest run (or --run-id) straight from the RCCL results store
+  cvs generate heatmap --store /shared/rccl_store -r reference.json
+
 Notes:
   - Both JSON files must be in RCCL graph format (from convert_to_graph_dict)
   - Reference JSON contains baseline/golden performance metrics
   - Actual JSON contains test results to compare against reference
+  - With --store the actual results are read from the RCCL results store instead of -a
 
 JSON Format:
   Basic format (results only):
@@ -71,7 +76,11 @@ JSON Format:
             """,
         )
 
-        parser.add_argument("-a", "--actual", required=True, help="Path to actual results JSON file")
+        actual = parser.add_mutually_exclusive_group(required=True)
+        actual.add_argument("-a", "--actual", help="Path to actual results JSON file")
+        actual.add_argument("--store", help="RCCL results store directory to read the actual results from")
+
+        parser.add_argument("--run-id", help="Run to use with --store (default: latest run)")
 
         parser.add_argument("-r", "--reference", required=True, help="Path to golden reference JSON file")
 
@@ -96,9 +105,29 @@ JSON Format:
 
         return parser
 
+    def _export_from_store(self, store_dir, run_id=None):
+        """Write one run of the results store as heatmap JSON, returns its path"""
+        if not rccl_store_lib.PYARROW_AVAILABLE:
+            print("Error: pyarrow is required for the RCCL results store (pip install pyarrow)")
+            return None
+        graph_dict = rccl_store_lib.RcclResultStore(store_dir).to_graph_dict(run_id)
+        if not graph_dict:
+            print(f"Error: No results for run {run_id or '(latest)'} in store {store_dir}")
+            return None
+        time_stamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+        actual_file = f'/tmp/rccl_result_from_store_{time_stamp}.json'
+        with open(actual_file, 'w') as f:
+            json.dump(graph_dict, f, indent=4)
+        return actual_file
+
     def generate(self, args):
         """Generate the RCCL performance heatmap HTML report"""
 
+        if args.store:
+            args.actual = self._export_from_store(args.store, args.run_id)
+            if args.actual is None:
+                return 1
+
         # Validate input files
         if not os.path.exists(args.actual):
             print(f"Error: Actual results file not found: {args.actual}")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Copyright 2025 Advanced Micro Devices, Inc.
+All rights reserved. This notice is intended as a precaution against inadvertent publication and does not imply publication or any waiver of confidentiality.
+The year included in the foregoing notice is the year of creation of the work.
+All code contained here is Property of Advanced Micro Devices, Inc.
+"""
+
+import argparse
+import json
+import os
+
+from cvs.cli_plugins.generate_plugin import GeneratorPlugin
+from cvs.lib import rccl_store_lib
+
+
+class RcclResultsGenerator(GeneratorPlugin):
+    """Generator plugin for querying the columnar RCCL results store"""
+
+    def get_name(self):
+        return "rccl_results"
+
+    def get_description(self):
+        return "Query RCCL results across runs from the columnar results store"
+
+    def get_parser(self):
+        parser = argparse.ArgumentParser(
+            description="Query the RCCL results store (Parquet files written by the RCCL suites)",
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            epilog=f"""
+Examples:
+  # Runs in the store
+  cvs generate rccl_results runs -s /shared/rccl_store
+
+  # busBw trend for all_reduce 1GB over the last 10 runs
+  cvs generate rccl_results trend -s /shared/rccl_store -c all_reduce --size 1G --last 10
+
+  # All measurements of a collective/dtype, as CSV
+  cvs generate rccl_results query -s /shared/rccl_store -c all_gather -d bfloat16 --format csv
+
+  # Export the latest run as heatmap JSON (or use: cvs generate heatmap --store ...)
+  cvs generate rccl_results export -s /shared/rccl_store -o actual.json
+
+Notes:
+  - Default store directory: {rccl_store_lib.DEFAULT_STORE_DIR}
+  - The RCCL suites append to the store when 'results_store_dir' is set in the config file
+            """,
+        )
+        parser.add_argument("action", choices=["runs", "trend", "query", "export"], help="What to report")
+        parser.add_argument("-s", "--store", default=rccl_store_lib.DEFAULT_STORE_DIR, help="Results store directory")
+        parser.add_argument("-c", "--collective", help="Collective, e.g. all_reduce or AllReduce")
+        parser.add_argument("-d", "--dtype", help="Data type, e.g. float or bfloat16")
+        parser.add_argument("--size", help="Message size in bytes or with unit, e.g. 1G or 256M")
+        parser.add_argument("--in-place", type=int, choices=[0, 1], help="In-place (1) or out-of-place (0) results")
+        parser.add_argument("--nodes", type=int, help="Node count")
+        parser.add_argument("--rocm-version", help="ROCm version")
+        parser.add_argument("--series", help="Result series, e.g. all_reduce_perf-float-16")
+        parser.add_argument("--run-id", action="append", help="Only this run (can be repeated)")
+        parser.add_argument("--last", type=int, help="Only the last N runs")
+        parser.add_argument("--metric", default="busBw", choices=["busBw", "algBw", "time"], help="Trend metric")
+        parser.add_argument("--format", default="table", choices=["table", "csv", "json"], help="Output format")
+        parser.add_argument("-o", "--output", help="Output file (export: heatmap JSON, others: table/csv/json)")
+        return parser
+
+    def _emit(self, df, args):
+        if args.format == "csv":
+            text = df.to_csv(index=False)
+        elif args.format == "json":
+            text = df.to_json(orient="records", indent=2)
+        else:
+            text = df.to_string(index=False) if not df.empty else "No results"
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text)
+            print(f"Wrote {len(df)} rows to {args.output}")
+        else:
+            print(text)
+
+    def generate(self, args):
+        """Run the requested query against the results store"""
+        if not rccl_store_lib.PYARROW_AVAILABLE:
+            print("Error: pyarrow is required for the RCCL results store (pip install pyarrow)")
+            return 1
+        if not os.path.isdir(args.store):
+            print(f"Error: Results store not found: {args.store}")
+            return 1
+
+        store = rccl_store_lib.RcclResultStore(args.store)
+        filters = {
+            "collective": args.collective,
+            "dtype": args.dtype,
+            "size": args.size,
+            "in_place": args.in_place,
+            "nodes": args.nodes,
+            "rocm_version": args.rocm_version,
+            "series": args.series,
+        }
+
+        try:
+            if args.action == "runs":
+                self._emit(store.runs(last=args.last), args)
+            elif args.action == "trend":
+                if not args.collective or not args.size:
+                    print("Error: trend needs --collective and --size")
+                    return 1
+                in_place = filters.pop("in_place")
+                trend = store.trend(
+                    filters.pop("collective"),
+                    filters.pop("size"),
+                    dtype=filters.pop("dtype"),
+                    in_place=0 if in_place is None else in_place,
+                    metric=args.metric,
+                    last_runs=args.last or 10,
+                    **{key: value for key, value in filters.items() if value is not None},
+                )
+                self._emit(trend, args)
+            elif args.action == "query":
+                df = store.query(run_ids=args.run_id, last_runs=args.last, **filters)
+                self._emit(df, args)
+            else:
+                run_id = args.run_id[-1] if args.run_id else None
+                filters.pop("series")
+                graph_dict = store.to_graph_dict(
+                    run_id, **{key: value for key, value in filters.items() if value is not None}
+                )
+                output = args.output or "/tmp/rccl_result_from_store.json"
+                with open(output, "w") as f:
+                    json.dump(graph_dict, f, indent=4)
+                print(f"Exported {len(graph_dict)} result series to {output}")
+            return 0
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
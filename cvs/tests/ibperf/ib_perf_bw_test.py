@@ -215,6 +215,39 @@ def test_ib_bw_perf(phdl, bw_test, config_dict):
             if rdma_nic_dict[node][rdma_dev]['eth_device'] in bck_nic_dict_lshw[node]:
                 bck_nic_dict[node][rdma_dev] = rdma_nic_dict[node][rdma_dev]
 
+    if re.search('True', config_dict.get('concurrent_sweep', 'False'), re.I):
+        # Whole msg size x QP count sweep as one scheduled job, see ibperf_lib.run_ib_perf_sweep
+        start_time = phdl.exec('date +"%a %b %e %H:%M"')
+        sweep_dict = ibperf_lib.run_ib_perf_sweep(
+            phdl,
+            [bw_test],
+            gpu_numa_dict,
+            gpu_nic_dict,
+            bck_nic_dict,
+            f'{config_dict["install_dir"]}/perftest/bin',
+            config_dict['msg_size_list'],
+            config_dict['gid_index'],
+            qp_count_list=config_dict['qp_count_list'],
+            port_no=int(config_dict['port_no']),
+            duration=int(config_dict['duration']),
+            samples=int(config_dict.get('samples', 1)),
+        )
+        ib_bw_dict[bw_test] = sweep_dict[bw_test]
+        end_time = phdl.exec('date +"%a %b %e %H:%M"')
+        verify_dmesg_for_errors(phdl, start_time, end_time, till_end_flag=True)
+        if re.search('True', config_dict['verify_bw'], re.I):
+            for msg_size in config_dict['msg_size_list']:
+                for qp_count in config_dict['qp_count_list']:
+                    ibperf_lib.verify_expected_bw(
+                        bw_test,
+                        msg_size,
+                        qp_count,
+                        ib_bw_dict[bw_test][msg_size][qp_count],
+                        config_dict['expected_results'],
+                    )
+        update_test_result()
+        return
+
     for msg_size in config_dict['msg_size_list']:
         ib_bw_dict[bw_test][msg_size] = {}
         for qp_count in config_dict['qp_count_list']:
@@ -233,6 +266,7 @@ def test_ib_bw_perf(phdl, bw_test, config_dict):
                 qp_count,
                 int(config_dict['port_no']),
                 int(config_dict['duration']),
+                samples=int(config_dict.get('samples', 1)),
             )
             end_time = phdl.exec('date +"%a %b %e %H:%M"')
             verify_dmesg_for_errors(phdl, start_time, end_time, till_end_flag=True)
@@ -273,6 +307,30 @@ def test_ib_lat_perf(phdl, lat_test, config_dict):
     print(f'%%%%%% gpu_nic_dict %%%%% {gpu_nic_dict}')
     print(f'%%%%%% gpu_numa_dict %%%%% {gpu_numa_dict}')
 
+    if re.search('True', config_dict.get('concurrent_sweep', 'False'), re.I):
+        start_time = phdl.exec('date +"%a %b %e %H:%M"')
+        sweep_dict = ibperf_lib.run_ib_perf_sweep(
+            phdl,
+            [lat_test],
+            gpu_numa_dict,
+            gpu_nic_dict,
+            bck_nic_dict,
+            f'{config_dict["install_dir"]}/perftest/bin',
+            config_dict['msg_size_list'],
+            config_dict['gid_index'],
+            port_no=int(config_dict['port_no']),
+        )
+        ib_lat_dict[lat_test] = sweep_dict[lat_test]
+        end_time = phdl.exec('date +"%a %b %e %H:%M"')
+        verify_dmesg_for_errors(phdl, start_time, end_time, till_end_flag=True)
+        if re.search('True', config_dict['verify_bw'], re.I):
+            for msg_size in config_dict['msg_size_list']:
+                ibperf_lib.verify_expected_lat(
+                    lat_test, msg_size, ib_lat_dict[lat_test][msg_size], config_dict['expected_results']
+                )
+        update_test_result()
+        return
+
     for msg_size in config_dict['msg_size_list']:
         ib_lat_dict[lat_test][msg_size] = {}
         # Log a message to Dmesg to create a timestamp record
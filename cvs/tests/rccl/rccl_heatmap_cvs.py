@@ -20,6 +20,7 @@ from datetime import datetime
 
 from cvs.lib import rccl_lib
 from cvs.lib import html_lib
+from cvs.lib import rccl_store_lib
 from cvs.lib.parallel_ssh_lib import *
 from cvs.lib.utils_lib import *
 from cvs.lib.verify_lib import *
@@ -289,6 +290,15 @@ def pytest_generate_tests(metafunc):
     if not active:
         return
 
+    # With batched_sweep, test_rccl_perf_sweep runs all data types and channel configs of a
+    # collective/gpu_count in one launch session, so only one of the two perf tests gets cases
+    batched_sweep = re.search('True', str(rccl.get('batched_sweep', 'False')), re.I) is not None
+    if (metafunc.function.__name__ == 'test_rccl_perf' and batched_sweep) or (
+        metafunc.function.__name__ == 'test_rccl_perf_sweep' and not batched_sweep
+    ):
+        metafunc.parametrize(",".join(active), [])
+        return
+
     domain_by_key = {
         "rccl_collective": rccl_collective_list,
         "data_type": data_type_list,
@@ -339,20 +349,8 @@ def test_rccl_perf(cluster_dict, config_dict, rccl_collective, gpu_count, data_t
     node_list = full_node_list[:no_of_nodes]
     no_of_global_ranks = int(gpu_count)
 
-    # Parse channel configuration (format: "min-max" or "default")
-    if str(channel_config).lower() == "default":
-        # Use RCCL defaults (don't specify channel parameters)
-        min_channels = None
-        max_channels = None
-    elif "-" in str(channel_config):
-        # Parse "min-max" format
-        min_channels, max_channels = channel_config.split("-")
-        min_channels = int(min_channels)
-        max_channels = int(max_channels)
-    else:
-        # Single value - use for both min and max
-        min_channels = int(channel_config)
-        max_channels = int(channel_config)
+    # Parse channel configuration (format: "min-max", single value or "default")
+    min_channels, max_channels = rccl_lib.parse_channel_config(channel_config)
 
     # Build list of nodes and their VPC IPs (used by the RCCL test)
     # make sure the VPC IPs are reachable from all nodes for passwordless ssh
@@ -445,6 +443,95 @@ def test_rccl_perf(cluster_dict, config_dict, rccl_collective, gpu_count, data_t
     update_test_result()
 
 
+def test_rccl_perf_sweep(cluster_dict, config_dict, rccl_collective, gpu_count):
+    """
+    Batched variant of test_rccl_perf, used when 'batched_sweep' is "True" in the config.
+
+    Runs every data_type x channel_config of one collective and GPU count through
+    rccl_lib.rccl_cluster_sweep_test, which pipelines the mpirun launches in one session on
+    the head node and streams the results back in one output. The dmesg bracket and the
+    optional cluster snapshots are taken once per sweep instead of once per config.
+    Results land in rccl_res_dict under the same keys test_rccl_perf uses.
+    """
+
+    globals.error_list = []
+    full_node_list = list(cluster_dict['node_dict'].keys())
+    node_list = full_node_list[: int(int(gpu_count) / 8)]
+    vpc_node_list = [cluster_dict['node_dict'][node]['vpc_ip'] for node in node_list]
+
+    phdl = Pssh(log, node_list, user=cluster_dict['username'], pkey=cluster_dict['priv_key_file'])
+    head_node = node_list[0]
+    shdl = Pssh(log, [head_node], user=cluster_dict['username'], pkey=cluster_dict['priv_key_file'])
+
+    phdl.exec(f'sudo echo "Starting Test {rccl_collective} sweep" | sudo tee /dev/kmsg')
+    start_time = phdl.exec('date +"%a %b %e %H:%M"')
+
+    if re.search('True', config_dict.get('cluster_snapshot_debug', 'False'), re.I):
+        cluster_dict_before = create_cluster_metrics_snapshot(phdl)
+
+    if not re.search('None', config_dict['env_source_script'], re.I):
+        phdl.exec(f'bash {config_dict["env_source_script"]}')
+
+    sweep_configs = rccl_lib.build_rccl_sweep_configs(
+        rccl_collective,
+        gpu_count,
+        config_dict.get('data_type_list', ['float', 'bfloat16']),
+        config_dict.get('channel_config_list', ['default']),
+    )
+    sweep_results = rccl_lib.rccl_cluster_sweep_test(
+        phdl,
+        shdl,
+        test_name=rccl_collective,
+        cluster_node_list=node_list,
+        vpc_node_list=vpc_node_list,
+        user_name=cluster_dict['username'],
+        ib_hca_list=config_dict['ib_hca_list'],
+        net_dev_list=config_dict['net_dev_list'],
+        oob_port=config_dict['oob_port'],
+        no_of_global_ranks=int(gpu_count),
+        rocm_path_var=config_dict['rocm_path_var'],
+        mpi_dir=config_dict['mpi_dir'],
+        mpi_path_var=config_dict['mpi_path_var'],
+        rccl_dir=config_dict['rccl_dir'],
+        rccl_path_var=config_dict['rccl_path_var'],
+        rccl_tests_dir=config_dict['rccl_tests_dir'],
+        sweep_configs=sweep_configs,
+        nccl_socket_ifname=config_dict.get('nccl_socket_ifname', ''),
+        gid_index=config_dict['gid_index'],
+        start_msg_size=config_dict['start_msg_size'],
+        end_msg_size=config_dict['end_msg_size'],
+        step_function=config_dict['step_function'],
+        threads_per_gpu=config_dict['threads_per_gpu'],
+        warmup_iterations=config_dict['warmup_iterations'],
+        no_of_iterations=config_dict['no_of_iterations'],
+        no_of_cycles=config_dict['no_of_cycles'],
+        check_iteration_count=config_dict['check_iteration_count'],
+        debug_level=config_dict['debug_level'],
+        ucx_tls=config_dict['ucx_tls'],
+        nccl_net_plugin=config_dict['nccl_net_plugin'],
+        mpi_pml=config_dict.get('mpi_pml', 'auto'),
+        verify_bus_bw=config_dict['verify_bus_bw'],
+        verify_bw_dip=config_dict['verify_bw_dip'],
+        verify_lat_dip=config_dict['verify_lat_dip'],
+        nic_model=config_dict['nic_model'],
+        exp_results_dict=config_dict['results'],
+        env_source_script=config_dict['env_source_script'],
+    )
+    for key_name, result_dict in sweep_results.items():
+        if result_dict:
+            rccl_res_dict[key_name] = result_dict
+
+    phdl.exec(f'sudo echo "End of Test {rccl_collective} sweep" | sudo tee /dev/kmsg')
+    end_time = phdl.exec('date +"%a %b %e %H:%M"')
+    verify_dmesg_for_errors(phdl, start_time, end_time, till_end_flag=True)
+
+    if re.search('True', config_dict.get('cluster_snapshot_debug', 'False'), re.I):
+        cluster_dict_after = create_cluster_metrics_snapshot(phdl)
+        compare_cluster_metrics_snapshots(cluster_dict_before, cluster_dict_after)
+
+    update_test_result()
+
+
 def test_gen_graph(request):
     print('Final Global result dict')
     print(rccl_res_dict)
@@ -493,6 +580,15 @@ def test_gen_heatmap(request, phdl, cluster_dict, config_dict):
     # You can optionally pass env_vars=['PATH', 'LD_LIBRARY_PATH'] to capture shell vars
     metadata = collect_system_metadata(phdl, cluster_dict, config_dict)
 
+    # Append this run to the columnar results store for cross-run queries
+    if config_dict.get('results_store_dir'):
+        try:
+            store = rccl_store_lib.RcclResultStore(config_dict['results_store_dir'])
+            store.append_series(rccl_res_dict, run_id=time_stamp, rocm_version=metadata.get('rocm_version'))
+            print(f'Appended results of run {time_stamp} to results store {config_dict["results_store_dir"]}')
+        except Exception as e:
+            print(f'Warning: Failed to append results to store {config_dict["results_store_dir"]}: {e}')
+
     # Create structured output with metadata and results
     structured_output = {'metadata': metadata, 'result': rccl_graph_dict}
 